@@ -12,7 +12,7 @@ from sentry.api.api_publish_status import ApiPublishStatus
 from sentry.api.base import region_silo_endpoint
 from sentry.api.bases.organization import OrganizationEndpoint
 from sentry.api.bases.organizationmember import MemberAndStaffPermission
-from sentry.api.paginator import OffsetPaginator
+from sentry.api.paginator import OffsetPaginator, use_keyset_pagination
 from sentry.api.serializers import serialize
 from sentry.api.serializers.models.organization_member import OrganizationMemberSerializer
 from sentry.api.serializers.models.organization_member.response import OrganizationMemberResponse
@@ -30,6 +30,7 @@ from sentry.search.utils import tokenize_query
 from sentry.signals import member_invited
 from sentry.users.services.user.service import user_service
 from sentry.utils import metrics
+from sentry.utils.cursors import Cursor, StringCursor
 
 from . import get_allowed_org_roles, save_team_assignments
 
@@ -284,6 +285,7 @@ class OrganizationMemberIndexEndpoint(OrganizationEndpoint):
                     queryset = queryset.none()
 
         expand = request.GET.getlist("expand", [])
+        keyset = use_keyset_pagination(self)
 
         return self.paginate(
             request=request,
@@ -294,6 +296,8 @@ class OrganizationMemberIndexEndpoint(OrganizationEndpoint):
                 serializer=OrganizationMemberSerializer(expand=expand),
             ),
             paginator_cls=OffsetPaginator,
+            keyset=keyset,
+            cursor_cls=StringCursor if keyset else Cursor,
         )
 
     @extend_schema(
@@ -16,7 +16,7 @@ from sentry.api.base import EnvironmentMixin, ReleaseAnalyticsMixin, region_silo
 from sentry.api.bases import NoProjects
 from sentry.api.bases.organization import OrganizationReleasesBaseEndpoint
 from sentry.api.exceptions import ConflictError, InvalidRepository
-from sentry.api.paginator import MergingOffsetPaginator, OffsetPaginator
+from sentry.api.paginator import MergingOffsetPaginator, OffsetPaginator, use_keyset_pagination
 from sentry.api.release_search import RELEASE_FREE_TEXT_KEY, parse_search_query
 from sentry.api.serializers import serialize
 from sentry.api.serializers.rest_framework import (
@@ -46,6 +46,7 @@ from sentry.signals import release_created
 from sentry.snuba.sessions import STATS_PERIODS
 from sentry.types.activity import ActivityType
 from sentry.utils.cache import cache
+from sentry.utils.cursors import StringCursor
 from sentry.utils.sdk import Scope, bind_organization_context
 
 ERR_INVALID_STATS_PERIOD = "Invalid %s. Valid choices are %s"
@@ -399,6 +400,11 @@ class OrganizationReleasesEndpoint(
         queryset = queryset.extra(select=select_extra)
         queryset = add_date_filter_to_queryset(queryset, filter_params)
 
+        # Keyset cursors need a non-null sort key that's unique per row, which flattened releases
+        # (one row per project) and the nullable semver and adoption sorts don't have.
+        if sort in ("date", "build") and not flatten and use_keyset_pagination(self):
+            paginator_kwargs.update(keyset=True, cursor_cls=StringCursor)
+
         return self.paginate(
             request=request,
             queryset=queryset,
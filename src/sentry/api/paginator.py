@@ -1,7 +1,11 @@
+import base64
 import bisect
 import functools
+import heapq
+import itertools
 import logging
 import math
+import operator
 from collections.abc import Callable, Sequence
 from datetime import datetime, timezone
 from typing import Any
@@ -9,9 +13,12 @@ from urllib.parse import quote
 
 from django.core.exceptions import EmptyResultSet, ObjectDoesNotExist
 from django.db import connections
+from django.db.models import Q
 from django.db.models.functions import Lower
 
-from sentry.utils.cursors import Cursor, CursorResult, build_cursor
+from sentry import options
+from sentry.utils import json, metrics
+from sentry.utils.cursors import Cursor, CursorResult, StringCursor, build_cursor
 from sentry.utils.pagination_factory import PaginatorLike
 
 quote_name = connections["default"].ops.quote_name
@@ -27,6 +34,18 @@ MAX_SNUBA_ELEMENTS = 10000
 def count_hits(queryset, max_hits):
     if not max_hits:
         return 0
+
+    # Counting is as slow as a scan of up to `max_hits` matching rows, so for large limits it's
+    # cheaper to go with the query planner's estimate. Smaller counts are cheap enough that
+    # planning the query on top of them isn't worth it.
+    approximate_threshold = options.get("api.paginator.approximate-hits-threshold")
+    if approximate_threshold and max_hits > approximate_threshold:
+        estimate = estimate_hits(queryset)
+        if estimate is not None and estimate >= approximate_threshold:
+            metrics.incr("api.paginator.count_hits", tags={"method": "estimate"})
+            return min(estimate, max_hits)
+
+    metrics.incr("api.paginator.count_hits", tags={"method": "count"})
     hits_query = queryset.values()[:max_hits].query
     # clear out any select fields (include select_related) and pull just the id
     hits_query.clear_select_clause()
@@ -41,6 +60,121 @@ def count_hits(queryset, max_hits):
     return cursor.fetchone()[0]
 
 
+def estimate_hits(queryset):
+    """
+    Return the Postgres query planner's estimate of the number of rows matched by ``queryset``, or
+    ``None`` if there is no estimate. This only costs planning the query, but can be far off for
+    selective filters or stale table statistics.
+    """
+    hits_query = queryset.values().query
+    hits_query.clear_select_clause()
+    hits_query.add_fields(["id"])
+    hits_query.clear_ordering(force=True, clear_default=True)
+    try:
+        h_sql, h_params = hits_query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    cursor = connections[queryset.using_replica().db].cursor()
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {h_sql}", h_params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    try:
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def use_keyset_pagination(endpoint):
+    """
+    Whether the endpoint should paginate with keyset cursors, see
+    ``api.paginator.keyset-endpoints``.
+    """
+    return type(endpoint).__name__ in options.get("api.paginator.keyset-endpoints")
+
+
+def encode_keyset_cursor_value(values):
+    """
+    Pack the sort key of a row into an opaque, URL safe cursor value for keyset pagination.
+    """
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value for value in values
+    ]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_keyset_cursor_value(value):
+    if not value or not isinstance(value, str):
+        raise BadPaginationError("Invalid cursor")
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)))
+        if not isinstance(payload, list):
+            raise ValueError(payload)
+        return [
+            datetime.fromisoformat(item["dt"]) if isinstance(item, dict) else item
+            for item in payload
+        ]
+    except (KeyError, TypeError, ValueError):
+        raise BadPaginationError("Invalid cursor")
+
+
+def build_keyset_filter(fields, values, inclusive=False):
+    """
+    Build a filter matching the rows that come after ``values`` when ordering by ``fields``, a
+    list of ``(field name, descending)`` pairs. With ``inclusive`` the row equal to ``values`` is
+    matched as well.
+
+    Postgres row comparisons (``(a, b) > (%s, %s)``) can't mix directions, so this is spelled out
+    as ``a > %s OR (a = %s AND b > %s)`` instead, which can still use an index on ``(a, b)``.
+    """
+    clauses = []
+    for i, ((field, desc), value) in enumerate(zip(fields, values)):
+        equal = {name: prefix_value for (name, _), prefix_value in zip(fields[:i], values[:i])}
+        clauses.append(Q(**equal, **{f"{field}__{'lt' if desc else 'gt'}": value}))
+    if inclusive:
+        clauses.append(Q(**{name: value for (name, _), value in zip(fields, values)}))
+    if not clauses:
+        return Q(pk__in=[])
+    return functools.reduce(operator.or_, clauses)
+
+
+def build_keyset_cursor_result(results, limit, cursor, key, on_results=None, hits=None):
+    """
+    Build the page of a keyset paginated query from up to ``limit + 1`` rows, fetched in the
+    direction of ``cursor`` starting after its value.
+
+    The cursor value is the encoded sort key of the row the page starts after, and an offset of 1
+    means the page starts at that row instead. That's only used to step back from an empty page.
+    """
+    has_more = len(results) > limit
+    results = list(results[:limit])
+    if cursor.is_prev:
+        results.reverse()
+
+    has_boundary = bool(cursor.value)
+    if results:
+        next_cursor = StringCursor(
+            encode_keyset_cursor_value(key(results[-1])),
+            0,
+            False,
+            has_boundary if cursor.is_prev else has_more,
+        )
+        prev_cursor = StringCursor(
+            encode_keyset_cursor_value(key(results[0])),
+            0,
+            True,
+            has_more if cursor.is_prev else has_boundary,
+        )
+    else:
+        next_cursor = StringCursor(cursor.value or "", 1, False, cursor.is_prev and has_boundary)
+        prev_cursor = StringCursor(cursor.value or "", 1, True, not cursor.is_prev and has_boundary)
+
+    if on_results:
+        results = on_results(results)
+
+    return CursorResult(results=results, next=next_cursor, prev=prev_cursor, hits=hits)
+
+
 class BadPaginationError(Exception):
     pass
 
@@ -241,8 +375,24 @@ class DateTimePaginator(BasePaginator):
 # and are only useful for polling situations. The OffsetPaginator ignores them
 # entirely and uses standard paging
 class OffsetPaginator(PaginatorLike):
+    """
+    Paginates a queryset by page number.
+
+    With ``keyset`` the paginator instead hands out opaque cursors holding the sort key of the
+    row the page starts after (use ``StringCursor`` as the cursor class), so that deep pages don't
+    have to skip over all the rows before them. ``order_by`` must then only name fields of the
+    model (or annotations), which may not be null. ``id`` is added as a tiebreaker if it isn't
+    part of the ordering already.
+    """
+
     def __init__(
-        self, queryset, order_by=None, max_limit=MAX_LIMIT, max_offset=None, on_results=None
+        self,
+        queryset,
+        order_by=None,
+        max_limit=MAX_LIMIT,
+        max_offset=None,
+        on_results=None,
+        keyset=False,
     ):
         self.key = (
             order_by
@@ -253,6 +403,7 @@ class OffsetPaginator(PaginatorLike):
         self.max_limit = max_limit
         self.max_offset = max_offset
         self.on_results = on_results
+        self.keyset = keyset
 
     def get_result(
         self,
@@ -269,6 +420,9 @@ class OffsetPaginator(PaginatorLike):
 
         limit = min(limit, self.max_limit)
 
+        if self.keyset:
+            return self._get_keyset_result(limit, cursor, count_hits)
+
         queryset = self.queryset
         if self.key:
             queryset = queryset.order_by(*self.key)
@@ -300,6 +454,51 @@ class OffsetPaginator(PaginatorLike):
 
         return CursorResult(results=results, next=next_cursor, prev=prev_cursor, hits=hits)
 
+    def get_keyset_fields(self):
+        """
+        Return the ``(field name, descending)`` pairs rows are ordered by in keyset mode.
+        """
+        fields = [
+            (key[1:], True) if key.startswith("-") else (key, False) for key in self.key or ()
+        ]
+        if not any(name in ("id", "pk") for name, _ in fields):
+            fields.append(("id", False))
+        return fields
+
+    def get_keyset_value(self, item):
+        return [getattr(item, name) for name, _ in self.get_keyset_fields()]
+
+    def _get_keyset_result(self, limit, cursor, count_hits):
+        fields = self.get_keyset_fields()
+
+        # Previous pages are fetched backwards from the cursor, and reversed afterwards.
+        fields = [(name, desc != cursor.is_prev) for name, desc in fields]
+        queryset = self.queryset.order_by(*(f"-{name}" if desc else name for name, desc in fields))
+
+        if cursor.value:
+            values = decode_keyset_cursor_value(cursor.value)
+            if len(values) != len(fields):
+                raise BadPaginationError("Invalid cursor")
+            queryset = queryset.filter(
+                build_keyset_filter(fields, values, inclusive=bool(cursor.offset))
+            )
+
+        results = list(queryset[: limit + 1])
+
+        if count_hits:
+            hits = self.count_hits(max_hits=MAX_HITS_LIMIT)
+        else:
+            hits = None
+
+        return build_keyset_cursor_result(
+            results,
+            limit,
+            cursor,
+            key=self.get_keyset_value,
+            on_results=self.on_results,
+            hits=hits,
+        )
+
     def count_hits(self, max_hits):
         return count_hits(self.queryset, max_hits)
 
@@ -578,17 +777,28 @@ class CombinedQuerysetPaginator:
     It assumes if _any_ field is a date key, all of them are.
 
     There is an assertion in the constructor to help prevent this from manifesting.
+
+    With ``keyset`` the paginator hands out opaque cursors holding the sort key of the row the page
+    starts after (use ``StringCursor`` as the cursor class) rather than page numbers. Every
+    intermediary then needs the same number of order_by keys, none of which may be null. Rows that
+    are tied on all keys are ordered by model name and primary key.
+
+    Each queryset is ordered and limited in the database, and the pages are produced by merging
+    them, so rows of one queryset are ordered by the database's collation.
     """
 
     multiplier = 1000000  # Use microseconds for date keys.
     using_dates = False
     model_key_map = {}
 
-    def __init__(self, intermediaries, desc=False, on_results=None, case_insensitive=False):
+    def __init__(
+        self, intermediaries, desc=False, on_results=None, case_insensitive=False, keyset=False
+    ):
         self.desc = desc
         self.intermediaries = intermediaries
         self.on_results = on_results
         self.case_insensitive = case_insensitive
+        self.keyset = keyset
         for intermediary in list(self.intermediaries):
             if intermediary.is_empty:
                 self.intermediaries.remove(intermediary)
@@ -609,6 +819,11 @@ class CombinedQuerysetPaginator:
                 not using_other
             ), "When sorting by a date, it must be the key used on all intermediaries"
 
+        if self.keyset:
+            assert (
+                len({len(intermediary.order_by) for intermediary in self.intermediaries}) <= 1
+            ), "When using keyset pagination, all intermediaries must have the same number of keys"
+
     def key_from_item(self, item):
         return self.model_key_map.get(type(item))[0]
 
@@ -632,45 +847,79 @@ class CombinedQuerysetPaginator:
         else:
             return self._prep_value(item, self.key_from_item(item), for_prev)
 
+    def get_keyset_value(self, item):
+        keys = self._get_sort_keys(self.model_key_map.get(type(item)))
+        return [*(getattr(item, key) for key in keys), type(item).__name__, item.pk]
+
     def _is_asc(self, is_prev):
         return (self.desc and is_prev) or not (self.desc or is_prev)
 
-    def _build_combined_querysets(self, is_prev):
-        asc = self._is_asc(is_prev)
-        combined_querysets = list()
-        for intermediary in self.intermediaries:
-            key = intermediary.order_by[0]
-            annotate = {}
-            if self.case_insensitive:
-                key = f"{key}_lower"
-                annotate[key] = Lower(intermediary.order_by[0])
-
-            queryset = intermediary.queryset.annotate(**annotate)
-            for key in intermediary.order_by:
-                if self.case_insensitive:
-                    key = f"{key}_lower"
-                if asc:
-                    queryset = queryset.order_by(key)
-                else:
-                    queryset = queryset.order_by(f"-{key}")
-            combined_querysets += list(queryset)
-
-        def _sort_combined_querysets(item):
-            sort_keys = []
-            sort_keys.append(self.get_item_key(item))
-            if len(self.model_key_map.get(type(item))) > 1:
-                # XXX: This doesn't do anything - it just uses a column name as the sort key. It should be pulling the
-                # value of the other keys out instead.
-                sort_keys.extend(iter(self.model_key_map.get(type(item))[1:]))
-            sort_keys.append(type(item).__name__)
-            return tuple(sort_keys)
-
-        combined_querysets.sort(
-            key=_sort_combined_querysets,
-            reverse=asc if is_prev else not asc,
+    def _get_sort_keys(self, order_by):
+        keys = list(order_by)
+        if self.case_insensitive:
+            keys[0] = f"{keys[0]}_lower"
+        return keys
+
+    def _get_sort_key(self, item):
+        if self.case_insensitive:
+            # Compare the values the database sorted each queryset by
+            sort_keys = [getattr(item, f"{self.key_from_item(item)}_lower")]
+        else:
+            sort_keys = [self.get_item_key(item)]
+        if len(self.model_key_map.get(type(item))) > 1:
+            # XXX: This doesn't do anything - it just uses a column name as the sort key. It should be pulling the
+            # value of the other keys out instead.
+            sort_keys.extend(iter(self.model_key_map.get(type(item))[1:]))
+        sort_keys.append(type(item).__name__)
+        return tuple(sort_keys)
+
+    def _build_queryset(self, intermediary, desc):
+        annotate = {}
+        keys = self._get_sort_keys(intermediary.order_by)
+        if self.case_insensitive:
+            annotate[keys[0]] = Lower(intermediary.order_by[0])
+
+        order_by = [f"-{key}" if desc else key for key in keys]
+        if self.keyset:
+            order_by.append("-pk" if desc else "pk")
+        return intermediary.queryset.annotate(**annotate).order_by(*order_by)
+
+    def _build_keyset_filter(self, intermediary, values, desc, inclusive):
+        *values, model_name, pk = values
+        keys = self._get_sort_keys(intermediary.order_by)
+        if len(values) != len(keys):
+            raise BadPaginationError("Invalid cursor")
+
+        fields = [(key, desc) for key in keys]
+        if intermediary.instance_type.__name__ == model_name:
+            return build_keyset_filter([*fields, ("pk", desc)], [*values, pk], inclusive)
+        # Rows that are tied with the cursor on all keys are ordered by model name
+        return build_keyset_filter(
+            fields, values, inclusive=(intermediary.instance_type.__name__ < model_name) == desc
         )
 
-        return combined_querysets
+    def _get_keyset_result(self, cursor, limit):
+        # Previous pages are fetched backwards from the cursor, and reversed afterwards.
+        desc = self.desc != cursor.is_prev
+        values = decode_keyset_cursor_value(cursor.value) if cursor.value else None
+
+        querysets = []
+        for intermediary in self.intermediaries:
+            queryset = self._build_queryset(intermediary, desc)
+            if values is not None:
+                queryset = queryset.filter(
+                    self._build_keyset_filter(intermediary, values, desc, bool(cursor.offset))
+                )
+            querysets.append(queryset[: limit + 1])
+
+        results = list(
+            itertools.islice(
+                heapq.merge(*querysets, key=self.get_keyset_value, reverse=desc), limit + 1
+            )
+        )
+        return build_keyset_cursor_result(
+            results, limit, cursor, key=self.get_keyset_value, on_results=self.on_results
+        )
 
     def get_result(self, cursor=None, limit=100):
         # offset is page #
@@ -680,7 +929,8 @@ class CombinedQuerysetPaginator:
 
         limit = min(limit, MAX_LIMIT)
 
-        combined_querysets = self._build_combined_querysets(cursor.is_prev)
+        if self.keyset:
+            return self._get_keyset_result(cursor, limit)
 
         page = int(cursor.offset)
         cursor_value = int(cursor.value)
@@ -690,7 +940,17 @@ class CombinedQuerysetPaginator:
         if offset < 0:
             raise BadPaginationError("Pagination offset cannot be negative")
 
-        results = list(combined_querysets[offset:stop])
+        # Pages are always in the requested order, so no queryset needs more than `stop` rows to
+        # produce one, and their merge only needs to run up to it.
+        querysets = [
+            self._build_queryset(intermediary, self.desc)[:stop]
+            for intermediary in self.intermediaries
+        ]
+        results = list(
+            itertools.islice(
+                heapq.merge(*querysets, key=self._get_sort_key, reverse=self.desc), offset, stop
+            )
+        )
         if cursor.value != limit:
             results = results[-(limit + 1) :]
 
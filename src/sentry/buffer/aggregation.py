@@ -0,0 +1,224 @@
+"""
+In-process pre-aggregation of buffer increments.
+
+Under load, the same few rows (think ``Group.times_seen`` of a hot group) are incremented over and
+over, and every ``Buffer.incr`` call is a separate round-trip to the buffer backend. When enabled,
+``IncrAggregator`` coalesces calls for the same ``(model, filters)`` in process memory: column
+deltas are summed and ``extra`` values are merged with the last write winning, exactly like the
+Redis buffer merges them. The aggregated increments are handed to the buffer backend when
+
+* ``buffer.incr-aggregation.max-keys`` distinct rows are pending,
+* the oldest pending increment is ``buffer.incr-aggregation.max-delay-ms`` old (checked by a
+  timer, so this also holds for idle processes, for buffers whose ``incr`` only enqueues work;
+  buffers that write to the database, like ``InProcessBuffer``, check it on the next ``add``
+  instead, so that those writes are never made from the timer thread),
+* the process shuts down (``atexit``, or Celery's ``worker_process_shutdown`` for forked workers),
+* or ``flush`` is called explicitly.
+
+Pending increments belong to the process that added them: a forked child starts with none.
+
+Durability contract: increments are only as durable as the process holding them until they are
+flushed. A process that is killed without running its shutdown hooks (SIGKILL, OOM) loses up to
+``max-delay-ms`` worth of increments. Pending increments are also invisible to ``Buffer.get`` and
+to other processes. Buffered counters are already eventually consistent (and lost if Redis
+loses them), which is why this is acceptable for them, but callers needing a read-your-writes
+guarantee must not rely on the buffer.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+import weakref
+from collections.abc import Callable
+from typing import Any
+
+from celery.signals import worker_process_shutdown
+
+from sentry import options
+from sentry.db import models
+from sentry.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+IncrFunc = Callable[..., None]
+
+
+class PendingIncr:
+    __slots__ = ("model", "columns", "filters", "extra", "signal_only", "count")
+
+    def __init__(
+        self,
+        model: type[models.Model],
+        filters: dict[str, Any],
+        signal_only: bool | None,
+    ) -> None:
+        self.model = model
+        self.filters = filters
+        self.signal_only = signal_only
+        self.columns: dict[str, int] = {}
+        self.extra: dict[str, Any] | None = None
+        self.count = 0
+
+    def add(self, columns: dict[str, int], extra: dict[str, Any] | None) -> None:
+        for column, amount in columns.items():
+            self.columns[column] = self.columns.get(column, 0) + amount
+        if extra:
+            if self.extra is None:
+                self.extra = {}
+            self.extra.update(extra)
+        self.count += 1
+
+
+def _make_filters_key(filters: dict[str, Any]) -> tuple[tuple[str, Any], ...]:
+    return tuple(
+        sorted((k, v.pk if isinstance(v, models.Model) else v) for k, v in filters.items())
+    )
+
+
+class IncrAggregator:
+    """
+    Coalesces ``Buffer.incr`` calls in memory and passes them on to ``incr_func`` in bulk. See
+    the module docstring for when pending increments are flushed, and what that means for their
+    durability.
+    """
+
+    def __init__(self, incr_func: IncrFunc, timed_flush: bool = True) -> None:
+        self.incr_func = incr_func
+        self.timed_flush = timed_flush
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[Any, ...], PendingIncr] = {}
+        self._timer: threading.Timer | None = None
+        # Monotonic time of the oldest pending increment.
+        self._oldest: float | None = None
+        # Set while this thread hands increments to the backend, whose `incr` calls back into
+        # `add`.
+        self._local = threading.local()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(
+        self,
+        model: type[models.Model],
+        columns: dict[str, int],
+        filters: dict[str, Any],
+        extra: dict[str, Any] | None = None,
+        signal_only: bool | None = None,
+    ) -> bool:
+        """
+        Hold on to an increment, returning ``False`` if it should be written through instead.
+        """
+        if getattr(self._local, "flushing", False):
+            return False
+
+        max_keys = options.get("buffer.incr-aggregation.max-keys")
+        if not max_keys:
+            return False
+
+        key = (model, _make_filters_key(filters), signal_only)
+        try:
+            hash(key)
+        except TypeError:
+            return False
+
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = PendingIncr(model, filters, signal_only)
+            else:
+                metrics.incr("buffer.incr_aggregation.coalesced", skip_internal=True)
+            pending.add(columns, extra)
+
+            now = time.monotonic()
+            if self._oldest is None:
+                self._oldest = now
+            if self.timed_flush and self._timer is None:
+                self._start_timer()
+            if len(self._pending) >= max_keys:
+                reason = "size"
+            elif not self.timed_flush and now - self._oldest >= self._max_delay():
+                reason = "time"
+            else:
+                reason = None
+
+        if reason is not None:
+            self.flush(reason=reason)
+        return True
+
+    def flush(self, reason: str = "explicit") -> None:
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            self._oldest = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not pending:
+            return
+
+        metrics.incr("buffer.incr_aggregation.flush", tags={"reason": reason}, skip_internal=True)
+        metrics.distribution("buffer.incr_aggregation.flush_size", len(pending))
+
+        self._local.flushing = True
+        try:
+            for incr in pending.values():
+                try:
+                    self.incr_func(
+                        incr.model, incr.columns, incr.filters, incr.extra, incr.signal_only
+                    )
+                except Exception:
+                    logger.exception(
+                        "buffer.incr_aggregation.flush_failed",
+                        extra={"model": incr.model.__name__, "count": incr.count},
+                    )
+        finally:
+            self._local.flushing = False
+
+    def reset_after_fork(self) -> None:
+        """
+        Drop the state inherited from the parent process: its pending increments are flushed by
+        the parent, its timer thread does not exist in the child, and its lock may have been held
+        by another thread while forking.
+        """
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._timer = None
+        self._oldest = None
+        self._local = threading.local()
+
+    def _max_delay(self) -> float:
+        return options.get("buffer.incr-aggregation.max-delay-ms") / 1000
+
+    def _start_timer(self) -> None:
+        self._timer = threading.Timer(self._max_delay(), self.flush, kwargs={"reason": "time"})
+        self._timer.daemon = True
+        self._timer.start()
+
+
+_aggregators: weakref.WeakSet[IncrAggregator] = weakref.WeakSet()
+
+
+def create_incr_aggregator(incr_func: IncrFunc, timed_flush: bool = True) -> IncrAggregator:
+    aggregator = IncrAggregator(incr_func, timed_flush=timed_flush)
+    _aggregators.add(aggregator)
+    return aggregator
+
+
+def flush_incr_aggregators(**kwargs: Any) -> None:
+    for aggregator in list(_aggregators):
+        aggregator.flush(reason="shutdown")
+
+
+def _reset_incr_aggregators_after_fork() -> None:
+    for aggregator in list(_aggregators):
+        aggregator.reset_after_fork()
+
+
+atexit.register(flush_incr_aggregators)
+os.register_at_fork(after_in_child=_reset_incr_aggregators_after_fork)
+worker_process_shutdown.connect(flush_incr_aggregators, weak=False)
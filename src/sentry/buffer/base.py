@@ -1,13 +1,24 @@
+import logging
+from collections import defaultdict
+from collections.abc import Sequence
 from datetime import datetime
+from functools import cached_property
 from typing import Any
 
+from django.db import router, transaction
 from django.db.models import Expression, F
+from django.db.models.signals import post_save
 
+from sentry.buffer.aggregation import IncrAggregator, create_incr_aggregator
+from sentry.buffer.bulk import BufferedIncr, Shape, bulk_update, get_filter_key, get_shape
 from sentry.db import models
 from sentry.signals import buffer_incr_complete
 from sentry.tasks.process_buffer import process_incr
+from sentry.utils import metrics
 from sentry.utils.services import Service
 
+logger = logging.getLogger(__name__)
+
 
 class Buffer(Service):
     """
@@ -21,12 +32,20 @@ class Buffer(Service):
 
     This is useful in situations where a single event might be happening so fast that the queue cant
     keep up with the updates.
+
+    Implementations of ``incr`` should first offer the increment to ``incr_aggregator``, which
+    coalesces increments in process memory when enabled (see ``sentry.buffer.aggregation``).
+    Implementations whose ``incr`` writes to the database must set ``incr_writes_to_database``,
+    so that pending increments are never flushed from the aggregator's timer thread.
     """
 
+    incr_writes_to_database = False
+
     __all__ = (
         "get",
         "incr",
         "process",
+        "bulk_process",
         "process_pending",
         "process_batch",
         "validate",
@@ -39,6 +58,10 @@ class Buffer(Service):
         "delete_key",
     )
 
+    @cached_property
+    def incr_aggregator(self) -> IncrAggregator:
+        return create_incr_aggregator(self.incr, timed_flush=not self.incr_writes_to_database)
+
     def get(
         self,
         model: type[models.Model],
@@ -109,6 +132,9 @@ class Buffer(Service):
         is useful in cases where we need to do additional processing before writing to the
         database and opt to do it in a `buffer_incr_complete` receiver.
         """
+        if self.incr_aggregator.add(model, columns, filters, extra, signal_only):
+            return
+
         process_incr.apply_async(
             kwargs={
                 "model": model,
@@ -120,7 +146,7 @@ class Buffer(Service):
             headers={"sentry-propagate-traces": False},
         )
 
-    def process_pending(self) -> None:
+    def process_pending(self, partition: int | None = None) -> None:
         return
 
     def process_batch(self) -> None:
@@ -178,3 +204,85 @@ class Buffer(Service):
             created=created,
             sender=model,
         )
+
+    def bulk_process(self, incrs: Sequence[BufferedIncr]) -> None:
+        """
+        Apply a batch of increments, with one statement per model and shape of increment (see
+        ``sentry.buffer.bulk``) instead of one per increment. Increments that can't be applied
+        in bulk go through ``process``. Signals are sent as ``process`` would send them:
+        ``post_save`` for updated groups, and ``buffer_incr_complete`` for every increment.
+        """
+        from sentry.models.group import Group
+
+        batches: dict[Shape, list[BufferedIncr]] = defaultdict(list)
+        single: list[BufferedIncr] = []
+        for incr in incrs:
+            shape = get_shape(incr)
+            if shape is None:
+                single.append(incr)
+            else:
+                batches[shape].append(incr)
+
+        for shape, batch in batches.items():
+            model = shape[0]
+            using = router.db_for_write(model)
+            if len(batch) < 2 or transaction.get_connection(using).vendor != "postgresql":
+                single.extend(batch)
+                continue
+
+            # Postgres applies only one of several updates to the same row in a statement.
+            seen = set()
+            unique = []
+            for incr in batch:
+                filter_key = get_filter_key(incr)
+                if filter_key in seen:
+                    single.append(incr)
+                else:
+                    seen.add(filter_key)
+                    unique.append(incr)
+
+            score = model is Group and "times_seen" in shape[1] and "last_seen" in shape[2]
+            try:
+                with transaction.atomic(using=using):
+                    updated = bulk_update(using, shape, unique, score=score)
+            except Exception:
+                logger.exception("buffer.bulk_process.failed", extra={"model": model.__name__})
+                single.extend(unique)
+                continue
+
+            metrics.distribution(
+                "buffer.bulk_process.batch_size", len(unique), tags={"model": model.__name__}
+            )
+            updated_indexes = {index for index, _ in updated}
+            if model is Group:
+                # Like `process`, increments of groups that were deleted in the meantime are
+                # dropped.
+                update_fields = [*shape[1], *shape[2]] + (["score"] if score else [])
+                for group in Group.objects.filter(id__in=[pk for _, pk in updated]):
+                    post_save.send(
+                        sender=Group, instance=group, created=False, update_fields=update_fields
+                    )
+                applied = unique
+            else:
+                applied = [incr for index, incr in enumerate(unique) if index in updated_indexes]
+                single.extend(
+                    incr for index, incr in enumerate(unique) if index not in updated_indexes
+                )
+
+            for incr in applied:
+                buffer_incr_complete.send_robust(
+                    model=model,
+                    columns=incr.columns,
+                    filters=incr.filters,
+                    extra=incr.extra,
+                    created=False,
+                    sender=model,
+                )
+
+        if single:
+            metrics.incr("buffer.bulk_process.single", amount=len(single), skip_internal=True)
+        for incr in single:
+            # Subclasses override `process` to take buffer keys, so call the base implementation.
+            Buffer.process(
+                self, incr.model, incr.columns, incr.filters, incr.extra, incr.signal_only
+            )
@@ -0,0 +1,166 @@
+"""
+Bulk application of buffered increments.
+
+Flushing a batch of buffer keys one ``Buffer.process`` call at a time costs a Postgres statement
+per key. ``bulk_update`` applies a whole batch of increments to rows of the same model with one
+``UPDATE ... FROM (VALUES ...)`` statement instead, as long as they share a shape: the same
+counter columns, ``extra`` columns and filter columns. Increments that don't fit (signal-only
+increments, filters that aren't plain columns, ``extra`` values that are expressions) are left
+to ``Buffer.process``, see ``Buffer.bulk_process``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import Field
+
+from sentry.db import models
+
+
+@dataclass
+class BufferedIncr:
+    model: type[models.Model]
+    columns: dict[str, int]
+    filters: dict[str, Any]
+    extra: dict[str, Any] | None = None
+    signal_only: bool | None = None
+
+
+Shape = tuple[type[models.Model], tuple[str, ...], tuple[str, ...], tuple[str, ...]]
+
+
+def _get_field(model: type[models.Model], name: str) -> Field:
+    if name == "pk":
+        return model._meta.pk
+    field = model._meta.get_field(name)
+    if not isinstance(field, Field) or not field.concrete:
+        raise FieldDoesNotExist(name)
+    return field
+
+
+def get_shape(incr: BufferedIncr) -> Shape | None:
+    """
+    Return the key increments have to share to be applied in one statement, or ``None`` if the
+    increment can't be applied in bulk.
+    """
+    if incr.signal_only or not incr.columns or not incr.filters:
+        return None
+
+    extra = incr.extra or {}
+    if any(hasattr(value, "resolve_expression") for value in extra.values()):
+        return None
+
+    try:
+        for name in (*incr.columns, *extra, *incr.filters):
+            _get_field(incr.model, name)
+    except FieldDoesNotExist:
+        return None
+
+    return (
+        incr.model,
+        tuple(sorted(incr.columns)),
+        tuple(sorted(extra)),
+        tuple(sorted(incr.filters)),
+    )
+
+
+def get_filter_key(incr: BufferedIncr) -> tuple[Any, ...]:
+    return tuple(
+        sorted(
+            (name, value.pk if isinstance(value, models.Model) else value)
+            for name, value in incr.filters.items()
+        )
+    )
+
+
+def bulk_update(
+    using: str,
+    shape: Shape,
+    incrs: Sequence[BufferedIncr],
+    score: bool = False,
+) -> list[tuple[int, Any]]:
+    """
+    Apply increments of the same shape with a single ``UPDATE ... FROM (VALUES ...)`` statement,
+    returning the index and primary key of every increment that matched a row. Filters must
+    identify distinct rows, as Postgres only applies one of several updates to the same row.
+
+    With ``score``, the ``Group`` score is recomputed the way ``ScoreClause`` does it.
+    """
+    model, columns, extra, filters = shape
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    meta = model._meta
+
+    # (alias, field) for every column of the VALUES list, besides the index
+    value_columns: list[tuple[str, Field]] = []
+    set_clauses = []
+    for i, name in enumerate(columns):
+        field = _get_field(model, name)
+        alias = f"i{i}"
+        value_columns.append((alias, field))
+        set_clauses.append(f"{qn(field.column)} = t.{qn(field.column)} + v.{alias}")
+    for i, name in enumerate(extra):
+        field = _get_field(model, name)
+        alias = f"e{i}"
+        value_columns.append((alias, field))
+        set_clauses.append(f"{qn(field.column)} = v.{alias}")
+    where_clauses = []
+    for i, name in enumerate(filters):
+        field = _get_field(model, name)
+        alias = f"f{i}"
+        value_columns.append((alias, field))
+        where_clauses.append(f"t.{qn(field.column)} = v.{alias}")
+
+    if score:
+        set_clauses.append(
+            "{score} = log(t.{times_seen} + v.{times_seen_value}) * 600"
+            " + floor(extract(epoch from v.{last_seen_value}))".format(
+                score=qn(meta.get_field("score").column),
+                times_seen=qn(meta.get_field("times_seen").column),
+                times_seen_value=f"i{columns.index('times_seen')}",
+                last_seen_value=f"e{extra.index('last_seen')}",
+            )
+        )
+
+    row_template = "(%s, {})".format(
+        ", ".join(f"CAST(%s AS {field.cast_db_type(connection)})" for _, field in value_columns)
+    )
+    rows = []
+    params: list[Any] = []
+    for index, incr in enumerate(incrs):
+        rows.append(row_template)
+        params.append(index)
+        for name in columns:
+            params.append(_get_field(model, name).get_db_prep_save(incr.columns[name], connection))
+        for name in extra:
+            params.append(
+                _get_field(model, name).get_db_prep_save(incr.extra[name], connection)  # type: ignore[index]
+            )
+        for name in filters:
+            value = incr.filters[name]
+            if isinstance(value, models.Model):
+                value = value.pk
+            params.append(_get_field(model, name).get_db_prep_value(value, connection))
+
+    sql = (
+        "UPDATE {table} AS t SET {set_clauses} "
+        "FROM (VALUES {rows}) AS v(idx, {aliases}) "
+        "WHERE {where_clauses} "
+        "RETURNING v.idx, t.{pk}"
+    ).format(
+        table=qn(meta.db_table),
+        set_clauses=", ".join(set_clauses),
+        rows=", ".join(rows),
+        aliases=", ".join(alias for alias, _ in value_columns),
+        where_clauses=" AND ".join(where_clauses),
+        pk=qn(meta.pk.column),
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(index, pk) for index, pk in cursor.fetchall()]
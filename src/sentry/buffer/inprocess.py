@@ -12,6 +12,8 @@ class InProcessBuffer(Buffer):
               in development and testing environments.
     """
 
+    incr_writes_to_database = True
+
     def incr(
         self,
         model: type[models.Model],
@@ -20,4 +22,7 @@ class InProcessBuffer(Buffer):
         extra: dict[str, Any] | None = None,
         signal_only: bool | None = None,
     ) -> None:
+        if self.incr_aggregator.add(model, columns, filters, extra, signal_only):
+            return
+
         self.process(model, columns, filters, extra, signal_only)
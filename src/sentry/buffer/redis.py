@@ -2,18 +2,21 @@ from __future__ import annotations
 
 import logging
 import pickle
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
 from datetime import date, datetime, timezone
 from enum import Enum
 from time import time
 from typing import Any, TypeVar
+from zlib import crc32
 
 import rb
 from django.utils.encoding import force_bytes, force_str
 from rediscluster import RedisCluster
 
+from sentry import options
 from sentry.buffer.base import Buffer
+from sentry.buffer.bulk import BufferedIncr
 from sentry.db import models
 from sentry.tasks.process_buffer import process_incr
 from sentry.utils import json, metrics
@@ -221,6 +224,12 @@ class PendingBuffer:
 class RedisBuffer(Buffer):
     key_expire = 60 * 60  # 1 hour
     pending_key = "b:p"
+    # Pending keys are spread over this many sets, which `buffer.pending-partitions` tasks split
+    # between themselves. A key's set doesn't depend on the option, so changing it strands none.
+    pending_set_count = 16
+    pending_lock_expire = 60
+    # Stop draining a pending set well before its lock expires, leaving the rest to the next run.
+    pending_drain_timeout = 50
 
     def __init__(self, incr_batch_size: int = 2, **options: object):
         self.is_redis_cluster, self.cluster, options = get_dynamic_cluster_from_options(
@@ -261,6 +270,16 @@ class RedisBuffer(Buffer):
         except Exception:
             return None
 
+    def _make_pending_key(self, index: int) -> str:
+        # The first set is the former unpartitioned pending set, so that no keys are stranded.
+        return self.pending_key if index == 0 else f"{self.pending_key}:{index}"
+
+    def _get_pending_key(self, key: str) -> str:
+        """
+        Returns the pending set a key is drained from.
+        """
+        return self._make_pending_key(crc32(force_bytes(key)) % self.pending_set_count)
+
     def _make_lock_key(self, key: str) -> str:
         return f"l:{key}"
 
@@ -464,7 +483,12 @@ class RedisBuffer(Buffer):
             - Perform a set (last write wins) on extra
             - Perform a set on signal_only (only if True)
         - Add hashmap key to pending flushes
+
+        Increments may first be coalesced in process memory, see ``sentry.buffer.aggregation``.
         """
+        if self.incr_aggregator.add(model, columns, filters, extra, signal_only):
+            return
+
         key = self._make_key(model, filters)
         # We can't use conn.map() due to wanting to support multiple pending
         # keys (one per Redis partition)
@@ -495,7 +519,8 @@ class RedisBuffer(Buffer):
             pipe.hset(key, "s", "1")
 
         pipe.expire(key, self.key_expire)
-        pipe.zadd(self.pending_key, {key: time()})
+        # Keys keep the time they were first enqueued, so that their age reflects the drain lag.
+        pipe.zadd(self._get_pending_key(key), {key: time()}, nx=True)
         pipe.execute()
 
         metrics.incr(
@@ -504,9 +529,30 @@ class RedisBuffer(Buffer):
             tags={"module": model.__module__, "model": model.__name__},
         )
 
-    def process_pending(self) -> None:
+    def process_pending(self, partition: int | None = None) -> None:
+        """
+        Drain the pending sets of ``partition`` into ``process_incr`` tasks, or all pending sets
+        one after the other if it's ``None``. Partition ``i`` of ``buffer.pending-partitions``
+        drains every pending set whose index is ``i`` modulo the number of partitions.
+        """
+        if partition is None:
+            indexes: Iterable[int] = range(self.pending_set_count)
+        else:
+            partitions = min(
+                max(options.get("buffer.pending-partitions"), 1), self.pending_set_count
+            )
+            indexes = range(partition % partitions, self.pending_set_count, partitions)
+
+        deadline = time() + self.pending_drain_timeout
+        for index in indexes:
+            if time() > deadline:
+                break
+            self._process_pending_set(index, deadline)
+
+    def _process_pending_set(self, index: int, deadline: float) -> None:
+        pending_key = self._make_pending_key(index)
         client = get_cluster_routing_client(self.cluster, self.is_redis_cluster)
-        lock_key = self._lock_key(client, self.pending_key, ex=60)
+        lock_key = self._lock_key(client, pending_key, ex=self.pending_lock_expire)
         if not lock_key:
             return
 
@@ -536,51 +582,73 @@ class RedisBuffer(Buffer):
                 metrics.incr("buffer.process-incr-default-queue")
             return process_incr_kwargs
 
+        def _add_pending_key(key: str) -> None:
+            model_key = self._extract_model_from_key(key=key)
+            pending_buffer = pending_buffers_router.get_pending_buffer(model_key=model_key)
+            pending_buffer.append(item=key)
+            if pending_buffer.full():
+                process_incr_kwargs = _generate_process_incr_kwargs(model_key=model_key)
+                process_incr.apply_async(
+                    kwargs={"batch_keys": pending_buffer.flush()},
+                    headers={"sentry-propagate-traces": False},
+                    **process_incr_kwargs,
+                )
+
+        tags = {"pending_set": str(index)}
         try:
             keycount = 0
+            oldest: float | None = None
+            chunk_size = max(options.get("buffer.pending-chunk-size"), 1)
+            started = time()
+            # Keys added once the drain started are left to the next run, so that a busy pending
+            # set can't keep the drain going until the lock expires.
+            max_score = started
+
             if is_instance_redis_cluster(self.cluster, self.is_redis_cluster):
-                keys: list[str] = self.cluster.zrange(self.pending_key, 0, -1)
-                keycount += len(keys)
-
-                for key in keys:
-                    model_key = self._extract_model_from_key(key=key)
-                    pending_buffer = pending_buffers_router.get_pending_buffer(model_key=model_key)
-                    pending_buffer.append(item=key)
-                    if pending_buffer.full():
-                        process_incr_kwargs = _generate_process_incr_kwargs(model_key=model_key)
-                        process_incr.apply_async(
-                            kwargs={"batch_keys": pending_buffer.flush()},
-                            headers={"sentry-propagate-traces": False},
-                            **process_incr_kwargs,
+                while True:
+                    items: list[tuple[str, float]] = self.cluster.zrangebyscore(
+                        pending_key, "-inf", max_score, start=0, num=chunk_size, withscores=True
+                    )
+                    if not items:
+                        break
+                    if oldest is None:
+                        oldest = items[0][1]
+
+                    keys = [key for key, _ in items]
+                    keycount += len(keys)
+                    for key in keys:
+                        _add_pending_key(key)
+                    self.cluster.zrem(pending_key, *keys)
+
+                    if len(keys) < chunk_size or time() > deadline:
+                        break
+            elif is_instance_rb_cluster(self.cluster, self.is_redis_cluster):
+                hosts: list[int] | str = "all"
+                while hosts:
+                    with self.cluster.fanout(hosts=hosts) as conn:
+                        results = conn.zrangebyscore(
+                            pending_key, "-inf", max_score, start=0, num=chunk_size, withscores=True
                         )
 
-                self.cluster.zrem(self.pending_key, *keys)
-            elif is_instance_rb_cluster(self.cluster, self.is_redis_cluster):
-                with self.cluster.all() as conn:
-                    results = conn.zrange(self.pending_key, 0, -1)
-
-                with self.cluster.all() as conn:
-                    for host_id, keysb in results.value.items():
-                        if not keysb:
-                            continue
-                        keycount += len(keysb)
-                        for keyb in keysb:
-                            key = keyb.decode("utf-8")
-                            model_key = self._extract_model_from_key(key=key)
-                            pending_buffer = pending_buffers_router.get_pending_buffer(
-                                model_key=model_key
-                            )
-                            pending_buffer.append(item=key)
-                            if pending_buffer.full():
-                                process_incr_kwargs = _generate_process_incr_kwargs(
-                                    model_key=model_key
-                                )
-                                process_incr.apply_async(
-                                    kwargs={"batch_keys": pending_buffer.flush()},
-                                    headers={"sentry-propagate-traces": False},
-                                    **process_incr_kwargs,
-                                )
-                        conn.target([host_id]).zrem(self.pending_key, *keysb)
+                    hosts = []
+                    with self.cluster.all() as conn:
+                        for host_id, itemsb in results.value.items():
+                            if not itemsb:
+                                continue
+                            if oldest is None or itemsb[0][1] < oldest:
+                                oldest = itemsb[0][1]
+
+                            keysb = [keyb for keyb, _ in itemsb]
+                            keycount += len(keysb)
+                            for keyb in keysb:
+                                _add_pending_key(keyb.decode("utf-8"))
+                            conn.target([host_id]).zrem(pending_key, *keysb)
+
+                            if len(keysb) == chunk_size:
+                                hosts.append(host_id)
+
+                    if time() > deadline:
+                        break
             else:
                 raise AssertionError("unreachable")
 
@@ -597,7 +665,14 @@ class RedisBuffer(Buffer):
                         **process_incr_kwargs,
                     )
 
-            metrics.distribution("buffer.pending-size", keycount)
+            metrics.distribution("buffer.pending-size", keycount, tags=tags)
+            # How long the oldest key waited to be picked up, to scale `process_incr` on lag.
+            metrics.distribution(
+                "buffer.pending-age",
+                max(started - oldest, 0) if oldest is not None else 0,
+                tags=tags,
+                unit="second",
+            )
         finally:
             client.delete(lock_key)
 
@@ -609,6 +684,10 @@ class RedisBuffer(Buffer):
             batch_keys = [key]
 
         if batch_keys is not None:
+            if len(batch_keys) > 1 and options.get("buffer.bulk-process.enabled"):
+                self._process_bulk_incr(batch_keys)
+                return
+
             for key in batch_keys:
                 self._process_single_incr(key)
 
@@ -622,54 +701,92 @@ class RedisBuffer(Buffer):
     ) -> Any:
         return super().process(model, columns, filters, extra, signal_only)
 
-    def _process_single_incr(self, key: str) -> None:
-        client = get_cluster_routing_client(self.cluster, self.is_redis_cluster)
+    def _lock_incr_key(self, client: Any, key: str) -> str | None:
         lock_key = self._lock_key(client, key, ex=10)
         if not lock_key:
             metrics.incr("buffer.revoked", tags={"reason": "locked"}, skip_internal=False)
             logger.debug("buffer.revoked.locked", extra={"redis_key": key})
-            return
+        return lock_key
 
-        try:
-            pipe = self.get_redis_connection(key, transaction=False)
-            pipe.hgetall(key)
-            pipe.zrem(self.pending_key, key)
-            pipe.delete(key)
-            values = pipe.execute()[0]
-
-            # XXX(python3): In python2 this isn't as important since redis will
-            # return string tyes (be it, byte strings), but in py3 we get bytes
-            # back, and really we just want to deal with keys as strings.
-            values = {force_str(k): v for k, v in values.items()}
-
-            if not values:
-                metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
-                logger.debug("buffer.revoked.empty", extra={"redis_key": key})
-                return
+    def _read_incr(self, key: str) -> BufferedIncr | None:
+        """
+        Pop the pending increment stored at ``key``, returning ``None`` if it has already been
+        processed.
+        """
+        pipe = self.get_redis_connection(key, transaction=False)
+        pipe.hgetall(key)
+        pipe.zrem(self._get_pending_key(key), key)
+        pipe.delete(key)
+        values = pipe.execute()[0]
+
+        # XXX(python3): In python2 this isn't as important since redis will
+        # return string tyes (be it, byte strings), but in py3 we get bytes
+        # back, and really we just want to deal with keys as strings.
+        values = {force_str(k): v for k, v in values.items()}
+
+        if not values:
+            metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
+            logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+            return None
 
-            model = import_string(force_str(values.pop("m")))
+        model = import_string(force_str(values.pop("m")))
 
-            if values["f"].startswith(b"{" if not self.is_redis_cluster else "{"):
-                filters = self._load_values(json.loads(force_str(values.pop("f"))))
-            else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(force_bytes(values.pop("f")))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in values.items():
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith(b"[" if not self.is_redis_cluster else "["):
-                        extra_values[k[2:]] = self._load_value(json.loads(force_str(v)))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(force_bytes(v))
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
-            self._process(model, incr_values, filters, extra_values, signal_only)
+        if values["f"].startswith(b"{" if not self.is_redis_cluster else "{"):
+            filters = self._load_values(json.loads(force_str(values.pop("f"))))
+        else:
+            # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+            filters = pickle.loads(force_bytes(values.pop("f")))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in values.items():
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                if v.startswith(b"[" if not self.is_redis_cluster else "["):
+                    extra_values[k[2:]] = self._load_value(json.loads(force_str(v)))
+                else:
+                    # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+                    extra_values[k[2:]] = pickle.loads(force_bytes(v))
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return BufferedIncr(model, incr_values, filters, extra_values, signal_only)
+
+    def _process_single_incr(self, key: str) -> None:
+        client = get_cluster_routing_client(self.cluster, self.is_redis_cluster)
+        lock_key = self._lock_incr_key(client, key)
+        if not lock_key:
+            return
+
+        try:
+            incr = self._read_incr(key)
+            if incr is not None:
+                self._process(incr.model, incr.columns, incr.filters, incr.extra, incr.signal_only)
         finally:
             client.delete(lock_key)
+
+    def _process_bulk_incr(self, keys: list[str]) -> None:
+        """
+        Process a batch of keys with ``Buffer.bulk_process``, holding the locks of all of them
+        until their increments are applied.
+        """
+        client = get_cluster_routing_client(self.cluster, self.is_redis_cluster)
+        lock_keys = []
+        try:
+            incrs = []
+            for key in keys:
+                lock_key = self._lock_incr_key(client, key)
+                if not lock_key:
+                    continue
+                lock_keys.append(lock_key)
+                incr = self._read_incr(key)
+                if incr is not None:
+                    incrs.append(incr)
+
+            with metrics.timer("buffer.bulk_process.duration"):
+                self.bulk_process(incrs)
+        finally:
+            for lock_key in lock_keys:
+                client.delete(lock_key)
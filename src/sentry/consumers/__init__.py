@@ -83,7 +83,8 @@ def ingest_replay_recordings_options() -> list[click.Option]:
 
 def ingest_replay_recordings_buffered_options() -> list[click.Option]:
     """Return a list of ingest-replay-recordings-buffered options."""
-    options = [
+    options = multiprocessing_options(default_max_batch_size=10)
+    options += [
         click.Option(
             ["--max-buffer-message-count", "max_buffer_message_count"],
             type=int,
@@ -99,6 +100,12 @@ def ingest_replay_recordings_buffered_options() -> list[click.Option]:
             type=int,
             default=1,
         ),
+        click.Option(
+            ["--upload-threads", "upload_threads"],
+            type=int,
+            default=None,
+            help="Upload segments with a long-lived pool of this many threads.",
+        ),
     ]
     return options
 
@@ -60,8 +60,10 @@ from sentry.grouping.ingest.config import (
 )
 from sentry.grouping.ingest.hashing import (
     find_existing_grouphash,
+    get_group_for_grouphash,
     get_hash_values,
     get_or_create_grouphashes,
+    get_or_create_grouphashes_many,
     maybe_run_background_grouping,
     maybe_run_secondary_grouping,
     run_primary_grouping,
@@ -1672,7 +1674,9 @@ def get_hashes_and_grouphashes(
     grouping_config, hashes = hash_calculation_function(project, job, metric_tags)
 
     if hashes:
-        grouphashes = get_or_create_grouphashes(project, hashes)
+        # Even for a single event this resolves all of its hashes with one query (or none, if
+        # they are in the grouphash cache), rather than one `get_or_create` per hash.
+        [grouphashes] = get_or_create_grouphashes_many([(project, hashes)])
 
         existing_grouphash = find_existing_grouphash(grouphashes)
 
@@ -1709,7 +1713,7 @@ def handle_existing_grouphash(
     # _save_aggregate had races around group creation which made this race
     # more user visible. For more context, see 84c6f75a and d0e22787, as
     # well as GH-5085.
-    group = Group.objects.get(id=existing_grouphash.group_id)
+    group = get_group_for_grouphash(existing_grouphash)
 
     if check_for_category_mismatch(group):
         return None
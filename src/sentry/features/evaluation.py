@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+__all__ = ["FeatureEvaluationContext", "feature_evaluation_context", "get_evaluation_context"]
+
+import time
+from collections.abc import Generator, Iterable, Mapping, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+from sentry import options
+from sentry.utils import flag as flag_manager
+from sentry.utils import metrics
+
+from .base import ProjectFeature
+
+if TYPE_CHECKING:
+    from sentry.features.manager import FeatureManager
+    from sentry.models.project import Project
+
+
+_evaluation_context: ContextVar[FeatureEvaluationContext | None] = ContextVar(
+    "feature_evaluation_context", default=None
+)
+
+
+class Uncacheable(Exception):
+    pass
+
+
+def _get_entity_key(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    if getattr(value, "is_anonymous", False) is True:
+        return "anonymous"
+    id = getattr(value, "id", None)
+    if id is None:
+        raise Uncacheable(value)
+    return (type(value).__name__, id)
+
+
+def get_memo_key(name: str, args: Sequence[Any], kwargs: Mapping[str, Any]) -> tuple[Any, ...]:
+    """
+    Build the memo key of a feature check from the entities it was called with, raising
+    ``Uncacheable`` if any of them can't be identified.
+    """
+    return (
+        name,
+        tuple(_get_entity_key(arg) for arg in args),
+        tuple(sorted((key, _get_entity_key(value)) for key, value in kwargs.items())),
+    )
+
+
+class FeatureEvaluationContext:
+    """
+    Memoizes feature checks for the duration of a request or task.
+
+    Checks are keyed on the feature name, the entities passed to ``has`` (organization, project,
+    etc.) and the actor. Project features are evaluated in one batch for all the projects of an
+    organization the context knows about, either because they were checked before or were added
+    with ``add_projects``.
+
+    The number of evaluations, memo hits and the time spent evaluating features are reported
+    when the context is closed.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.results: dict[tuple[Any, ...], bool] = {}
+        # organization id -> project id -> project
+        self.projects: dict[int, dict[int, Project]] = {}
+        self.evaluations = 0
+        self.hits = 0
+        self.duration = 0.0
+
+    def add_projects(self, projects: Iterable[Project]) -> None:
+        """
+        Make the context aware of projects that are about to be checked, so that the checks for
+        all of them are done in one batch.
+        """
+        for project in projects:
+            self.projects.setdefault(project.organization_id, {})[project.id] = project
+
+    def has(self, manager: FeatureManager, name: str, *args: Any, **kwargs: Any) -> bool:
+        actor = kwargs.pop("actor", None)
+        try:
+            key = get_memo_key(name, args, kwargs)
+            actor_key = _get_entity_key(actor)
+        except Uncacheable:
+            return self._evaluate(manager._has, name, *args, actor=actor, **kwargs)
+
+        rv = self.results.get((key, actor_key))
+        if rv is not None:
+            self.hits += 1
+            flag_manager.process_flag_result(name, rv)
+            return rv
+
+        project = self._get_project(manager, name, args, kwargs)
+        if project is not None:
+            self.add_projects([project])
+            siblings = [
+                sibling
+                for sibling in self.projects[project.organization_id].values()
+                if sibling.id != project.id
+                and ((name, (_get_entity_key(sibling),), ()), actor_key) not in self.results
+            ]
+            if siblings:
+                self.has_for_projects(
+                    manager, name, project.organization, [project, *siblings], actor
+                )
+                rv = self.results.get((key, actor_key))
+                if rv is not None:
+                    flag_manager.process_flag_result(name, rv)
+                    return rv
+
+        rv = self._evaluate(manager._has, name, *args, actor=actor, **kwargs)
+        self.results[(key, actor_key)] = rv
+        return rv
+
+    def has_for_projects(
+        self,
+        manager: FeatureManager,
+        name: str,
+        organization: Any,
+        objects: Sequence[Project],
+        actor: Any = None,
+    ) -> Mapping[Project, bool]:
+        try:
+            actor_key = _get_entity_key(actor)
+        except Uncacheable:
+            return self._evaluate(
+                manager._has_for_projects, name, organization, objects, actor, count=len(objects)
+            )
+
+        result = {}
+        pending = []
+        for obj in objects:
+            rv = self.results.get(((name, (_get_entity_key(obj),), ()), actor_key))
+            if rv is None:
+                pending.append(obj)
+            else:
+                result[obj] = rv
+        self.hits += len(result)
+
+        if pending:
+            evaluated = self._evaluate(
+                manager._has_for_projects, name, organization, pending, actor, count=len(pending)
+            )
+            for obj, rv in evaluated.items():
+                self.results[((name, (_get_entity_key(obj),), ()), actor_key)] = rv
+            result.update(evaluated)
+        return result
+
+    def close(self) -> None:
+        tags = {"context": self.name}
+        metrics.distribution("features.evaluation_context.evaluations", self.evaluations, tags=tags)
+        metrics.distribution("features.evaluation_context.hits", self.hits, tags=tags)
+        metrics.distribution(
+            "features.evaluation_context.duration", self.duration, tags=tags, unit="second"
+        )
+
+    def _evaluate(self, func: Any, *args: Any, count: int = 1, **kwargs: Any) -> Any:
+        start = time.monotonic()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.duration += time.monotonic() - start
+            self.evaluations += count
+
+    def _get_project(
+        self, manager: FeatureManager, name: str, args: Sequence[Any], kwargs: Mapping[str, Any]
+    ) -> Project | None:
+        from sentry.models.project import Project
+
+        if kwargs or len(args) != 1 or not isinstance(args[0], Project):
+            return None
+        try:
+            if not issubclass(manager._get_feature_class(name), ProjectFeature):
+                return None
+        except Exception:
+            return None
+        return args[0]
+
+
+def get_evaluation_context() -> FeatureEvaluationContext | None:
+    return _evaluation_context.get()
+
+
+@contextmanager
+def feature_evaluation_context(
+    name: str, force: bool = False
+) -> Generator[FeatureEvaluationContext | None, None, None]:
+    """
+    Memoize feature checks within the block, if enabled with
+    ``features.evaluation-context.enabled`` or ``force``. Nested blocks share the outermost
+    context.
+    """
+    context = _evaluation_context.get()
+    if context is not None:
+        yield context
+        return
+    if not force and not options.get("features.evaluation-context.enabled"):
+        yield context
+        return
+
+    context = FeatureEvaluationContext(name)
+    token = _evaluation_context.set(context)
+    try:
+        yield context
+    finally:
+        _evaluation_context.reset(token)
+        context.close()
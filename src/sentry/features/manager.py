@@ -19,6 +19,7 @@ from sentry.utils import metrics
 from sentry.utils.types import Dict
 
 from .base import Feature, FeatureHandlerStrategy
+from .evaluation import get_evaluation_context
 from .exceptions import FeatureNotRegistered
 from .rollout import in_random_rollout
 
@@ -270,7 +271,15 @@ class FeatureManager(RegisteredFeatureManager):
 
         >>> FeatureManager.has('organizations:feature', organization, actor=request.user)
 
+        Within a ``feature_evaluation_context`` results are memoized, and project features are
+        checked in batches for all the projects the context knows about.
         """
+        context = get_evaluation_context()
+        if context is None or skip_entity:
+            return self._has(name, *args, skip_entity=skip_entity, **kwargs)
+        return context.has(self, name, *args, **kwargs)
+
+    def _has(self, name: str, *args: Any, skip_entity: bool | None = False, **kwargs: Any) -> bool:
         sample_rate = 0.01
         try:
             with metrics.timer("features.has", tags={"feature": name}, sample_rate=sample_rate):
@@ -322,6 +331,54 @@ class FeatureManager(RegisteredFeatureManager):
                 sentry_sdk.capture_exception(e)
             return False
 
+    def _has_for_projects(
+        self,
+        name: str,
+        organization: Organization,
+        projects: Sequence[Project],
+        actor: User | None = None,
+    ) -> Mapping[Project, bool]:
+        """
+        Check a project feature for several projects of an organization at once. Unlike
+        ``has_for_batch``, this gives the same results as calling ``has`` for every project: the
+        projects which the registered handlers don't decide are checked with the entity handler
+        and then the default.
+        """
+        result: MutableMapping[Project, bool] = {}
+        remaining = list(projects)
+        try:
+            for handler in self._handler_registry[name]:
+                if not remaining:
+                    break
+                batch = FeatureCheckBatch(self, name, organization, remaining, actor)
+                for obj, flag in handler.has_for_batch(batch).items():
+                    if flag is not None:
+                        result[obj] = flag
+                remaining = [project for project in remaining if project not in result]
+
+            if remaining and self._entity_handler:
+                entity_results = (
+                    self._entity_handler.batch_has(
+                        [name], actor, projects=remaining, organization=organization
+                    )
+                    or {}
+                )
+                for project in remaining:
+                    flag = entity_results.get(f"project:{project.id}", {}).get(name)
+                    if flag is not None:
+                        result[project] = flag
+                remaining = [project for project in remaining if project not in result]
+
+            default_flag = settings.SENTRY_FEATURES.get(name, False)
+            for project in remaining:
+                result[project] = default_flag
+        except Exception as e:
+            if in_random_rollout("features.error.capture_rate"):
+                sentry_sdk.capture_exception(e)
+            return {project: self._has(name, project, actor=actor) for project in projects}
+
+        return result
+
     def batch_has(
         self,
         feature_names: Sequence[str],
@@ -1,3 +1,4 @@
+import functools
 from typing import Any
 
 from sentry.grouping.utils import get_rule_bool
@@ -76,8 +77,66 @@ def _get_function_name(frame_data: dict, platform: str | None):
     return function_name or "<unknown>"
 
 
+# Fields of the raw frame which feed into `create_match_frame`, besides `data.category` and
+# `data.orig_in_app`
+_MATCH_FRAME_SOURCE_FIELDS = (
+    "platform",
+    "raw_function",
+    "function",
+    "in_app",
+    "module",
+    "package",
+    "abs_path",
+    "filename",
+)
+
+# Large stacktraces from the same SDK repeat the same frames across events over and over again, so
+# this is sized to hold the frames of a few thousand events.
+MATCH_FRAME_CACHE_SIZE = 50_000
+
+
 def create_match_frame(frame_data: dict, platform: str | None) -> dict:
-    """Create flat dict of values relevant to matchers"""
+    """Create flat dict of values relevant to matchers
+
+    Results are memoized across events on the frame fields they depend on, since encoding and
+    normalizing every frame of every stacktrace twice per event (once to apply modifications, once
+    to assemble the grouping component) is a significant part of grouping time.
+    """
+    if not isinstance(frame_data, dict):
+        return _create_match_frame(frame_data, platform)
+
+    data = frame_data.get("data")
+    if not isinstance(data, dict):
+        data = {}
+
+    try:
+        return dict(
+            _create_match_frame_cached(
+                platform,
+                data.get("category"),
+                data.get("orig_in_app"),
+                tuple(frame_data.get(field) for field in _MATCH_FRAME_SOURCE_FIELDS),
+            )
+        )
+    except TypeError:
+        # Some value is not hashable (e.g. malformed data where a string was expected), in which
+        # case we just don't memoize.
+        return _create_match_frame(frame_data, platform)
+
+
+@functools.lru_cache(maxsize=MATCH_FRAME_CACHE_SIZE)
+def _create_match_frame_cached(
+    platform: str | None,
+    category: Any,
+    orig_in_app: Any,
+    source_values: tuple[Any, ...],
+) -> dict:
+    frame_data = dict(zip(_MATCH_FRAME_SOURCE_FIELDS, source_values))
+    frame_data["data"] = {"category": category, "orig_in_app": orig_in_app}
+    return _create_match_frame(frame_data, platform)
+
+
+def _create_match_frame(frame_data: dict, platform: str | None) -> dict:
     match_frame = dict(
         category=get_path(frame_data, "data", "category"),
         family=get_behavior_family_for_platform(frame_data.get("platform") or platform),
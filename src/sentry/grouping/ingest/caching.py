@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+from sentry import options
+from sentry.models.group import GroupStatus
+from sentry.models.grouphash import GroupHash
+from sentry.utils import metrics
+
+# Upper bound on the number of (project, hash) pairs kept per process. Entries are tiny (a couple
+# of ints), so this stays well under a megabyte.
+GROUPHASH_CACHE_MAX_SIZE = 10_000
+
+# Statuses of groups which cached grouphashes must not point at anymore, since they are being
+# merged or deleted elsewhere.
+DEAD_GROUP_STATUSES = frozenset(
+    [
+        GroupStatus.PENDING_DELETION,
+        GroupStatus.DELETION_IN_PROGRESS,
+        GroupStatus.PENDING_MERGE,
+        GroupStatus.REPROCESSING,
+    ]
+)
+
+
+@dataclass(frozen=True)
+class CachedGroupHash:
+    grouphash_id: int
+    group_id: int
+    expires_at: float
+
+
+class GroupHashCache:
+    """
+    Per-process LRU of recently resolved `(project_id, hash) -> (grouphash_id, group_id)` mappings.
+
+    Only grouphashes which are already attached to a group (and aren't tombstoned or locked in a
+    migration) are cached, since those are the only ones whose lookup we can skip entirely. Because
+    the cache is local to the process, it can't see merges, unmerges or discards done elsewhere.
+    Entries therefore expire after `grouping.grouphash_cache.ttl` seconds, and the code paths which
+    re-point grouphashes call `invalidate_grouphash_cache` so that at least the local process stops
+    using stale mappings immediately.
+    """
+
+    def __init__(self, max_size: int = GROUPHASH_CACHE_MAX_SIZE) -> None:
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[int, str], CachedGroupHash] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, project_id: int, hashes: Iterable[str]) -> dict[str, CachedGroupHash]:
+        now = time.monotonic()
+        found = {}
+
+        with self._lock:
+            for hash_value in hashes:
+                key = (project_id, hash_value)
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry.expires_at <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[hash_value] = entry
+
+        return found
+
+    def set_many(self, grouphashes: Iterable[GroupHash], ttl: float) -> None:
+        expires_at = time.monotonic() + ttl
+
+        with self._lock:
+            for grouphash in grouphashes:
+                if (
+                    grouphash.group_id is None
+                    or grouphash.group_tombstone_id is not None
+                    or grouphash.state == GroupHash.State.LOCKED_IN_MIGRATION
+                ):
+                    continue
+
+                key = (grouphash.project_id, grouphash.hash)
+                self._entries[key] = CachedGroupHash(grouphash.id, grouphash.group_id, expires_at)
+                self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                metrics.incr("grouping.grouphash_cache.eviction")
+
+    def invalidate(
+        self,
+        project_id: int | None = None,
+        hashes: Iterable[str] | None = None,
+        group_ids: Iterable[int] | None = None,
+    ) -> None:
+        with self._lock:
+            if project_id is not None and hashes is not None:
+                for hash_value in hashes:
+                    self._entries.pop((project_id, hash_value), None)
+
+            if group_ids is not None:
+                group_id_set = set(group_ids)
+                for key, entry in list(self._entries.items()):
+                    if entry.group_id in group_id_set:
+                        del self._entries[key]
+
+            if project_id is not None and hashes is None and group_ids is None:
+                for key in list(self._entries):
+                    if key[0] == project_id:
+                        del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+grouphash_cache = GroupHashCache()
+
+
+def is_grouphash_cache_enabled() -> bool:
+    return options.get("grouping.grouphash_cache.enabled")
+
+
+def get_cached_grouphashes(project_id: int, hashes: Sequence[str]) -> dict[str, GroupHash]:
+    """
+    Return unsaved-but-identified `GroupHash` instances for whichever of the given hashes have a
+    live cache entry, keyed by hash value.
+    """
+    if not is_grouphash_cache_enabled():
+        return {}
+
+    cached = grouphash_cache.get_many(project_id, hashes)
+    metrics.incr("grouping.grouphash_cache.hit", amount=len(cached))
+    metrics.incr("grouping.grouphash_cache.miss", amount=len(hashes) - len(cached))
+
+    return {
+        hash_value: GroupHash(
+            id=entry.grouphash_id,
+            project_id=project_id,
+            hash=hash_value,
+            group_id=entry.group_id,
+        )
+        for hash_value, entry in cached.items()
+    }
+
+
+def is_cached_grouphash(grouphash: GroupHash) -> bool:
+    # Cached grouphashes are built from their cache entry instead of being loaded, so Django
+    # still considers them unsaved.
+    return grouphash._state.adding and grouphash.id is not None
+
+
+def cache_grouphashes(grouphashes: Iterable[GroupHash]) -> None:
+    if not is_grouphash_cache_enabled():
+        return
+
+    grouphash_cache.set_many(grouphashes, ttl=options.get("grouping.grouphash_cache.ttl"))
+
+
+def invalidate_grouphash_cache(
+    project_id: int | None = None,
+    hashes: Iterable[str] | None = None,
+    group_ids: Iterable[int] | None = None,
+) -> None:
+    """
+    Drop cached mappings for the given hashes, for every hash pointing at one of the given groups,
+    or (if only a project is given) for the whole project.
+    """
+    grouphash_cache.invalidate(project_id=project_id, hashes=hashes, group_ids=group_ids)
@@ -3,9 +3,12 @@ from __future__ import annotations
 import copy
 import logging
 from collections.abc import Sequence
+from functools import reduce
+from operator import or_
 from typing import TYPE_CHECKING
 
 import sentry_sdk
+from django.db.models import Q
 
 from sentry import features, options
 from sentry.exceptions import HashDiscarded
@@ -21,8 +24,16 @@ from sentry.grouping.api import (
     get_grouping_config_dict_for_project,
     load_grouping_config,
 )
+from sentry.grouping.ingest.caching import (
+    DEAD_GROUP_STATUSES,
+    cache_grouphashes,
+    get_cached_grouphashes,
+    invalidate_grouphash_cache,
+    is_cached_grouphash,
+)
 from sentry.grouping.ingest.config import is_in_transition
 from sentry.grouping.ingest.metrics import record_hash_calculation_metrics
+from sentry.models.group import Group
 from sentry.models.grouphash import GroupHash
 from sentry.models.grouphashmetadata import GroupHashMetadata
 from sentry.models.project import Project
@@ -257,3 +268,118 @@ def get_or_create_grouphashes(project: Project, hashes: Sequence[str]) -> list[G
         grouphashes.append(grouphash)
 
     return grouphashes
+
+
+def get_or_create_grouphashes_many(
+    requests: Sequence[tuple[Project, Sequence[str]]],
+) -> list[list[GroupHash]]:
+    """
+    Bulk version of `get_or_create_grouphashes`, for resolving the hashes of a whole batch of
+    events at once.
+
+    Takes a `(project, hashes)` pair per event and returns, for each pair, the `GroupHash` entries
+    in the same order as the given hashes. Hashes are deduplicated across the batch, so an error
+    storm of identically-hashed events costs a handful of queries in total rather than several per
+    event. Recently-resolved hashes are served from the per-process grouphash cache (see
+    `sentry.grouping.ingest.caching`) without a query, so the group of a returned grouphash has to
+    be loaded with `get_group_for_grouphash`.
+    """
+    projects = {project.id: project for project, _ in requests}
+    hashes_by_project: dict[int, set[str]] = {}
+    for project, hashes in requests:
+        hashes_by_project.setdefault(project.id, set()).update(hashes)
+
+    resolved: dict[tuple[int, str], GroupHash] = {}
+
+    for project_id, hashes in hashes_by_project.items():
+        for hash_value, grouphash in get_cached_grouphashes(project_id, sorted(hashes)).items():
+            resolved[(project_id, hash_value)] = grouphash
+
+    missing = {
+        project_id: {h for h in hashes if (project_id, h) not in resolved}
+        for project_id, hashes in hashes_by_project.items()
+    }
+    _fetch_grouphashes(missing, resolved)
+
+    to_create = [
+        GroupHash(project=projects[project_id], hash=hash_value)
+        for project_id, hashes in missing.items()
+        for hash_value in sorted(hashes)
+        if (project_id, hash_value) not in resolved
+    ]
+
+    if to_create:
+        # Another event with the same hash may be racing us to create the row, in which case we
+        # simply pick up whichever one won
+        GroupHash.objects.bulk_create(to_create, ignore_conflicts=True)
+        created = {
+            project_id: {gh.hash for gh in to_create if gh.project_id == project_id}
+            for project_id in {gh.project_id for gh in to_create}
+        }
+        _fetch_grouphashes(created, resolved)
+        _create_grouphash_metadata(
+            [resolved[(gh.project_id, gh.hash)] for gh in to_create], projects
+        )
+
+    metrics.distribution("grouping.grouphashes_many.batch_size", len(requests))
+    metrics.distribution("grouping.grouphashes_many.distinct_hashes", len(resolved))
+
+    cache_grouphashes(resolved.values())
+
+    return [[resolved[(project.id, h)] for h in hashes] for project, hashes in requests]
+
+
+def get_group_for_grouphash(grouphash: GroupHash) -> Group:
+    """
+    Fetch the group of a grouphash returned by `get_or_create_grouphashes_many`.
+
+    Grouphashes served from the grouphash cache aren't checked against the database, so a group
+    merged or deleted by another process can still be referenced by them. This is only noticed
+    here, when the group is loaded anyway, in which case the cache entry is dropped and the
+    grouphash reloaded. Live cached groups therefore cost no more queries than uncached ones.
+    """
+    try:
+        group = Group.objects.get(id=grouphash.group_id)
+    except Group.DoesNotExist:
+        if not is_cached_grouphash(grouphash):
+            raise
+    else:
+        if not is_cached_grouphash(grouphash) or group.status not in DEAD_GROUP_STATUSES:
+            return group
+
+    metrics.incr("grouping.grouphash_cache.stale")
+    invalidate_grouphash_cache(project_id=grouphash.project_id, hashes=[grouphash.hash])
+    grouphash.refresh_from_db()
+    return Group.objects.get(id=grouphash.group_id)
+
+
+def _fetch_grouphashes(
+    hashes_by_project: dict[int, set[str]], resolved: dict[tuple[int, str], GroupHash]
+) -> None:
+    conditions = [
+        Q(project_id=project_id, hash__in=hashes)
+        for project_id, hashes in hashes_by_project.items()
+        if hashes
+    ]
+    if not conditions:
+        return
+
+    for grouphash in GroupHash.objects.filter(reduce(or_, conditions)):
+        resolved[(grouphash.project_id, grouphash.hash)] = grouphash
+
+
+def _create_grouphash_metadata(grouphashes: list[GroupHash], projects: dict[int, Project]) -> None:
+    if not options.get("grouping.grouphash_metadata.ingestion_writes_enabled"):
+        return
+
+    GroupHashMetadata.objects.bulk_create(
+        [
+            GroupHashMetadata(grouphash=grouphash)
+            for grouphash in grouphashes
+            if features.has(
+                "organizations:grouphash-metadata-creation",
+                projects[grouphash.project_id].organization,
+            )
+        ],
+        ignore_conflicts=True,
+    )
@@ -1,7 +1,8 @@
 import dataclasses
 import re
-from collections import defaultdict
-from collections.abc import Callable, Sequence
+import threading
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable, Hashable, Sequence
 from functools import lru_cache
 
 import tiktoken
@@ -196,6 +197,10 @@ class ParameterizationCallable:
 
 @dataclasses.dataclass
 class ParameterizationCallableExperiment(ParameterizationCallable):
+    @property
+    def cache_key(self) -> Hashable:
+        return (self.name, self.apply)
+
     def run(self, content: str, callback: Callable[[str, int], None]) -> str:
         content, count = self.apply(content)
         if count:
@@ -204,6 +209,10 @@ class ParameterizationCallableExperiment(ParameterizationCallable):
 
 
 class ParameterizationRegexExperiment(ParameterizationRegex):
+    @property
+    def cache_key(self) -> Hashable:
+        return (self.name, self.raw_pattern, self.lookbehind, self.lookahead)
+
     def run(
         self,
         content: str,
@@ -223,8 +232,13 @@ class _UniqueId:
         return tiktoken.get_encoding("cl100k_base")
 
     @staticmethod
+    @lru_cache(maxsize=10_000)
     def num_tokens_from_string(token_str: str) -> int:
-        """Returns the number of tokens in a text string."""
+        """Returns the number of tokens in a text string.
+
+        Tokenizing is by far the most expensive part of parameterization, and the same words show up
+        in message after message, so results are memoized.
+        """
         num_tokens = len(_UniqueId.tiktoken_encoding().encode(token_str))
         return num_tokens
 
@@ -275,18 +289,35 @@ UniqueIdExperiment = ParameterizationCallableExperiment(
 ParameterizationExperiment = ParameterizationCallableExperiment | ParameterizationRegexExperiment
 
 
+# Maximum number of raw messages whose parameterized result is kept around per process
+PARAMETERIZATION_CACHE_SIZE = 10_000
+
+
 class Parameterizer:
+    # Shared between instances, since a new `Parameterizer` is created for every message. Maps
+    # (regex keys, enabled experiments, raw content) to the parameterized content and the match
+    # counts it produced, so that repeated log messages skip the regexes and tokenizer entirely.
+    _result_cache: OrderedDict[Hashable, tuple[str, tuple[tuple[str, int], ...]]] = OrderedDict()
+    _result_cache_lock = threading.Lock()
+
     def __init__(
         self,
         regex_pattern_keys: Sequence[str],
         experiments: Sequence[ParameterizationExperiment] = (),
     ):
-        self._parameterization_regex = self._make_regex_from_patterns(regex_pattern_keys)
+        self._regex_pattern_keys = tuple(regex_pattern_keys)
+        self._parameterization_regex = self._make_regex_from_patterns(self._regex_pattern_keys)
         self._experiments = experiments
 
         self.matches_counter: defaultdict[str, int] = defaultdict(int)
 
+    @classmethod
+    def clear_cache(cls) -> None:
+        with cls._result_cache_lock:
+            cls._result_cache.clear()
+
     @staticmethod
+    @lru_cache(maxsize=16)
     def _make_regex_from_patterns(pattern_keys: Sequence[str]) -> re.Pattern[str]:
         """
         Takes list of pattern keys and returns a compiled regex pattern that matches any of them.
@@ -365,4 +396,38 @@ class Parameterizer:
     def parameterize_all(
         self, content: str, should_run: Callable[[str], bool] = lambda _: True
     ) -> str:
-        return self.parametrize_w_experiments(self.parametrize_w_regex(content), should_run)
+        enabled_experiments = [e for e in self._experiments if should_run(e.name)]
+        cache_key = (
+            self._regex_pattern_keys,
+            tuple(e.cache_key for e in enabled_experiments),
+            content,
+        )
+
+        with self._result_cache_lock:
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+
+        if cached is not None:
+            result, match_counts = cached
+            for key, count in match_counts:
+                self.matches_counter[key] += count
+            return result
+
+        counter_before = dict(self.matches_counter)
+        enabled_names = {e.name for e in enabled_experiments}
+        result = self.parametrize_w_experiments(
+            self.parametrize_w_regex(content), lambda name: name in enabled_names
+        )
+        match_counts = tuple(
+            (key, count - counter_before.get(key, 0))
+            for key, count in self.matches_counter.items()
+            if count != counter_before.get(key, 0)
+        )
+
+        with self._result_cache_lock:
+            self._result_cache[cache_key] = (result, match_counts)
+            while len(self._result_cache) > PARAMETERIZATION_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+
+        return result
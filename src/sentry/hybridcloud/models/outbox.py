@@ -384,6 +384,16 @@ class OutboxBase(Model):
     def get_total_outbox_count(cls) -> int:
         return cls.objects.count()
 
+    @classmethod
+    def get_category_depths(cls) -> dict[int, int]:
+        """
+        Queries the number of outboxes waiting to be processed for each category.
+        """
+        return {
+            row["category"]: row["depth"]
+            for row in cls.objects.values("category").annotate(depth=Count("*")).order_by()
+        }
+
 
 # Outboxes bound from region silo -> control silo
 class RegionOutboxBase(OutboxBase):
@@ -1,9 +1,15 @@
-from collections.abc import Generator, Mapping
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Generator, Iterable, Mapping
+from concurrent import futures
+from concurrent.futures import Future
 from typing import TypeVar
 
 from django.core.cache import cache
 from django.core.cache.backends.base import DEFAULT_TIMEOUT
 
+from sentry import options
 from sentry.hybridcloud.models.cacheversion import (
     CacheVersionBase,
     ControlCacheVersion,
@@ -26,12 +32,162 @@ def _consume_generator(g: Generator[None, None, _V]) -> _V:
             return e.value
 
 
+class _LocalCache:
+    """
+    Process-local tier in front of the django cache.
+
+    Values are kept by versioned key, and the value of a versioned key is never replaced, so
+    they can be kept until they are evicted.  Versions of keys are only kept for
+    `hybridcloud.caching.local-version-ttl` seconds, which bounds how long invalidations made
+    by other processes go unnoticed.  Invalidations made by this process are seen immediately.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: OrderedDict[str, str] = OrderedDict()
+        # key -> (version, time the version was read)
+        self._versions: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return options.get("hybridcloud.caching.local-cache-size") > 0
+
+    def get_versions(self, keys: Iterable[str]) -> dict[str, int]:
+        ttl = options.get("hybridcloud.caching.local-version-ttl")
+        if ttl <= 0:
+            return {}
+        now = time.monotonic()
+        result = {}
+        with self._lock:
+            for key in keys:
+                item = self._versions.get(key)
+                if item is not None and now - item[1] < ttl:
+                    result[key] = item[0]
+        return result
+
+    def set_versions(self, versions: Mapping[str, int]) -> None:
+        if options.get("hybridcloud.caching.local-version-ttl") <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for key, version in versions.items():
+                # Versions only grow, a read racing with an invalidation must not go back.
+                current = self._versions.get(key)
+                if current is not None and current[0] > version:
+                    continue
+                self._versions[key] = (version, now)
+                self._versions.move_to_end(key)
+            self._trim(self._versions)
+
+    def get_values(self, versioned_keys: Iterable[str]) -> dict[str, str]:
+        result = {}
+        with self._lock:
+            for versioned_key in versioned_keys:
+                value = self._values.get(versioned_key)
+                if value is not None:
+                    self._values.move_to_end(versioned_key)
+                    result[versioned_key] = value
+        return result
+
+    def set_values(self, values: Mapping[str, str]) -> None:
+        with self._lock:
+            for versioned_key, value in values.items():
+                if isinstance(value, str):
+                    self._values[versioned_key] = value
+                    self._values.move_to_end(versioned_key)
+            self._trim(self._values)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self._versions.clear()
+
+    def _trim(self, items: OrderedDict[str, _V]) -> None:
+        max_size = options.get("hybridcloud.caching.local-cache-size")
+        while len(items) > max_size:
+            items.popitem(last=False)
+
+
+class _InFlightCalls:
+    """
+    Coalesces concurrent fetches of the same versioned key in this process into one call.
+
+    Callers claim the versioned keys they miss, fetch the ones they own and release them with
+    the serialized results, while callers that found a key already claimed wait for it. Waiting
+    is bounded by `hybridcloud.caching.coalesce-timeout`, and when that is 0 every caller owns
+    all of its keys.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future[str | None]] = {}
+
+    def claim(
+        self, versioned_keys: Iterable[str]
+    ) -> tuple[dict[str, Future[str | None]], dict[str, Future[str | None]]]:
+        owned: dict[str, Future[str | None]] = {}
+        waiting: dict[str, Future[str | None]] = {}
+        if options.get("hybridcloud.caching.coalesce-timeout") <= 0:
+            return {versioned_key: Future() for versioned_key in versioned_keys}, waiting
+        with self._lock:
+            for versioned_key in versioned_keys:
+                future = self._calls.get(versioned_key)
+                if future is None:
+                    owned[versioned_key] = self._calls[versioned_key] = Future()
+                else:
+                    waiting[versioned_key] = future
+        return owned, waiting
+
+    def release(
+        self,
+        owned: Mapping[str, Future[str | None]],
+        results: Mapping[str, str | None] | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        with self._lock:
+            for versioned_key, future in owned.items():
+                if self._calls.get(versioned_key) is future:
+                    del self._calls[versioned_key]
+        for versioned_key, future in owned.items():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result((results or {}).get(versioned_key))
+
+    def wait(
+        self, waiting: Mapping[str, Future[str | None]]
+    ) -> tuple[dict[str, str | None], list[str]]:
+        """
+        Wait for the calls of other callers, for up to `hybridcloud.caching.coalesce-timeout`
+        seconds in total. Returns the results of the calls that finished, and the keys of those
+        that didn't, which the caller should fetch itself.
+        """
+        done, _ = futures.wait(
+            waiting.values(), timeout=options.get("hybridcloud.caching.coalesce-timeout")
+        )
+        results: dict[str, str | None] = {}
+        timed_out: list[str] = []
+        for versioned_key, future in waiting.items():
+            if future in done:
+                results[versioned_key] = future.result()
+            else:
+                timed_out.append(versioned_key)
+        return results, timed_out
+
+
+_local_cache = _LocalCache()
+_in_flight = _InFlightCalls()
+
+
 def _set_cache(
     key: str, value: str | None, version: int, timeout: int | None = None
 ) -> Generator[None, None, bool]:
     if timeout is None:
         timeout = DEFAULT_TIMEOUT
-    result = cache.add(_versioned_key(key, version), value, timeout=timeout)
+    versioned_key = _versioned_key(key, version)
+    result = cache.add(versioned_key, value, timeout=timeout)
+    if result and value is not None and _local_cache.enabled:
+        _local_cache.set_values({versioned_key: value})
     yield
     return result
 
@@ -50,23 +206,42 @@ def _version_model(mode: SiloMode) -> type[CacheVersionBase]:
 
 def _delete_cache(key: str, mode: SiloMode) -> Generator[None, None, int]:
     version = _version_model(mode).incr_version(key)
+    if _local_cache.enabled:
+        _local_cache.set_versions({key: version})
     yield
     return version
 
 
 def _get_cache(keys: list[str], mode: SiloMode) -> Generator[None, None, Mapping[str, str | int]]:
-    versions = {cv.key: cv.version for cv in _version_model(mode).objects.filter(key__in=keys)}
+    local_cache = _local_cache if _local_cache.enabled else None
+
+    versions = local_cache.get_versions(keys) if local_cache else {}
+    if remaining := [key for key in keys if key not in versions]:
+        fetched = {
+            cv.key: cv.version for cv in _version_model(mode).objects.filter(key__in=remaining)
+        }
+        fetched.update({key: 0 for key in remaining if key not in fetched})
+        if local_cache:
+            local_cache.set_versions(fetched)
+        versions.update(fetched)
     yield
 
-    versioned_keys = [_versioned_key(key, versions.get(key, 0)) for key in keys]
-    existing = cache.get_many(versioned_keys)
+    versioned_keys = [_versioned_key(key, versions[key]) for key in keys]
+    existing = local_cache.get_values(versioned_keys) if local_cache else {}
+    if remaining := [
+        versioned_key for versioned_key in versioned_keys if versioned_key not in existing
+    ]:
+        from_cache = cache.get_many(remaining)
+        if local_cache:
+            local_cache.set_values(from_cache)
+        existing.update(from_cache)
     yield
     result: dict[str, str | int] = {}
     for k, versioned_key in zip(keys, versioned_keys):
         if versioned_key in existing:
             result[k] = existing[versioned_key]
             continue
-        result[k] = versions.get(k, 0)
+        result[k] = versions[k]
     return result
 
 
@@ -79,7 +79,7 @@ class SiloCacheBackedCallable(Generic[_R]):
     def resolve_from(
         self, i: int, values: Mapping[str, int | str]
     ) -> Generator[None, None, _R | None]:
-        from .impl import _consume_generator, _delete_cache, _set_cache
+        from .impl import _consume_generator, _delete_cache, _in_flight, _set_cache, _versioned_key
 
         key = self.key_from(i)
         value = values[key]
@@ -93,10 +93,30 @@ class SiloCacheBackedCallable(Generic[_R]):
         else:
             version = value
 
+        # Concurrent misses of the same version of the key share one call.
+        versioned_key = _versioned_key(key, version)
+        owned, waiting = _in_flight.claim([versioned_key])
+        if waiting:
+            metrics.incr("hybridcloud.caching.one.coalesced", tags={"base_key": self.base_key})
+            results, timed_out = _in_flight.wait(waiting)
+            if timed_out:
+                metrics.incr(
+                    "hybridcloud.caching.one.coalesce_timeout", tags={"base_key": self.base_key}
+                )
+                return self.cb(i)
+            serialized = results[versioned_key]
+            return None if serialized is None else self.type_(**json.loads(serialized))
+
         metrics.incr("hybridcloud.caching.one.rpc", tags={"base_key": self.base_key})
-        r = self.cb(i)
-        if r is not None:
-            _consume_generator(_set_cache(key, r.json(), version, self.timeout))
+        try:
+            r = self.cb(i)
+            serialized = None if r is None else r.json()
+            if serialized is not None:
+                _consume_generator(_set_cache(key, serialized, version, self.timeout))
+        except BaseException as e:
+            _in_flight.release(owned, error=e)
+            raise
+        _in_flight.release(owned, {versioned_key: serialized})
         return r
 
     def get_one(self, object_id: int) -> _R | None:
@@ -147,7 +167,14 @@ class SiloCacheManyBackedCallable(Generic[_R]):
         return f"{self.base_key}:{object_id}"
 
     def get_many(self, ids: list[int]) -> list[_R]:
-        from .impl import _consume_generator, _delete_cache, _get_cache, _set_cache
+        from .impl import (
+            _consume_generator,
+            _delete_cache,
+            _get_cache,
+            _in_flight,
+            _set_cache,
+            _versioned_key,
+        )
 
         keys = {i: self.key_from(i) for i in ids}
         cache_values = _consume_generator(_get_cache(list(keys.values()), self.silo_mode))
@@ -171,27 +198,74 @@ class SiloCacheManyBackedCallable(Generic[_R]):
             if version is not None:
                 missing[object_id] = version
 
-        missing_keys = list(missing.keys())
+        # Misses which are already being fetched by a concurrent call are waited for, all other
+        # misses are fetched with a single call.
+        versioned_keys = {
+            object_id: _versioned_key(keys[object_id], version)
+            for object_id, version in missing.items()
+        }
+        owned, waiting = _in_flight.claim(versioned_keys.values())
+        missing_keys = [
+            object_id
+            for object_id, versioned_key in versioned_keys.items()
+            if versioned_key in owned
+        ]
         metrics.incr(
             "hybridcloud.caching.many.rpc", len(missing_keys), tags={"base_key": self.base_key}
         )
         metrics.incr(
             "hybridcloud.caching.many.cached", len(found), tags={"base_key": self.base_key}
         )
+        metrics.incr(
+            "hybridcloud.caching.many.coalesced", len(waiting), tags={"base_key": self.base_key}
+        )
 
-        # This result could have different order than missing_object_ids, or have gaps
-        cb_result = self.cb(missing_keys)
-        for record in cb_result:
-            # TODO(hybridcloud) The types/interfaces don't make reading this attribute safe.
-            # We rely on a convention of records having `id` for now. In the future
-            # this could become a decorator parameter instead.
-            record_id = getattr(record, "id")
-            if record_id is None:
-                continue
-            cache_key = keys[record_id]
-            record_version = missing[record_id]
-            _consume_generator(_set_cache(cache_key, record.json(), record_version, self.timeout))
-            found[record_id] = record
+        results: dict[str, str | None] = {}
+        try:
+            # This result could have different order than missing_object_ids, or have gaps
+            cb_result = self.cb(missing_keys) if missing_keys else []
+            for record in cb_result:
+                # TODO(hybridcloud) The types/interfaces don't make reading this attribute safe.
+                # We rely on a convention of records having `id` for now. In the future
+                # this could become a decorator parameter instead.
+                record_id = getattr(record, "id")
+                if record_id is None:
+                    continue
+                cache_key = keys[record_id]
+                record_version = missing[record_id]
+                serialized = record.json()
+                _consume_generator(_set_cache(cache_key, serialized, record_version, self.timeout))
+                results[versioned_keys[record_id]] = serialized
+                found[record_id] = record
+        except BaseException as e:
+            _in_flight.release(owned, error=e)
+            raise
+        _in_flight.release(owned, results)
+
+        waited, timed_out = _in_flight.wait(waiting)
+        for object_id, versioned_key in versioned_keys.items():
+            serialized = waited.get(versioned_key)
+            if serialized is not None:
+                found[object_id] = self.type_(**json.loads(serialized))
+
+        if timed_out:
+            # The calls we waited for took too long, fetch their records ourselves.
+            metrics.incr(
+                "hybridcloud.caching.many.coalesce_timeout",
+                len(timed_out),
+                tags={"base_key": self.base_key},
+            )
+            timed_out_keys = set(timed_out)
+            for record in self.cb(
+                [
+                    object_id
+                    for object_id, versioned_key in versioned_keys.items()
+                    if versioned_key in timed_out_keys
+                ]
+            ):
+                record_id = getattr(record, "id")
+                if record_id is not None:
+                    found[record_id] = record
 
         return [found[id] for id in ids if id in found]
 
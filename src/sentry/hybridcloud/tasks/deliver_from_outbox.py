@@ -1,19 +1,27 @@
 from __future__ import annotations
 
 import math
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import sentry_sdk
 from celery import Task
 from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
 from django.db.models import Max, Min
 
+from sentry import options
 from sentry.hybridcloud.models.outbox import (
     ControlOutboxBase,
     OutboxBase,
     OutboxFlushError,
     RegionOutboxBase,
 )
+from sentry.hybridcloud.outbox.category import OutboxCategory
 from sentry.hybridcloud.tasks.backfill_outboxes import backfill_outboxes_for
 from sentry.silo.base import SiloMode
 from sentry.tasks.base import instrumented_task
@@ -59,6 +67,54 @@ def enqueue_outbox_jobs(
 # non coalesced work.
 CONCURRENCY = 5
 
+# Weight of the latest batch in the moving average of the time it takes to drain a shard.
+SHARD_LATENCY_DECAY = 0.2
+SHARD_LATENCY_TTL = 60 * 60
+
+
+def _shard_latency_key(outbox_name: str) -> str:
+    return f"deliver_from_outbox.shard_latency:{outbox_name}"
+
+
+def record_shard_latency(outbox_name: str, duration: float, shard_count: int) -> None:
+    if not shard_count:
+        return
+    latency = duration / shard_count
+    previous: float | None = cache.get(_shard_latency_key(outbox_name))
+    if previous is not None:
+        latency = SHARD_LATENCY_DECAY * latency + (1 - SHARD_LATENCY_DECAY) * previous
+    cache.set(_shard_latency_key(outbox_name), latency, SHARD_LATENCY_TTL)
+
+
+def get_batch_count(outbox_name: str, outbox_count: int, concurrency: int) -> int:
+    """
+    The number of drain tasks to schedule for a backlog, so that each of them takes about
+    `hybridcloud.outbox.target_batch_seconds` going by the observed time to drain a shard.
+    """
+    target_seconds = options.get("hybridcloud.outbox.target_batch_seconds")
+    if target_seconds <= 0:
+        return concurrency
+
+    latency: float | None = cache.get(_shard_latency_key(outbox_name))
+    if latency is None:
+        return concurrency
+
+    # Every outbox is counted as a shard of its own, which over-estimates the work of
+    # backlogs that coalesce.
+    batch_count = math.ceil(outbox_count * latency / target_seconds)
+    return max(concurrency, min(batch_count, options.get("hybridcloud.outbox.max_batches")))
+
+
+def get_category_name(category: int) -> str:
+    """
+    Name an outbox category for metric tags. Outboxes of retired categories may still be waiting
+    in the table, and are tagged with their raw value.
+    """
+    try:
+        return OutboxCategory(category).name
+    except ValueError:
+        return str(category)
+
 
 def schedule_batch(
     silo_mode: SiloMode,
@@ -81,8 +137,14 @@ def schedule_batch(
             if hi < lo:
                 continue
 
+            # The total is summed from the per category counts, so that the table is only
+            # counted once per tick.
+            category_depths = outbox_model.get_category_depths()
+            outbox_count = sum(category_depths.values())
+            batch_count = get_batch_count(outbox_name, outbox_count, concurrency)
+
             scheduled_count += hi - lo + 1
-            batch_size = math.ceil((hi - lo + 1) / concurrency)
+            batch_size = math.ceil((hi - lo + 1) / batch_count)
 
             metrics_tags = dict(silo_mode=silo_mode.name, outbox_name=outbox_name)
             metrics.gauge(
@@ -91,10 +153,16 @@ def schedule_batch(
                 tags=metrics_tags,
                 sample_rate=1.0,
             )
+            metrics.gauge(
+                "deliver_from_outbox.queued_batch_count",
+                value=batch_count,
+                tags=metrics_tags,
+                sample_rate=1.0,
+            )
 
             # Notably, when l and h are close, this will result in creating tasks that are processing future ids --
             # that's totally fine.
-            for i in range(concurrency):
+            for i in range(batch_count):
                 drain_task.delay(
                     outbox_name=outbox_name,
                     outbox_identifier_low=lo + i * batch_size,
@@ -112,13 +180,19 @@ def schedule_batch(
                 sample_rate=1.0,
             )
 
-            outbox_count = outbox_model.get_total_outbox_count()
             metrics.gauge(
                 "deliver_from_outbox.total_outbox_count",
                 value=outbox_count,
                 tags=metrics_tags,
                 sample_rate=1.0,
             )
+            for category, depth in category_depths.items():
+                metrics.gauge(
+                    "deliver_from_outbox.category_outbox_count",
+                    value=depth,
+                    tags={**metrics_tags, "category": get_category_name(category)},
+                    sample_rate=1.0,
+                )
         if process_outbox_backfills:
             backfill_outboxes_for(silo_mode, scheduled_count)
 
@@ -174,33 +248,74 @@ def drain_outbox_shards_control(
 def process_outbox_batch(
     outbox_identifier_hi: int, outbox_identifier_low: int, outbox_model: type[OutboxBase]
 ) -> int:
-    processed_count: int = 0
-    for shard_attributes in outbox_model.find_scheduled_shards(
-        outbox_identifier_low, outbox_identifier_hi
-    ):
-        shard_outbox: OutboxBase | None = outbox_model.prepare_next_from_shard(shard_attributes)
-        if not shard_outbox:
-            continue
+    start = time.monotonic()
+    shards = outbox_model.find_scheduled_shards(outbox_identifier_low, outbox_identifier_hi)
+    drain_threads = min(options.get("hybridcloud.outbox.drain_threads"), len(shards))
+    if drain_threads > 1:
+        processed_count = _drain_shards_concurrently(outbox_model, shards, drain_threads)
+    else:
+        processed_count = sum(_drain_scheduled_shard(outbox_model, shard) for shard in shards)
 
-        try:
-            processed_count += 1
-            shard_outbox.drain_shard(flush_all=True)
-        except Exception as e:
-            with sentry_sdk.isolation_scope() as scope:
-                if isinstance(e, OutboxFlushError):
-                    scope.set_tag("outbox.category", e.outbox.category)
-                    scope.set_tag("outbox.shard_scope", e.outbox.shard_scope)
-                    scope.set_context(
-                        "outbox",
-                        {
-                            "shard_identifier": e.outbox.shard_identifier,
-                            "object_identifier": e.outbox.object_identifier,
-                            "payload": e.outbox.payload,
-                        },
-                    )
-                sentry_sdk.capture_exception(e)
-                # In production, it's ok to just continue processing forward, but in tests we aim to surface
-                # problems aggressively.
-                if in_test_environment():
-                    raise
+    duration = time.monotonic() - start
+    outbox_name = outbox_model._meta.label
+    metrics_tags = {"outbox_name": outbox_name}
+    metrics.timing("deliver_from_outbox.batch_duration", duration, tags=metrics_tags)
+    metrics.incr("deliver_from_outbox.drained_shards", amount=processed_count, tags=metrics_tags)
+    record_shard_latency(outbox_name, duration, processed_count)
     return processed_count
+
+
+def _drain_shards_concurrently(
+    outbox_model: type[OutboxBase], shards: list[Mapping[str, Any]], drain_threads: int
+) -> int:
+    # Shards are independent of each other, and `prepare_next_from_shard` skips shards locked by
+    # another worker or task, so every worker simply takes the next scheduled shard.
+    remaining = iter(shards)
+    lock = threading.Lock()
+
+    def drain() -> int:
+        processed_count = 0
+        try:
+            while True:
+                with lock:
+                    shard_attributes = next(remaining, None)
+                if shard_attributes is None:
+                    return processed_count
+                processed_count += _drain_scheduled_shard(outbox_model, shard_attributes)
+        finally:
+            for connection in connections.all():
+                connection.close()
+
+    with ThreadPoolExecutor(max_workers=drain_threads) as threadpool:
+        futures = [threadpool.submit(drain) for _ in range(drain_threads)]
+        return sum(future.result() for future in futures)
+
+
+def _drain_scheduled_shard(
+    outbox_model: type[OutboxBase], shard_attributes: Mapping[str, Any]
+) -> int:
+    shard_outbox: OutboxBase | None = outbox_model.prepare_next_from_shard(shard_attributes)
+    if not shard_outbox:
+        return 0
+
+    try:
+        shard_outbox.drain_shard(flush_all=True)
+    except Exception as e:
+        with sentry_sdk.isolation_scope() as scope:
+            if isinstance(e, OutboxFlushError):
+                scope.set_tag("outbox.category", e.outbox.category)
+                scope.set_tag("outbox.shard_scope", e.outbox.shard_scope)
+                scope.set_context(
+                    "outbox",
+                    {
+                        "shard_identifier": e.outbox.shard_identifier,
+                        "object_identifier": e.outbox.object_identifier,
+                        "payload": e.outbox.payload,
+                    },
+                )
+            sentry_sdk.capture_exception(e)
+            # In production, it's ok to just continue processing forward, but in tests we aim to surface
+            # problems aggressively.
+            if in_test_environment():
+                raise
+    return 1
@@ -22,6 +22,7 @@ from sentry.api.paginator import (
     CombinedQuerysetIntermediary,
     CombinedQuerysetPaginator,
     OffsetPaginator,
+    use_keyset_pagination,
 )
 from sentry.api.serializers import serialize
 from sentry.api.serializers.rest_framework.project import ProjectField
@@ -82,6 +83,7 @@ class AlertRuleIndexMixin(Endpoint):
         if monitor_type is not None:
             alert_rules = alert_rules.filter(monitor_type=monitor_type)
 
+        keyset = use_keyset_pagination(self)
         response = self.paginate(
             request,
             queryset=alert_rules,
@@ -89,6 +91,8 @@ class AlertRuleIndexMixin(Endpoint):
             paginator_cls=OffsetPaginator,
             on_results=lambda x: serialize(x, request.user),
             default_per_page=25,
+            keyset=keyset,
+            cursor_cls=StringCursor if keyset else Cursor,
         )
 
         response[ALERT_RULES_COUNT_HEADER] = len(alert_rules)
@@ -307,6 +311,7 @@ class OrganizationCombinedRuleIndexEndpoint(OrganizationEndpoint):
         alert_rule_intermediary = CombinedQuerysetIntermediary(alert_rules, sort_key)
         rule_intermediary = CombinedQuerysetIntermediary(issue_rules, rule_sort_key)
         uptime_intermediary = CombinedQuerysetIntermediary(uptime_rules, sort_key)
+        keyset = use_keyset_pagination(self)
         response = self.paginate(
             request,
             paginator_cls=CombinedQuerysetPaginator,
@@ -314,8 +319,9 @@ class OrganizationCombinedRuleIndexEndpoint(OrganizationEndpoint):
             default_per_page=25,
             intermediaries=[alert_rule_intermediary, rule_intermediary, uptime_intermediary],
             desc=not is_asc,
-            cursor_cls=StringCursor if case_insensitive else Cursor,
+            cursor_cls=StringCursor if case_insensitive or keyset else Cursor,
             case_insensitive=case_insensitive,
+            keyset=keyset,
         )
         response[MAX_QUERY_SUBSCRIPTIONS_HEADER] = settings.MAX_QUERY_SUBSCRIPTIONS_PER_ORG
         return response
@@ -3,6 +3,7 @@ from collections.abc import Callable
 from django.http.request import HttpRequest
 from django.http.response import HttpResponseBase
 
+from sentry.features.evaluation import feature_evaluation_context
 from sentry.utils.flag import initialize_flag_manager
 
 
@@ -12,4 +13,5 @@ class FlagMiddleware:
 
     def __call__(self, request: HttpRequest) -> HttpResponseBase:
         initialize_flag_manager()
-        return self.get_response(request)
+        with feature_evaluation_context("request"):
+            return self.get_response(request)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from collections.abc import Callable, Mapping, Sequence
+from collections.abc import Callable, Iterable, Mapping, Sequence
 from typing import TYPE_CHECKING, Any, ClassVar
 
 from django.db import models
@@ -133,6 +133,31 @@ class ProjectOptionManager(OptionManager["ProjectOption"]):
 
         return self._option_cache.get(cache_key, {})
 
+    def prefetch_all_values(self, project_ids: Iterable[int]) -> None:
+        """
+        Load the options of many projects into the local cache, with one cache and at most
+        one database round-trip, so that later `get_all_values` calls don't query per project.
+        """
+        cache_keys = {self._make_key(project_id): project_id for project_id in project_ids}
+        missing = [key for key in cache_keys if key not in self._option_cache]
+        if not missing:
+            return
+
+        cached = cache.get_many(missing)
+        self._option_cache.update(cached)
+
+        results: dict[int, dict[str, Any]] = {
+            cache_keys[key]: {} for key in missing if key not in cached
+        }
+        if not results:
+            return
+        for option in self.filter(project_id__in=results):
+            results[option.project_id][option.key] = option.value
+
+        loaded = {self._make_key(project_id): result for project_id, result in results.items()}
+        cache.set_many(loaded)
+        self._option_cache.update(loaded)
+
     def reload_cache(self, project_id: int, update_reason: str) -> Mapping[str, Any]:
         from sentry.tasks.relay import schedule_invalidate_project_config
 
@@ -3,7 +3,7 @@ from __future__ import annotations
 import logging
 import uuid
 from collections import defaultdict
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 from concurrent.futures import ThreadPoolExecutor, wait
 from copy import deepcopy
 from datetime import datetime, timedelta
@@ -22,11 +22,12 @@ from sentry_kafka_schemas.codecs import Codec
 from sentry_kafka_schemas.schema_types.ingest_monitors_v1 import IngestMonitorMessage
 from sentry_sdk.tracing import Span, Transaction
 
-from sentry import quotas, ratelimits
+from sentry import options, quotas, ratelimits
 from sentry.conf.types.kafka_definition import Topic, get_topic_codec
 from sentry.constants import DataCategory, ObjectStatus
 from sentry.db.postgres.transactions import in_test_hide_transaction_boundary
 from sentry.killswitches import killswitch_matches_context
+from sentry.models.environment import Environment
 from sentry.models.project import Project
 from sentry.monitors.clock_dispatch import try_monitor_clock_tick
 from sentry.monitors.constants import PermitCheckInStatus
@@ -86,19 +87,146 @@ CHECKIN_QUOTA_LIMIT = 6
 CHECKIN_QUOTA_WINDOW = 60
 
 
+class CheckinBatchPrefetch:
+    """
+    The monitors, monitor environments and new check-in GUIDs referenced by a
+    batch of check-ins, loaded up front with a few queries instead of a few
+    queries per check-in.
+
+    Check-ins of a group are processed in order and update these rows (e.g.
+    `mark_ok` moves `next_checkin` of the monitor environment with a queryset
+    update), so every prefetched object is handed out once. Later check-ins of
+    the same group load them again.
+    """
+
+    def __init__(self, items: Sequence[CheckinItem]) -> None:
+        # (project_id, slug) -> monitor, None when it doesn't exist
+        self.monitors: dict[tuple[int, str], Monitor | None] = {}
+        # (monitor_id, environment name) -> monitor environment
+        self.environments: dict[tuple[int, str], MonitorEnvironment] = {}
+        # GUIDs of check-ins that don't exist yet
+        self.new_guids: set[uuid.UUID] = set()
+
+        processing_keys_by_monitor: dict[tuple[int, str], set[str]] = defaultdict(set)
+        environment_names: set[str] = set()
+        processing_keys_by_guid: dict[uuid.UUID, set[str]] = defaultdict(set)
+        for item in items:
+            monitor_key = (int(item.message["project_id"]), item.valid_monitor_slug)
+            processing_keys_by_monitor[monitor_key].add(item.processing_key)
+            environment_names.add(item.payload.get("environment") or "production")
+            try:
+                guid = uuid.UUID(item.payload["check_in_id"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if guid.int != 0:
+                processing_keys_by_guid[guid].add(item.processing_key)
+
+        # A monitor sent with check-ins of different groups (e.g. with another
+        # environment) is processed by several threads, which may each upsert
+        # or update it, so those are looked up when processed.
+        slugs_by_project: dict[int, set[str]] = defaultdict(set)
+        for (project_id, slug), keys in processing_keys_by_monitor.items():
+            if len(keys) == 1:
+                slugs_by_project[project_id].add(slug)
+                self.monitors[(project_id, slug)] = None
+
+        # Check-ins of deleted projects are left to be handled when processed.
+        projects: dict[int, Project] = {}
+        for project_id in list(slugs_by_project):
+            try:
+                projects[project_id] = Project.objects.get_from_cache(id=project_id)
+            except Project.DoesNotExist:
+                for slug in slugs_by_project.pop(project_id):
+                    del self.monitors[(project_id, slug)]
+        for monitor in Monitor.objects.filter(
+            project_id__in=slugs_by_project,
+            slug__in={slug for slugs in slugs_by_project.values() for slug in slugs},
+        ):
+            key = (monitor.project_id, monitor.slug)
+            project = projects[monitor.project_id]
+            if key in self.monitors and monitor.organization_id == project.organization_id:
+                self.monitors[key] = monitor
+
+        monitor_ids = [monitor.id for monitor in self.monitors.values() if monitor is not None]
+        monitor_environments = list(MonitorEnvironment.objects.filter(monitor_id__in=monitor_ids))
+        environment_names_by_id = dict(
+            Environment.objects.filter(
+                id__in={monitor_env.environment_id for monitor_env in monitor_environments},
+                name__in=environment_names,
+            ).values_list("id", "name")
+        )
+        for monitor_env in monitor_environments:
+            name = environment_names_by_id.get(monitor_env.environment_id)
+            if name is not None:
+                self.environments[(monitor_env.monitor_id, name)] = monitor_env
+
+        # A GUID sent with check-ins of different groups (e.g. with another
+        # environment) may be created concurrently, so those are looked up
+        # when processed.
+        guids = [guid for guid, keys in processing_keys_by_guid.items() if len(keys) == 1]
+        existing_guids = set(
+            MonitorCheckIn.objects.filter(guid__in=guids).values_list("guid", flat=True)
+        )
+        self.new_guids = set(guids) - existing_guids
+
+    def pop_monitor(self, project_id: int, monitor_slug: str) -> tuple[bool, Monitor | None]:
+        """
+        Whether the monitor was prefetched, and the prefetched monitor (None
+        when it doesn't exist).
+        """
+        try:
+            return True, self.monitors.pop((project_id, monitor_slug))
+        except KeyError:
+            return False, None
+
+    def pop_environment(
+        self, monitor_id: int, environment_name: str | None
+    ) -> MonitorEnvironment | None:
+        return self.environments.pop((monitor_id, environment_name or "production"), None)
+
+    def pop_new_guid(self, guid: uuid.UUID) -> bool:
+        """
+        Whether this is the first check-in of the batch with a GUID that
+        doesn't exist yet.
+        """
+        if guid in self.new_guids:
+            self.new_guids.discard(guid)
+            return True
+        return False
+
+
+def get_checkin_batch_prefetch(items: Sequence[CheckinItem]) -> CheckinBatchPrefetch | None:
+    if not options.get("crons.consumer.batch-prefetch"):
+        return None
+
+    try:
+        with metrics.timer("monitors.checkin.batch_prefetch"):
+            return CheckinBatchPrefetch(items)
+    except Exception:
+        logger.exception("Failed to prefetch check-in batch")
+        return None
+
+
 def _ensure_monitor_with_config(
     project: Project,
     monitor_slug: str,
     config: Mapping | None,
+    prefetch: CheckinBatchPrefetch | None = None,
 ):
-    try:
-        monitor = Monitor.objects.get(
-            slug=monitor_slug,
-            project_id=project.id,
-            organization_id=project.organization_id,
-        )
-    except Monitor.DoesNotExist:
-        monitor = None
+    prefetched = False
+    monitor: Monitor | None = None
+    if prefetch is not None:
+        prefetched, monitor = prefetch.pop_monitor(project.id, monitor_slug)
+
+    if not prefetched:
+        try:
+            monitor = Monitor.objects.get(
+                slug=monitor_slug,
+                project_id=project.id,
+                organization_id=project.organization_id,
+            )
+        except Monitor.DoesNotExist:
+            monitor = None
 
     if not config:
         return monitor
@@ -406,7 +534,11 @@ def update_existing_check_in(
     existing_check_in.update(**updated_checkin)
 
 
-def _process_checkin(item: CheckinItem, txn: Transaction | Span):
+def _process_checkin(
+    item: CheckinItem,
+    txn: Transaction | Span,
+    prefetch: CheckinBatchPrefetch | None = None,
+):
     params = item.payload
 
     start_time = to_datetime(float(item.message["start_time"]))
@@ -552,6 +684,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
             project,
             monitor_slug,
             monitor_config,
+            prefetch,
         )
     except ProcessingErrorsException as e:
         ensure_config_errors = list(e.processing_errors)
@@ -661,9 +794,13 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
     # 02
     # Retrieve or upsert monitor environment for this check-in
     try:
-        monitor_environment = MonitorEnvironment.objects.ensure_environment(
-            project, monitor, environment
-        )
+        monitor_environment = None
+        if prefetch is not None:
+            monitor_environment = prefetch.pop_environment(monitor.id, environment)
+        if monitor_environment is None:
+            monitor_environment = MonitorEnvironment.objects.ensure_environment(
+                project, monitor, environment
+            )
     except MonitorEnvironmentLimitsExceeded as e:
         metrics.incr(
             "monitors.checkin.result",
@@ -745,6 +882,9 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
                         .order_by("-date_added")[:1]
                         .get()
                     )
+                elif prefetch is not None and prefetch.pop_new_guid(guid):
+                    # Known not to exist when the batch was prefetched
+                    raise MonitorCheckIn.DoesNotExist
                 else:
                     check_in = MonitorCheckIn.objects.select_for_update().get(
                         guid=guid,
@@ -913,7 +1053,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
         logger.exception("Failed to process check-in")
 
 
-def process_checkin(item: CheckinItem):
+def process_checkin(item: CheckinItem, prefetch: CheckinBatchPrefetch | None = None):
     """
     Process an individual check-in
     """
@@ -924,20 +1064,20 @@ def process_checkin(item: CheckinItem):
         ) as txn:
             # Deepcopy the checkin here so that it's not modified. We need the original when we get a
             # `ProcessingErrorsException`
-            _process_checkin(deepcopy(item), txn)
+            _process_checkin(deepcopy(item), txn, prefetch)
     except ProcessingErrorsException as e:
         handle_processing_errors(item, e)
     except Exception:
         logger.exception("Failed to process check-in")
 
 
-def process_checkin_group(items: list[CheckinItem]):
+def process_checkin_group(items: list[CheckinItem], prefetch: CheckinBatchPrefetch | None = None):
     """
     Process a group of related check-ins (all part of the same monitor)
     completely serially.
     """
     for item in items:
-        process_checkin(item)
+        process_checkin(item, prefetch)
 
 
 def process_batch(executor: ThreadPoolExecutor, message: Message[ValuesBatch[KafkaPayload]]):
@@ -987,8 +1127,12 @@ def process_batch(executor: ThreadPoolExecutor, message: Message[ValuesBatch[Kaf
 
     # Submit check-in groups for processing
     with sentry_sdk.start_transaction(op="process_batch", name="monitors.monitor_consumer"):
+        prefetch = get_checkin_batch_prefetch(
+            [item for group in checkin_mapping.values() for item in group]
+        )
         futures = [
-            executor.submit(process_checkin_group, group) for group in checkin_mapping.values()
+            executor.submit(process_checkin_group, group, prefetch)
+            for group in checkin_mapping.values()
         ]
         wait(futures)
 
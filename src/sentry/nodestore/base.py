@@ -10,6 +10,8 @@ from django.core.cache import BaseCache, InvalidCacheBackendError, caches
 from django.utils.functional import cached_property
 
 from sentry import options
+from sentry.nodestore import compression
+from sentry.nodestore.localcache import MISSING, LocalNodeCache, get_local_node_cache
 from sentry.utils import json, metrics
 from sentry.utils.services import Service
 
@@ -125,11 +127,18 @@ class NodeStorage(local, Service):
         >>> nodestore._get_bytes('key1')
         b'{"message": "hello world"}'
         """
-        return self._get_bytes(id)
+        return self._get_decompressed_bytes(id)
 
     def _get_bytes(self, id: str) -> bytes | None:
         raise NotImplementedError
 
+    def _get_decompressed_bytes(self, id: str) -> bytes | None:
+        """
+        Read the payload of a node, undoing any dictionary compression. See
+        `sentry.nodestore.compression`.
+        """
+        return compression.decompress(self._get_bytes(id))
+
     @metrics.wraps("nodestore.get.duration")
     def get(self, id: str, subkey: str | None = None) -> Any:
         """
@@ -138,6 +147,15 @@ class NodeStorage(local, Service):
         """
         with sentry_sdk.start_span(op="nodestore.get") as span:
             span.set_tag("node_id", id)
+            local_cache = self.local_cache
+            if local_cache is not None:
+                local_item = local_cache.get(id)
+                if local_item is not None:
+                    span.set_tag("origin", "from_local_cache")
+                    rv = self._decode(None if local_item is MISSING else local_item, subkey)
+                    span.set_tag("found", bool(rv))
+                    return rv
+
             if subkey is None:
                 item_from_cache = self._get_cache_item(id)
                 if item_from_cache:
@@ -147,7 +165,10 @@ class NodeStorage(local, Service):
                     return item_from_cache
 
             span.set_tag("subkey", str(subkey))
-            bytes_data = self._get_bytes(id)
+            if local_cache is not None:
+                bytes_data = local_cache.fetch(id, self._get_decompressed_bytes)
+            else:
+                bytes_data = self._get_decompressed_bytes(id)
             rv = self._decode(bytes_data, subkey=subkey)
             if subkey is None:
                 # set cache item only after we know decoding did not fail
@@ -183,10 +204,23 @@ class NodeStorage(local, Service):
             span.set_tag("subkey", str(subkey))
             span.set_tag("num_ids", len(id_list))
 
+            local_cache = self.local_cache
+            local_items: dict[str, Any | None] = {}
+            if local_cache is not None:
+                for id, local_item in local_cache.get_many(id_list).items():
+                    local_items[id] = self._decode(
+                        None if local_item is MISSING else local_item, subkey
+                    )
+                if len(local_items) == len(id_list):
+                    span.set_tag("result", "from_local_cache")
+                    return local_items
+                id_list = [id for id in id_list if id not in local_items]
+
             if subkey is None:
                 cache_items = self._get_cache_items(id_list)
                 if len(cache_items) == len(id_list):
                     span.set_tag("result", "from_cache")
+                    cache_items.update(local_items)
                     return cache_items
 
                 uncached_ids = [id for id in id_list if id not in cache_items]
@@ -194,13 +228,19 @@ class NodeStorage(local, Service):
                 uncached_ids = id_list
 
             with sentry_sdk.start_span(op="nodestore._get_bytes_multi_and_decode") as span:
-                items = {
-                    id: self._decode(value, subkey=subkey)
+                bytes_items = {
+                    id: compression.decompress(value)
                     for id, value in self._get_bytes_multi(uncached_ids).items()
                 }
+                items = {
+                    id: self._decode(value, subkey=subkey) for id, value in bytes_items.items()
+                }
+            if local_cache is not None:
+                local_cache.set_many(bytes_items)
             if subkey is None:
                 self._set_cache_items(items)
                 items.update(cache_items)
+            items.update(local_items)
 
             span.set_tag("result", "from_service")
             span.set_tag("found", len(items))
@@ -229,7 +269,12 @@ class NodeStorage(local, Service):
         >>> nodestore.set_bytes('key1', b"{'foo': 'bar'}")
         """
         metrics.distribution("nodestore.set_bytes", len(data))
-        return self._set_bytes(item_id, data, ttl)
+        rv = self._set_bytes(item_id, data, ttl)
+        # Writes happen mostly during ingestion, where we don't want to fill the local cache with
+        # payloads which may never be read again, so just drop whatever is cached
+        if self.local_cache is not None:
+            self.local_cache.delete([item_id])
+        return rv
 
     def _set_bytes(self, item_id: str, data: bytes, ttl: timedelta | None = None) -> None:
         raise NotImplementedError
@@ -261,7 +306,10 @@ class NodeStorage(local, Service):
         {'foo': 'bam'}
         """
         cache_item = data.get(None)
+        platform = cache_item.get("platform") if isinstance(cache_item, Mapping) else None
         bytes_data = self._encode(data)
+        compression.maybe_sample_payload(bytes_data, platform)
+        bytes_data = compression.compress_with_dictionary(bytes_data, platform)
         self.set_bytes(item_id, bytes_data, ttl=ttl)
         # set cache only after encoding and write to nodestore has succeeded
         if options.get("nodestore.set-subkeys.enable-set-cache-item"):
@@ -294,13 +342,25 @@ class NodeStorage(local, Service):
             self.cache.set_many(items)
 
     def _delete_cache_item(self, item_id: str) -> None:
+        if self.local_cache is not None:
+            self.local_cache.set_missing([item_id])
         if self.cache:
             self.cache.delete(item_id)
 
     def _delete_cache_items(self, id_list: list[str]) -> None:
+        if self.local_cache is not None:
+            self.local_cache.set_missing(id_list)
         if self.cache:
             self.cache.delete_many([item_id for item_id in id_list])
 
+    @property
+    def local_cache(self) -> LocalNodeCache | None:
+        """
+        In-process cache tier in front of ``cache``. Backends can override this to plug in their
+        own tier, or return ``None`` to opt out.
+        """
+        return get_local_node_cache()
+
     @cached_property
     def cache(self) -> BaseCache | None:
         try:
@@ -0,0 +1,197 @@
+"""
+Optional zstd dictionary compression for nodestore payloads.
+
+Event payloads are extremely repetitive across a project (same SDK, same contexts, same frame
+paths), which standalone compression can't take advantage of for the typical few-kilobyte event. A
+zstd dictionary trained on sampled payloads of one platform captures those repetitions once.
+
+Dictionary-compressed values carry a small header (magic bytes, format version and the dictionary
+id) in front of the zstd frame. Values without the header are returned unchanged, so old and new
+payloads can be read side by side. Dictionaries are immutable, addressed by their zstd dictionary
+id and stored in the filestore, so every process can decode every value no matter which dictionary
+is currently active for its platform.
+
+Rolling out a dictionary:
+
+1. Enable sampling with ``nodestore.zstd-dictionary.sample-rate``.
+2. Call ``train_dictionary(platform)`` once enough samples have been collected.
+3. Add ``{platform: dict_id}`` to ``nodestore.zstd-dictionaries``.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import struct
+import threading
+from io import BytesIO
+
+import zstandard
+from django.conf import settings
+
+from sentry import options
+from sentry.utils import metrics, redis
+
+logger = logging.getLogger(__name__)
+
+# A JSON payload always starts with `{`, and legacy pickled payloads with `\x80`, so a leading NUL
+# byte is unambiguous.
+DICTIONARY_MAGIC = b"\x00ZD"
+DICTIONARY_HEADER = struct.Struct(">3sBI")
+DICTIONARY_FORMAT_VERSION = 1
+
+DICTIONARY_PATH_TEMPLATE = "nodestore/zstd-dictionaries/v1/{dict_id}"
+
+DEFAULT_DICTIONARY_SIZE = 110 * 1024
+COMPRESSION_LEVEL = 3
+
+# How many sampled payloads to keep per platform for training
+MAX_SAMPLES = 2000
+SAMPLES_KEY_TEMPLATE = "nodestore:zstd-dictionary-samples:{platform}"
+SAMPLES_TTL = 7 * 24 * 60 * 60
+
+
+class UnknownDictionary(Exception):
+    pass
+
+
+_dictionaries: dict[int, zstandard.ZstdCompressionDict] = {}
+_dictionaries_lock = threading.Lock()
+
+
+def _get_samples_cluster():
+    return redis.redis_clusters.get_binary(settings.SENTRY_NODESTORE_DICTIONARY_REDIS_CLUSTER)
+
+
+def get_dictionary(dict_id: int) -> zstandard.ZstdCompressionDict:
+    """
+    Load a dictionary by id, caching it for the lifetime of the process (dictionaries never
+    change once stored).
+    """
+    with _dictionaries_lock:
+        dictionary = _dictionaries.get(dict_id)
+    if dictionary is not None:
+        return dictionary
+
+    from sentry.models.files.utils import get_storage
+
+    path = DICTIONARY_PATH_TEMPLATE.format(dict_id=dict_id)
+    try:
+        with get_storage().open(path) as f:
+            data = f.read()
+    except Exception as e:
+        raise UnknownDictionary(dict_id) from e
+
+    dictionary = zstandard.ZstdCompressionDict(data)
+    # Precomputing the compression parameters makes per-event compression much cheaper
+    dictionary.precompute_compress(level=COMPRESSION_LEVEL)
+
+    with _dictionaries_lock:
+        _dictionaries[dict_id] = dictionary
+    return dictionary
+
+
+def store_dictionary(data: bytes) -> int:
+    from sentry.models.files.utils import get_storage
+
+    dictionary = zstandard.ZstdCompressionDict(data)
+    dict_id = dictionary.dict_id()
+    get_storage().save(DICTIONARY_PATH_TEMPLATE.format(dict_id=dict_id), BytesIO(data))
+    return dict_id
+
+
+def get_active_dictionary_id(platform: str | None) -> int | None:
+    if not platform:
+        return None
+    return options.get("nodestore.zstd-dictionaries").get(platform)
+
+
+def compress_with_dictionary(value: bytes, platform: str | None) -> bytes:
+    """
+    Compress ``value`` with the active dictionary for ``platform``, or return it unchanged if
+    there is none (or it can't be loaded).
+    """
+    dict_id = get_active_dictionary_id(platform)
+    if dict_id is None:
+        return value
+
+    try:
+        dictionary = get_dictionary(dict_id)
+    except UnknownDictionary:
+        logger.exception("nodestore.zstd_dictionary.unknown", extra={"dict_id": dict_id})
+        return value
+
+    compressed = zstandard.ZstdCompressor(
+        dict_data=dictionary, write_dict_id=False, write_content_size=True
+    ).compress(value)
+
+    metrics.distribution(
+        "nodestore.zstd_dictionary.compression_ratio",
+        len(value) / max(len(compressed), 1),
+        tags={"platform": platform},
+    )
+
+    return DICTIONARY_HEADER.pack(DICTIONARY_MAGIC, DICTIONARY_FORMAT_VERSION, dict_id) + compressed
+
+
+def is_dictionary_compressed(value: bytes | None) -> bool:
+    return value is not None and value[: len(DICTIONARY_MAGIC)] == DICTIONARY_MAGIC
+
+
+def decompress(value: bytes | None) -> bytes | None:
+    """
+    Undo ``compress_with_dictionary``. Values in any other format are returned unchanged.
+    """
+    if value is None or not is_dictionary_compressed(value):
+        return value
+
+    _, version, dict_id = DICTIONARY_HEADER.unpack_from(value)
+    if version != DICTIONARY_FORMAT_VERSION:
+        raise ValueError(f"Unknown nodestore dictionary format version {version}")
+
+    return zstandard.ZstdDecompressor(dict_data=get_dictionary(dict_id)).decompress(
+        value[DICTIONARY_HEADER.size :]
+    )
+
+
+def maybe_sample_payload(value: bytes, platform: str | None) -> None:
+    """
+    Keep a bounded sample of recent payloads per platform to train dictionaries on.
+    """
+    if not platform:
+        return
+
+    sample_rate = options.get("nodestore.zstd-dictionary.sample-rate")
+    if not sample_rate or random.random() >= sample_rate:
+        return
+
+    try:
+        key = SAMPLES_KEY_TEMPLATE.format(platform=platform)
+        with _get_samples_cluster().pipeline() as pipeline:
+            pipeline.lpush(key, value)
+            pipeline.ltrim(key, 0, MAX_SAMPLES - 1)
+            pipeline.expire(key, SAMPLES_TTL)
+            pipeline.execute()
+    except Exception:
+        # Sampling must never break writes
+        logger.exception("nodestore.zstd_dictionary.sample_failed")
+
+
+def train_dictionary(platform: str, dict_size: int = DEFAULT_DICTIONARY_SIZE) -> int:
+    """
+    Train a dictionary on the sampled payloads of ``platform``, store it and return its id. The
+    dictionary isn't used for writes until it is activated through the
+    ``nodestore.zstd-dictionaries`` option.
+    """
+    samples = _get_samples_cluster().lrange(SAMPLES_KEY_TEMPLATE.format(platform=platform), 0, -1)
+    if not samples:
+        raise ValueError(f"No payloads sampled for platform {platform!r}")
+
+    dictionary = zstandard.train_dictionary(dict_size, samples, level=COMPRESSION_LEVEL)
+    dict_id = store_dictionary(dictionary.as_bytes())
+
+    logger.info(
+        "nodestore.zstd_dictionary.trained",
+        extra={"platform": platform, "dict_id": dict_id, "num_samples": len(samples)},
+    )
+    return dict_id
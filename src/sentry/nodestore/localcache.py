@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+
+from sentry import options
+from sentry.utils import metrics
+
+# Marker stored for ids which are known not to exist, either because a fetch came back empty or
+# because we deleted them ourselves.
+MISSING = object()
+
+# Rough per-entry bookkeeping overhead (key, tuple, OrderedDict node), so that lots of tiny or
+# missing entries still count against the budget.
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class _InFlight:
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: bytes | None = None
+        self.error: BaseException | None = None
+
+
+class LocalNodeCache:
+    """
+    Byte-budgeted, process-wide LRU of decompressed nodestore payloads.
+
+    This sits in front of the (remote) Django cache configured as ``nodedata`` and the nodestore
+    backend itself. It stores the raw, decompressed bytes of a node rather than decoded JSON, so
+    that:
+
+    * Every subkey of a node is served from one entry.
+    * Callers always get a freshly decoded object and can't mutate the cached payload.
+    * The memory used by the cache can be accounted for exactly.
+
+    Ids that came back empty (or were deleted through nodestore) are remembered as misses for
+    ``miss_ttl`` seconds. Concurrent fetches of the same id from different threads are coalesced
+    into a single backend call.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, miss_ttl: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.current_bytes = 0
+
+        self._lock = threading.Lock()
+        # id -> (value or MISSING, size in bytes, expiry)
+        self._entries: OrderedDict[str, tuple[object, int, float]] = OrderedDict()
+        self._in_flight: dict[str, _InFlight] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, id: str) -> object | None:
+        """
+        Return the cached bytes, ``MISSING`` for a known miss, or ``None`` if nothing is cached.
+        """
+        with self._lock:
+            value = self._get_locked(id, time.monotonic())
+
+        metrics.incr("nodestore.local_cache.get", tags={"result": _result_tag(value)})
+        return value
+
+    def get_many(self, id_list: Iterable[str]) -> dict[str, object]:
+        rv = {}
+        misses = 0
+        now = time.monotonic()
+
+        with self._lock:
+            for id in id_list:
+                value = self._get_locked(id, now)
+                if value is not None:
+                    rv[id] = value
+                else:
+                    misses += 1
+
+        for value in rv.values():
+            metrics.incr("nodestore.local_cache.get", tags={"result": _result_tag(value)})
+        if misses:
+            metrics.incr("nodestore.local_cache.get", amount=misses, tags={"result": "miss"})
+        return rv
+
+    def set(self, id: str, value: bytes | None) -> None:
+        with self._lock:
+            self._set_locked(id, value)
+
+    def set_many(self, items: dict[str, bytes | None]) -> None:
+        with self._lock:
+            for id, value in items.items():
+                self._set_locked(id, value)
+
+    def set_missing(self, id_list: Iterable[str]) -> None:
+        self.set_many({id: None for id in id_list})
+
+    def delete(self, id_list: Iterable[str]) -> None:
+        with self._lock:
+            for id in id_list:
+                self._pop_locked(id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def fetch(self, id: str, fetch_func: Callable[[str], bytes | None]) -> bytes | None:
+        """
+        Read ``id`` through the cache, calling ``fetch_func`` on a miss. If another thread is
+        already fetching the same id, wait for its result instead of fetching again.
+
+        Unlike ``get``, this doesn't record hits and misses, as it's meant to be called right after
+        a ``get`` came back empty.
+        """
+        with self._lock:
+            value = self._get_locked(id, time.monotonic())
+            if value is None:
+                in_flight = self._in_flight.get(id)
+                if in_flight is None:
+                    in_flight = self._in_flight[id] = _InFlight()
+                    is_leader = True
+                else:
+                    is_leader = False
+
+        if value is not None:
+            return None if value is MISSING else value  # type: ignore[return-value]
+
+        if not is_leader:
+            metrics.incr("nodestore.local_cache.coalesced")
+            in_flight.event.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.value
+
+        try:
+            in_flight.value = fetch_func(id)
+        except BaseException as e:
+            in_flight.error = e
+            raise
+        else:
+            self.set(id, in_flight.value)
+            return in_flight.value
+        finally:
+            with self._lock:
+                self._in_flight.pop(id, None)
+            in_flight.event.set()
+
+    def _get_locked(self, id: str, now: float) -> object | None:
+        entry = self._entries.get(id)
+        if entry is None:
+            return None
+
+        value, _, expires_at = entry
+        if expires_at <= now:
+            self._pop_locked(id)
+            return None
+
+        self._entries.move_to_end(id)
+        return value
+
+    def _set_locked(self, id: str, value: bytes | None) -> None:
+        self._pop_locked(id)
+
+        if value is None:
+            size = ENTRY_OVERHEAD_BYTES
+            entry = (MISSING, size, time.monotonic() + self.miss_ttl)
+        else:
+            size = len(value) + ENTRY_OVERHEAD_BYTES
+            # Don't let a single huge payload flush the whole cache
+            if size > self.max_bytes // 4:
+                metrics.incr("nodestore.local_cache.skipped_too_large")
+                return
+            entry = (value, size, time.monotonic() + self.ttl)
+
+        self._entries[id] = entry
+        self.current_bytes += size
+
+        evicted = 0
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            evicted += 1
+
+        if evicted:
+            metrics.incr("nodestore.local_cache.eviction", amount=evicted)
+        metrics.gauge("nodestore.local_cache.bytes", self.current_bytes)
+
+    def _pop_locked(self, id: str) -> None:
+        entry = self._entries.pop(id, None)
+        if entry is not None:
+            self.current_bytes -= entry[1]
+
+
+_local_cache: LocalNodeCache | None = None
+_local_cache_lock = threading.Lock()
+
+
+def get_local_node_cache() -> LocalNodeCache | None:
+    """
+    Return the process-wide local node cache, or ``None`` if it's disabled (the default). The
+    cache is recreated whenever its byte budget is changed.
+    """
+    global _local_cache
+
+    max_bytes = options.get("nodestore.local-cache.max-bytes")
+    if not max_bytes:
+        return None
+
+    with _local_cache_lock:
+        if _local_cache is None or _local_cache.max_bytes != max_bytes:
+            _local_cache = LocalNodeCache(max_bytes=max_bytes, ttl=0, miss_ttl=0)
+        _local_cache.ttl = options.get("nodestore.local-cache.ttl")
+        _local_cache.miss_ttl = options.get("nodestore.local-cache.miss-ttl")
+        return _local_cache
+
+
+def _result_tag(value: object | None) -> str:
+    if value is None:
+        return "miss"
+    if value is MISSING:
+        return "negative_hit"
+    return "hit"
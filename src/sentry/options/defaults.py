@@ -297,6 +297,23 @@ register(
     flags=FLAG_MODIFIABLE_BOOL | FLAG_AUTOMATOR_MODIFIABLE,
 )
 
+# Paginators report the query planner's estimate rather than counting the rows when it's at
+# least this many hits. Only counts capped above this many hits are estimated. 0 always counts.
+register(
+    "api.paginator.approximate-hits-threshold",
+    type=Int,
+    default=0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Endpoints (by class name) that paginate with keyset cursors instead of page numbers. Cursors
+# handed out before an endpoint is switched over are rejected.
+register(
+    "api.paginator.keyset-endpoints",
+    type=Sequence,
+    default=[],
+    flags=FLAG_ALLOW_EMPTY | FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # API Tokens
 register(
     "apitoken.auto-add-last-chars",
@@ -1117,6 +1134,14 @@ register(
 # Controls whether generic inbound filters are sent to Relay.
 register("relay.emit-generic-inbound-filters", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
+# Recompute and store only the affected sections of cached project configs on invalidations
+# which are known to change just those sections.
+register(
+    "relay.project-config-patching.enable",
+    default=False,
+    flags=FLAG_MODIFIABLE_BOOL | FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # Write new kafka headers in eventstream
 register("eventstream:kafka-headers", default=True, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
@@ -1294,6 +1319,29 @@ register(
     flags=FLAG_AUTOMATOR_MODIFIABLE,
 )
 
+# Size (0 disables it) and TTL in seconds of the caching indexer's process-local cache tier
+register(
+    "sentry-metrics.indexer.cache-l1.max-size",
+    type=Int,
+    default=0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+register(
+    "sentry-metrics.indexer.cache-l1.ttl",
+    type=Int,
+    default=600,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
+# Capacity (0 disables it) of the caching indexer's Bloom filter of strings that couldn't be
+# indexed, which are then not looked up in the cache again for up to one cache-l1.ttl.
+register(
+    "sentry-metrics.indexer.cache-bloom.capacity",
+    type=Int,
+    default=0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # Option to control sampling percentage of schema validation on the generic metrics pipeline
 # based on namespace.
 register(
@@ -1890,6 +1938,45 @@ register(
 )
 register("hybrid_cloud.disable_tombstone_cleanup", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
+# Coalesce buffer increments in process memory, handing them to the buffer backend once this many
+# rows have pending increments (0 disables aggregation), or once the oldest is this many
+# milliseconds old. See sentry.buffer.aggregation for the durability trade-off.
+register(
+    "buffer.incr-aggregation.max-keys",
+    type=Int,
+    default=0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+register(
+    "buffer.incr-aggregation.max-delay-ms",
+    type=Int,
+    default=1000,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Apply batches of buffer keys with one UPDATE per model and shape of increment, instead of one
+# per key. See sentry.buffer.bulk.
+register(
+    "buffer.bulk-process.enabled",
+    type=Bool,
+    default=False,
+    flags=FLAG_MODIFIABLE_BOOL | FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Drain the buffer's pending sets with this many process_pending tasks, at most
+# RedisBuffer.pending_set_count. It can be changed at any time.
+register(
+    "buffer.pending-partitions",
+    type=Int,
+    default=1,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# How many pending keys process_pending reads from Redis at a time.
+register(
+    "buffer.pending-chunk-size",
+    type=Int,
+    default=10000,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # Flagpole Configuration (used in getsentry)
 register("flagpole.debounce_reporting_seconds", default=0, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
@@ -1897,6 +1984,15 @@ register("flagpole.debounce_reporting_seconds", default=0, flags=FLAG_AUTOMATOR_
 # When feature flagging has faults, it can become very high volume and we can overwhelm sentry.
 register("features.error.capture_rate", default=0.1, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
+# Memoize feature checks for the duration of an API request or post_process task, and check
+# project features in batches.
+register(
+    "features.evaluation-context.enabled",
+    type=Bool,
+    default=False,
+    flags=FLAG_MODIFIABLE_BOOL | FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # Retry controls
 register("hybridcloud.regionsiloclient.retries", default=5, flags=FLAG_AUTOMATOR_MODIFIABLE)
 register("hybridcloud.rpc.retries", default=5, flags=FLAG_AUTOMATOR_MODIFIABLE)
@@ -1910,6 +2006,41 @@ register(
     default=4,
     flags=FLAG_AUTOMATOR_MODIFIABLE,
 )
+# Outbox drain controls
+# Number of shards each outbox drain task processes concurrently.
+register("hybridcloud.outbox.drain_threads", default=1, type=Int, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Seconds a drain task should take. When set, the number of drain tasks scheduled for a backlog
+# is derived from the observed time to drain a shard, 0 always schedules the given concurrency.
+register(
+    "hybridcloud.outbox.target_batch_seconds",
+    default=0.0,
+    type=Float,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Upper bound for the number of drain tasks scheduled per outbox table each turn.
+register("hybridcloud.outbox.max_batches", default=50, type=Int, flags=FLAG_AUTOMATOR_MODIFIABLE)
+
+# Silo cache controls
+# Number of versioned values of silo cached RPCs kept in process memory, 0 disables the local tier.
+register(
+    "hybridcloud.caching.local-cache-size", default=0, type=Int, flags=FLAG_AUTOMATOR_MODIFIABLE
+)
+# Seconds for which cache versions are kept in process memory. Invalidations made by other
+# processes are only seen after this long, 0 reads versions from the database on every call.
+register(
+    "hybridcloud.caching.local-version-ttl",
+    default=0.0,
+    type=Float,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Seconds for which a silo cache miss waits for a concurrent call in the same process that is
+# already fetching the same key, before making the call itself. 0 disables coalescing of misses.
+register(
+    "hybridcloud.caching.coalesce-timeout",
+    default=0.0,
+    type=Float,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
 
 # Break glass controls
 register("hybrid_cloud.rpc.disabled-service-methods", default=[], flags=FLAG_AUTOMATOR_MODIFIABLE)
@@ -1923,6 +2054,25 @@ register("txnames.bump-lifetime-sample-rate", default=0.1, flags=FLAG_AUTOMATOR_
 register(
     "nodestore.set-subkeys.enable-set-cache-item", default=True, flags=FLAG_AUTOMATOR_MODIFIABLE
 )
+# In-process cache tier for nodestore reads (see `sentry.nodestore.localcache`). Disabled when the
+# byte budget is 0.
+register("nodestore.local-cache.max-bytes", default=0, flags=FLAG_AUTOMATOR_MODIFIABLE)
+register("nodestore.local-cache.ttl", default=60, flags=FLAG_AUTOMATOR_MODIFIABLE)
+register("nodestore.local-cache.miss-ttl", default=10, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# zstd dictionary compression of nodestore payloads (see `sentry.nodestore.compression`). Maps
+# platform to the id of the dictionary used for new writes; platforms not listed are not affected.
+register(
+    "nodestore.zstd-dictionaries",
+    type=Dict,
+    default={},
+    flags=FLAG_ALLOW_EMPTY | FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Rate at which written payloads are sampled for training dictionaries.
+register(
+    "nodestore.zstd-dictionary.sample-rate",
+    default=0.0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
 
 # === Backpressure related runtime options ===
 
@@ -1971,6 +2121,15 @@ register(
 # Killswitch for monitor check-ins
 register("crons.organization.disable-check-in", type=Sequence, default=[])
 
+# Prefetch monitors, monitor environments and check-ins for a whole batch of
+# check-ins in the parallel monitors consumer
+register(
+    "crons.consumer.batch-prefetch",
+    type=Bool,
+    default=False,
+    flags=FLAG_MODIFIABLE_BOOL | FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # Sets the timeout for webhooks
 register(
     "sentry-apps.webhook.timeout.sec",
@@ -2257,6 +2416,12 @@ register(
     default=0.0,
     flags=FLAG_AUTOMATOR_MODIFIABLE | FLAG_MODIFIABLE_RATE,
 )
+# Use to rollout caching the metric specs generated from alert and widget queries across projects
+register(
+    "on_demand_metrics.cache_metric_specs",
+    default=0.0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE | FLAG_MODIFIABLE_RATE,
+)
 
 # Relocation: whether or not the self-serve API for the feature is enabled. When set on a region
 # silo, this flag controls whether or not that region's API will serve relocation requests to
@@ -2480,6 +2645,25 @@ register(
     default=300,  # 5 minutes
     flags=FLAG_PRIORITIZE_DISK | FLAG_AUTOMATOR_MODIFIABLE,
 )
+# Assemble segments in the memory of the process spans consumer, spilling
+# them to the redis buffer only beyond these budgets.
+register(
+    "standalone-spans.segment-assembler.enable",
+    default=False,
+    flags=FLAG_PRIORITIZE_DISK | FLAG_AUTOMATOR_MODIFIABLE,
+)
+register(
+    "standalone-spans.segment-assembler.max-bytes",
+    type=Int,
+    default=100 * 1000 * 1000,  # 100 MB
+    flags=FLAG_PRIORITIZE_DISK | FLAG_AUTOMATOR_MODIFIABLE,
+)
+register(
+    "standalone-spans.segment-assembler.max-hold-seconds",
+    type=Int,
+    default=300,  # 5 minutes
+    flags=FLAG_PRIORITIZE_DISK | FLAG_AUTOMATOR_MODIFIABLE,
+)
 register(
     "standalone-spans.detect-performance-issues-consumer.enable",
     default=True,
@@ -2698,6 +2882,15 @@ register(
     default=10000,
     flags=FLAG_AUTOMATOR_MODIFIABLE,
 )
+# Share the results of the comparison queries of percent delayed rule conditions between
+# `apply_delayed` tasks. The end of their window is rounded down to a multiple of this many seconds.
+# 0 disables the cache.
+register(
+    "delayed_processing.query_cache.bucket_seconds",
+    type=Int,
+    default=0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
 
 register(
     "grouping.grouphash_metadata.ingestion_writes_enabled",
@@ -2706,6 +2899,22 @@ register(
     flags=FLAG_AUTOMATOR_MODIFIABLE,
 )
 
+# Per-process cache of resolved grouphashes used by the batched grouphash lookup in ingest. Entries
+# are only trusted for `ttl` seconds, since merges and unmerges in other processes can't invalidate
+# them directly.
+register(
+    "grouping.grouphash_cache.enabled",
+    type=Bool,
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+register(
+    "grouping.grouphash_cache.ttl",
+    type=Int,
+    default=10,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 register(
     "ecosystem:enable_integration_form_error_raise", default=True, flags=FLAG_AUTOMATOR_MODIFIABLE
 )
@@ -2736,3 +2945,18 @@ register(
     default=[],
     flags=FLAG_ALLOW_EMPTY | FLAG_AUTOMATOR_MODIFIABLE,
 )
+
+# Keep the state of the uptime results consumer in memory, checkpointing it to
+# redis every `state-checkpoint-seconds`, instead of a redis round-trip per result
+register(
+    "uptime.result-consumer.in-memory-state",
+    type=Bool,
+    default=False,
+    flags=FLAG_MODIFIABLE_BOOL | FLAG_AUTOMATOR_MODIFIABLE,
+)
+register(
+    "uptime.result-consumer.state-checkpoint-seconds",
+    type=Int,
+    default=10,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
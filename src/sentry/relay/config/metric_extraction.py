@@ -51,6 +51,7 @@ from sentry.snuba.models import SnubaQuery
 from sentry.snuba.referrer import Referrer
 from sentry.utils import json, metrics
 from sentry.utils.cache import cache
+from sentry.utils.hashlib import md5_text
 
 OnDemandExtractionState = DashboardWidgetQueryOnDemand.OnDemandExtractionState
 
@@ -65,6 +66,9 @@ _METRIC_EXTRACTION_VERSION = 4
 _WIDGET_QUERY_CARDINALITY_TTL = 3600 * 24  # 24h
 _WIDGET_QUERY_CARDINALITY_SOFT_DEADLINE_TTL = 3600 * 0.5  # 30m
 
+# TTL for metric specs generated from alert and widget queries
+_METRIC_SPECS_CACHE_TTL = 3600 * 24  # 24h
+
 HashedMetricSpec = tuple[str, MetricSpec, SpecVersion]
 
 
@@ -767,7 +771,17 @@ def _convert_aggregate_and_query_to_metrics(
     ):
         return None
 
+    cache_key = None
+    if in_random_rollout("on_demand_metrics.cache_metric_specs"):
+        cache_key = _metric_specs_cache_key(
+            dataset, aggregate, query, environment, spec_type, groupbys
+        )
+        if (cached_specs := _get_cached_metric_specs(cache_key)) is not None:
+            return cached_specs
+
     metric_specs_and_hashes = []
+    project_dependent = False
+    failed = False
     extra = {
         "dataset": dataset,
         "aggregate": aggregate,
@@ -788,6 +802,8 @@ def _convert_aggregate_and_query_to_metrics(
                     spec_type=spec_type,
                     spec_version=spec_version,
                 )
+                # Known before generating the spec, which can fail for a single project.
+                project_dependent = project_dependent or on_demand_spec.is_project_dependent()
                 metric_spec = on_demand_spec.to_metric_spec(project)
                 # TODO: switch to validate_rule_condition
                 if (condition := metric_spec.get("condition")) is not None:
@@ -802,18 +818,87 @@ def _convert_aggregate_and_query_to_metrics(
                 )
             except ValueError:
                 # raised by validate_sampling_condition or metric_spec lacking "condition"
+                failed = True
                 metrics.incr(
                     "on_demand_metrics.invalid_metric_spec", tags={"prefilling": prefilling}
                 )
                 logger.exception("Invalid on-demand metric spec", extra=extra)
             except Exception:
                 # Since prefilling might include several non-ondemand-compatible alerts, we want to not trigger errors in the
+                failed = True
                 metrics.incr("on_demand_metrics.invalid_metric_spec.other")
                 logger.exception("Failed on-demand metric spec creation.", extra=extra)
 
+    # Specs which failed to generate, e.g. because of the settings of this project, are not
+    # cached for the other projects.
+    if cache_key is not None and not failed:
+        _set_cached_metric_specs(cache_key, metric_specs_and_hashes, project_dependent)
+
     return metric_specs_and_hashes
 
 
+def _metric_specs_cache_key(
+    dataset: str,
+    aggregate: str,
+    query: str,
+    environment: str | None,
+    spec_type: MetricSpecType,
+    groupbys: Sequence[str] | None,
+) -> str:
+    # Specs are keyed by everything they are generated from, so that a changed alert or widget
+    # query, or a new spec version, never reads the specs of the previous one.
+    spec_versions = [
+        (spec_version.version, sorted(spec_version.flags))
+        for spec_version in OnDemandMetricSpecVersioning.get_spec_versions()
+    ]
+    key = json.dumps(
+        [dataset, aggregate, query, environment, spec_type.value, groupbys, spec_versions]
+    )
+    return f"on-demand.metric-specs.{_METRIC_EXTRACTION_VERSION}.{md5_text(key).hexdigest()}"
+
+
+def _get_cached_metric_specs(cache_key: str) -> list[HashedMetricSpec] | None:
+    """
+    Returns the cached specs of a query, or None if they have to be generated, because they
+    aren't cached or depend on the project (see `OnDemandMetricSpec.is_project_dependent`).
+    """
+    cached = cache.get(cache_key)
+    if cached is None:
+        metrics.incr("on_demand_metrics.metric_specs_cache", tags={"result": "miss"})
+        return None
+
+    project_dependent, cached_specs = cached
+    if project_dependent:
+        metrics.incr("on_demand_metrics.metric_specs_cache", tags={"result": "project"})
+        return None
+
+    metrics.incr("on_demand_metrics.metric_specs_cache", tags={"result": "hit"})
+    spec_versions = {
+        spec_version.version: spec_version
+        for spec_version in OnDemandMetricSpecVersioning.get_spec_versions()
+    }
+    return [
+        (query_hash, metric_spec, spec_versions[version])
+        for query_hash, metric_spec, version in cached_specs
+    ]
+
+
+def _set_cached_metric_specs(
+    cache_key: str, specs: Sequence[HashedMetricSpec], project_dependent: bool
+) -> None:
+    # Specs which depend on the project are generated for every project, only the fact that
+    # they do is cached so that the query isn't looked up in vain.
+    cached_specs = (
+        []
+        if project_dependent
+        else [
+            (query_hash, metric_spec, spec_version.version)
+            for query_hash, metric_spec, spec_version in specs
+        ]
+    )
+    cache.set(cache_key, (project_dependent, cached_specs), timeout=_METRIC_SPECS_CACHE_TTL)
+
+
 # CONDITIONAL TAGGING
 
 
@@ -2,7 +2,7 @@ from sentry.utils.services import Service
 
 
 class ProjectConfigCache(Service):
-    __all__ = ("set_many", "delete_many", "get")
+    __all__ = ("set_many", "patch_many", "delete_many", "get", "exists_many")
 
     def __init__(self, **options):
         pass
@@ -10,8 +10,15 @@ class ProjectConfigCache(Service):
     def set_many(self, configs):
         pass
 
+    def patch_many(self, patches):
+        pass
+
     def delete_many(self, public_keys):
         pass
 
     def get(self, public_key):
         raise NotImplementedError()
+
+    def exists_many(self, public_keys):
+        """Returns the set of the given public keys which have a config in the cache."""
+        return {public_key for public_key in public_keys if self.get(public_key) is not None}
@@ -1,6 +1,8 @@
 import logging
-from collections.abc import Mapping
-from typing import Any
+import uuid
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
 
 import zstandard
 
@@ -8,6 +10,9 @@ from sentry.relay.projectconfig_cache.base import ProjectConfigCache
 from sentry.utils import json, metrics, redis
 from sentry.utils.redis import validate_dynamic_cluster
 
+if TYPE_CHECKING:
+    from sentry.relay.config import ProjectConfigPatch
+
 REDIS_CACHE_TIMEOUT = 3600  # 1 hr
 COMPRESSION_LEVEL = 3  # 3 is the default level of compression
 
@@ -33,19 +38,16 @@ class RedisProjectConfigCache(ProjectConfigCache):
     def __get_redis_rev_key(self, public_key):
         return f"{self.__get_redis_key(public_key)}.rev"
 
+    def __get_redis_sections_key(self, public_key):
+        return f"{self.__get_redis_key(public_key)}.sections"
+
     def set_many(self, configs: dict[str, Mapping[str, Any]]):
         metrics.incr("relay.projectconfig_cache.write", amount=len(configs), tags={"action": "set"})
 
         # Note: Those are multiple pipelines, one per cluster node.
         p = self.cluster.pipeline(transaction=False)
         for public_key, config in configs.items():
-            serialized = json.dumps(config).encode()
-            compressed = zstandard.compress(serialized, level=COMPRESSION_LEVEL)
-            metrics.distribution(
-                "relay.projectconfig_cache.uncompressed_size", len(serialized), unit="byte"
-            )
-            metrics.distribution("relay.projectconfig_cache.size", len(compressed), unit="byte")
-
+            compressed = _compress(config)
             p.setex(self.__get_redis_key(public_key), REDIS_CACHE_TIMEOUT, compressed)
             # Update the revision after updating the config, while not strictly necessary
             # this means when the reader is checking the revision before reading the key
@@ -57,6 +59,38 @@ class RedisProjectConfigCache(ProjectConfigCache):
             # made transactional.
             if rev := config.get("rev"):
                 p.setex(self.__get_redis_rev_key(public_key), REDIS_CACHE_TIMEOUT, rev)
+            # A full config supersedes all sections patched into the previous one.
+            p.delete(self.__get_redis_sections_key(public_key))
+
+        p.execute()
+
+    def patch_many(self, patches: dict[str, "ProjectConfigPatch"]):
+        """Replaces sections of the ``config`` of cached project configs.
+
+        Sections are stored next to the full config, each with its own revision, and are
+        applied on top of it by :meth:`get`.  The assembled config takes the revision of its
+        most recently changed section.
+        """
+        metrics.incr(
+            "relay.projectconfig_cache.write", amount=len(patches), tags={"action": "patch"}
+        )
+
+        now = datetime.now(timezone.utc)
+        p = self.cluster.pipeline(transaction=False)
+        for public_key, patch in patches.items():
+            rev = uuid.uuid4().hex
+            sections_key = self.__get_redis_sections_key(public_key)
+            p.hset(
+                sections_key,
+                mapping={
+                    section: _compress({"rev": rev, "lastChange": now, "value": value})
+                    for section, value in patch.sections.items()
+                },
+            )
+            # The sections outlive the full config at most by the cache timeout, `get` ignores
+            # them once the full config is gone.
+            p.expire(sections_key, REDIS_CACHE_TIMEOUT)
+            p.setex(self.__get_redis_rev_key(public_key), REDIS_CACHE_TIMEOUT, rev)
 
         p.execute()
 
@@ -65,24 +99,67 @@ class RedisProjectConfigCache(ProjectConfigCache):
         with self.cluster.pipeline() as p:
             for public_key in public_keys:
                 p.delete(self.__get_redis_key(public_key))
+                p.delete(self.__get_redis_sections_key(public_key))
             return_values = p.execute()
 
         metrics.incr(
-            "relay.projectconfig_cache.write", amount=sum(return_values), tags={"action": "delete"}
+            "relay.projectconfig_cache.write",
+            amount=sum(return_values[::2]),
+            tags={"action": "delete"},
         )
 
     def get(self, public_key):
-        rv_b = self.cluster_read.get(self.__get_redis_key(public_key))
-        if rv_b is not None:
-            try:
-                rv = zstandard.decompress(rv_b).decode()
-            except (TypeError, zstandard.ZstdError):
-                # assume raw json
-                rv = rv_b.decode()
-            return json.loads(rv)
-        return None
+        # Sections patched in are applied even once `relay.project-config-patching.enable` is
+        # turned off, as the revision of the config is theirs until it is recomputed in full.
+        p = self.cluster_read.pipeline(transaction=False)
+        p.get(self.__get_redis_key(public_key))
+        p.hgetall(self.__get_redis_sections_key(public_key))
+        rv_b, sections_b = p.execute()
+        if rv_b is None:
+            return None
+
+        rv = _decompress(rv_b)
+        if sections_b:
+            config = rv.setdefault("config", {})
+            sections = [(name.decode(), _decompress(value)) for name, value in sections_b.items()]
+            for name, section in sections:
+                if section["value"] is None:
+                    config.pop(name, None)
+                else:
+                    config[name] = section["value"]
+            latest = max((section for _, section in sections), key=lambda s: s["lastChange"])
+            rv["rev"] = latest["rev"]
+            rv["lastChange"] = latest["lastChange"]
+        return rv
+
+    def exists_many(self, public_keys: Iterable[str]) -> set[str]:
+        public_keys = list(public_keys)
+        # Note: Those are multiple pipelines, one per cluster node
+        p = self.cluster_read.pipeline(transaction=False)
+        for public_key in public_keys:
+            p.exists(self.__get_redis_key(public_key))
+        return {public_key for public_key, exists in zip(public_keys, p.execute()) if exists}
 
     def get_rev(self, public_key) -> str | None:
         if value := self.cluster_read.get(self.__get_redis_rev_key(public_key)):
             return value.decode()
         return None
+
+
+def _compress(value: Any) -> bytes:
+    serialized = json.dumps(value).encode()
+    compressed = zstandard.compress(serialized, level=COMPRESSION_LEVEL)
+    metrics.distribution(
+        "relay.projectconfig_cache.uncompressed_size", len(serialized), unit="byte"
+    )
+    metrics.distribution("relay.projectconfig_cache.size", len(compressed), unit="byte")
+    return compressed
+
+
+def _decompress(value: bytes) -> Any:
+    try:
+        rv = zstandard.decompress(value).decode()
+    except (TypeError, zstandard.ZstdError):
+        # assume raw json
+        rv = value.decode()
+    return json.loads(rv)
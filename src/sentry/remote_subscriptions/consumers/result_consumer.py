@@ -3,7 +3,7 @@ from __future__ import annotations
 import abc
 import logging
 from collections.abc import Mapping
-from typing import Generic, TypeVar
+from typing import Any, Generic, TypeVar
 
 from arroyo.backends.kafka.consumer import KafkaPayload
 from arroyo.processing.strategies.abstract import ProcessingStrategy, ProcessingStrategyFactory
@@ -70,6 +70,51 @@ class ResultProcessor(abc.ABC, Generic[T, U]):
     def handle_result(self, subscription: U | None, result: T):
         pass
 
+    def poll(self) -> None:
+        """
+        Called whenever the consumer polls, also while no results arrive.
+        """
+
+    def flush(self) -> None:
+        """
+        Called when the strategy is joined, e.g. before partitions are revoked, once all results
+        it was given were processed and before their offsets are committed.
+        """
+
+
+class ResultProcessorStrategy(ProcessingStrategy[KafkaPayload]):
+    """
+    Runs results through a `ResultProcessor`, giving it a chance to flush its state before the
+    offsets of the processed results are committed.
+    """
+
+    def __init__(
+        self,
+        result_processor: ResultProcessor[Any, Any],
+        next_step: ProcessingStrategy[FilteredPayload | None],
+    ) -> None:
+        self.result_processor = result_processor
+        self.run_task = RunTask(function=result_processor, next_step=next_step)
+
+    def submit(self, message: Message[KafkaPayload | FilteredPayload]) -> None:
+        self.run_task.submit(message)
+
+    def poll(self) -> None:
+        self.run_task.poll()
+        self.result_processor.poll()
+
+    def close(self) -> None:
+        self.run_task.close()
+
+    def terminate(self) -> None:
+        self.run_task.terminate()
+
+    def join(self, timeout: float | None = None) -> None:
+        # Results are processed as they are submitted, so everything that will be committed was
+        # handed to the processor already.
+        self.result_processor.flush()
+        self.run_task.join(timeout)
+
 
 class ResultsStrategyFactory(ProcessingStrategyFactory[KafkaPayload], Generic[T, U]):
     def __init__(self) -> None:
@@ -85,7 +130,7 @@ class ResultsStrategyFactory(ProcessingStrategyFactory[KafkaPayload], Generic[T,
         commit: Commit,
         partitions: Mapping[Partition, int],
     ) -> ProcessingStrategy[KafkaPayload]:
-        return RunTask(
-            function=self.result_processor,
+        return ResultProcessorStrategy(
+            result_processor=self.result_processor,
             next_step=CommitOffsets(commit),
         )
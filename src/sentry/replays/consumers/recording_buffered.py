@@ -19,6 +19,14 @@ This option limits the amount of time a message will wait in the buffer before b
 this value exceeds the Kafka commit interval then the Kafka offsets will not be committed until the
 buffer has been flushed and fully committed.
 
+# Pipelining
+
+By default messages are decompressed and parsed in the consumer thread as they are appended to the
+buffer. With **num_processes** greater than one they are processed in a pool of processes instead
+and only their results are buffered. With **upload_threads** the buffer's segments are uploaded by
+a long-lived pool of that many threads rather than by a new thread per segment. In either case
+offsets are committed once every upload of the buffer succeeded.
+
 # Errors
 
 All deterministic errors must be handled otherwise the consumer will deadlock and progress will
@@ -42,7 +50,8 @@ import logging
 import time
 import zlib
 from collections.abc import Mapping
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
 from typing import Any, TypedDict, cast
 
 import sentry_sdk
@@ -71,6 +80,7 @@ from sentry.replays.usecases.ingest.dom_index import (
 )
 from sentry.replays.usecases.pack import pack
 from sentry.utils import json, metrics
+from sentry.utils.arroyo import MultiprocessingPool, run_task_with_multiprocessing
 
 logger = logging.getLogger(__name__)
 
@@ -116,28 +126,61 @@ class RecordingBufferedStrategyFactory(ProcessingStrategyFactory[KafkaPayload]):
         max_buffer_message_count: int,
         max_buffer_size_in_bytes: int,
         max_buffer_time_in_seconds: int,
+        num_processes: int = 1,
+        input_block_size: int | None = None,
+        output_block_size: int | None = None,
+        max_batch_size: int = 10,
+        max_batch_time: int = 1,
+        upload_threads: int | None = None,
     ) -> None:
         self.max_buffer_message_count = max_buffer_message_count
         self.max_buffer_size_in_bytes = max_buffer_size_in_bytes
         self.max_buffer_time_in_seconds = max_buffer_time_in_seconds
+        self.input_block_size = input_block_size
+        self.output_block_size = output_block_size
+        self.max_batch_size = max_batch_size
+        self.max_batch_time = max_batch_time
+        self.pool = MultiprocessingPool(num_processes) if num_processes > 1 else None
+        self.upload_executor = (
+            ThreadPoolExecutor(max_workers=upload_threads) if upload_threads else None
+        )
 
     def create_with_partitions(
         self,
         commit: Commit,
         partitions: Mapping[Partition, int],
     ) -> ProcessingStrategy[KafkaPayload]:
-        return Buffer(
+        buffer_step = Buffer(
             buffer=RecordingBuffer(
                 self.max_buffer_message_count,
                 self.max_buffer_size_in_bytes,
                 self.max_buffer_time_in_seconds,
             ),
             next_step=RunTask(
-                function=process_commit,
+                function=partial(process_commit, upload_executor=self.upload_executor),
                 next_step=CommitOffsets(commit),
             ),
         )
 
+        if self.pool is None:
+            return buffer_step
+
+        return run_task_with_multiprocessing(
+            function=process_recording_message,
+            next_step=buffer_step,
+            max_batch_size=self.max_batch_size,
+            max_batch_time=self.max_batch_time,
+            pool=self.pool,
+            input_block_size=self.input_block_size,
+            output_block_size=self.output_block_size,
+        )
+
+    def shutdown(self) -> None:
+        if self.pool:
+            self.pool.close()
+        if self.upload_executor:
+            self.upload_executor.shutdown()
+
 
 class UploadEvent(TypedDict):
     key: str
@@ -153,6 +196,12 @@ class InitialSegmentEvent(TypedDict):
     is_replay_video: bool
 
 
+class ProcessedRecording(TypedDict):
+    upload_events: list[UploadEvent]
+    initial_segment_event: InitialSegmentEvent | None
+    replay_actions_event: ReplayActionsEvent | None
+
+
 class RecordingBuffer:
     def __init__(
         self,
@@ -205,8 +254,22 @@ class RecordingBuffer:
         """Return "True" if we have waited to commit for the configured amount of time."""
         return time.time() >= self._buffer_next_commit_time
 
-    def append(self, message: BaseValue[KafkaPayload]) -> None:
-        process_message(self, message.payload.value)
+    def append(self, message: BaseValue[KafkaPayload | ProcessedRecording | None]) -> None:
+        # Messages are processed here unless a previous step already processed them.
+        if isinstance(message.payload, KafkaPayload):
+            process_message(self, message.payload.value)
+        else:
+            self.add(message.payload)
+
+    def add(self, recording: ProcessedRecording | None) -> None:
+        if recording is None:
+            return
+
+        self.upload_events.extend(recording["upload_events"])
+        if recording["initial_segment_event"] is not None:
+            self.initial_segment_events.append(recording["initial_segment_event"])
+        if recording["replay_actions_event"] is not None:
+            self.replay_action_events.append(recording["replay_actions_event"])
 
     def new(self) -> RecordingBuffer:
         return RecordingBuffer(
@@ -220,6 +283,15 @@ class RecordingBuffer:
 
 
 def process_message(buffer: RecordingBuffer, message: bytes) -> None:
+    buffer.add(process_recording(message))
+
+
+def process_recording_message(message: Message[KafkaPayload]) -> ProcessedRecording | None:
+    """Process a message in a worker process, ahead of the buffer."""
+    return process_recording(message.payload.value)
+
+
+def process_recording(message: bytes) -> ProcessedRecording | None:
     with sentry_sdk.start_span(op="replays.consumer.recording.decode_kafka_message"):
         try:
             decoded_message: ReplayRecording = RECORDINGS_CODEC.decode(message)
@@ -263,6 +335,11 @@ def process_message(buffer: RecordingBuffer, message: bytes) -> None:
         retention_days=decoded_message["retention_days"],
         segment_id=headers["segment_id"],
     )
+    recording: ProcessedRecording = {
+        "upload_events": [],
+        "initial_segment_event": None,
+        "replay_actions_event": None,
+    }
 
     if replay_video := decoded_message.get("replay_video"):
         # Logging org info for bigquery
@@ -288,7 +365,7 @@ def process_message(buffer: RecordingBuffer, message: bytes) -> None:
             "replay.replay-video.organization-file-packing"
         ):
             dat = zlib.compress(pack(rrweb=recording_data, video=cast(bytes, replay_video)))
-            buffer.upload_events.append(
+            recording["upload_events"].append(
                 {"key": make_recording_filename(recording_segment), "value": dat}
             )
 
@@ -297,50 +374,45 @@ def process_message(buffer: RecordingBuffer, message: bytes) -> None:
                 "replays.recording_consumer.replay_video_event_size", len(dat), unit="byte"
             )
         else:
-            buffer.upload_events.append(
+            recording["upload_events"].append(
                 {"key": make_recording_filename(recording_segment), "value": compressed_segment}
             )
-            buffer.upload_events.append(
+            recording["upload_events"].append(
                 {"key": make_video_filename(recording_segment), "value": cast(bytes, replay_video)}
             )
 
     else:
-        buffer.upload_events.append(
+        recording["upload_events"].append(
             {"key": make_recording_filename(recording_segment), "value": compressed_segment}
         )
 
     # Initial segment events are recorded in the state machine.
     if headers["segment_id"] == 0:
-        buffer.initial_segment_events.append(
-            {
-                "key_id": decoded_message["key_id"],
-                "org_id": decoded_message["org_id"],
-                "project_id": decoded_message["project_id"],
-                "received": decoded_message["received"],
-                "replay_id": decoded_message["replay_id"],
-                "is_replay_video": decoded_message.get("replay_video") is not None,
-            }
-        )
+        recording["initial_segment_event"] = {
+            "key_id": decoded_message["key_id"],
+            "org_id": decoded_message["org_id"],
+            "project_id": decoded_message["project_id"],
+            "received": decoded_message["received"],
+            "replay_id": decoded_message["replay_id"],
+            "is_replay_video": decoded_message.get("replay_video") is not None,
+        }
 
     try:
         with sentry_sdk.start_span(op="replays.consumer.recording.json_loads_segment"):
-            parsed_recording_data = json.loads(recording_data)
             parsed_replay_event = (
                 json.loads(cast_payload_bytes(decoded_message["replay_event"]))
                 if decoded_message.get("replay_event")
                 else None
             )
 
-        replay_actions = parse_replay_actions(
+        # The segment's events are decoded as they're parsed rather than all at once.
+        recording["replay_actions_event"] = parse_replay_actions(
             decoded_message["project_id"],
             decoded_message["replay_id"],
             decoded_message["retention_days"],
-            parsed_recording_data,
+            json.loads_array_items(recording_data),
             parsed_replay_event,
         )
-
-        if replay_actions is not None:
-            buffer.replay_action_events.append(replay_actions)
     except Exception:
         logging.exception(
             "Failed to parse recording org=%s, project=%s, replay=%s, segment=%s",
@@ -350,28 +422,38 @@ def process_message(buffer: RecordingBuffer, message: bytes) -> None:
             headers["segment_id"],
         )
 
+    return recording
+
 
 # Commit.
 
 
 def process_commit(
-    message: Message[tuple[list[UploadEvent], list[InitialSegmentEvent], list[ReplayActionsEvent]]]
+    message: Message[tuple[list[UploadEvent], list[InitialSegmentEvent], list[ReplayActionsEvent]]],
+    upload_executor: ThreadPoolExecutor | None = None,
 ) -> None:
     # High I/O section.
     with sentry_sdk.start_span(op="replays.consumer.recording.commit_buffer"):
         upload_events, initial_segment_events, replay_action_events = message.payload
-        commit_uploads(upload_events)
+        commit_uploads(upload_events, upload_executor)
         commit_initial_segments(initial_segment_events)
         commit_replay_actions(replay_action_events)
 
 
-def commit_uploads(upload_events: list[UploadEvent]) -> None:
+def commit_uploads(
+    upload_events: list[UploadEvent], upload_executor: ThreadPoolExecutor | None = None
+) -> None:
+    futures: list[Future[None]]
     with sentry_sdk.start_span(op="replays.consumer.recording.upload_segments"):
         # This will run to completion taking potentially an infinite amount of time. However,
         # that outcome is unlikely. In the event of an indefinite backlog the process can be
         # restarted.
-        with ThreadPoolExecutor(max_workers=len(upload_events)) as pool:
-            futures = [pool.submit(_do_upload, upload) for upload in upload_events]
+        if upload_executor is not None:
+            futures = [upload_executor.submit(_do_upload, upload) for upload in upload_events]
+            wait(futures)
+        else:
+            with ThreadPoolExecutor(max_workers=len(upload_events)) as pool:
+                futures = [pool.submit(_do_upload, upload) for upload in upload_events]
 
     has_errors = False
 
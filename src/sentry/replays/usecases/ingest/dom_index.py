@@ -4,7 +4,7 @@ import logging
 import random
 import time
 import uuid
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 from hashlib import md5
 from typing import Any, Literal, TypedDict
 
@@ -85,10 +85,14 @@ def parse_replay_actions(
     project_id: int,
     replay_id: str,
     retention_days: int,
-    segment_data: list[dict[str, Any]],
+    segment_data: Iterable[dict[str, Any]],
     replay_event: dict[str, Any] | None,
 ) -> ReplayActionsEvent | None:
-    """Parse RRWeb payload to ReplayActionsEvent."""
+    """Parse RRWeb payload to ReplayActionsEvent.
+
+    The segment's events are iterated once, so they can be decoded incrementally with
+    `json.loads_array_items` instead of being loaded up front.
+    """
     actions = get_user_actions(project_id, replay_id, segment_data, replay_event)
     if len(actions) == 0:
         return None
@@ -155,7 +159,7 @@ def log_canvas_size(
 def get_user_actions(
     project_id: int,
     replay_id: str,
-    events: list[dict[str, Any]],
+    events: Iterable[dict[str, Any]],
     replay_event: dict[str, Any] | None,
 ) -> list[ReplayActionsEventPayloadClick]:
     """Return a list of ReplayActionsEventPayloadClick types.
@@ -323,7 +327,7 @@ def _should_report_rage_click_issue(project_id: int) -> bool:
     return all([_project_has_feature_enabled(), _project_has_option_enabled()])
 
 
-def _iter_custom_events(events: list[dict[str, Any]]) -> Generator[dict[str, Any]]:
+def _iter_custom_events(events: Iterable[dict[str, Any]]) -> Generator[dict[str, Any]]:
     for event in events:
         if event.get("type") == 5:
             yield event
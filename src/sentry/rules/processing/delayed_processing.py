@@ -8,6 +8,7 @@ from itertools import islice
 from typing import Any, DefaultDict, NamedTuple
 
 import sentry_sdk
+from django.core.cache import cache
 from django.db.models import OuterRef, Subquery
 
 from sentry import buffer, nodestore, options
@@ -15,6 +16,7 @@ from sentry.buffer.redis import BufferHookEvent, redis_buffer_registry
 from sentry.db import models
 from sentry.eventstore.models import Event, GroupEvent
 from sentry.issues.issue_occurrence import IssueOccurrence
+from sentry.locks import locks
 from sentry.models.group import Group
 from sentry.models.grouprulestatus import GroupRuleStatus
 from sentry.models.project import Project
@@ -40,13 +42,18 @@ from sentry.silo.base import SiloMode
 from sentry.tasks.base import instrumented_task
 from sentry.tasks.post_process import should_retry_fetch
 from sentry.utils import json, metrics
+from sentry.utils.hashlib import md5_text
 from sentry.utils.iterators import chunked
+from sentry.utils.locking import UnableToAcquireLock
 from sentry.utils.retries import ConditionalRetryPolicy, exponential_delay
 from sentry.utils.safe import safe_execute
 
 logger = logging.getLogger("sentry.rules.delayed_processing")
 EVENT_LIMIT = 100
 COMPARISON_INTERVALS_VALUES = {k: v[1] for k, v in COMPARISON_INTERVALS.items()}
+# How long a task waits for another task running the same condition query
+# before querying itself.
+QUERY_LOCK_TIMEOUT = 10
 
 
 class UniqueConditionQuery(NamedTuple):
@@ -330,11 +337,11 @@ def get_condition_group_results(
                 unique_condition.comparison_interval
             )
 
-        result = safe_execute(
-            condition_inst.get_rate_bulk,
+        result = get_rate_bulk_cached(
+            condition_inst,
+            unique_condition,
             duration=duration,
             group_ids=group_ids,
-            environment_id=unique_condition.environment_id,
             current_time=current_time,
             comparison_interval=comparison_interval,
         )
@@ -343,6 +350,115 @@ def get_condition_group_results(
     return condition_group_results
 
 
+def get_query_cache_key(unique_condition: UniqueConditionQuery, window_end: int) -> str:
+    return "delayed_processing.query_result:{}:{}:{}:{}:{}".format(
+        unique_condition.cls_id,
+        unique_condition.interval,
+        unique_condition.environment_id,
+        unique_condition.comparison_interval,
+        window_end,
+    )
+
+
+def get_rate_bulk_cached(
+    condition_inst: BaseEventFrequencyCondition,
+    unique_condition: UniqueConditionQuery,
+    duration: timedelta,
+    group_ids: set[int],
+    current_time: datetime,
+    comparison_interval: timedelta | None,
+) -> dict[int, int] | None:
+    """
+    Run the condition query for the given groups, sharing results between
+    `apply_delayed` tasks.
+
+    Only the second query of percent comparison conditions is shared, whose
+    window ends `comparison_interval` (at least 5 minutes) ago and so before
+    every buffered event: it counts the same events no matter how many arrived
+    since. The window of the first query ends now and is always queried, so
+    that new events are counted.
+
+    If `delayed_processing.query_cache.bucket_seconds` is set, the end of the
+    comparison window is rounded down to a multiple of it, and the result for
+    every group is cached until the end of that bucket. Tasks running the same
+    query concurrently are coalesced: one runs it while the others wait for the
+    cached result. Without the option, this is the same as calling
+    `get_rate_bulk`.
+    """
+
+    def query(group_ids: set[int], current_time: datetime) -> dict[int, int] | None:
+        return safe_execute(
+            condition_inst.get_rate_bulk,
+            duration=duration,
+            group_ids=group_ids,
+            environment_id=unique_condition.environment_id,
+            current_time=current_time,
+            comparison_interval=comparison_interval,
+        )
+
+    bucket_seconds = options.get("delayed_processing.query_cache.bucket_seconds")
+    if not bucket_seconds or comparison_interval is None:
+        return query(group_ids, current_time)
+
+    window_end = (
+        math.floor((current_time - comparison_interval).timestamp() / bucket_seconds)
+        * bucket_seconds
+    )
+    current_time = datetime.fromtimestamp(window_end, tz=timezone.utc) + comparison_interval
+    query_key = get_query_cache_key(unique_condition, window_end)
+    cache_keys = {group_id: f"{query_key}:{group_id}" for group_id in group_ids}
+
+    def get_cached(group_ids: set[int]) -> dict[int, int]:
+        cached = cache.get_many([cache_keys[group_id] for group_id in group_ids])
+        return {
+            group_id: cached[cache_keys[group_id]]
+            for group_id in group_ids
+            if cache_keys[group_id] in cached
+        }
+
+    results = get_cached(group_ids)
+    missing = group_ids - results.keys()
+    metrics.incr("delayed_processing.query_cache.hit", amount=len(results))
+    metrics.incr("delayed_processing.query_cache.miss", amount=len(missing))
+    if not missing:
+        metrics.incr("delayed_processing.query_cache.query_saved", tags={"reason": "cached"})
+        return results
+
+    lock_key = md5_text(query_key, ",".join(map(str, sorted(missing)))).hexdigest()
+    lock = locks.get(
+        f"delayed_processing.query_lock:{lock_key}",
+        duration=QUERY_LOCK_TIMEOUT * 3,
+        name="delayed_processing_query",
+    )
+    try:
+        with lock.blocking_acquire(initial_delay=0.1, timeout=QUERY_LOCK_TIMEOUT):
+            # Another task may have run the same query while we were waiting
+            # for the lock.
+            results.update(get_cached(missing))
+            missing -= results.keys()
+            if not missing:
+                metrics.incr(
+                    "delayed_processing.query_cache.query_saved", tags={"reason": "coalesced"}
+                )
+                return results
+
+            result = query(missing, current_time)
+            if result is not None:
+                cache.set_many(
+                    {
+                        cache_keys[group_id]: value
+                        for group_id, value in result.items()
+                        if group_id in cache_keys
+                    },
+                    timeout=bucket_seconds,
+                )
+    except UnableToAcquireLock:
+        result = query(missing, current_time)
+
+    results.update(result or {})
+    return results
+
+
 def passes_comparison(
     condition_group_results: dict[UniqueConditionQuery, dict[int, int]],
     condition_data: EventFrequencyConditionData,
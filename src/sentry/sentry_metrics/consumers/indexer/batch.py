@@ -1,8 +1,9 @@
 import logging
 import random
+import time
 from collections import defaultdict
 from collections.abc import Callable, Iterable, Mapping, MutableMapping, MutableSequence, Sequence
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, cast
 
 import orjson
@@ -88,6 +89,55 @@ class IndexerBatchMetrics:
         return self.total_value_len / self.message_count
 
 
+@dataclass
+class IndexerBatchColumns:
+    """
+    The valid messages of a batch as parallel arrays, in the order they were decoded. The tags of
+    the message at ``i`` are the ``tag_offsets[i]:tag_offsets[i + 1]`` slices of ``tag_keys``
+    and ``tag_values``. The decoded payloads aren't kept around, these are the only copy of the
+    messages' fields.
+    """
+
+    broker_metas: list[BrokerMeta] = field(default_factory=list)
+    org_ids: list[int] = field(default_factory=list)
+    project_ids: list[int] = field(default_factory=list)
+    use_case_ids: list[UseCaseID] = field(default_factory=list)
+    names: list[str] = field(default_factory=list)
+    types: list[str] = field(default_factory=list)
+    timestamps: list[int] = field(default_factory=list)
+    values: list[Any] = field(default_factory=list)
+    retention_days: list[int | None] = field(default_factory=list)
+    sampling_weights: list[int | None] = field(default_factory=list)
+    tag_offsets: list[int] = field(default_factory=lambda: [0])
+    tag_keys: list[str] = field(default_factory=list)
+    tag_values: list[str] = field(default_factory=list)
+    positions: dict[BrokerMeta, int] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.broker_metas)
+
+    def append(self, broker_meta: BrokerMeta, parsed_payload: ParsedMessage) -> None:
+        self.positions[broker_meta] = len(self.broker_metas)
+        self.broker_metas.append(broker_meta)
+        self.org_ids.append(parsed_payload["org_id"])
+        self.project_ids.append(parsed_payload["project_id"])
+        self.use_case_ids.append(parsed_payload["use_case_id"])
+        self.names.append(parsed_payload["name"])
+        self.types.append(parsed_payload["type"])
+        self.timestamps.append(parsed_payload["timestamp"])
+        self.values.append(parsed_payload["value"])
+        self.retention_days.append(parsed_payload.get("retention_days"))
+        self.sampling_weights.append(parsed_payload.get("sampling_weight"))
+        tags = parsed_payload.get("tags", {})
+        self.tag_keys.extend(tags.keys())
+        self.tag_values.extend(tags.values())
+        self.tag_offsets.append(len(self.tag_keys))
+
+    def get_tags(self, position: int) -> tuple[list[str], list[str]]:
+        start, end = self.tag_offsets[position], self.tag_offsets[position + 1]
+        return self.tag_keys[start:end], self.tag_values[start:end]
+
+
 class IndexerBatch:
     def __init__(
         self,
@@ -112,8 +162,9 @@ class IndexerBatch:
         # DLQ while discarding the filtered messages
         self.invalid_msg_meta: set[BrokerMeta] = set()
         self.filtered_msg_meta: set[BrokerMeta] = set()
-        self.parsed_payloads_by_meta: MutableMapping[BrokerMeta, ParsedMessage] = {}
+        self.columns = IndexerBatchColumns()
 
+        self._started = time.monotonic()
         self._extract_messages()
 
     @metrics.wraps("process_messages.extract_messages")
@@ -147,7 +198,7 @@ class IndexerBatch:
             try:
                 parsed_payload = self._extract_message(msg)
                 self._validate_message(parsed_payload)
-                self.parsed_payloads_by_meta[broker_meta] = parsed_payload
+                self.columns.append(broker_meta, parsed_payload)
             except Exception as e:
                 self.invalid_msg_meta.add(broker_meta)
                 logger.exception(
@@ -253,13 +304,9 @@ class IndexerBatch:
         # XXX: it is useful to be able to get a sample of organization ids that are affected by rate limits, but this is really slow.
         for broker_meta in keys_to_remove:
             if _should_sample_debug_log():
-                sentry_sdk.set_tag(
-                    "sentry_metrics.organization_id",
-                    self.parsed_payloads_by_meta[broker_meta]["org_id"],
-                )
-                sentry_sdk.set_tag(
-                    "sentry_metrics.metric_name", self.parsed_payloads_by_meta[broker_meta]["name"]
-                )
+                position = self.columns.positions[broker_meta]
+                sentry_sdk.set_tag("sentry_metrics.organization_id", self.columns.org_ids[position])
+                sentry_sdk.set_tag("sentry_metrics.metric_name", self.columns.names[position])
                 logger.error(
                     "process_messages.dropped_message",
                     extra={
@@ -275,24 +322,25 @@ class IndexerBatch:
             lambda: defaultdict(set)
         )
 
-        for broker_meta, message in self.parsed_payloads_by_meta.items():
-            if broker_meta in self.invalid_msg_meta or broker_meta in self.filtered_msg_meta:
-                continue
-
-            metric_name = message["name"]
-            use_case_id = message["use_case_id"]
-            org_id = message["org_id"]
-            tags = message.get("tags", {})
+        columns = self.columns
+        skipped = self.invalid_msg_meta | self.filtered_msg_meta
+        should_index_tag_values = self.__should_index_tag_values
+        tag_offsets = columns.tag_offsets
 
-            strings_in_message = {
-                metric_name,
-                *tags.keys(),
-            }
-
-            if self.__should_index_tag_values:
-                strings_in_message.update(tags.values())
+        for position, broker_meta in enumerate(columns.broker_metas):
+            if broker_meta in skipped:
+                continue
 
-            strings[use_case_id][org_id].update(strings_in_message)
+            # Strings are added to the set of their org directly, without building a set per
+            # message first.
+            org_strings = strings[columns.use_case_ids[position]][columns.org_ids[position]]
+            org_strings.add(columns.names[position])
+            start, end = tag_offsets[position], tag_offsets[position + 1]
+            if start == end:
+                continue
+            org_strings.update(columns.tag_keys[start:end])
+            if should_index_tag_values:
+                org_strings.update(columns.tag_values[start:end])
 
         for use_case_id, org_mapping in strings.items():
             metrics.gauge(
@@ -311,6 +359,7 @@ class IndexerBatch:
     ) -> IndexerOutputMessageBatch:
         new_messages: MutableSequence[Message[RoutingPayload | KafkaPayload | InvalidMessage]] = []
         cogs_usage: MutableMapping[UseCaseID, int] = defaultdict(int)
+        columns = self.columns
 
         for message in self.outer_message.payload:
             used_tags: set[str] = set()
@@ -328,14 +377,14 @@ class IndexerBatch:
                     )
                 )
                 continue
-            old_payload_value = self.parsed_payloads_by_meta.pop(broker_meta)
+            position = columns.positions[broker_meta]
 
-            metric_name = old_payload_value["name"]
-            org_id = old_payload_value["org_id"]
-            use_case_id = old_payload_value["use_case_id"]
+            metric_name = columns.names[position]
+            org_id = columns.org_ids[position]
+            use_case_id = columns.use_case_ids[position]
             cogs_usage[use_case_id] += 1
             sentry_sdk.set_tag("sentry_metrics.organization_id", org_id)
-            tags = old_payload_value.get("tags", {})
+            tag_keys, tag_values = columns.get_tags(position)
             used_tags.add(metric_name)
 
             new_tags: dict[str, str | int] = {}
@@ -344,7 +393,7 @@ class IndexerBatch:
 
             with metrics.timer("metrics_consumer.reconstruct_messages.get_indexed_tags"):
                 try:
-                    for k, v in tags.items():
+                    for k, v in zip(tag_keys, tag_values):
                         used_tags.update({k, v})
                         new_k = mapping[use_case_id][org_id][k]
                         if new_k is None:
@@ -378,7 +427,10 @@ class IndexerBatch:
 
                         new_tags[str(new_k)] = value_to_write
                 except KeyError:
-                    logger.exception("process_messages.key_error", extra={"tags": tags})
+                    logger.exception(
+                        "process_messages.key_error",
+                        extra={"tags": dict(zip(tag_keys, tag_values))},
+                    )
                     continue
 
             if exceeded_org_quotas or exceeded_global_quotas:
@@ -449,22 +501,26 @@ class IndexerBatch:
             # used for end-to-end latency metrics
             sentry_received_timestamp = message.value.timestamp.timestamp()
 
+            # XXX: relay actually sends this value unconditionally
+            retention_days = columns.retention_days[position]
+            if retention_days is None:
+                retention_days = 90
+            value = columns.values[position]
+
             with metrics.timer("metrics_consumer.reconstruct_messages.build_new_payload"):
                 if self.__should_index_tag_values:
                     # Metrics don't support gauges (which use dicts), so assert value type
-                    value = old_payload_value["value"]
                     assert isinstance(value, (int, float, list))
                     new_payload_v1: Metric = {
                         "tags": cast(dict[str, int], new_tags),
-                        # XXX: relay actually sends this value unconditionally
-                        "retention_days": old_payload_value.get("retention_days", 90),
+                        "retention_days": retention_days,
                         "mapping_meta": output_message_meta,
-                        "use_case_id": old_payload_value["use_case_id"].value,
+                        "use_case_id": use_case_id.value,
                         "metric_id": numeric_metric_id,
-                        "org_id": old_payload_value["org_id"],
-                        "timestamp": old_payload_value["timestamp"],
-                        "project_id": old_payload_value["project_id"],
-                        "type": old_payload_value["type"],
+                        "org_id": org_id,
+                        "timestamp": columns.timestamps[position],
+                        "project_id": columns.project_ids[position],
+                        "type": columns.types[position],
                         "value": value,
                         "sentry_received_timestamp": sentry_received_timestamp,
                     }
@@ -477,23 +533,23 @@ class IndexerBatch:
                     new_payload_v2: GenericMetric = {
                         "tags": cast(dict[str, str], new_tags),
                         "version": 2,
-                        "retention_days": old_payload_value.get("retention_days", 90),
+                        "retention_days": retention_days,
                         "mapping_meta": output_message_meta,
-                        "use_case_id": old_payload_value["use_case_id"].value,
+                        "use_case_id": use_case_id.value,
                         "metric_id": numeric_metric_id,
-                        "org_id": old_payload_value["org_id"],
-                        "timestamp": old_payload_value["timestamp"],
-                        "project_id": old_payload_value["project_id"],
-                        "type": old_payload_value["type"],
-                        "value": old_payload_value["value"],
+                        "org_id": org_id,
+                        "timestamp": columns.timestamps[position],
+                        "project_id": columns.project_ids[position],
+                        "type": columns.types[position],
+                        "value": value,
                         "sentry_received_timestamp": sentry_received_timestamp,
                     }
-                    if aggregation_options := get_aggregation_options(old_payload_value["name"]):
+                    if aggregation_options := get_aggregation_options(metric_name):
                         # TODO: This should eventually handle multiple aggregation options
                         option = list(aggregation_options.items())[0][0]
                         assert option is not None
                         new_payload_v2["aggregation_option"] = option.value
-                    if sampling_weight := old_payload_value.get("sampling_weight"):
+                    if sampling_weight := columns.sampling_weights[position]:
                         new_payload_v2["sampling_weight"] = sampling_weight
 
                     new_payload_value = new_payload_v2
@@ -526,6 +582,7 @@ class IndexerBatch:
                     new_messages.append(Message(message.value.replace(kafka_payload)))
 
         with metrics.timer("metrics_consumer.reconstruct_messages.emit_payload_metrics"):
+            self._emit_throughput_metrics()
             for use_case_id, metrics_by_type in self._message_metrics.items():
                 for metric_type, batch_metric in metrics_by_type.items():
                     if batch_metric.message_count == 0:
@@ -609,3 +666,24 @@ class IndexerBatch:
             new_messages,
             cogs_usage,
         )
+
+    def _emit_throughput_metrics(self) -> None:
+        """
+        Report how fast the batch went through the indexer, from decoding its messages to
+        encoding their replacements.
+        """
+        elapsed = time.monotonic() - self._started
+        if elapsed <= 0:
+            return
+
+        num_messages = len(self.outer_message.payload)
+        num_bytes = sum(len(msg.payload.value) for msg in self.outer_message.payload)
+        metrics.distribution(
+            "metrics_consumer.process_message.batch.messages_per_second",
+            num_messages / elapsed,
+        )
+        metrics.distribution(
+            "metrics_consumer.process_message.batch.bytes_per_second",
+            num_bytes / elapsed,
+            unit="byte",
+        )
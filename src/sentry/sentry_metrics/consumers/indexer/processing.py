@@ -123,7 +123,7 @@ class MessageProcessor:
             schema_validator=self.__get_schema_validator(),
         )
 
-        sdk.set_measurement("indexer_batch.payloads.len", len(batch.parsed_payloads_by_meta))
+        sdk.set_measurement("indexer_batch.payloads.len", len(batch.columns))
 
         extracted_strings = batch.extract_strings()
 
@@ -2,6 +2,9 @@ from __future__ import annotations
 
 import logging
 import random
+import threading
+import time
+from collections import OrderedDict
 from collections.abc import Collection, Iterable, Mapping, MutableMapping, Sequence
 from datetime import datetime, timedelta
 
@@ -21,6 +24,7 @@ from sentry.sentry_metrics.indexer.base import (
 )
 from sentry.sentry_metrics.use_case_id_registry import UseCaseID
 from sentry.utils import metrics
+from sentry.utils.bloom import BloomFilter
 from sentry.utils.hashlib import md5_text
 
 logger = logging.getLogger(__name__)
@@ -33,6 +37,8 @@ _INDEXER_CACHE_RESOLVE_CACHE_REPLENISHMENT_METRIC = (
 _INDEXER_CACHE_DOUBLE_WRITE_METRIC = "sentry_metrics.indexer.memcache.double-write"
 _INDEXER_CACHE_DOUBLE_READ_METRIC = "sentry_metrics.indexer.memcache.new-schema-read"
 _INDEXER_CACHE_STALE_KEYS_METRIC = "sentry_metrics.indexer.memcache.stale-keys"
+_INDEXER_CACHE_L1_METRIC = "sentry_metrics.indexer.memcache.l1"
+_INDEXER_CACHE_BLOOM_SKIP_METRIC = "sentry_metrics.indexer.memcache.bloom-skip"
 
 # only used to compare to the older version of the PGIndexer
 _INDEXER_CACHE_FETCH_METRIC = "sentry_metrics.indexer.memcache.fetch"
@@ -45,19 +51,119 @@ BULK_RECORD_CACHE_NAMESPACE = "br"
 RESOLVE_CACHE_NAMESPACE = "res"
 
 
+def _randomize_ttl(cache_ttl: int) -> int:
+    # introduce jitter in the cache_ttl so that when we have large
+    # amount of new keys written into the cache, they don't expire all at once
+    jitter = random.uniform(0, 0.25) * cache_ttl
+    return int(cache_ttl + jitter)
+
+
+class LocalIndexerCache:
+    """
+    A bounded, process-local LRU cache in front of the shared indexer cache. The working set of
+    (org, string) pairs of an indexer consumer is small and stable, so most lookups never need
+    to leave the process.
+
+    It also keeps a Bloom filter of strings the indexer recently failed to map (e.g. because they
+    were rate limited), which are looked up in every batch they show up in but are never written
+    to the cache. The filter is replaced once it's full or a TTL old, so a string that gets an id
+    later on is looked up in the shared cache again after one TTL at the latest.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # (namespace, key) -> (id, expiry)
+        self._entries: OrderedDict[tuple[str, str], tuple[int, float]] = OrderedDict()
+        self._absent: BloomFilter | None = None
+        self._absent_expiry = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def max_size(self) -> int:
+        return options.get("sentry-metrics.indexer.cache-l1.max-size")
+
+    @property
+    def ttl(self) -> int:
+        return options.get("sentry-metrics.indexer.cache-l1.ttl")
+
+    def get(self, namespace: str, key: str) -> int | None:
+        entry_key = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                return None
+            value, expiry = entry
+            if expiry <= time.monotonic():
+                del self._entries[entry_key]
+                return None
+            self._entries.move_to_end(entry_key)
+            return value
+
+    def set_many(self, namespace: str, key_values: Mapping[str, int]) -> None:
+        max_size = self.max_size
+        if not max_size:
+            if self._entries:
+                with self._lock:
+                    self._entries.clear()
+            return
+
+        now = time.monotonic()
+        ttl = self.ttl
+        with self._lock:
+            for key, value in key_values.items():
+                entry_key = (namespace, key)
+                self._entries[entry_key] = (value, now + _randomize_ttl(ttl))
+                self._entries.move_to_end(entry_key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, namespace: str, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop((namespace, key), None)
+
+    def is_absent(self, key: str) -> bool:
+        absent = self._absent
+        if absent is None or self._absent_expiry <= time.monotonic():
+            return False
+        return key in absent
+
+    def add_absent(self, keys: Iterable[str]) -> None:
+        capacity = options.get("sentry-metrics.indexer.cache-bloom.capacity")
+        if not capacity:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._absent is None
+                or self._absent.full
+                or self._absent.capacity != capacity
+                or self._absent_expiry <= now
+            ):
+                self._absent = BloomFilter(capacity)
+                self._absent_expiry = now + self.ttl
+            for key in keys:
+                self._absent.add(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._absent = None
+
+
 class StringIndexerCache:
     def __init__(self, cache_name: str, partition_key: str):
         self.version = 1
         self.cache = caches[cache_name]
         self.partition_key = partition_key
+        self.local = LocalIndexerCache()
 
     @property
     def randomized_ttl(self) -> int:
-        # introduce jitter in the cache_ttl so that when we have large
-        # amount of new keys written into the cache, they don't expire all at once
-        cache_ttl = settings.SENTRY_METRICS_INDEXER_CACHE_TTL
-        jitter = random.uniform(0, 0.25) * cache_ttl
-        return int(cache_ttl + jitter)
+        return _randomize_ttl(settings.SENTRY_METRICS_INDEXER_CACHE_TTL)
 
     def _make_cache_key(self, key: str) -> str:
         use_case_id, org_id, string = key.split(":", 2)
@@ -131,6 +237,16 @@ class StringIndexerCache:
         return int(result)
 
     def get(self, namespace: str, key: str) -> int | None:
+        result = self.local.get(namespace, key)
+        if result is not None:
+            return result
+
+        result = self._get(namespace, key)
+        if isinstance(result, int):
+            self.local.set_many(namespace, {key: result})
+        return result
+
+    def _get(self, namespace: str, key: str) -> int | None:
         if options.get(NAMESPACED_READ_FEAT_FLAG):
             metrics.incr(_INDEXER_CACHE_DOUBLE_READ_METRIC)
             result = self.cache.get(
@@ -140,6 +256,7 @@ class StringIndexerCache:
         return self.cache.get(self._make_cache_key(key), version=self.version)
 
     def set(self, namespace: str, key: str, value: int) -> None:
+        self.local.set_many(namespace, {key: value})
         self.cache.set(
             key=self._make_cache_key(key),
             value=value,
@@ -156,6 +273,46 @@ class StringIndexerCache:
             )
 
     def get_many(self, namespace: str, keys: Iterable[str]) -> MutableMapping[str, int | None]:
+        """
+        Look keys up in the process-local cache first, and only fetch the rest from the shared
+        cache, skipping keys that are known not to be in there.
+        """
+        keys = list(keys)
+        results: MutableMapping[str, int | None] = {}
+        remote_keys = []
+        l1_hits = 0
+        absent = 0
+        for key in keys:
+            result = self.local.get(namespace, key)
+            if result is not None:
+                results[key] = result
+                l1_hits += 1
+            elif self.local.is_absent(key):
+                results[key] = None
+                absent += 1
+            else:
+                remote_keys.append(key)
+
+        if self.local.max_size:
+            metrics.incr(_INDEXER_CACHE_L1_METRIC, tags={"cache_hit": "true"}, amount=l1_hits)
+            metrics.incr(
+                _INDEXER_CACHE_L1_METRIC,
+                tags={"cache_hit": "false"},
+                amount=len(results) + len(remote_keys) - l1_hits,
+            )
+        if absent:
+            metrics.incr(_INDEXER_CACHE_BLOOM_SKIP_METRIC, amount=absent)
+
+        if remote_keys:
+            remote_results = self._get_many(namespace, remote_keys)
+            self.local.set_many(
+                namespace, {k: v for k, v in remote_results.items() if isinstance(v, int)}
+            )
+            results.update(remote_results)
+
+        return {key: results[key] for key in keys}
+
+    def _get_many(self, namespace: str, keys: Sequence[str]) -> MutableMapping[str, int | None]:
         if options.get(NAMESPACED_READ_FEAT_FLAG):
             metrics.incr(_INDEXER_CACHE_DOUBLE_READ_METRIC)
             cache_keys = {self._make_namespaced_cache_key(namespace, key): key for key in keys}
@@ -176,6 +333,7 @@ class StringIndexerCache:
             return self._format_results(keys, results)
 
     def set_many(self, namespace: str, key_values: Mapping[str, int]) -> None:
+        self.local.set_many(namespace, key_values)
         cache_key_values = {self._make_cache_key(k): v for k, v in key_values.items()}
         self.cache.set_many(cache_key_values, timeout=self.randomized_ttl, version=self.version)
         if options.get(NAMESPACED_WRITE_FEAT_FLAG):
@@ -190,12 +348,14 @@ class StringIndexerCache:
             )
 
     def delete(self, namespace: str, key: str) -> None:
+        self.local.delete_many(namespace, [key])
         self.cache.delete(self._make_cache_key(key), version=self.version)
         if options.get(NAMESPACED_WRITE_FEAT_FLAG):
             metrics.incr(_INDEXER_CACHE_DOUBLE_WRITE_METRIC)
             self.cache.delete(self._make_namespaced_cache_key(namespace, key), version=self.version)
 
     def delete_many(self, namespace: str, keys: Sequence[str]) -> None:
+        self.local.delete_many(namespace, keys)
         self.cache.delete_many([self._make_cache_key(key) for key in keys], version=self.version)
         if options.get(NAMESPACED_WRITE_FEAT_FLAG):
             metrics.incr(_INDEXER_CACHE_DOUBLE_WRITE_METRIC)
@@ -256,9 +416,11 @@ class CachingIndexer(StringIndexer):
             }
         )
 
-        self.cache.set_many(
-            BULK_RECORD_CACHE_NAMESPACE, db_record_key_results.get_mapped_strings_to_ints()
-        )
+        mapped = db_record_key_results.get_mapped_strings_to_ints()
+        self.cache.set_many(BULK_RECORD_CACHE_NAMESPACE, mapped)
+        # Strings that didn't get an id (e.g. because they were rate limited) won't be in the
+        # cache the next time they show up either.
+        self.cache.local.add_absent(key for key in db_record_keys.as_strings() if key not in mapped)
 
         return cache_key_results.merge(db_record_key_results)
 
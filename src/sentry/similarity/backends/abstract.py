@@ -14,6 +14,22 @@ class AbstractIndexBackend(metaclass=ABCMeta):
     def record(self, scope, key, items, timestamp=None):
         pass
 
+    def record_many(self, scope, records, timestamp=None):
+        """
+        Record several keys within a scope at once. ``records`` is a sequence
+        of ``(key, items, timestamp)`` tuples, where a ``timestamp`` of
+        ``None`` falls back to the ``timestamp`` argument.
+        """
+        return [
+            self.record(
+                scope,
+                key,
+                items,
+                timestamp=record_timestamp if record_timestamp is not None else timestamp,
+            )
+            for key, items, record_timestamp in records
+        ]
+
     @abstractmethod
     def merge(self, scope, destination, items, timestamp=None):
         pass
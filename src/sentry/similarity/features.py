@@ -1,6 +1,7 @@
 import functools
 import itertools
 import logging
+from collections import defaultdict
 
 logger = logging.getLogger("sentry.similarity")
 
@@ -93,31 +94,21 @@ class FeatureSet:
         return results
 
     def record(self, events):
+        """
+        Record the features of the given events. Events may belong to
+        different groups (and projects): everything recorded within a scope is
+        sent to the index in one batch.
+        """
         if not events:
             return []
 
-        scope = None
-        key = None
-
-        items = []
+        records = defaultdict(list)
         for event in events:
             if not event.group_id:
                 continue
-            for label, features in self.extract(event).items():
-                if scope is None:
-                    scope = self.__get_scope(event.project)
-                else:
-                    assert (
-                        self.__get_scope(event.project) == scope
-                    ), "all events must be associated with the same project"
-
-                if key is None:
-                    key = self.__get_key(event.group)
-                else:
-                    assert (
-                        self.__get_key(event.group) == key
-                    ), "all events must be associated with the same group"
 
+            items = []
+            for label, features in self.extract(event).items():
                 try:
                     features = [self.encoder.dumps(feature) for feature in features]
                 except Exception as error:
@@ -136,7 +127,15 @@ class FeatureSet:
                     if features:
                         items.append((self.aliases[label], features))
 
-        return self.index.record(scope, key, items, timestamp=int(event.datetime.timestamp()))
+            if items:
+                records[self.__get_scope(event.project)].append(
+                    (self.__get_key(event.group), items, int(event.datetime.timestamp()))
+                )
+
+        results = []
+        for scope, scope_records in records.items():
+            results.extend(self.index.record_many(scope, scope_records))
+        return results
 
     def classify(self, events, limit=None, thresholds=None):
         if not events:
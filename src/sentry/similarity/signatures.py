@@ -1,9 +1,19 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+import functools
+from collections.abc import Iterable, Sequence
 
 import mmh3
 
+# Hashing dominates building signatures, and the same features (frame pairs,
+# application chunks, message shingles) turn up in event after event.
+FEATURE_HASH_CACHE_SIZE = 10_000
+
+
+@functools.lru_cache(maxsize=FEATURE_HASH_CACHE_SIZE)
+def _hash_feature(feature: str | bytes, columns: int, rows: int) -> tuple[int, ...]:
+    return tuple(mmh3.hash(feature, column) % rows for column in range(columns))
+
 
 class MinHashSignatureBuilder:
     def __init__(self, columns: int, rows: int) -> None:
@@ -11,7 +21,19 @@ class MinHashSignatureBuilder:
         self.rows = rows
 
     def __call__(self, features: Iterable[str]) -> list[int]:
-        return [
-            min(mmh3.hash(feature, column) % self.rows for feature in features)
-            for column in range(self.columns)
-        ]
+        return self.build_many([features])[0]
+
+    def build_many(self, feature_sets: Sequence[Iterable[str]]) -> list[list[int]]:
+        """
+        Build the signatures of several feature sets at once. Each feature is
+        hashed into a row of ``columns`` values (once per process, for recently
+        seen features), and a signature is the column-wise minimum of the rows
+        of its features.
+        """
+        signatures = []
+        for features in feature_sets:
+            hashes = [_hash_feature(feature, self.columns, self.rows) for feature in features]
+            if not hashes:
+                raise ValueError("cannot build a signature without any features")
+            signatures.append(list(map(min, zip(*hashes))))
+        return signatures
@@ -18,6 +18,8 @@ class ProcessSegmentsContext:
     timestamp: int
     partition: int
     should_process_segments: bool
+    # Segments completed in the consumer's memory, see `SegmentAssembler`
+    assembled_segments: list[list[bytes]] = dataclasses.field(default_factory=list)
 
 
 class SegmentKey(NamedTuple):
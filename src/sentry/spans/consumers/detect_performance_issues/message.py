@@ -1,6 +1,6 @@
 import logging
 import uuid
-from collections.abc import Mapping, Sequence, Set
+from collections.abc import Sequence
 from copy import deepcopy
 from typing import Any
 
@@ -57,62 +57,74 @@ def _send_occurrence_to_platform(jobs: Sequence[Job], projects: ProjectsMapping)
             )
 
 
-def build_tree(spans):
-    span_tree = {}
-    root_span_id = None
-
-    for span in spans:
-        span_id = span["span_id"]
-        is_root = span["is_segment"]
-        if is_root:
-            root_span_id = span_id
-        if span_id not in span_tree:
-            span_tree[span_id] = span
-            span_tree[span_id]["children"] = []
-
-    for span in span_tree.values():
-        parent_id = span.get("parent_span_id")
-        if parent_id is not None and parent_id in span_tree:
-            parent_span = span_tree[parent_id]
-            children = parent_span["children"]
-            children.append(span)
-
-    return span_tree, root_span_id
-
-
-def dfs(visited, flattened_spans, tree, span_id):
-    stack = [span_id]
-
-    while len(stack):
-        span_id = stack.pop()
-
-        span = deepcopy(tree[span_id])
-        children = span.pop("children")
-
-        if span_id not in visited:
-            flattened_spans.append(span)
-            tree.pop(span_id)
-            visited.add(span_id)
-
-        for child in sorted(children, key=lambda span: span["start_timestamp"], reverse=True):
-            if child["span_id"] not in visited:
-                stack.append(child["span_id"])
-
-
-def flatten_tree(tree, root_span_id):
-    visited: Set[str] = set()
-    flattened_spans: list[Mapping[str, Any]] = []
-
-    if root_span_id:
-        dfs(visited, flattened_spans, tree, root_span_id)
-
-    # Catch all for orphan spans
-    remaining = sorted(tree.items(), key=lambda span: span[1]["start_timestamp"])
-    for span_id, _ in remaining:
-        if span_id not in visited:
-            dfs(visited, flattened_spans, tree, span_id)
-
-    return flattened_spans
+class SpanTree:
+    """
+    The spans of a segment as a tree backed by flat arrays: the parent index and the
+    children indexes of every span, by its position in ``spans``. Only the first span of
+    every span ID is kept.
+    """
+
+    def __init__(self, spans: Sequence[dict[str, Any]]) -> None:
+        index_by_id: dict[str, int] = {}
+        self.spans: list[dict[str, Any]] = []
+        self.root = -1
+
+        for span in spans:
+            span_id = span["span_id"]
+            if span["is_segment"]:
+                # The last segment span wins.
+                self.root = index_by_id.get(span_id, len(self.spans))
+            if span_id not in index_by_id:
+                index_by_id[span_id] = len(self.spans)
+                self.spans.append(span)
+
+        self.parents: list[int] = [-1] * len(self.spans)
+        self.children: list[list[int]] = [[] for _ in self.spans]
+        for i, span in enumerate(self.spans):
+            parent = index_by_id.get(span.get("parent_span_id"), -1)  # type: ignore[arg-type]
+            self.parents[i] = parent
+            if parent != -1:
+                self.children[parent].append(i)
+
+    def preorder(self) -> list[int]:
+        """
+        Return the indexes of all spans depth first, starting at the segment span, with
+        children ordered by start timestamp. Spans that aren't reachable from the segment
+        span (orphans) follow, ordered by start timestamp as well.
+        """
+        spans = self.spans
+        visited = bytearray(len(spans))
+        order: list[int] = []
+
+        def start_timestamp(i: int) -> float:
+            return spans[i]["start_timestamp"]
+
+        def visit(start: int) -> None:
+            stack = [start]
+            while stack:
+                i = stack.pop()
+                if visited[i]:
+                    continue
+                visited[i] = 1
+                order.append(i)
+                # Pushed latest first, so the earliest child is visited next.
+                stack.extend(
+                    child
+                    for child in sorted(self.children[i], key=start_timestamp, reverse=True)
+                    if not visited[child]
+                )
+
+        if self.root != -1:
+            visit(self.root)
+
+        for i in sorted(range(len(spans)), key=start_timestamp):
+            if not visited[i]:
+                visit(i)
+
+        return order
+
+    def flatten(self) -> list[dict[str, Any]]:
+        return [self.spans[i] for i in self.preorder()]
 
 
 def _update_occurrence_group_type(jobs: Sequence[Job], projects: ProjectsMapping) -> None:
@@ -168,8 +180,7 @@ def transform_spans_to_event_dict(spans):
     # So we build a tree and flatten it depth first.
     # TODO: See if we can update the detectors to work without this assumption so we can
     # just pass it a list of spans.
-    tree, root_span_id = build_tree(processed_spans)
-    flattened_spans = flatten_tree(tree, root_span_id)
+    flattened_spans = SpanTree(processed_spans).flatten()
     event["spans"] = flattened_spans
 
     root_span = flattened_spans[0]
@@ -182,8 +193,8 @@ def transform_spans_to_event_dict(spans):
 
 
 def prepare_event_for_occurrence_consumer(event):
-    event_light = deepcopy(event)
-    event_light["spans"] = []
+    # The spans are dropped anyway, so don't copy them.
+    event_light = deepcopy({**event, "spans": []})
     event_light["timestamp"] = event["datetime"]
     return event_light
 
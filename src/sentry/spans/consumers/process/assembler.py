@@ -0,0 +1,186 @@
+"""
+In-memory assembly of segments for the process spans consumer.
+
+By default every span is pushed to a Redis list for its segment, and segments are read back
+from Redis once ``standalone-spans.buffer-window.seconds`` have passed since their first span.
+With ``standalone-spans.segment-assembler.enable``, ``SegmentAssembler`` keeps open segments in
+the consumer's memory instead, keyed by ``SegmentKey`` (and so by the partition that owns them),
+and hands complete segments to the producer without a Redis round-trip.
+
+Segments are spilled to the Redis buffer, where the existing flow picks them up, when
+
+* the open segments hold more than ``standalone-spans.segment-assembler.max-bytes``, oldest
+  first,
+* a segment was held for ``standalone-spans.segment-assembler.max-hold-seconds`` of wall-clock
+  time (e.g. because its partition stopped receiving messages, so it never completes),
+* or the strategy is joined, e.g. because partitions are revoked or the consumer shuts down.
+
+Once spilled, later spans of the segment keep going to Redis so that it's only emitted once.
+
+Offsets are only committed up to the oldest span the assembler holds (see ``held_offsets``), so a
+consumer that dies without spilling reads the spans of its open segments again. Segments that were
+completed or spilled since then may be emitted twice.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import time
+from collections.abc import Iterable, Mapping
+
+from sentry import options
+from sentry.spans.buffer.redis import SegmentKey
+from sentry.utils import metrics
+
+
+@dataclasses.dataclass
+class OpenSegment:
+    first_seen: int
+    first_offset: int
+    opened_at: float
+    spans: list[bytes] = dataclasses.field(default_factory=list)
+    size: int = 0
+
+
+@dataclasses.dataclass
+class SpilledSegments:
+    spans_map: dict[SegmentKey, list[bytes]] = dataclasses.field(default_factory=dict)
+    segment_first_seen_ts: dict[SegmentKey, int] = dataclasses.field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.spans_map)
+
+
+class SegmentAssembler:
+    def __init__(self) -> None:
+        self.segments: dict[SegmentKey, OpenSegment] = {}
+        # segment key -> when it was spilled
+        self.spilled: dict[SegmentKey, float] = {}
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def add(
+        self,
+        spans_map: Mapping[SegmentKey, list[bytes]],
+        segment_first_seen_ts: Mapping[SegmentKey, int],
+        segment_first_offset: Mapping[SegmentKey, int],
+    ) -> SpilledSegments:
+        """
+        Add the spans of a batch to their open segments, returning spans that have to go to
+        Redis because their segment was spilled before.
+        """
+        now = time.monotonic()
+        to_redis = SpilledSegments()
+        for key, spans in spans_map.items():
+            first_seen = segment_first_seen_ts[key]
+            if key in self.spilled:
+                to_redis.spans_map[key] = list(spans)
+                to_redis.segment_first_seen_ts[key] = first_seen
+                continue
+
+            segment = self.segments.get(key)
+            if segment is None:
+                segment = self.segments[key] = OpenSegment(
+                    first_seen=first_seen, first_offset=segment_first_offset[key], opened_at=now
+                )
+            elif first_seen < segment.first_seen:
+                segment.first_seen = first_seen
+
+            size = sum(len(span) for span in spans)
+            segment.spans.extend(spans)
+            segment.size += size
+            self.size += size
+
+        return to_redis
+
+    def pop_complete(
+        self, latest_ts_by_partition: Mapping[int, int]
+    ) -> list[tuple[SegmentKey, list[bytes]]]:
+        """
+        Remove and return the segments whose buffer window passed, going by the latest message
+        timestamp of their partition, like the Redis buffer does.
+        """
+        buffer_window = options.get("standalone-spans.buffer-window.seconds")
+        complete = [
+            key
+            for key, segment in self.segments.items()
+            if key.partition in latest_ts_by_partition
+            and latest_ts_by_partition[key.partition] - segment.first_seen >= buffer_window
+        ]
+        metrics.incr("spans.assembler.segments.complete", amount=len(complete))
+        return [(key, self._pop(key).spans) for key in complete]
+
+    def pop_spilled(self) -> SpilledSegments:
+        """
+        Remove and return the segments that exceed the memory or time budget.
+        """
+        now = time.monotonic()
+        max_bytes = options.get("standalone-spans.segment-assembler.max-bytes")
+        max_hold = options.get("standalone-spans.segment-assembler.max-hold-seconds")
+
+        # Spilled segments are written to Redis with the buffer TTL, after which their spans
+        # can't be appended to anymore anyway.
+        ttl = options.get("standalone-spans.buffer-ttl.seconds")
+        self.spilled = {key: at for key, at in self.spilled.items() if now - at < ttl}
+
+        keys = [key for key, segment in self.segments.items() if now - segment.opened_at > max_hold]
+        reason = "time"
+        if self.size > max_bytes:
+            # Segments are kept in the order they were opened, so the oldest are spilled first.
+            remaining = self.size - sum(self.segments[key].size for key in keys)
+            spilling = set(keys)
+            for key, segment in self.segments.items():
+                if remaining <= max_bytes:
+                    break
+                if key not in spilling:
+                    keys.append(key)
+                    remaining -= segment.size
+            reason = "memory"
+
+        if keys:
+            metrics.incr(
+                "spans.assembler.segments.spilled", amount=len(keys), tags={"reason": reason}
+            )
+        return self._spill(keys, now)
+
+    def pop_all(self, partitions: Iterable[int] | None = None) -> SpilledSegments:
+        """
+        Spill all open segments, or those of some partitions, e.g. when they are revoked.
+        """
+        if partitions is None:
+            keys = list(self.segments)
+        else:
+            partition_set = set(partitions)
+            keys = [key for key in self.segments if key.partition in partition_set]
+        return self._spill(keys, time.monotonic())
+
+    def held_offsets(self) -> dict[int, int]:
+        """
+        The offset of the oldest span held in each partition, which is as far as offsets of the
+        partition can be committed.
+        """
+        offsets: dict[int, int] = {}
+        for key, segment in self.segments.items():
+            if key.partition not in offsets or segment.first_offset < offsets[key.partition]:
+                offsets[key.partition] = segment.first_offset
+        return offsets
+
+    def record_metrics(self) -> None:
+        metrics.gauge("spans.assembler.segments.open", len(self.segments))
+        metrics.gauge("spans.assembler.size", self.size, unit="byte")
+
+    def _pop(self, key: SegmentKey) -> OpenSegment:
+        segment = self.segments.pop(key)
+        self.size -= segment.size
+        return segment
+
+    def _spill(self, keys: Iterable[SegmentKey], now: float) -> SpilledSegments:
+        spilled = SpilledSegments()
+        for key in keys:
+            segment = self._pop(key)
+            spilled.spans_map[key] = segment.spans
+            spilled.segment_first_seen_ts[key] = segment.first_seen
+            self.spilled[key] = now
+        return spilled
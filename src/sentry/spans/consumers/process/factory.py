@@ -1,4 +1,5 @@
 import dataclasses
+import functools
 import logging
 from collections import defaultdict
 from collections.abc import Mapping
@@ -22,6 +23,7 @@ from sentry_kafka_schemas.schema_types.snuba_spans_v1 import SpanEvent
 from sentry import options
 from sentry.conf.types.kafka_definition import Topic, get_topic_codec
 from sentry.spans.buffer.redis import ProcessSegmentsContext, RedisSpansBuffer, SegmentKey
+from sentry.spans.consumers.process.assembler import SegmentAssembler
 from sentry.spans.consumers.process.strategy import CommitSpanOffsets, NoOp
 from sentry.utils import metrics
 from sentry.utils.arroyo import MultiprocessingPool, run_task_with_multiprocessing
@@ -54,6 +56,7 @@ class SpanMessageWithMetadata:
     project_id: int
     timestamp: int
     partition: int
+    offset: int
     span: bytes
 
 
@@ -106,6 +109,7 @@ def _process_message(message: Message[KafkaPayload]) -> SpanMessageWithMetadata
         payload_value = message.payload.value
         timestamp = int(message.value.timestamp.timestamp())
         partition = message.value.partition.index
+        offset = message.value.offset
 
         use_orjson = options.get("standalone-spans.deserialize-spans-orjson.enable")
         use_rapidjson = options.get("standalone-spans.deserialize-spans-rapidjson.enable")
@@ -124,6 +128,7 @@ def _process_message(message: Message[KafkaPayload]) -> SpanMessageWithMetadata
         project_id=project_id,
         timestamp=timestamp,
         partition=partition,
+        offset=offset,
         span=payload_value,
     )
 
@@ -136,17 +141,25 @@ def process_message(message: Message[KafkaPayload]) -> SpanMessageWithMetadata |
         return FILTERED_PAYLOAD
 
 
-def _batch_write_to_redis(message: Message[ValuesBatch[SpanMessageWithMetadata]]):
+def _batch_write_to_redis(
+    message: Message[ValuesBatch[SpanMessageWithMetadata]],
+    assembler: SegmentAssembler | None = None,
+):
     """
     Gets a batch of `SpanMessageWithMetadata` and creates a dictionary with
     segment_id as key and a list of spans belonging to that segment_id as value.
     Pushes the batch of spans to redis.
+
+    With an `assembler`, spans are kept in memory instead and only the segments
+    it spills are pushed to redis. Segments it completes are handed on in the
+    `ProcessSegmentsContext` of their partition.
     """
     with sentry_sdk.start_transaction(op="process", name="spans.process.expand_segments"):
         batch = message.payload
         latest_ts_by_partition: dict[int, int] = {}
         spans_map: dict[SegmentKey, list[bytes]] = defaultdict(list)
         segment_first_seen_ts: dict[SegmentKey, int] = {}
+        segment_first_offset: dict[SegmentKey, int] = {}
 
         for item in batch:
             payload = item.payload
@@ -166,6 +179,9 @@ def _batch_write_to_redis(message: Message[ValuesBatch[SpanMessageWithMetadata]]
             if key not in segment_first_seen_ts or timestamp < segment_first_seen_ts[key]:
                 segment_first_seen_ts[key] = timestamp
 
+            if key not in segment_first_offset or payload.offset < segment_first_offset[key]:
+                segment_first_offset[key] = payload.offset
+
             # Collects latest timestamps processed in each partition. It is
             # important to keep track of this per partition because message
             # timestamps are guaranteed to be monotonic per partition only.
@@ -177,18 +193,41 @@ def _batch_write_to_redis(message: Message[ValuesBatch[SpanMessageWithMetadata]]
 
         client = RedisSpansBuffer()
 
-        return client.batch_write_and_check_processing(
-            spans_map=spans_map,
-            segment_first_seen_ts=segment_first_seen_ts,
+        if assembler is None:
+            return client.batch_write_and_check_processing(
+                spans_map=spans_map,
+                segment_first_seen_ts=segment_first_seen_ts,
+                latest_ts_by_partition=latest_ts_by_partition,
+            )
+
+        to_redis = assembler.add(spans_map, segment_first_seen_ts, segment_first_offset)
+        spilled = assembler.pop_spilled()
+        to_redis.spans_map.update(spilled.spans_map)
+        to_redis.segment_first_seen_ts.update(spilled.segment_first_seen_ts)
+        complete = assembler.pop_complete(latest_ts_by_partition)
+        assembler.record_metrics()
+
+        # This still records the latest timestamp of every partition, which
+        # drives processing of segments that were spilled.
+        contexts = client.batch_write_and_check_processing(
+            spans_map=to_redis.spans_map,
+            segment_first_seen_ts=to_redis.segment_first_seen_ts,
             latest_ts_by_partition=latest_ts_by_partition,
         )
 
+        contexts_by_partition = {context.partition: context for context in contexts}
+        for key, spans in complete:
+            contexts_by_partition[key.partition].assembled_segments.append(spans)
+
+        return contexts
+
 
 def batch_write_to_redis(
     message: Message[ValuesBatch[SpanMessageWithMetadata]],
+    assembler: SegmentAssembler | None = None,
 ):
     try:
-        return _batch_write_to_redis(message)
+        return _batch_write_to_redis(message, assembler)
     except Exception:
         sentry_sdk.capture_exception()
         return FILTERED_PAYLOAD
@@ -203,6 +242,11 @@ def _expand_segments(should_process_segments: list[ProcessSegmentsContext]):
             partition = result.partition
             should_process = result.should_process_segments
 
+            for segment in result.assembled_segments:
+                payload = _prepare_segment_payload(segment, segment_key=None)
+                if payload is not None:
+                    buffered_segments.append(payload)
+
             if not should_process:
                 continue
 
@@ -226,20 +270,26 @@ def _expand_segments(should_process_segments: list[ProcessSegmentsContext]):
                         if not segment:
                             continue
 
-                        payload_data = prepare_buffered_segment_payload(segment)
-                        if len(payload_data) > MAX_PAYLOAD_SIZE:
-                            logger.warning(
-                                "Failed to produce message: max payload size exceeded.",
-                                extra={"segment_key": keys[i + j]},
-                            )
-                            metrics.incr("performance.buffered_segments.max_payload_size_exceeded")
-                            continue
-
-                        buffered_segments.append(KafkaPayload(None, payload_data, []))
+                        payload = _prepare_segment_payload(segment, segment_key=keys[i + j])
+                        if payload is not None:
+                            buffered_segments.append(payload)
 
     return buffered_segments
 
 
+def _prepare_segment_payload(segment: list[bytes], segment_key: str | None) -> KafkaPayload | None:
+    payload_data = prepare_buffered_segment_payload(segment)
+    if len(payload_data) > MAX_PAYLOAD_SIZE:
+        logger.warning(
+            "Failed to produce message: max payload size exceeded.",
+            extra={"segment_key": segment_key},
+        )
+        metrics.incr("performance.buffered_segments.max_payload_size_exceeded")
+        return None
+
+    return KafkaPayload(None, payload_data, [])
+
+
 def expand_segments(should_process_segments: list[ProcessSegmentsContext]):
     try:
         return _expand_segments(should_process_segments)
@@ -256,6 +306,10 @@ class ProcessSpansStrategyFactory(ProcessingStrategyFactory[KafkaPayload]):
     4. Fetch all segments are two minutes or older and expire the keys so they
        aren't reprocessed
     5. Produce segments to buffered-segments topic
+
+    With `standalone-spans.segment-assembler.enable`, step 1 keeps segments in a
+    `SegmentAssembler` and only pushes the ones it spills to redis. Step 2 then
+    holds back offsets of spans that are only in memory.
     """
 
     def __init__(
@@ -295,10 +349,14 @@ class ProcessSpansStrategyFactory(ProcessingStrategyFactory[KafkaPayload]):
 
         unfold_step = Unfold(generator=expand_segments, next_step=produce_step)
 
-        commit_step = CommitSpanOffsets(commit=commit, next_step=unfold_step)
+        assembler = None
+        if options.get("standalone-spans.segment-assembler.enable"):
+            assembler = SegmentAssembler()
+
+        commit_step = CommitSpanOffsets(commit=commit, next_step=unfold_step, assembler=assembler)
 
         batch_processor = RunTask(
-            function=batch_write_to_redis,
+            function=functools.partial(batch_write_to_redis, assembler=assembler),
             next_step=commit_step,
         )
 
@@ -1,8 +1,13 @@
 from typing import Any, Generic, TypeVar
 
+import sentry_sdk
 from arroyo.processing.strategies.abstract import ProcessingStrategy
 from arroyo.processing.strategies.commit import CommitOffsets
-from arroyo.types import Commit, Message
+from arroyo.types import Commit, Message, Partition, Value
+
+from sentry.spans.buffer.redis import RedisSpansBuffer
+from sentry.spans.consumers.process.assembler import SegmentAssembler, SpilledSegments
+from sentry.utils import metrics
 
 TPayload = TypeVar("TPayload")
 
@@ -13,18 +18,44 @@ class CommitSpanOffsets(CommitOffsets, Generic[TPayload]):
     processed spans before carrying on the work to build segments and produce them since
     the processing messages and producing segments are two distinct operations. Span messages
     should be committed once they are processed and put into redis.
+
+    With an `assembler`, offsets are only committed up to the oldest span it holds in memory.
+    Its open segments are spilled to redis when the strategy is joined, after which all offsets
+    are committed.
     """
 
-    def __init__(self, commit: Commit, next_step: ProcessingStrategy[TPayload]) -> None:
+    def __init__(
+        self,
+        commit: Commit,
+        next_step: ProcessingStrategy[TPayload],
+        assembler: SegmentAssembler | None = None,
+    ) -> None:
         super().__init__(commit=commit)
+        self.__commit = commit
         self.__next_step = next_step
+        self.__assembler = assembler
+        self.__held_back: dict[Partition, int] = {}
 
     def poll(self) -> None:
         super().poll()
         self.__next_step.poll()
 
     def submit(self, message: Message[TPayload]) -> None:
-        super().submit(message)
+        if self.__assembler is None:
+            super().submit(message)
+        else:
+            held_offsets = self.__assembler.held_offsets()
+            committable = {}
+            for partition, offset in message.committable.items():
+                held_offset = held_offsets.get(partition.index)
+                if held_offset is not None and held_offset < offset:
+                    self.__held_back[partition] = offset
+                    offset = held_offset
+                else:
+                    self.__held_back.pop(partition, None)
+                committable[partition] = offset
+            super().submit(Message(Value(message.payload, committable, message.timestamp)))
+
         self.__next_step.submit(message)
 
     def close(self) -> None:
@@ -34,10 +65,32 @@ class CommitSpanOffsets(CommitOffsets, Generic[TPayload]):
         self.__next_step.terminate()
 
     def join(self, timeout: float | None = None) -> None:
+        if self.__assembler is not None:
+            try:
+                spill_to_redis(self.__assembler.pop_all())
+            except Exception:
+                sentry_sdk.capture_exception()
+            else:
+                if self.__held_back:
+                    self.__commit(self.__held_back)
+                    self.__held_back = {}
+
         super().join(timeout)
         self.__next_step.join(timeout=timeout)
 
 
+def spill_to_redis(spilled: SpilledSegments) -> None:
+    if not spilled:
+        return
+
+    metrics.incr("spans.assembler.segments.spilled", amount=len(spilled), tags={"reason": "join"})
+    RedisSpansBuffer().batch_write_and_check_processing(
+        spans_map=spilled.spans_map,
+        segment_first_seen_ts=spilled.segment_first_seen_ts,
+        latest_ts_by_partition={},
+    )
+
+
 class NoOp(ProcessingStrategy[Any]):
     def __init__(self) -> None:
         return
@@ -7,6 +7,7 @@ from django.db.models import F
 from django.db.models.base import Model
 
 from sentry import eventstream, similarity, tsdb
+from sentry.grouping.ingest.caching import invalidate_grouphash_cache
 from sentry.silo.base import SiloMode
 from sentry.tasks.base import instrumented_task, track_group_async_operation
 from sentry.tsdb.base import TSDBModel
@@ -113,6 +114,7 @@ def merge_groups(
             # work for this group.
             from_object_ids.remove(from_object_id)
 
+            invalidate_grouphash_cache(group_ids=[group.id])
             similarity.merge(group.project, new_group, [group], allow_unsafe=True)
 
             environment_ids = list(
@@ -15,6 +15,7 @@ from google.api_core.exceptions import ServiceUnavailable
 
 from sentry import features, projectoptions
 from sentry.exceptions import PluginError
+from sentry.features.evaluation import feature_evaluation_context
 from sentry.issues.grouptype import GroupCategory
 from sentry.issues.issue_occurrence import IssueOccurrence
 from sentry.killswitches import killswitch_matches_context
@@ -521,7 +522,10 @@ def post_process_group(
     """
     from sentry.utils import snuba
 
-    with snuba.options_override({"consistent": True}):
+    with (
+        snuba.options_override({"consistent": True}),
+        feature_evaluation_context("post_process"),
+    ):
         from sentry import eventstore
         from sentry.eventstore.processing import event_processing_store
         from sentry.ingest.transaction_clusterer.datasource.redis import (
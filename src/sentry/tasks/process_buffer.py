@@ -20,17 +20,32 @@ def get_process_lock(lock_name: str) -> Lock:
 @instrumented_task(
     name="sentry.tasks.process_buffer.process_pending", queue="buffers.process_pending"
 )
-def process_pending() -> None:
+def process_pending(partition: int | None = None) -> None:
     """
-    Process pending buffers.
+    Process pending buffers. With several ``buffer.pending-partitions``, each partition is drained
+    by a task of its own.
     """
-    from sentry import buffer
+    from sentry import buffer, options
+
+    if partition is None:
+        partitions = options.get("buffer.pending-partitions")
+        if partitions > 1:
+            for partition in range(partitions):
+                process_pending.apply_async(
+                    kwargs={"partition": partition}, queue="buffers.process_pending"
+                )
+            return
 
-    lock = get_process_lock("process_pending")
+        lock = get_process_lock("process_pending")
+    else:
+        lock = get_process_lock(f"process_pending:{partition}")
 
     try:
         with lock.acquire():
-            buffer.process_pending()
+            if partition is None:
+                buffer.process_pending()
+            else:
+                buffer.process_pending(partition=partition)
     except UnableToAcquireLock as error:
         logger.warning("process_pending.fail", extra={"error": error})
 
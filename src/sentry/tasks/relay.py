@@ -4,6 +4,8 @@ import time
 import sentry_sdk
 from django.db import router, transaction
 
+from sentry import options
+from sentry.features.evaluation import feature_evaluation_context
 from sentry.models.organization import Organization
 from sentry.relay import projectconfig_cache, projectconfig_debounce_cache
 from sentry.silo.base import SiloMode
@@ -13,6 +15,20 @@ from sentry.utils.sdk import set_current_event_project
 
 logger = logging.getLogger(__name__)
 
+# Invalidation triggers which only change some sections of the project config, see
+# `sentry.relay.config.CONFIG_SECTIONS`.  Configs of other triggers are recomputed in full.
+TRIGGER_SECTIONS = {
+    "dynamic_sampling:boost_release": ("sampling",),
+    "dynamic_sampling:custom_rule_upsert": ("sampling",),
+    "dynamic_sampling_boost_low_volume_projects": ("sampling",),
+    "dynamic_sampling_boost_low_volume_transactions": ("sampling",),
+    "releaseproject.post_save": ("sampling",),
+    "releaseproject.post_delete": ("sampling",),
+    "alerts:create-on-demand-metric": ("metricExtraction",),
+    "dashboards:create-on-demand-metric": ("metricExtraction",),
+    "monitors:monitor_created": ("quotas",),
+}
+
 
 # The time_limit here should match the `debounce_ttl` of the projectconfig_debounce_cache
 # service.
@@ -102,14 +118,17 @@ def validate_args(organization_id=None, project_id=None, public_key=None):
         raise TypeError("Must provide exactly one of organzation_id, project_id or public_key")
 
 
-def compute_configs(organization_id=None, project_id=None, public_key=None):
+def compute_configs(organization_id=None, project_id=None, public_key=None, sections=None):
     """Computes all configs for the org, project or single public key.
 
     You must only provide one single argument, not all.
 
-    :returns: A dict mapping all affected public keys to their config.  The dict will not
-       contain keys which should be retained in the cache unchanged.
+    :param sections: Only recompute these sections of the configs which are in the cache, see
+       :func:`compute_projectkey_config`.
+    :returns: A dict mapping all affected public keys to their config or the patch of their
+       config.  The dict will not contain keys which should be retained in the cache unchanged.
     """
+    from sentry.models.options.project_option import ProjectOption
     from sentry.models.project import Project
     from sentry.models.projectkey import ProjectKey
 
@@ -124,22 +143,46 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
         # it could be possible that refrequent invalidations cause the task to take excessive time
         # to complete.
         for organization in Organization.objects.filter(id=organization_id):
-            for project in Project.objects.filter(organization_id=organization_id):
-                project.set_cached_field_value("organization", organization)
-                for key in ProjectKey.objects.filter(project_id=project.id):
-                    key.set_cached_field_value("project", project)
-                    # If we find the config in the cache it means it was active.  As such we want to
-                    # recalculate it.  If the config was not there at all, we leave it and avoid the
-                    # cost of re-computation.
-                    if projectconfig_cache.backend.get(key.public_key) is not None:
-                        configs[key.public_key] = compute_projectkey_config(key)
-                        action = "recompute"
-                    else:
-                        action = "not-cached"
-                    metrics.incr(
-                        "relay.projectconfig_cache.invalidation.recompute",
-                        tags={"action": action, "scope": "organization"},
-                    )
+            projects = {
+                project.id: project
+                for project in Project.objects.filter(organization_id=organization_id)
+            }
+            keys = list(ProjectKey.objects.filter(project_id__in=projects))
+
+            # If we find the config in the cache it means it was active.  As such we want to
+            # recalculate it.  If the config was not there at all, we leave it and avoid the
+            # cost of re-computation.
+            cached = projectconfig_cache.backend.exists_many([key.public_key for key in keys])
+            # Load the options of all recomputed projects at once, rather than one project at a
+            # time while building its config.
+            recomputed_project_ids = {key.project_id for key in keys if key.public_key in cached}
+            ProjectOption.objects.prefetch_all_values(recomputed_project_ids)
+
+            # Organization features are checked once for all projects rather than once per
+            # project, and each project feature is checked with one `has_for_batch` over all the
+            # recomputed projects.
+            with feature_evaluation_context("relay.compute_configs", force=True) as context:
+                for project in projects.values():
+                    project.set_cached_field_value("organization", organization)
+                if context is not None:
+                    context.add_projects(projects[id] for id in recomputed_project_ids)
+
+                for key in keys:
+                    key.set_cached_field_value("project", projects[key.project_id])
+                    if key.public_key in cached:
+                        configs[key.public_key] = compute_projectkey_config(key, sections)
+
+            recomputed = len(configs)
+            metrics.incr(
+                "relay.projectconfig_cache.invalidation.recompute",
+                amount=recomputed,
+                tags={"action": "recompute", "scope": "organization"},
+            )
+            metrics.incr(
+                "relay.projectconfig_cache.invalidation.recompute",
+                amount=len(keys) - recomputed,
+                tags={"action": "not-cached", "scope": "organization"},
+            )
     elif project_id:
         for project in Project.objects.filter(id=project_id):
             for key in ProjectKey.objects.filter(project_id=project_id):
@@ -148,7 +191,7 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
                 # recalculate it.  If the config was not there at all, we leave it and avoid the
                 # cost of re-computation.
                 if projectconfig_cache.backend.get(key.public_key) is not None:
-                    configs[key.public_key] = compute_projectkey_config(key)
+                    configs[key.public_key] = compute_projectkey_config(key, sections)
                     action = "recompute"
                 else:
                     action = "not-cached"
@@ -178,16 +221,23 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
     return configs
 
 
-def compute_projectkey_config(key):
+def compute_projectkey_config(key, sections=None):
     """Computes a single config for the given :class:`ProjectKey`.
 
-    :returns: A dict with the project config.
+    :param sections: Only recompute these sections of the config, see
+        :data:`sentry.relay.config.CONFIG_SECTIONS`.  Disabled configs are still computed in
+        full.
+    :returns: A dict with the project config, or a :class:`ProjectConfigPatch` with the
+        recomputed sections.
     """
+    from sentry.constants import ObjectStatus
     from sentry.models.projectkey import ProjectKeyStatus
-    from sentry.relay.config import get_project_config
+    from sentry.relay.config import get_project_config, get_project_config_sections
 
     if key.status != ProjectKeyStatus.ACTIVE:
         return {"disabled": True}
+    elif sections is not None and key.project.status == ObjectStatus.ACTIVE:
+        return get_project_config_sections(key.project, sections, project_keys=[key])
     else:
         return get_project_config(key.project, project_keys=[key]).to_dict()
 
@@ -200,7 +250,12 @@ def compute_projectkey_config(key):
     silo_mode=SiloMode.REGION,
 )
 def invalidate_project_config(
-    organization_id=None, project_id=None, public_key=None, trigger="invalidated", **kwargs
+    organization_id=None,
+    project_id=None,
+    public_key=None,
+    trigger="invalidated",
+    sections=None,
+    **kwargs,
 ):
     """Task which re-computes an invalidated project config.
 
@@ -220,11 +275,19 @@ def invalidate_project_config(
 
     Both these mean that an outdated version of the project config could still end up in the
     cache.  These will be addressed in the future using config revisions tracked in Redis.
+
+    If ``sections`` are given, only these sections of the cached configs are recomputed and
+    patched, see :data:`TRIGGER_SECTIONS`.
     """
+    from sentry.relay.config import ProjectConfigPatch
+
     # Make sure we start by deleting the deduplication key so that new invalidation triggers
     # can schedule a new message while we already started computing the project config.
     projectconfig_debounce_cache.invalidation.mark_task_done(
-        organization_id=organization_id, project_id=project_id, public_key=public_key
+        organization_id=organization_id,
+        project_id=project_id,
+        public_key=public_key,
+        sections=sections,
     )
 
     if project_id:
@@ -236,12 +299,25 @@ def invalidate_project_config(
     if public_key:
         sentry_sdk.set_tag("public_key", public_key)
     sentry_sdk.set_tag("trigger", trigger)
+    sentry_sdk.set_tag("sections", ",".join(sections) if sections else "all")
     sentry_sdk.set_context("kwargs", kwargs)
 
-    updated_configs = compute_configs(
-        organization_id=organization_id, project_id=project_id, public_key=public_key
-    )
+    updated_configs = {}
+    patches = {}
+    for key, config in compute_configs(
+        organization_id=organization_id,
+        project_id=project_id,
+        public_key=public_key,
+        sections=sections,
+    ).items():
+        if isinstance(config, ProjectConfigPatch):
+            patches[key] = config
+        else:
+            updated_configs[key] = config
+
     projectconfig_cache.backend.set_many(updated_configs)
+    if patches:
+        projectconfig_cache.backend.patch_many(patches)
 
 
 @sentry_sdk.tracing.trace
@@ -356,8 +432,16 @@ def _schedule_invalidate_project_config(
         else:
             check_debounce_keys["organization_id"] = org_id
 
-    if projectconfig_debounce_cache.invalidation.is_debounced(**check_debounce_keys):
-        # If this task is already in the queue, do not schedule another task.
+    sections = None
+    if options.get("relay.project-config-patching.enable"):
+        sections = TRIGGER_SECTIONS.get(trigger)
+
+    if projectconfig_debounce_cache.invalidation.is_debounced(
+        **check_debounce_keys, sections=sections
+    ):
+        # If this task is already in the queue, do not schedule another task.  Tasks recomputing
+        # some sections only are debounced by a queued task for the same sections, or one which
+        # recomputes all of them.
         metrics.incr(
             "relay.projectconfig_cache.skipped",
             tags={"reason": "debounce", "update_reason": trigger, "task": "invalidation"},
@@ -369,17 +453,22 @@ def _schedule_invalidate_project_config(
         tags={"update_reason": trigger, "task": "invalidation"},
     )
 
-    invalidate_project_config.apply_async(
-        countdown=countdown,
-        kwargs={
-            "project_id": project_id,
-            "organization_id": organization_id,
-            "public_key": public_key,
-            "trigger": trigger,
-        },
-    )
+    kwargs = {
+        "project_id": project_id,
+        "organization_id": organization_id,
+        "public_key": public_key,
+        "trigger": trigger,
+    }
+    if sections is not None:
+        kwargs["sections"] = sections
+    invalidate_project_config.apply_async(countdown=countdown, kwargs=kwargs)
 
-    # Use the original arguments to this function to set the debounce key.
+    # Use the original arguments to this function to set the debounce key.  Tasks which
+    # recompute only some sections have their own key, so that they don't debounce
+    # invalidations of the other sections.
     projectconfig_debounce_cache.invalidation.debounce(
-        organization_id=organization_id, project_id=project_id, public_key=public_key
+        organization_id=organization_id,
+        project_id=project_id,
+        public_key=public_key,
+        sections=sections,
     )
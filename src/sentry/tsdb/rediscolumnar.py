@@ -0,0 +1,428 @@
+import logging
+import sys
+from array import array
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from typing import Any
+
+from django.utils import timezone
+
+from sentry.tsdb.base import IncrMultiOptions, TSDBKey, TSDBModel
+from sentry.tsdb.redis import RedisTSDB, SuppressionWrapper
+from sentry.utils.redis import check_cluster_versions
+from sentry.utils.versioning import Version
+
+logger = logging.getLogger(__name__)
+
+# Counters are signed 64 bit integers. ``BITFIELD`` numbers bits starting from
+# the most significant bit of the first byte, so they are stored big endian.
+COUNTER_TYPE = "i64"
+COUNTER_SIZE = 8
+
+
+def decode_counters(data: bytes | None, length: int) -> array:
+    """
+    Decode a run of ``length`` packed counters. ``GETRANGE`` stops at the end
+    of the stored value, so any missing trailing counters are zero.
+    """
+    counters = array("q", data or b"")
+    if sys.byteorder == "little":
+        counters.byteswap()
+    if len(counters) < length:
+        counters.extend([0] * (length - len(counters)))
+    return counters
+
+
+class RedisColumnarTSDB(RedisTSDB):
+    """
+    A variant of ``RedisTSDB`` which stores simple counters as packed arrays.
+
+    ``RedisTSDB`` stores the counter of every key for a rollup interval as a
+    field of a hash shared with other keys, so reading a range of N intervals
+    for M keys takes N * M ``HGET`` commands. Here every key owns one string per
+    block of consecutive intervals of a rollup, where the block size is the
+    number of samples kept for that rollup, and the string holds one counter
+    per interval::
+
+        {
+            "<prefix>c:<model>:<rollup>:<block>:<key>": [<count>, <count>, ...],
+            ...
+        }
+
+    Counters are incremented in place with ``BITFIELD``, and reading a range is
+    a single ``GETRANGE`` per key and block (a range within the retention of a
+    rollup never spans more than two blocks) which is decoded in one go.
+
+    Distinct counters and frequency tables are stored the same way as in
+    ``RedisTSDB``. Counters written by ``RedisTSDB`` are not visible to this
+    backend and vice versa.
+    """
+
+    def validate(self) -> None:
+        logger.debug("Validating Redis version...")
+        # BITFIELD was added in Redis 3.2
+        check_cluster_versions(self.cluster, Version((3, 2, 0)), label="TSDB")
+
+    def make_counter_array_key(
+        self,
+        model: TSDBModel,
+        rollup: int,
+        block: int,
+        key: int | str | bytes,
+        environment_id: int | None,
+    ) -> str:
+        """
+        Make the key of the counter array holding a block of rollup intervals.
+        """
+        return str(
+            self.add_environment_parameter(
+                "{prefix}c:{model}:{rollup}:{block}:{key}".format(
+                    prefix=self.prefix,
+                    model=model.value,
+                    rollup=rollup,
+                    block=block,
+                    key=self.get_model_key(key),
+                ),
+                environment_id,
+            )
+        )
+
+    def calculate_counter_array_expiry(self, rollup: int, block: int) -> int:
+        """
+        Calculate the expiration time of a counter array, which is the
+        expiration time of the last interval it holds.
+        """
+        samples = self.rollups[rollup]
+        last_epoch = ((block + 1) * samples - 1) * rollup
+        return last_epoch + (rollup * samples)
+
+    def get_counter_array_slices(
+        self,
+        model: TSDBModel,
+        rollup: int,
+        start_index: int,
+        end_index: int,
+        key: TSDBKey,
+        environment_id: int | None,
+    ) -> list[tuple[str, int, int, int]]:
+        """
+        Returns a ``(array key, block, offset, length)`` tuple for every counter
+        array covering the rollup intervals ``start_index`` to ``end_index``
+        (both inclusive.)
+        """
+        samples = self.rollups[rollup]
+        slices = []
+        for block in range(start_index // samples, end_index // samples + 1):
+            first = max(start_index, block * samples)
+            last = min(end_index, (block + 1) * samples - 1)
+            slices.append(
+                (
+                    self.make_counter_array_key(model, rollup, block, key, environment_id),
+                    block,
+                    first - block * samples,
+                    last - first + 1,
+                )
+            )
+        return slices
+
+    def incr_multi(
+        self,
+        items: Sequence[tuple[TSDBModel, TSDBKey] | tuple[TSDBModel, TSDBKey, IncrMultiOptions]],
+        timestamp: datetime | None = None,
+        count: int = 1,
+        environment_id: int | None = None,
+    ) -> None:
+        default_timestamp = timestamp
+        default_count = count
+
+        self.validate_arguments([item[0] for item in items], [environment_id])
+
+        if default_timestamp is None:
+            default_timestamp = timezone.now()
+
+        for (cluster, durable), environment_ids in self.get_cluster_groups({None, environment_id}):
+            # array key -> offset -> count
+            increments: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+            expiries: dict[str, int] = {}
+
+            for rollup, samples in self.rollups.items():
+                for item in items:
+                    if len(item) == 2:
+                        model, key = item
+                        options: IncrMultiOptions = {
+                            "timestamp": default_timestamp,
+                            "count": default_count,
+                        }
+                    else:
+                        model, key, options = item
+
+                    count = options.get("count", default_count)
+                    _timestamp = options.get("timestamp", default_timestamp)
+
+                    block, offset = divmod(self.normalize_to_rollup(_timestamp, rollup), samples)
+
+                    for _environment_id in environment_ids:
+                        array_key = self.make_counter_array_key(
+                            model, rollup, block, key, _environment_id
+                        )
+                        increments[array_key][offset] += count
+                        expiries[array_key] = self.calculate_counter_array_expiry(rollup, block)
+
+            commands: dict[str, list[tuple[Any, ...]]] = {}
+            for array_key, offsets in increments.items():
+                operations: list[Any] = ["BITFIELD", array_key]
+                for offset, count in offsets.items():
+                    operations.extend(("INCRBY", COUNTER_TYPE, f"#{offset}", count))
+                commands[array_key] = [
+                    tuple(operations),
+                    ("EXPIREAT", array_key, expiries[array_key]),
+                ]
+
+            try:
+                cluster.execute_commands(commands)
+            except Exception:
+                if durable:
+                    raise
+
+    def get_counters(
+        self,
+        model: TSDBModel,
+        keys: Sequence[TSDBKey],
+        rollup: int,
+        series: Sequence[int],
+        environment_id: int | None,
+    ) -> dict[TSDBKey, array]:
+        """
+        Fetch the counters of ``keys`` for every interval of ``series``, which
+        must be consecutive epochs of ``rollup``.
+        """
+        if not series:
+            return {}
+
+        if rollup not in self.rollups:
+            # Nothing is ever written for rollups which aren't configured.
+            return {key: array("q", bytes(COUNTER_SIZE * len(series))) for key in keys}
+
+        start_index = self.normalize_ts_to_rollup(series[0], rollup)
+        end_index = self.normalize_ts_to_rollup(series[-1], rollup)
+
+        # An array only expires together with its last interval, so it can
+        # still hold intervals which are past their retention. Those read as
+        # zero, the same as in ``RedisTSDB`` where they would have expired.
+        earliest_index = self.normalize_to_rollup(timezone.now(), rollup) - self.rollups[rollup] + 1
+        expired = min(max(earliest_index - start_index, 0), len(series))
+        start_index += expired
+
+        promises = {}
+        cluster, _ = self.get_cluster(environment_id)
+        with cluster.map() as client:
+            for key in keys:
+                if start_index > end_index:
+                    promises[key] = []
+                    continue
+                promises[key] = [
+                    (
+                        client.getrange(
+                            array_key,
+                            offset * COUNTER_SIZE,
+                            (offset + length) * COUNTER_SIZE - 1,
+                        ),
+                        length,
+                    )
+                    for array_key, _, offset, length in self.get_counter_array_slices(
+                        model, rollup, start_index, end_index, key, environment_id
+                    )
+                ]
+
+        results = {}
+        for key, slices in promises.items():
+            counters = array("q", bytes(COUNTER_SIZE * expired))
+            for promise, length in slices:
+                counters.extend(decode_counters(promise.value, length))
+            results[key] = counters
+        return results
+
+    def get_range(
+        self,
+        model: TSDBModel,
+        keys: Sequence[TSDBKey],
+        start: datetime,
+        end: datetime,
+        rollup: int | None = None,
+        environment_ids: Sequence[int] | None = None,
+        conditions=None,
+        use_cache: bool = False,
+        jitter_value: int | None = None,
+        tenant_ids: dict[str, str | int] | None = None,
+        referrer_suffix: str | None = None,
+    ) -> dict[TSDBKey, list[tuple[int, int]]]:
+        # redis backend doesn't support multiple envs
+        if environment_ids is not None and len(environment_ids) > 1:
+            raise NotImplementedError
+        environment_id = environment_ids[0] if environment_ids else None
+
+        self.validate_arguments([model], [environment_id])
+
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+
+        return {
+            key: list(zip(series, counters))
+            for key, counters in self.get_counters(
+                model, keys, rollup, series, environment_id
+            ).items()
+        }
+
+    def get_sums(
+        self,
+        model: TSDBModel,
+        keys: list[int],
+        start: datetime,
+        end: datetime,
+        rollup: int | None = None,
+        environment_id: int | None = None,
+        use_cache: bool = False,
+        jitter_value: int | None = None,
+        tenant_ids: dict[str, str | int] | None = None,
+        referrer_suffix: str | None = None,
+    ) -> dict[int, int]:
+        self.validate_arguments([model], [environment_id])
+
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+
+        return {
+            key: sum(counters)
+            for key, counters in self.get_counters(
+                model, keys, rollup, series, environment_id
+            ).items()
+        }
+
+    def merge(
+        self,
+        model: TSDBModel,
+        destination: int,
+        sources: list[int],
+        timestamp: datetime | None = None,
+        environment_ids: Iterable[int] | None = None,
+    ) -> None:
+        ids = (set(environment_ids) if environment_ids is not None else set()).union([None])
+
+        self.validate_arguments([model], ids)
+
+        rollups = self.get_active_series(timestamp=timestamp)
+
+        for (cluster, durable), _environment_ids in self.get_cluster_groups(ids):
+            manager = cluster.map()
+            if not durable:
+                manager = SuppressionWrapper(manager)
+
+            reads = []
+            with manager as client:
+                for rollup, series in rollups.items():
+                    if not series:
+                        continue
+                    start_index = self.normalize_to_rollup(series[0], rollup)
+                    end_index = self.normalize_to_rollup(series[-1], rollup)
+                    for source in sources:
+                        for environment_id in _environment_ids:
+                            for array_key, block, offset, length in self.get_counter_array_slices(
+                                model, rollup, start_index, end_index, source, environment_id
+                            ):
+                                promise = client.getrange(
+                                    array_key,
+                                    offset * COUNTER_SIZE,
+                                    (offset + length) * COUNTER_SIZE - 1,
+                                )
+                                reads.append(
+                                    (promise, array_key, rollup, block, offset, environment_id)
+                                )
+
+            commands: dict[str, list[tuple[Any, ...]]] = defaultdict(list)
+            # destination array key -> offset -> count
+            increments: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+            expiries: dict[str, int] = {}
+            for promise, array_key, rollup, block, offset, environment_id in reads:
+                counters = decode_counters(promise.value, 0)
+                decrements: list[Any] = []
+                destination_key = self.make_counter_array_key(
+                    model, rollup, block, destination, environment_id
+                )
+                for i, count in enumerate(counters):
+                    if count:
+                        # Subtract rather than reset what we've read, so that
+                        # increments arriving in the meantime aren't lost.
+                        decrements.extend(("INCRBY", COUNTER_TYPE, f"#{offset + i}", -count))
+                        increments[destination_key][offset + i] += count
+                        expiries[destination_key] = self.calculate_counter_array_expiry(
+                            rollup, block
+                        )
+                if decrements:
+                    commands[array_key].append(("BITFIELD", array_key, *decrements))
+
+            for destination_key, offsets in increments.items():
+                operations: list[Any] = ["BITFIELD", destination_key]
+                for offset, count in offsets.items():
+                    operations.extend(("INCRBY", COUNTER_TYPE, f"#{offset}", count))
+                commands[destination_key].append(tuple(operations))
+                commands[destination_key].append(
+                    ("EXPIREAT", destination_key, expiries[destination_key])
+                )
+
+            try:
+                cluster.execute_commands(commands)
+            except Exception:
+                if durable:
+                    raise
+
+    def delete(
+        self,
+        models: list[Any],
+        keys: list[int],
+        start: datetime | None = None,
+        end: datetime | None = None,
+        timestamp: datetime | None = None,
+        environment_ids: Iterable[int | None] | None = None,
+    ) -> None:
+        ids = (set(environment_ids) if environment_ids is not None else set()).union([None])
+
+        self.validate_arguments(models, ids)
+
+        rollups = self.get_active_series(start, end, timestamp)
+
+        for (cluster, durable), _ids in self.get_cluster_groups(ids):
+            commands: dict[str, list[tuple[Any, ...]]] = {}
+            for rollup, series in rollups.items():
+                if not series:
+                    continue
+                samples = self.rollups[rollup]
+                start_index = self.normalize_to_rollup(series[0], rollup)
+                end_index = self.normalize_to_rollup(series[-1], rollup)
+                for model in models:
+                    for key in keys:
+                        for environment_id in _ids:
+                            for array_key, block, offset, length in self.get_counter_array_slices(
+                                model, rollup, start_index, end_index, key, environment_id
+                            ):
+                                if length == samples:
+                                    commands[array_key] = [("DEL", array_key)]
+                                    continue
+
+                                operations: list[Any] = ["BITFIELD", array_key]
+                                for i in range(offset, offset + length):
+                                    operations.extend(("SET", COUNTER_TYPE, f"#{i}", 0))
+                                # Resetting counters creates the array if it
+                                # didn't exist yet, so make sure it expires.
+                                commands[array_key] = [
+                                    tuple(operations),
+                                    (
+                                        "EXPIREAT",
+                                        array_key,
+                                        self.calculate_counter_array_expiry(rollup, block),
+                                    ),
+                                ]
+
+            try:
+                cluster.execute_commands(commands)
+            except Exception:
+                if durable:
+                    raise
@@ -16,6 +16,7 @@ from sentry.remote_subscriptions.consumers.result_consumer import (
     ResultProcessor,
     ResultsStrategyFactory,
 )
+from sentry.uptime.consumers.state_store import InMemoryStateStore, RedisStateStore
 from sentry.uptime.detectors.ranking import _get_cluster
 from sentry.uptime.detectors.tasks import set_failed_url
 from sentry.uptime.issue_platform import create_issue_platform_occurrence, resolve_uptime_issue
@@ -71,6 +72,43 @@ class UptimeResultProcessor(ResultProcessor[CheckResult, UptimeSubscription]):
     subscription_model = UptimeSubscription
     topic_for_codec = Topic.UPTIME_RESULTS
 
+    def __init__(self):
+        super().__init__()
+        self.redis_state_store = RedisStateStore()
+        self.in_memory_state_store: InMemoryStateStore | None = None
+
+    @property
+    def state_store(self) -> RedisStateStore:
+        """
+        Where last update times and consecutive status counts are kept. With
+        `uptime.result-consumer.in-memory-state` they are kept in memory and checkpointed
+        to redis, instead of a redis round-trip per result.
+        """
+        if options.get("uptime.result-consumer.in-memory-state"):
+            if self.in_memory_state_store is None:
+                self.in_memory_state_store = InMemoryStateStore(
+                    timedelta(
+                        seconds=options.get("uptime.result-consumer.state-checkpoint-seconds")
+                    )
+                )
+            return self.in_memory_state_store
+
+        if self.in_memory_state_store is not None:
+            # Write back what is only in memory before going back to redis
+            self.in_memory_state_store.clear()
+            self.in_memory_state_store = None
+        return self.redis_state_store
+
+    def poll(self) -> None:
+        if self.in_memory_state_store is not None:
+            self.in_memory_state_store.checkpoint()
+
+    def flush(self) -> None:
+        # State goes to redis before offsets are committed, e.g. for the next owner of revoked
+        # partitions, and state of newly assigned partitions is recovered from redis as it's used.
+        if self.in_memory_state_store is not None:
+            self.in_memory_state_store.clear()
+
     def get_subscription_id(self, result: CheckResult) -> str:
         return result["subscription_id"]
 
@@ -86,13 +124,13 @@ class UptimeResultProcessor(ResultProcessor[CheckResult, UptimeSubscription]):
 
         project_subscriptions = list(subscription.projectuptimesubscription_set.all())
 
-        cluster = _get_cluster()
-        last_updates: list[str | None] = cluster.mget(
-            build_last_update_key(sub) for sub in project_subscriptions
+        state_store = self.state_store
+        last_updates = state_store.get_many(
+            [build_last_update_key(sub) for sub in project_subscriptions]
         )
 
-        for last_update_raw, project_subscription in zip(last_updates, project_subscriptions):
-            last_update_ms = 0 if last_update_raw is None else int(last_update_raw)
+        for last_update, project_subscription in zip(last_updates, project_subscriptions):
+            last_update_ms = 0 if last_update is None else last_update
             self.handle_result_for_project(project_subscription, result, last_update_ms)
 
     def handle_result_for_project(
@@ -167,11 +205,10 @@ class UptimeResultProcessor(ResultProcessor[CheckResult, UptimeSubscription]):
             logger.exception("Failed to process result for uptime project subscription")
 
         # Now that we've processed the result for this project subscription we track the last update date
-        cluster = _get_cluster()
-        cluster.set(
+        self.state_store.set(
             build_last_update_key(project_subscription),
             int(result["scheduled_check_time_ms"]),
-            ex=LAST_UPDATE_REDIS_TTL,
+            LAST_UPDATE_REDIS_TTL,
         )
 
     def handle_result_for_project_auto_onboarding_mode(
@@ -244,12 +281,13 @@ class UptimeResultProcessor(ResultProcessor[CheckResult, UptimeSubscription]):
     def handle_result_for_project_active_mode(
         self, project_subscription: ProjectUptimeSubscription, result: CheckResult
     ):
-        redis = _get_cluster()
         delete_status = (
             CHECKSTATUS_FAILURE if result["status"] == CHECKSTATUS_SUCCESS else CHECKSTATUS_SUCCESS
         )
         # Delete any consecutive results we have for the opposing status, since we received this status
-        redis.delete(build_active_consecutive_status_key(project_subscription, delete_status))
+        self.state_store.delete(
+            build_active_consecutive_status_key(project_subscription, delete_status)
+        )
 
         if (
             project_subscription.uptime_status == UptimeStatus.OK
@@ -314,11 +352,8 @@ class UptimeResultProcessor(ResultProcessor[CheckResult, UptimeSubscription]):
     def has_reached_status_threshold(
         self, project_subscription: ProjectUptimeSubscription, status: str
     ) -> bool:
-        pipeline = _get_cluster().pipeline()
         key = build_active_consecutive_status_key(project_subscription, status)
-        pipeline.incr(key)
-        pipeline.expire(key, ACTIVE_THRESHOLD_REDIS_TTL)
-        status_count = int(pipeline.execute()[0])
+        status_count = self.state_store.incr(key, ACTIVE_THRESHOLD_REDIS_TTL)
         result = (status == CHECKSTATUS_FAILURE and status_count >= ACTIVE_FAILURE_THRESHOLD) or (
             status == CHECKSTATUS_SUCCESS and status_count >= ACTIVE_RECOVERY_THRESHOLD
         )
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Sequence
+from datetime import timedelta
+
+from sentry.uptime.detectors.ranking import _get_cluster
+from sentry.utils import metrics
+
+# Expiry of keys without a TTL and of keys known not to exist, which are remembered until the
+# store is cleared
+NO_EXPIRY = float("inf")
+
+
+class RedisStateStore:
+    """
+    Integer state of the results consumer (last processed check times, consecutive status
+    counts), stored in Redis with a round-trip per operation.
+    """
+
+    def get_many(self, keys: Sequence[str]) -> list[int | None]:
+        if not keys:
+            return []
+        values: list[str | None] = _get_cluster().mget(keys)
+        return [None if value is None else int(value) for value in values]
+
+    def set(self, key: str, value: int, ttl: timedelta) -> None:
+        _get_cluster().set(key, value, ex=ttl)
+
+    def incr(self, key: str, ttl: timedelta) -> int:
+        pipeline = _get_cluster().pipeline()
+        pipeline.incr(key)
+        pipeline.expire(key, ttl)
+        return int(pipeline.execute()[0])
+
+    def delete(self, key: str) -> None:
+        _get_cluster().delete(key)
+
+    def checkpoint(self, force: bool = False) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class InMemoryStateStore(RedisStateStore):
+    """
+    Keeps the state in process memory, loading keys from Redis the first time they are used
+    and writing changed keys back to Redis at most every ``checkpoint_interval``.
+
+    Results are partitioned by subscription, so only the consumer that owns a partition
+    touches the keys of its subscriptions. The store must be checkpointed and cleared when
+    partitions are reassigned, so that the next owner recovers the state from Redis. A
+    consumer that dies loses at most ``checkpoint_interval`` of updates.
+    """
+
+    def __init__(self, checkpoint_interval: timedelta) -> None:
+        self.checkpoint_interval = checkpoint_interval.total_seconds()
+        # key -> (value, expires at), a value of None marks a key known not to exist
+        self.values: dict[str, tuple[int | None, float]] = {}
+        self.dirty: set[str] = set()
+        self.last_checkpoint = time.time()
+
+    def get_many(self, keys: Sequence[str]) -> list[int | None]:
+        self._load(keys)
+        return [self._get(key) for key in keys]
+
+    def set(self, key: str, value: int, ttl: timedelta) -> None:
+        self.values[key] = (value, time.time() + ttl.total_seconds())
+        self.dirty.add(key)
+
+    def incr(self, key: str, ttl: timedelta) -> int:
+        self._load([key])
+        value = (self._get(key) or 0) + 1
+        self.set(key, value, ttl)
+        return value
+
+    def delete(self, key: str) -> None:
+        if key in self.values and self.values[key][0] is None:
+            return
+        self.values[key] = (None, NO_EXPIRY)
+        self.dirty.add(key)
+
+    def checkpoint(self, force: bool = False) -> None:
+        now = time.time()
+        if not force and now - self.last_checkpoint < self.checkpoint_interval:
+            return
+        self.last_checkpoint = now
+
+        if self.dirty:
+            pipeline = _get_cluster().pipeline()
+            for key in self.dirty:
+                value, expires_at = self.values[key]
+                if value is None or expires_at <= now:
+                    pipeline.delete(key)
+                elif expires_at == NO_EXPIRY:
+                    pipeline.set(key, value)
+                else:
+                    pipeline.set(key, value, px=max(int((expires_at - now) * 1000), 1))
+            pipeline.execute()
+            metrics.incr("uptime.result_processor.state_store.checkpoint", amount=len(self.dirty))
+            self.dirty.clear()
+
+        # Everything is in Redis now, so expired keys don't have to be remembered.
+        self.values = {key: item for key, item in self.values.items() if item[1] > now}
+        metrics.gauge("uptime.result_processor.state_store.size", len(self.values))
+
+    def clear(self) -> None:
+        self.checkpoint(force=True)
+        self.values.clear()
+
+    def _get(self, key: str) -> int | None:
+        value, expires_at = self.values[key]
+        return value if expires_at > time.time() else None
+
+    def _load(self, keys: Sequence[str]) -> None:
+        missing = [key for key in keys if key not in self.values]
+        if not missing:
+            return
+
+        now = time.time()
+        pipeline = _get_cluster().pipeline()
+        for key in missing:
+            pipeline.get(key)
+            pipeline.pttl(key)
+        results = pipeline.execute()
+        for i, key in enumerate(missing):
+            value, ttl_ms = results[2 * i], results[2 * i + 1]
+            if value is None:
+                self.values[key] = (None, NO_EXPIRY)
+            elif ttl_ms is None or ttl_ms < 0:
+                self.values[key] = (int(value), NO_EXPIRY)
+            else:
+                self.values[key] = (int(value), now + ttl_ms / 1000)
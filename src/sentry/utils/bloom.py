@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import hashlib
+import math
+from collections.abc import Iterator
+
+
+class BloomFilter:
+    """
+    A fixed size, in-memory Bloom filter over strings.
+
+    Membership checks have no false negatives, and false positives at roughly ``error_rate``
+    until more than ``capacity`` strings were added. Strings can't be removed, callers that need
+    to forget strings should replace the filter (see ``full``).
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        assert capacity > 0
+        assert 0 < error_rate < 1
+        self.capacity = capacity
+        self.bit_count = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(round(self.bit_count / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.bit_count + 7) // 8)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[bit >> 3] & (1 << (bit & 7)) for bit in self._get_bits(value))
+
+    def add(self, value: str) -> None:
+        for bit in self._get_bits(value):
+            self.bits[bit >> 3] |= 1 << (bit & 7)
+        self.count += 1
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    def _get_bits(self, value: str) -> Iterator[int]:
+        # Double hashing: two halves of one digest stand in for `hash_count` hash functions.
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.bit_count
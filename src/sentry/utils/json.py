@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import datetime
 import decimal
+import re
 import uuid
 from collections.abc import Callable, Collection, Generator, Mapping
 from enum import Enum
@@ -125,6 +126,42 @@ def loads(value: str | bytes, use_rapid_json: bool = False, **kwargs: NoReturn)
         return _default_decoder.decode(value)
 
 
+_whitespace = re.compile(r"[ \t\n\r]*")
+
+
+def loads_array_items(value: str | bytes) -> Generator[Any]:
+    """
+    Decode a JSON array one item at a time, so that only one item has to be held as Python
+    objects at once. Errors are raised once the iteration gets to them.
+    """
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+
+    end = len(value)
+    idx = _whitespace.match(value, 0).end()  # type: ignore[union-attr]
+    if idx == end or value[idx] != "[":
+        raise JSONDecodeError("Expecting '['", value, idx)
+
+    idx = _whitespace.match(value, idx + 1).end()  # type: ignore[union-attr]
+    if idx < end and value[idx] == "]":
+        idx += 1
+    else:
+        while True:
+            item, idx = _default_decoder.raw_decode(value, idx)
+            yield item
+            idx = _whitespace.match(value, idx).end()  # type: ignore[union-attr]
+            if idx < end and value[idx] == ",":
+                idx = _whitespace.match(value, idx + 1).end()  # type: ignore[union-attr]
+            elif idx < end and value[idx] == "]":
+                idx += 1
+                break
+            else:
+                raise JSONDecodeError("Expecting ',' delimiter", value, idx)
+
+    if _whitespace.match(value, idx).end() != end:  # type: ignore[union-attr]
+        raise JSONDecodeError("Extra data", value, idx)
+
+
 # dumps JSON with `orjson` or the default function depending on `option_name`
 # TODO: remove this when orjson experiment is successful
 def dumps_experimental(option_name: str, data: Any) -> str:
@@ -206,6 +243,7 @@ __all__ = (
     "dumps_htmlsafe",
     "load",
     "loads",
+    "loads_array_items",
     "prune_empty_keys",
     "apply_key_filter",
 )
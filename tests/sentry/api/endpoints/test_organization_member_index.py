@@ -12,7 +12,7 @@ from sentry.models.organizationmemberteam import OrganizationMemberTeam
 from sentry.roles import organization_roles
 from sentry.silo.base import SiloMode
 from sentry.testutils.cases import APITestCase, TestCase
-from sentry.testutils.helpers import Feature, with_feature
+from sentry.testutils.helpers import Feature, override_options, parse_link_header, with_feature
 from sentry.testutils.hybrid_cloud import HybridCloudTestMixin
 from sentry.testutils.outbox import outbox_runner
 from sentry.testutils.silo import assume_test_silo_mode
@@ -202,6 +202,26 @@ class OrganizationMemberListTest(OrganizationMemberListTestBase, HybridCloudTest
         assert len(response.data) == 1
         assert response.data[0]["email"] == self.user2.email
 
+    def test_keyset_pagination(self):
+        with override_options(
+            {"api.paginator.keyset-endpoints": ["OrganizationMemberIndexEndpoint"]}
+        ):
+            response = self.get_success_response(self.organization.slug, qs_params={"per_page": 1})
+            assert [member["email"] for member in response.data] == [self.user.email]
+
+            links = {attrs["rel"]: attrs for attrs in parse_link_header(response["Link"]).values()}
+            assert links["next"]["results"] == "true"
+            response = self.get_success_response(
+                self.organization.slug,
+                qs_params={"per_page": 1, "cursor": links["next"]["cursor"]},
+            )
+            assert [member["email"] for member in response.data] == [self.user2.email]
+
+            # Page number cursors aren't accepted anymore
+            self.get_error_response(
+                self.organization.slug, qs_params={"cursor": "1:1:0"}, status_code=400
+            )
+
     def test_id_query(self):
         member = OrganizationMember.objects.create(
             email="billy@localhost", organization=self.organization
@@ -42,6 +42,8 @@ from sentry.testutils.cases import (
     SetRefsTestCase,
     TestCase,
 )
+from sentry.testutils.helpers.link_header import parse_link_header
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.outbox import outbox_runner
 from sentry.testutils.silo import assume_test_silo_mode
 from sentry.testutils.skips import requires_snuba
@@ -153,6 +155,32 @@ class OrganizationReleaseListTest(APITestCase, BaseMetricsTestCase):
         response = self.get_success_response(org.slug)
         self.assert_expected_versions(response, [release8, release7, release6])
 
+    def test_release_list_keyset_pagination(self):
+        self.login_as(user=self.user)
+
+        date_added = datetime(2013, 8, 14, 3, 8, 24, 880386, tzinfo=UTC)
+        release_1 = self.create_release(version="1", date_added=date_added - timedelta(days=1))
+        # Releases added at the same time are ordered by id
+        release_2 = self.create_release(version="2", date_added=date_added)
+        release_3 = self.create_release(version="3", date_added=date_added)
+
+        with override_options({"api.paginator.keyset-endpoints": ["OrganizationReleasesEndpoint"]}):
+            response = self.get_success_response(self.organization.slug, per_page=2)
+            self.assert_expected_versions(response, [release_2, release_3])
+
+            links = {attrs["rel"]: attrs for attrs in parse_link_header(response["Link"]).values()}
+            response = self.get_success_response(
+                self.organization.slug, per_page=2, cursor=links["next"]["cursor"]
+            )
+            self.assert_expected_versions(response, [release_1])
+
+            links = {attrs["rel"]: attrs for attrs in parse_link_header(response["Link"]).values()}
+            assert links["next"]["results"] == "false"
+            response = self.get_success_response(
+                self.organization.slug, per_page=2, cursor=links["previous"]["cursor"]
+            )
+            self.assert_expected_versions(response, [release_2, release_3])
+
     def test_release_list_order_by_sessions_empty(self):
         self.login_as(user=self.user)
 
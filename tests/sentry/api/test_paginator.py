@@ -1,7 +1,10 @@
+import os
 from datetime import UTC, datetime, timedelta
 from unittest import TestCase as SimpleTestCase
+from unittest.mock import patch
 
 import pytest
+from django.db import connections, router
 from django.db.models import DateTimeField, IntegerField, OuterRef, Subquery, Value
 from django.db.models.functions import Coalesce
 from django.utils import timezone
@@ -29,6 +32,8 @@ from sentry.api.paginator import (
     OffsetPaginator,
     Paginator,
     SequencePaginator,
+    encode_keyset_cursor_value,
+    estimate_hits,
     reverse_bisect_left,
 )
 from sentry.incidents.models.alert_rule import AlertRule
@@ -36,9 +41,12 @@ from sentry.incidents.models.incident import Incident
 from sentry.models.rule import Rule
 from sentry.testutils.cases import APITestCase, SnubaTestCase, TestCase
 from sentry.testutils.helpers.datetime import iso_format
+from sentry.testutils.helpers.options import override_options
+from sentry.testutils.pytest.fixtures import django_db_all
 from sentry.testutils.silo import control_silo_test
+from sentry.testutils.skips import requires_pytest_benchmark
 from sentry.users.models.user import User
-from sentry.utils.cursors import Cursor
+from sentry.utils.cursors import Cursor, StringCursor
 from sentry.utils.snuba import raw_snql_query
 
 
@@ -85,6 +93,25 @@ class PaginatorTest(TestCase):
         result = paginator.count_hits(1)
         assert result == 1
 
+    def test_count_hits_approximate(self):
+        self.create_user("foo@example.com")
+        self.create_user("bar@example.com")
+
+        queryset = User.objects.all()
+        assert isinstance(estimate_hits(queryset), int)
+        assert estimate_hits(User.objects.none()) == 0
+
+        paginator = self.cls(queryset, "id")
+        with override_options({"api.paginator.approximate-hits-threshold": 100}):
+            with patch("sentry.api.paginator.estimate_hits", return_value=5000):
+                assert paginator.count_hits(1000) == 1000
+            with patch("sentry.api.paginator.estimate_hits", return_value=50):
+                assert paginator.count_hits(1000) == 2
+            # Counts capped below the threshold are cheap, so the planner isn't asked.
+            with patch("sentry.api.paginator.estimate_hits") as estimate:
+                assert paginator.count_hits(100) == 2
+            assert not estimate.called
+
     def test_prev_emptyset(self):
         queryset = User.objects.all()
 
@@ -197,6 +224,72 @@ class OffsetPaginatorTest(TestCase):
         with pytest.raises(BadPaginationError):
             paginator.get_result()
 
+    def test_keyset(self):
+        res1 = self.create_user("foo@example.com")
+        res2 = self.create_user("bar@example.com")
+        res3 = self.create_user("baz@example.com")
+
+        queryset = User.objects.all()
+
+        paginator = OffsetPaginator(queryset, "id", keyset=True)
+        result1 = paginator.get_result(limit=2, cursor=None)
+        assert list(result1) == [res1, res2]
+        assert result1.next
+        assert not result1.prev
+
+        result2 = paginator.get_result(limit=2, cursor=result1.next)
+        assert list(result2) == [res3]
+        assert not result2.next
+        assert result2.prev
+
+        result3 = paginator.get_result(limit=2, cursor=result2.prev)
+        assert list(result3) == [res1, res2]
+        assert result3.next
+        assert not result3.prev
+
+        result4 = paginator.get_result(limit=2, cursor=result2.next)
+        assert len(result4) == 0
+        assert not result4.next
+        assert result4.prev
+
+        result5 = paginator.get_result(limit=2, cursor=result4.prev)
+        assert list(result5) == [res2, res3]
+        assert result5.next
+
+        # cursors survive being passed around as strings
+        cursor = StringCursor.from_string(str(result1.next))
+        assert list(paginator.get_result(limit=2, cursor=cursor)) == [res3]
+
+    def test_keyset_order_by_multiple(self):
+        res1 = self.create_user("foo@example.com")
+        res2 = self.create_user("bar@example.com")
+        res3 = self.create_user("baz@example.com")
+        res3.update(is_active=False)
+
+        queryset = User.objects.all()
+
+        paginator = OffsetPaginator(queryset, ("is_active", "-date_joined"), keyset=True)
+        cursor = None
+        results = []
+        for _ in range(3):
+            result = paginator.get_result(limit=1, cursor=cursor)
+            assert len(result) == 1
+            results.extend(result)
+            cursor = result.next
+        assert results == [res3, res2, res1]
+        assert not cursor
+
+        result = paginator.get_result(limit=2, cursor=result.prev)
+        assert list(result) == [res3, res2]
+
+    def test_keyset_invalid_cursor(self):
+        self.create_user("foo@example.com")
+        paginator = OffsetPaginator(User.objects.all(), "id", keyset=True)
+
+        for cursor in (Cursor(10, 1), StringCursor("not a cursor", 0), StringCursor("WzEsMl0", 0)):
+            with pytest.raises(BadPaginationError):
+                paginator.get_result(cursor=cursor)
+
 
 @control_silo_test
 class DateTimePaginatorTest(TestCase):
@@ -823,6 +916,92 @@ class CombinedQuerysetPaginatorTest(APITestCase):
         assert len(result) == 5
         assert result == page1_results
 
+    def test_keyset(self):
+        project = self.project
+        Rule.objects.all().delete()
+
+        alert_rule0 = self.create_alert_rule(name="alertrule0")
+        alert_rule1 = self.create_alert_rule(name="alertrule1")
+        rule1 = Rule.objects.create(label="rule1", project=project)
+        alert_rule2 = self.create_alert_rule(name="alertrule2")
+        alert_rule3 = self.create_alert_rule(name="alertrule3")
+        rule2 = Rule.objects.create(label="rule2", project=project)
+        rule3 = Rule.objects.create(label="rule3", project=project)
+
+        alert_rule_intermediary = CombinedQuerysetIntermediary(
+            AlertRule.objects.all(), ["date_added"]
+        )
+        rule_intermediary = CombinedQuerysetIntermediary(Rule.objects.all(), ["date_added"])
+        paginator = CombinedQuerysetPaginator(
+            intermediaries=[alert_rule_intermediary, rule_intermediary],
+            desc=True,
+            keyset=True,
+        )
+
+        result = paginator.get_result(limit=3, cursor=None)
+        page1_results = list(result)
+        assert page1_results == [rule3, rule2, alert_rule3]
+        assert not result.prev
+
+        result = paginator.get_result(limit=3, cursor=result.next)
+        assert list(result) == [alert_rule2, rule1, alert_rule1]
+        prev_cursor = result.prev
+
+        result = paginator.get_result(limit=3, cursor=result.next)
+        assert list(result) == [alert_rule0]
+        assert not result.next
+
+        result = paginator.get_result(limit=3, cursor=prev_cursor)
+        assert list(result) == page1_results
+        assert not result.prev
+
+        paginator = CombinedQuerysetPaginator(
+            intermediaries=[alert_rule_intermediary, rule_intermediary],
+            keyset=True,
+        )
+        result = paginator.get_result(limit=4, cursor=None)
+        assert list(result) == [alert_rule0, alert_rule1, rule1, alert_rule2]
+        result = paginator.get_result(limit=4, cursor=result.next)
+        assert list(result) == [alert_rule3, rule2, rule3]
+        assert not result.next
+
+    def test_keyset_ties(self):
+        project = self.project
+        AlertRule.objects.all().delete()
+        Rule.objects.all().delete()
+
+        rules = [Rule.objects.create(label=f"rule{i}", project=project) for i in range(4)]
+        alert_rules = [self.create_alert_rule(name=f"alertrule{i}") for i in range(4)]
+
+        incident_status_value = Value(-2, output_field=IntegerField())
+        paginator = CombinedQuerysetPaginator(
+            intermediaries=[
+                CombinedQuerysetIntermediary(
+                    AlertRule.objects.annotate(incident_status=incident_status_value),
+                    ["incident_status"],
+                ),
+                CombinedQuerysetIntermediary(
+                    Rule.objects.annotate(incident_status=incident_status_value),
+                    ["incident_status"],
+                ),
+            ],
+            desc=True,
+            keyset=True,
+        )
+
+        cursor = None
+        results = []
+        for _ in range(3):
+            result = paginator.get_result(limit=3, cursor=cursor)
+            results.extend(result)
+            cursor = result.next
+        assert not cursor
+
+        # Tied rows are ordered by model name, then primary key
+        assert [r.id for r in results] == [r.id for r in reversed(rules)] + [
+            r.id for r in reversed(alert_rules)
+        ]
+
 
 class TestChainPaginator(SimpleTestCase):
     cls = ChainPaginator
@@ -956,3 +1135,58 @@ class CallbackPaginatorTest(APITestCase, SnubaTestCase):
         assert third_page.next.has_results is False
         assert third_page.prev.offset == 1
         assert third_page.prev.has_results
+
+
+BENCHMARK_ROWS = int(os.environ.get("SENTRY_PAGINATOR_BENCHMARK_ROWS", 1_000_000))
+
+
+@pytest.fixture
+def benchmark_rules(default_project):
+    """
+    A project with ``BENCHMARK_ROWS`` issue alert rules, cloned from one rule in the database so
+    that building the fixture doesn't take longer than the benchmark.
+    """
+    rule = Rule.objects.create(label="rule", project=default_project)
+    with connections[router.db_for_write(Rule)].cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO sentry_rule (project_id, label, data, status, source, date_added)
+            SELECT project_id, label || n, data, status, source, date_added + n * interval '1 ms'
+            FROM sentry_rule, generate_series(1, %s) AS n
+            WHERE id = %s
+            """,
+            [BENCHMARK_ROWS - 1, rule.id],
+        )
+    return Rule.objects.filter(project=default_project)
+
+
+@requires_pytest_benchmark
+@django_db_all
+@pytest.mark.parametrize("keyset", [False, True], ids=["offset", "keyset"])
+@pytest.mark.parametrize("paginator_cls", ["offset_paginator", "combined_queryset_paginator"])
+def test_benchmark_deep_page(benchmark_rules, paginator_cls, keyset, benchmark):
+    """
+    Fetch a page 90% of the way into a million rows, by page number and by keyset cursor.
+    """
+    limit = 100
+    page = BENCHMARK_ROWS * 9 // 10 // limit
+    boundary = benchmark_rules.order_by("id")[page * limit - 1]
+
+    if paginator_cls == "offset_paginator":
+        paginator = OffsetPaginator(benchmark_rules, "id", keyset=keyset)
+        cursor_value = [boundary.id]
+    else:
+        paginator = CombinedQuerysetPaginator(
+            intermediaries=[CombinedQuerysetIntermediary(benchmark_rules, ["id"])],
+            keyset=keyset,
+        )
+        cursor_value = [boundary.id, "Rule", boundary.id]
+
+    if keyset:
+        cursor = StringCursor(encode_keyset_cursor_value(cursor_value), 0, False)
+    else:
+        cursor = Cursor(limit, page, False)
+
+    result = benchmark(paginator.get_result, limit=limit, cursor=cursor)
+    assert result[0].id > boundary.id
+    assert len(result) == limit
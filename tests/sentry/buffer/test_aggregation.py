@@ -0,0 +1,141 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from sentry.buffer.aggregation import IncrAggregator, flush_incr_aggregators
+from sentry.buffer.base import Buffer
+from sentry.buffer.inprocess import InProcessBuffer
+from sentry.models.group import Group
+from sentry.models.project import Project
+from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
+
+
+class IncrAggregatorTest(TestCase):
+    def setUp(self):
+        self.incr = mock.Mock()
+        self.aggregator = IncrAggregator(self.incr)
+
+    def test_disabled(self):
+        assert not self.aggregator.add(Group, {"times_seen": 1}, {"id": 1})
+        assert len(self.aggregator) == 0
+
+    @override_options({"buffer.incr-aggregation.max-keys": 10})
+    def test_coalesces(self):
+        first_seen = timezone.now()
+        last_seen = first_seen + timedelta(seconds=5)
+        project = Project(id=1)
+
+        assert self.aggregator.add(Group, {"times_seen": 1}, {"id": 1, "project": project})
+        assert self.aggregator.add(
+            Group, {"times_seen": 2}, {"project": project, "id": 1}, {"last_seen": first_seen}
+        )
+        assert self.aggregator.add(
+            Group, {"times_seen": 3}, {"id": 1, "project": 1}, {"last_seen": last_seen}
+        )
+        assert self.aggregator.add(Group, {"times_seen": 1}, {"id": 2})
+        assert self.aggregator.add(Group, {"times_seen": 1}, {"id": 2}, signal_only=True)
+        assert len(self.aggregator) == 3
+        assert self.incr.call_count == 0
+
+        self.aggregator.flush()
+        assert len(self.aggregator) == 0
+        assert self.incr.call_args_list == [
+            mock.call(
+                Group,
+                {"times_seen": 6},
+                {"id": 1, "project": project},
+                {"last_seen": last_seen},
+                None,
+            ),
+            mock.call(Group, {"times_seen": 1}, {"id": 2}, None, None),
+            mock.call(Group, {"times_seen": 1}, {"id": 2}, None, True),
+        ]
+
+    @override_options({"buffer.incr-aggregation.max-keys": 2})
+    def test_flushes_when_full(self):
+        assert self.aggregator.add(Group, {"times_seen": 1}, {"id": 1})
+        assert self.aggregator.add(Group, {"times_seen": 1}, {"id": 1})
+        assert self.incr.call_count == 0
+
+        assert self.aggregator.add(Group, {"times_seen": 1}, {"id": 2})
+        assert self.incr.call_count == 2
+        assert len(self.aggregator) == 0
+
+    @override_options(
+        {"buffer.incr-aggregation.max-keys": 10, "buffer.incr-aggregation.max-delay-ms": 0}
+    )
+    def test_flushes_after_delay(self):
+        assert self.aggregator.add(Group, {"times_seen": 1}, {"id": 1})
+        for _ in range(100):
+            if self.incr.call_count:
+                break
+            time.sleep(0.05)
+        assert self.incr.call_count == 1
+        assert len(self.aggregator) == 0
+
+    @override_options({"buffer.incr-aggregation.max-keys": 10})
+    def test_flush_failure_does_not_drop_other_rows(self):
+        self.incr.side_effect = [Exception("boom"), None]
+        self.aggregator.add(Group, {"times_seen": 1}, {"id": 1})
+        self.aggregator.add(Group, {"times_seen": 1}, {"id": 2})
+        self.aggregator.flush()
+        assert self.incr.call_count == 2
+
+    @override_options(
+        {"buffer.incr-aggregation.max-keys": 10, "buffer.incr-aggregation.max-delay-ms": 0}
+    )
+    def test_without_timed_flush(self):
+        aggregator = IncrAggregator(self.incr, timed_flush=False)
+        with mock.patch("sentry.buffer.aggregation.threading.Timer") as timer:
+            assert aggregator.add(Group, {"times_seen": 1}, {"id": 1})
+        assert timer.call_count == 0
+        # The delay has passed by the time the increment is added, so it's flushed right away.
+        assert self.incr.call_count == 1
+        assert len(aggregator) == 0
+
+    @override_options({"buffer.incr-aggregation.max-keys": 10})
+    def test_reset_after_fork(self):
+        assert self.aggregator.add(Group, {"times_seen": 1}, {"id": 1})
+        assert self.aggregator._timer is not None
+        self.aggregator._timer.cancel()
+
+        self.aggregator.reset_after_fork()
+        assert len(self.aggregator) == 0
+        assert self.aggregator._timer is None
+
+        assert self.aggregator.add(Group, {"times_seen": 1}, {"id": 2})
+        assert self.aggregator._timer is not None
+        self.aggregator.flush()
+        assert self.incr.call_args_list == [
+            mock.call(Group, {"times_seen": 1}, {"id": 2}, None, None)
+        ]
+
+
+class BufferIncrAggregationTest(TestCase):
+    def test_timed_flush(self):
+        assert Buffer().incr_aggregator.timed_flush
+        assert not InProcessBuffer().incr_aggregator.timed_flush
+
+    @override_options({"buffer.incr-aggregation.max-keys": 10})
+    @mock.patch("sentry.buffer.base.process_incr")
+    def test_incr(self, process_incr):
+        buf = Buffer()
+        filters = {"id": 1}
+        buf.incr(Group, {"times_seen": 1}, filters)
+        buf.incr(Group, {"times_seen": 1}, filters)
+        assert process_incr.apply_async.call_count == 0
+
+        flush_incr_aggregators()
+        process_incr.apply_async.assert_called_once_with(
+            kwargs={
+                "model": Group,
+                "columns": {"times_seen": 2},
+                "filters": filters,
+                "extra": None,
+                "signal_only": None,
+            },
+            headers=mock.ANY,
+        )
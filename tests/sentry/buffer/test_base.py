@@ -1,3 +1,4 @@
+import math
 from datetime import timedelta
 from unittest import mock
 
@@ -5,6 +6,7 @@ from django.utils import timezone
 from pytest import raises
 
 from sentry.buffer.base import Buffer
+from sentry.buffer.bulk import BufferedIncr
 from sentry.db import models
 from sentry.models.group import Group
 from sentry.models.organization import Organization
@@ -13,6 +15,7 @@ from sentry.models.release import Release
 from sentry.models.releases.release_project import ReleaseProject
 from sentry.models.team import Team
 from sentry.receivers import create_default_projects
+from sentry.signals import buffer_incr_complete
 from sentry.testutils.cases import TestCase
 
 
@@ -79,6 +82,64 @@ class BufferTest(TestCase):
         group.refresh_from_db()
         assert group.times_seen == prev_times_seen
 
+    def test_bulk_process(self):
+        groups = [self.create_group(times_seen=1) for _ in range(3)]
+        the_date = timezone.now() + timedelta(days=5)
+        release = Release.objects.create(organization=self.organization, version="abcdefg")
+        other_release = Release.objects.create(organization=self.organization, version="hijklmn")
+        release_project = ReleaseProject.objects.create(project=self.project, release=release)
+        incrs = [
+            BufferedIncr(Group, {"times_seen": i + 1}, {"id": group.id}, {"last_seen": the_date})
+            for i, group in enumerate(groups)
+        ]
+        incrs += [
+            # Deleted groups are skipped
+            BufferedIncr(Group, {"times_seen": 1}, {"id": 0}, {"last_seen": the_date}),
+            BufferedIncr(Group, {"times_seen": 1}, {"id": groups[0].id}, signal_only=True),
+            BufferedIncr(
+                ReleaseProject,
+                {"new_groups": 1},
+                {"project_id": self.project.id, "release_id": release.id},
+            ),
+            # Rows that don't exist yet are created
+            BufferedIncr(
+                ReleaseProject,
+                {"new_groups": 2},
+                {"project_id": self.project.id, "release_id": other_release.id},
+            ),
+        ]
+
+        completed = []
+
+        def receiver(sender, created, **kwargs):
+            completed.append((sender, kwargs["filters"], created))
+
+        buffer_incr_complete.connect(receiver, weak=False)
+        self.addCleanup(buffer_incr_complete.disconnect, receiver)
+
+        with mock.patch("sentry.buffer.base.post_save") as post_save:
+            self.buf.bulk_process(incrs)
+
+        for i, group in enumerate(groups):
+            group.refresh_from_db()
+            assert group.times_seen == i + 2
+            assert group.last_seen == the_date
+            assert group.score == round(math.log10(i + 2) * 600 + int(the_date.timestamp()))
+        assert post_save.send.call_count == 3
+        assert post_save.send.call_args.kwargs["update_fields"] == [
+            "times_seen",
+            "last_seen",
+            "score",
+        ]
+
+        release_project.refresh_from_db()
+        assert release_project.new_groups == 1
+        assert ReleaseProject.objects.get(release=other_release).new_groups == 2
+
+        assert len(completed) == len(incrs)
+        assert (ReleaseProject, incrs[-1].filters, True) in completed
+        assert (Group, {"id": 0}, False) in completed
+
     def test_push_to_hash_bulk(self):
         raises(NotImplementedError, self.buf.push_to_hash_bulk, Group, {"id": 1}, {"foo": "bar"})
 
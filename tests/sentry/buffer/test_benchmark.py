@@ -0,0 +1,36 @@
+import pytest
+from django.utils import timezone
+
+from sentry.buffer.base import Buffer
+from sentry.buffer.bulk import BufferedIncr
+from sentry.models.group import Group
+from sentry.testutils.factories import Factories
+from sentry.testutils.pytest.fixtures import django_db_all
+from sentry.testutils.skips import requires_pytest_benchmark
+
+
+@requires_pytest_benchmark
+@django_db_all
+@pytest.mark.parametrize("keys", [10, 100, 1000])
+@pytest.mark.parametrize("bulk", [False, True], ids=["single", "bulk"])
+def test_benchmark_flush(default_project, keys, bulk, benchmark):
+    """
+    Flush a batch of group counters, one statement per key and in bulk, to compare keys/sec.
+    """
+    buf = Buffer()
+    groups = [Factories.create_group(project=default_project, times_seen=1) for _ in range(keys)]
+    incrs = [
+        BufferedIncr(Group, {"times_seen": 1}, {"id": group.id}, {"last_seen": timezone.now()})
+        for group in groups
+    ]
+
+    def flush():
+        if bulk:
+            buf.bulk_process(incrs)
+        else:
+            for incr in incrs:
+                buf.process(incr.model, incr.columns, incr.filters, incr.extra)
+
+    benchmark.pedantic(flush, rounds=10)
+    benchmark.extra_info["keys"] = keys
+    assert Group.objects.get(id=groups[0].id).times_seen == 1 + 10
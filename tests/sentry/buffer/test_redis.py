@@ -1,5 +1,6 @@
 import datetime
 import pickle
+import time
 from collections import defaultdict
 from collections.abc import Mapping
 from unittest import mock
@@ -9,6 +10,7 @@ import pytest
 from django.utils import timezone
 
 from sentry import options
+from sentry.buffer.bulk import BufferedIncr
 from sentry.buffer.redis import (
     BufferHookEvent,
     RedisBuffer,
@@ -127,6 +129,91 @@ class TestRedisBuffer:
         self.buf.process("foo")
         process.assert_called_once_with(Group, columns, filters, extra, signal_only)
 
+    @mock.patch("sentry.buffer.redis.process_incr")
+    @mock.patch("sentry.buffer.redis.metrics")
+    def test_process_pending_in_chunks(self, metrics, process_incr, set_sentry_option):
+        set_sentry_option("buffer.pending-chunk-size", 2)
+        self.buf.incr_batch_size = 10
+        client = get_cluster_routing_client(self.buf.cluster, self.buf.is_redis_cluster)
+        now = time.time()
+        client.zadd("b:p", {"foo": now - 30, "bar": now - 20, "baz": now - 10})
+        # Keys added while draining are left to the next run
+        client.zadd("b:p", {"qux": now + 60})
+
+        self.buf.process_pending()
+        process_incr.apply_async.assert_called_once_with(
+            kwargs={"batch_keys": ["foo", "bar", "baz"]}, headers=mock.ANY
+        )
+        assert client.zrange("b:p", 0, -1) in (["qux"], [b"qux"])
+
+        metrics.distribution.assert_any_call("buffer.pending-size", 3, tags={"pending_set": "0"})
+        (age,) = [
+            call.args[1]
+            for call in metrics.distribution.call_args_list
+            if call.args[0] == "buffer.pending-age"
+        ]
+        assert 30 <= age < 40
+
+    @mock.patch("sentry.buffer.redis.process_incr")
+    def test_process_pending_partitions(self, process_incr, set_sentry_option):
+        set_sentry_option("buffer.pending-partitions", 4)
+        self.buf.incr_batch_size = 100
+        for pk in range(40):
+            self.buf.incr(Group, {"times_seen": 1}, {"pk": pk})
+
+        client = get_cluster_routing_client(self.buf.cluster, self.buf.is_redis_cluster)
+        sizes = [
+            client.zcard(self.buf._make_pending_key(index))
+            for index in range(self.buf.pending_set_count)
+        ]
+        assert sum(sizes) == 40
+        assert len([size for size in sizes if size]) > 1
+
+        self.buf.process_pending(partition=1)
+        for index, size in enumerate(sizes):
+            expected = 0 if index % 4 == 1 else size
+            assert client.zcard(self.buf._make_pending_key(index)) == expected
+
+        # Fewer partitions still drain all pending sets
+        set_sentry_option("buffer.pending-partitions", 2)
+        self.buf.process_pending(partition=0)
+        self.buf.process_pending(partition=1)
+        keys = [
+            key
+            for call in process_incr.apply_async.call_args_list
+            for key in call.kwargs["kwargs"]["batch_keys"]
+        ]
+        assert sorted(keys) == sorted(self.buf._make_key(Group, {"pk": pk}) for pk in range(40))
+
+    def test_incr_keeps_first_enqueue_time(self):
+        client = get_cluster_routing_client(self.buf.cluster, self.buf.is_redis_cluster)
+        key = self.buf._make_key(Group, {"pk": 1})
+        with mock.patch("sentry.buffer.redis.time", return_value=100.0):
+            self.buf.incr(Group, {"times_seen": 1}, {"pk": 1})
+        with mock.patch("sentry.buffer.redis.time", return_value=200.0):
+            self.buf.incr(Group, {"times_seen": 1}, {"pk": 1})
+
+        assert client.zscore(self.buf._get_pending_key(key), key) == 100.0
+
+    @mock.patch("sentry.buffer.base.Buffer.bulk_process")
+    def test_process_batch_keys_in_bulk(self, bulk_process, set_sentry_option):
+        set_sentry_option("buffer.bulk-process.enabled", True)
+        self.buf.incr(Group, {"times_seen": 1}, {"pk": 1})
+        self.buf.incr(Group, {"times_seen": 2}, {"pk": 2})
+        keys = [self.buf._make_key(Group, {"pk": 1}), self.buf._make_key(Group, {"pk": 2})]
+
+        self.buf.process(batch_keys=[*keys, "missing"])
+        bulk_process.assert_called_once_with(
+            [
+                BufferedIncr(Group, {"times_seen": 1}, {"pk": 1}, {}, None),
+                BufferedIncr(Group, {"times_seen": 2}, {"pk": 2}, {}, None),
+            ]
+        )
+        client = get_cluster_routing_client(self.buf.cluster, self.buf.is_redis_cluster)
+        for key in keys:
+            assert not client.exists(key)
+            assert not client.exists(self.buf._make_lock_key(key))
+
     @django_db_all
     @freeze_time()
     def test_group_cache_updated(self, default_group, task_runner):
@@ -187,7 +274,7 @@ class TestRedisBuffer:
         else:
             assert result == {"i+times_seen": b"1", "m": b"unittest.mock.Mock"}
 
-        pending = client.zrange("b:p", 0, -1)
+        pending = client.zrange(self.buf._get_pending_key(key), 0, -1)
         if self.buf.is_redis_cluster:
             assert pending == [key]
         else:
@@ -203,7 +290,7 @@ class TestRedisBuffer:
         else:
             assert result == {"i+times_seen": b"2", "m": b"unittest.mock.Mock"}
 
-        pending = client.zrange("b:p", 0, -1)
+        pending = client.zrange(self.buf._get_pending_key(key), 0, -1)
         if self.buf.is_redis_cluster:
             assert pending == [key]
         else:
@@ -0,0 +1,131 @@
+from unittest import mock
+
+from sentry import features
+from sentry.features.base import OrganizationFeature, ProjectFeature
+from sentry.features.evaluation import feature_evaluation_context, get_evaluation_context
+from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
+
+
+class FeatureEvaluationContextTest(TestCase):
+    def setUp(self):
+        self.manager = features.FeatureManager()
+        self.manager.add("organizations:feature", OrganizationFeature)
+        self.manager.add("projects:feature", ProjectFeature)
+
+        self.entity_handler = mock.Mock(spec=features.FeatureHandler)
+        self.entity_handler.has.return_value = True
+        self.entity_handler.batch_has.side_effect = (
+            lambda feature_names, actor, projects, **kwargs: {
+                f"project:{project.id}": {name: project.slug != "off" for name in feature_names}
+                for project in projects
+            }
+        )
+        self.manager.add_entity_handler(self.entity_handler)
+
+    def test_disabled(self):
+        with feature_evaluation_context("test") as context:
+            assert context is None
+            assert self.manager.has("organizations:feature", self.organization)
+            assert self.manager.has("organizations:feature", self.organization)
+        assert self.entity_handler.has.call_count == 2
+
+    def test_forced(self):
+        with feature_evaluation_context("test", force=True) as context:
+            assert context is not None
+            assert self.manager.has("organizations:feature", self.organization)
+            assert self.manager.has("organizations:feature", self.organization)
+        assert self.entity_handler.has.call_count == 1
+        assert get_evaluation_context() is None
+
+    @override_options({"features.evaluation-context.enabled": True})
+    def test_memoizes(self):
+        user = self.create_user()
+        other_organization = self.create_organization()
+
+        with feature_evaluation_context("test") as context:
+            assert get_evaluation_context() is context
+
+            with feature_evaluation_context("nested") as nested:
+                assert nested is context
+
+            for _ in range(3):
+                assert self.manager.has("organizations:feature", self.organization)
+                assert self.manager.has("organizations:feature", self.organization, actor=user)
+                assert self.manager.has("organizations:feature", other_organization)
+            assert self.entity_handler.has.call_count == 3
+
+            # Skipping the entity handler changes the result, so it is never memoized
+            self.manager.has("organizations:feature", self.organization, skip_entity=True)
+            self.manager.has("organizations:feature", self.organization, skip_entity=True)
+            assert self.entity_handler.has.call_count == 3
+
+            assert context.evaluations == 3
+            assert context.hits == 6
+
+        assert get_evaluation_context() is None
+        assert self.manager.has("organizations:feature", self.organization)
+        assert self.entity_handler.has.call_count == 4
+
+    @override_options({"features.evaluation-context.enabled": True})
+    def test_batches_projects(self):
+        projects = [
+            self.create_project(organization=self.organization, slug=slug)
+            for slug in ("on", "off", "also-on")
+        ]
+
+        with feature_evaluation_context("test") as context:
+            context.add_projects(projects)
+            assert [self.manager.has("projects:feature", project) for project in projects] == [
+                True,
+                False,
+                True,
+            ]
+
+        assert self.entity_handler.batch_has.call_count == 1
+        assert self.entity_handler.has.call_count == 0
+        assert context.evaluations == 3
+        assert context.hits == 2
+
+    @override_options({"features.evaluation-context.enabled": True})
+    def test_batches_projects_with_handlers(self):
+        class ProjectHandler(features.BatchFeatureHandler):
+            features = {"projects:feature"}
+
+            def _check_for_batch(self, feature_name, organization, actor):
+                return None
+
+            def batch_has(self, *args, **kwargs):
+                raise NotImplementedError
+
+        handler = ProjectHandler()
+        self.manager.add_handler(handler)
+
+        projects = [self.create_project(organization=self.organization) for _ in range(3)]
+        with (
+            mock.patch.object(handler, "has_for_batch", wraps=handler.has_for_batch) as batch,
+            feature_evaluation_context("test") as context,
+        ):
+            # Projects added to the context are checked in one batch
+            assert self.manager.has("projects:feature", projects[0])
+            context.add_projects(projects[1:])
+            assert self.manager.has("projects:feature", projects[1])
+            assert self.manager.has("projects:feature", projects[2])
+
+        assert batch.call_count == 1
+        assert self.entity_handler.batch_has.call_count == 1
+        assert self.entity_handler.has.call_count == 1
+
+    @override_options({"features.evaluation-context.enabled": True})
+    def test_reports_metrics(self):
+        with mock.patch("sentry.features.evaluation.metrics") as metrics:
+            with feature_evaluation_context("test"):
+                self.manager.has("organizations:feature", self.organization)
+                self.manager.has("organizations:feature", self.organization)
+
+        metrics.distribution.assert_any_call(
+            "features.evaluation_context.evaluations", 1, tags={"context": "test"}
+        )
+        metrics.distribution.assert_any_call(
+            "features.evaluation_context.hits", 1, tags={"context": "test"}
+        )
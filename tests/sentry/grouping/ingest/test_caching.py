@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from sentry.grouping.ingest.caching import GroupHashCache, grouphash_cache
+from sentry.grouping.ingest.hashing import get_group_for_grouphash, get_or_create_grouphashes_many
+from sentry.models.group import GroupStatus
+from sentry.models.grouphash import GroupHash
+from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
+
+
+def _grouphash(id: int, project_id: int, hash: str, group_id: int | None) -> GroupHash:
+    return GroupHash(id=id, project_id=project_id, hash=hash, group_id=group_id)
+
+
+class GroupHashCacheTest(TestCase):
+    def test_only_caches_grouphashes_with_groups(self):
+        cache = GroupHashCache()
+        cache.set_many(
+            [
+                _grouphash(1, 11, "a" * 32, 21),
+                _grouphash(2, 11, "b" * 32, None),
+                GroupHash(id=3, project_id=11, hash="c" * 32, group_id=None, group_tombstone_id=5),
+                GroupHash(
+                    id=4,
+                    project_id=11,
+                    hash="d" * 32,
+                    group_id=22,
+                    state=GroupHash.State.LOCKED_IN_MIGRATION,
+                ),
+            ],
+            ttl=60,
+        )
+
+        cached = cache.get_many(11, ["a" * 32, "b" * 32, "c" * 32, "d" * 32])
+        assert list(cached) == ["a" * 32]
+        assert cached["a" * 32].grouphash_id == 1
+        assert cached["a" * 32].group_id == 21
+
+    def test_evicts_least_recently_used(self):
+        cache = GroupHashCache(max_size=2)
+        cache.set_many([_grouphash(1, 11, "a" * 32, 21), _grouphash(2, 11, "b" * 32, 22)], ttl=60)
+
+        # Touch "a" so that "b" becomes the oldest entry
+        cache.get_many(11, ["a" * 32])
+        cache.set_many([_grouphash(3, 11, "c" * 32, 23)], ttl=60)
+
+        assert len(cache) == 2
+        assert set(cache.get_many(11, ["a" * 32, "b" * 32, "c" * 32])) == {"a" * 32, "c" * 32}
+
+    def test_expires_entries(self):
+        cache = GroupHashCache()
+        with patch("sentry.grouping.ingest.caching.time.monotonic", return_value=100.0):
+            cache.set_many([_grouphash(1, 11, "a" * 32, 21)], ttl=10)
+
+        with patch("sentry.grouping.ingest.caching.time.monotonic", return_value=109.0):
+            assert cache.get_many(11, ["a" * 32])
+        with patch("sentry.grouping.ingest.caching.time.monotonic", return_value=110.0):
+            assert not cache.get_many(11, ["a" * 32])
+        assert len(cache) == 0
+
+    def test_invalidate(self):
+        cache = GroupHashCache()
+        grouphashes = [
+            _grouphash(1, 11, "a" * 32, 21),
+            _grouphash(2, 11, "b" * 32, 22),
+            _grouphash(3, 12, "c" * 32, 23),
+        ]
+
+        cache.set_many(grouphashes, ttl=60)
+        cache.invalidate(project_id=11, hashes=["a" * 32])
+        assert set(cache.get_many(11, ["a" * 32, "b" * 32])) == {"b" * 32}
+
+        cache.set_many(grouphashes, ttl=60)
+        cache.invalidate(group_ids=[22, 23])
+        assert set(cache.get_many(11, ["a" * 32, "b" * 32])) == {"a" * 32}
+        assert not cache.get_many(12, ["c" * 32])
+
+        cache.set_many(grouphashes, ttl=60)
+        cache.invalidate(project_id=11)
+        assert not cache.get_many(11, ["a" * 32, "b" * 32])
+        assert cache.get_many(12, ["c" * 32])
+
+
+class GetOrCreateGroupHashesManyTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        grouphash_cache.clear()
+
+    def test_deduplicates_hashes_across_batch(self):
+        other_project = self.create_project(organization=self.organization)
+        existing = GroupHash.objects.create(project=self.project, hash="a" * 32, group=self.group)
+
+        results = get_or_create_grouphashes_many(
+            [
+                (self.project, ["a" * 32, "b" * 32]),
+                (self.project, ["b" * 32]),
+                (other_project, ["a" * 32]),
+            ]
+        )
+
+        assert [[gh.hash for gh in grouphashes] for grouphashes in results] == [
+            ["a" * 32, "b" * 32],
+            ["b" * 32],
+            ["a" * 32],
+        ]
+        assert results[0][0].id == existing.id
+        assert results[0][0].group_id == self.group.id
+        assert results[0][1].id == results[1][0].id
+        assert results[2][0].project_id == other_project.id
+        assert results[2][0].group_id is None
+        assert GroupHash.objects.filter(hash="b" * 32).count() == 1
+
+    def test_query_count_does_not_scale_with_events(self):
+        GroupHash.objects.create(project=self.project, hash="a" * 32, group=self.group)
+
+        with self.assertNumQueries(1):
+            get_or_create_grouphashes_many([(self.project, ["a" * 32])] * 100)
+
+    def test_uses_cache_for_live_groups(self):
+        grouphash = GroupHash.objects.create(project=self.project, hash="a" * 32, group=self.group)
+
+        # Uncached, resolving the grouphash and loading its group takes a query each
+        with self.assertNumQueries(2):
+            [[resolved]] = get_or_create_grouphashes_many([(self.project, ["a" * 32])])
+            get_group_for_grouphash(resolved)
+
+        with override_options({"grouping.grouphash_cache.enabled": True}):
+            get_or_create_grouphashes_many([(self.project, ["a" * 32])])
+
+            # Cached, only the group is loaded
+            with self.assertNumQueries(1):
+                [[cached]] = get_or_create_grouphashes_many([(self.project, ["a" * 32])])
+                assert get_group_for_grouphash(cached) == self.group
+
+            assert cached.id == grouphash.id
+            assert cached.group_id == self.group.id
+
+    def test_reloads_cached_grouphashes_of_merged_groups(self):
+        new_group = self.create_group(project=self.project)
+        grouphash = GroupHash.objects.create(project=self.project, hash="a" * 32, group=self.group)
+
+        with override_options({"grouping.grouphash_cache.enabled": True}):
+            get_or_create_grouphashes_many([(self.project, ["a" * 32])])
+
+            # Simulate a merge happening in another process, which can't touch our cache
+            self.group.update(status=GroupStatus.PENDING_MERGE)
+            GroupHash.objects.filter(id=grouphash.id).update(group=new_group)
+
+            [[resolved]] = get_or_create_grouphashes_many([(self.project, ["a" * 32])])
+            assert get_group_for_grouphash(resolved) == new_group
+            assert resolved.group_id == new_group.id
+
+            # The stale entry was dropped
+            [[resolved]] = get_or_create_grouphashes_many([(self.project, ["a" * 32])])
+            assert resolved.group_id == new_group.id
+
+    def test_reloads_cached_grouphashes_of_deleted_groups(self):
+        new_group = self.create_group(project=self.project)
+        grouphash = GroupHash.objects.create(project=self.project, hash="a" * 32, group=self.group)
+
+        with override_options({"grouping.grouphash_cache.enabled": True}):
+            get_or_create_grouphashes_many([(self.project, ["a" * 32])])
+
+            GroupHash.objects.filter(id=grouphash.id).update(group=new_group)
+            self.group.delete()
+
+            [[resolved]] = get_or_create_grouphashes_many([(self.project, ["a" * 32])])
+            assert get_group_for_grouphash(resolved) == new_group
@@ -1,22 +1,19 @@
+from unittest import mock
+
 import pytest
 
 from sentry.grouping.api import get_default_grouping_config_dict
+from sentry.grouping.enhancer import ENHANCEMENT_BASES
+from sentry.grouping.enhancer.matchers import _create_match_frame_cached
 from sentry.grouping.strategies.configurations import CONFIGURATIONS
+from sentry.stacktraces.processing import find_stacktraces_in_data
+from sentry.testutils.skips import requires_pytest_benchmark
 from tests.sentry.grouping import grouping_input as grouping_inputs
 
 CONFIGS = {key: get_default_grouping_config_dict(key) for key in sorted(CONFIGURATIONS.keys())}
 
 
-def benchmark_available() -> bool:
-    try:
-        __import__("pytest_benchmark")
-    except ModuleNotFoundError:
-        return False
-    else:
-        return True
-
-
-@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@requires_pytest_benchmark
 @pytest.mark.parametrize(
     "config_name", sorted(CONFIGURATIONS.keys()), ids=lambda x: x.replace("-", "_")
 )
@@ -37,3 +34,41 @@ def run_configuration(grouping_input, config):
     event.project = None
 
     event.get_hashes()
+
+
+@requires_pytest_benchmark
+@pytest.mark.parametrize("base_id", sorted(ENHANCEMENT_BASES.keys()))
+@pytest.mark.parametrize("memoized", [True, False], ids=["memoized", "unmemoized"])
+def test_benchmark_enhancements(base_id, memoized, benchmark):
+    """
+    Run every enhancement base against the frames of all grouping inputs, with and without the
+    match frame memo, to compare rules/sec.
+    """
+    enhancements = ENHANCEMENT_BASES[base_id]
+    stacktraces = []
+    for grouping_input in grouping_inputs:
+        platform = grouping_input.data.get("platform") or "python"
+        for stacktrace_info in find_stacktraces_in_data(grouping_input.data):
+            frames = stacktrace_info.get_frames()
+            if frames:
+                stacktraces.append((frames, platform))
+
+    def run():
+        for frames, platform in stacktraces:
+            frames = [dict(frame) for frame in frames]
+            enhancements.apply_modifications_to_frame(frames, platform, {})
+
+    if memoized:
+        _create_match_frame_cached.cache_clear()
+        benchmark(run)
+    else:
+        with mock.patch(
+            "sentry.grouping.enhancer.matchers._create_match_frame_cached",
+            side_effect=TypeError,
+        ):
+            benchmark(run)
+
+    num_frames = sum(len(frames) for frames, _ in stacktraces)
+    benchmark.extra_info["rules_per_sec"] = (
+        len(enhancements.rules) * num_frames / benchmark.stats.stats.mean
+    )
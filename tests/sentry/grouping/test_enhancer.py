@@ -494,3 +494,40 @@ def test_cached_with_kwargs():
     # Call with different kwargs order - call_count is still one:
     _cached(cache, foo, kw2=2, kw1=1)
     assert foo.call_count == 1
+
+
+def test_create_match_frame_is_memoized():
+    frame = {"function": "foo", "abs_path": "C:\\Foo\\Bar.dll", "data": {"category": "std"}}
+
+    first = create_match_frame(frame, "native")
+    second = create_match_frame(dict(frame), "native")
+
+    assert (
+        first
+        == second
+        == {
+            "category": b"std",
+            "family": "native",
+            "function": b"foo",
+            "in_app": None,
+            "orig_in_app": None,
+            "module": None,
+            "package": None,
+            "path": b"c:/foo/bar.dll",
+        }
+    )
+    # Callers get their own copy, so mutating one can't poison the memo
+    assert first is not second
+    first["function"] = b"bar"
+    assert create_match_frame(frame, "native")["function"] == b"foo"
+
+    # The platform is part of the memo key
+    assert create_match_frame(frame, "python")["family"] == "other"
+
+
+def test_create_match_frame_with_unhashable_values():
+    frame = {"module": ["not", "a", "string"], "package": "foo"}
+
+    match_frame = create_match_frame(frame, "native")
+    assert match_frame["module"] == ["not", "a", "string"]
+    assert match_frame["package"] == b"foo"
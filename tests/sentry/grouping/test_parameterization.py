@@ -7,6 +7,14 @@ from sentry.grouping.parameterization import (
     Parameterizer,
     UniqueIdExperiment,
 )
+from sentry.testutils.skips import requires_pytest_benchmark
+
+
+@pytest.fixture(autouse=True)
+def clear_parameterization_cache():
+    Parameterizer.clear_cache()
+    yield
+    Parameterizer.clear_cache()
 
 
 @pytest.fixture
@@ -268,6 +276,89 @@ def test_parameterize_regex_experiment_cached_compiled():
     mocked_pattern.assert_called_once()
 
 
+def test_parameterize_cached_result_replays_match_counts(parameterizer):
+    input = "blah 0.0.0.0 had a problem with 7c1811ed-e98f-4c9c-a9f9-58c757ff494f at 0xdeadbeef"
+    expected = "blah <ip> had a problem with <uuid> at <hex>"
+
+    assert parameterizer.parameterize_all(input) == expected
+    first_counts = dict(parameterizer.matches_counter)
+
+    with mock.patch.object(Parameterizer, "parametrize_w_regex") as mock_regex:
+        cached_parameterizer = Parameterizer(
+            regex_pattern_keys=parameterizer._regex_pattern_keys,
+            experiments=(UniqueIdExperiment,),
+        )
+        assert cached_parameterizer.parameterize_all(input) == expected
+        assert mock_regex.call_count == 0
+
+    assert (
+        dict(cached_parameterizer.matches_counter)
+        == first_counts
+        == {
+            "ip": 1,
+            "uuid": 1,
+            "hex": 1,
+        }
+    )
+
+
+def test_parameterize_cache_respects_enabled_experiments(parameterizer):
+    input = """API gateway VdLchF7iDo8sVkg= blah"""
+
+    assert parameterizer.parameterize_all(input, lambda _: False) == input
+    assert parameterizer.parameterize_all(input) == "API gateway <uniq_id> blah"
+    assert parameterizer.parameterize_all(input, lambda _: False) == input
+
+
+# Messages modelled after real-world log lines, used to check that caching doesn't change the
+# output and to benchmark the parameterizer
+LOG_MESSAGE_CORPUS = [
+    "Connection reset by peer while talking to 10.0.12.113:6379",
+    "Timeout after 3000ms waiting for db-replica-3.internal.example.com",
+    "User 1234567 not found in organization 987654",
+    "Failed to process payment pi_3NZaVf2eZvKYlo2C1gTkBfZP for customer cus_OFx8n1mPqwr2KL",
+    'Invalid value for field "email": john.doe@example.org',
+    "Request to https://api.example.com/v2/orders/44812?expand=items failed with status 502",
+    "Task 7c1811ed-e98f-4c9c-a9f9-58c757ff494f exceeded soft time limit (300s)",
+    "Segmentation fault at address 0x00007ffd5e8c3a10",
+    'SQL: RELEASE SAVEPOINT "s140177518376768_x2"',
+    "KeyError: 'startRTM' of undefined",
+    "Checksum mismatch: expected da39a3ee5e6b4b0d3255bfef95601890afd80709",
+    "Job finished at 2024-03-18T22:52:00Z after 1.53s with retries=3 cached=false",
+    'Permission denied to access property "__reactFiber$b6c78e70asw"',
+    "fbtrace_id Aba64NMEPMmBwi_cPLaGeeK AugPfq0jxGbto4u3kxn8u6p",
+    "A quick brown fox jumped over the lazy dog",
+]
+
+
+@pytest.mark.parametrize("input", LOG_MESSAGE_CORPUS)
+def test_parameterize_cache_matches_uncached(input, parameterizer):
+    uncached = Parameterizer(
+        regex_pattern_keys=parameterizer._regex_pattern_keys,
+        experiments=(UniqueIdExperiment,),
+    )
+    expected = uncached.parametrize_w_experiments(uncached.parametrize_w_regex(input))
+
+    # The first call fills the cache, the second one is served from it
+    assert parameterizer.parameterize_all(input) == expected
+    assert parameterizer.parameterize_all(input) == expected
+    assert parameterizer.matches_counter == {
+        key: count * 2 for key, count in uncached.matches_counter.items()
+    }
+
+
+@requires_pytest_benchmark
+@pytest.mark.parametrize("cached", [True, False], ids=["cached", "uncached"])
+def test_benchmark_parameterize(cached, parameterizer, benchmark):
+    def run():
+        if not cached:
+            Parameterizer.clear_cache()
+        for message in LOG_MESSAGE_CORPUS:
+            parameterizer.parameterize_all(message)
+
+    benchmark(run)
+
+
 # These are test cases that we should fix
 @pytest.mark.xfail()
 @pytest.mark.parametrize(
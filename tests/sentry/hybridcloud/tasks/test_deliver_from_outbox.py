@@ -0,0 +1,111 @@
+from unittest.mock import Mock, call, patch
+
+from django.core.cache import cache
+
+from sentry.hybridcloud.models.outbox import RegionOutbox, outbox_context
+from sentry.hybridcloud.outbox.category import OutboxCategory
+from sentry.hybridcloud.tasks.deliver_from_outbox import (
+    enqueue_outbox_jobs,
+    get_batch_count,
+    get_category_name,
+    process_outbox_batch,
+    record_shard_latency,
+)
+from sentry.models.organization import Organization
+from sentry.models.organizationmember import OrganizationMember
+from sentry.testutils.cases import TestCase, TransactionTestCase
+from sentry.testutils.helpers import override_options
+
+
+class AdaptiveBatchCountTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_without_target(self) -> None:
+        record_shard_latency("sentry.RegionOutbox", duration=10.0, shard_count=10)
+        assert get_batch_count("sentry.RegionOutbox", 1000, 5) == 5
+
+    @override_options({"hybridcloud.outbox.target_batch_seconds": 10.0})
+    def test_from_observed_latency(self) -> None:
+        # Nothing was observed yet.
+        assert get_batch_count("sentry.RegionOutbox", 100, 1) == 1
+
+        record_shard_latency("sentry.RegionOutbox", duration=5.0, shard_count=10)
+        assert get_batch_count("sentry.RegionOutbox", 100, 1) == 5
+        assert get_batch_count("sentry.RegionOutbox", 100, 8) == 8
+        assert get_batch_count("sentry.RegionOutbox", 100000, 1) == 50
+
+        # Slower batches move the average towards their latency.
+        record_shard_latency("sentry.RegionOutbox", duration=25.0, shard_count=10)
+        assert get_batch_count("sentry.RegionOutbox", 100, 1) == 9
+
+    @override_options({"hybridcloud.outbox.target_batch_seconds": 10.0})
+    @patch("sentry.hybridcloud.tasks.deliver_from_outbox.drain_outbox_shards.delay")
+    def test_enqueue_outbox_jobs(self, mock_delay: Mock) -> None:
+        with outbox_context(flush=False):
+            for i in range(20):
+                Organization(id=10000 + i).outbox_for_update().save()
+
+        record_shard_latency("sentry.RegionOutbox", duration=10.0, shard_count=1)
+        enqueue_outbox_jobs(process_outbox_backfills=False)
+        assert mock_delay.call_count == 20
+
+    @patch("sentry.hybridcloud.tasks.deliver_from_outbox.metrics")
+    def test_category_outbox_count(self, mock_metrics: Mock) -> None:
+        with outbox_context(flush=False):
+            Organization(id=10001).outbox_for_update().save()
+            Organization(id=10002).outbox_for_update().save()
+            OrganizationMember(organization_id=10001, id=1).outbox_for_update().save()
+
+        assert RegionOutbox.get_category_depths() == {
+            OutboxCategory.ORGANIZATION_UPDATE: 2,
+            OutboxCategory.ORGANIZATION_MEMBER_UPDATE: 1,
+        }
+        with self.tasks():
+            enqueue_outbox_jobs(process_outbox_backfills=False)
+
+        tags = {"silo_mode": "REGION", "outbox_name": "sentry.RegionOutbox"}
+        mock_metrics.gauge.assert_has_calls(
+            [
+                call(
+                    "deliver_from_outbox.category_outbox_count",
+                    value=2,
+                    tags={**tags, "category": "ORGANIZATION_UPDATE"},
+                    sample_rate=1.0,
+                ),
+                call(
+                    "deliver_from_outbox.category_outbox_count",
+                    value=1,
+                    tags={**tags, "category": "ORGANIZATION_MEMBER_UPDATE"},
+                    sample_rate=1.0,
+                ),
+            ],
+            any_order=True,
+        )
+        mock_metrics.gauge.assert_any_call(
+            "deliver_from_outbox.total_outbox_count", value=3, tags=tags, sample_rate=1.0
+        )
+
+    def test_category_name(self) -> None:
+        assert get_category_name(OutboxCategory.ORGANIZATION_UPDATE) == "ORGANIZATION_UPDATE"
+        # Retired categories don't fail the scheduling of the remaining outboxes
+        assert get_category_name(10000) == "10000"
+
+
+class ConcurrentDrainTest(TransactionTestCase):
+    @override_options({"hybridcloud.outbox.drain_threads": 4})
+    @patch("sentry.hybridcloud.models.outbox.process_region_outbox.send")
+    def test_process_outbox_batch(self, mock_send: Mock) -> None:
+        with outbox_context(flush=False):
+            for i in range(10):
+                Organization(id=10000 + i).outbox_for_update().save()
+                Organization(id=10000 + i).outbox_for_update().save()
+
+        assert process_outbox_batch(RegionOutbox.objects.latest("id").id + 1, 0, RegionOutbox) == 10
+
+        # Each shard is drained once, with its outboxes coalesced.
+        assert mock_send.call_count == 10
+        assert {c.kwargs["shard_identifier"] for c in mock_send.call_args_list} == {
+            10000 + i for i in range(10)
+        }
+        assert not RegionOutbox.objects.exists()
@@ -1,5 +1,6 @@
 from collections.abc import Generator, Iterator
 from random import Random
+from unittest import mock
 
 from django.core.cache import cache
 
@@ -9,11 +10,20 @@ from sentry.hybridcloud.rpc.caching import (
     control_caching_service,
     region_caching_service,
 )
-from sentry.hybridcloud.rpc.caching.impl import CacheBackend, _consume_generator
+from sentry.hybridcloud.rpc.caching.impl import (
+    CacheBackend,
+    _consume_generator,
+    _delete_cache,
+    _in_flight,
+    _InFlightCalls,
+    _local_cache,
+    _versioned_key,
+)
 from sentry.organizations.services.organization.model import RpcOrganizationSummary
 from sentry.organizations.services.organization.service import organization_service
 from sentry.silo.base import SiloMode
 from sentry.testutils.factories import Factories
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.pytest.fixtures import django_db_all
 from sentry.testutils.silo import assume_test_silo_mode, control_silo_test, no_silo_test
 from sentry.types.region import get_local_region
@@ -279,3 +289,126 @@ def test_caching_many_versioning() -> None:
 
     after_clear = get_users(user_ids)
     assert len(after_clear) == 2
+
+
+@django_db_all(transaction=True)
+@override_options(
+    {"hybridcloud.caching.local-cache-size": 100, "hybridcloud.caching.local-version-ttl": 60.0}
+)
+def test_caching_local_tier() -> None:
+    cache.clear()
+    _local_cache.clear()
+
+    @back_with_silo_cache(base_key="my-test-key", silo_mode=SiloMode.REGION, t=RpcUser)
+    def get_user(user_id: int) -> RpcUser:
+        return user_service.get_many(filter=dict(user_ids=[user_id]))[0]
+
+    user = Factories.create_user()
+    cached = get_user(user.id)
+    assert cached
+
+    # Served from process memory, without the django cache.
+    cache.clear()
+    with mock.patch.object(get_user, "cb") as cb:
+        assert get_user(user.id) == cached
+        assert not cb.called
+
+    with assume_test_silo_mode(SiloMode.CONTROL):
+        user.update(username=user.username + "moocow")
+
+    # Invalidations made by this process are seen immediately.
+    region_caching_service.clear_key(
+        region_name=get_local_region().name, key=get_user.key_from(user.id)
+    )
+    updated = get_user(user.id)
+    assert updated
+    assert updated.username == user.username
+
+    _local_cache.clear()
+
+
+@django_db_all(transaction=True)
+def test_caching_many_all_cached() -> None:
+    cache.clear()
+
+    @back_with_silo_cache_many(base_key="get_users", silo_mode=SiloMode.REGION, t=RpcUser)
+    def get_users(user_ids: list[int]) -> list[RpcUser]:
+        return user_service.get_many(filter=dict(user_ids=user_ids))
+
+    users = [Factories.create_user() for _ in range(2)]
+    user_ids = [u.id for u in users]
+    assert len(get_users(user_ids)) == 2
+
+    with mock.patch.object(get_users, "cb") as cb:
+        assert [u.id for u in get_users(user_ids)] == user_ids
+        assert not cb.called
+
+
+@override_options({"hybridcloud.caching.coalesce-timeout": 1.0})
+def test_in_flight_calls() -> None:
+    in_flight = _InFlightCalls()
+
+    owned, waiting = in_flight.claim(["a", "b"])
+    assert set(owned) == {"a", "b"}
+    assert waiting == {}
+
+    # A concurrent miss waits for the owner instead of calling again.
+    owned2, waiting2 = in_flight.claim(["b", "c"])
+    assert set(owned2) == {"c"}
+    assert set(waiting2) == {"b"}
+
+    in_flight.release(owned, {"a": "value-a", "b": "value-b"})
+    assert waiting2["b"].result(timeout=1) == "value-b"
+    in_flight.release(owned2, error=ValueError("failed"))
+    assert isinstance(owned2["c"].exception(timeout=1), ValueError)
+
+    # Released keys are fetched again by the next miss.
+    owned3, waiting3 = in_flight.claim(["a"])
+    assert set(owned3) == {"a"}
+    assert waiting3 == {}
+
+
+@override_options({"hybridcloud.caching.coalesce-timeout": 0.01})
+def test_in_flight_calls_wait() -> None:
+    in_flight = _InFlightCalls()
+
+    owned, _ = in_flight.claim(["a", "b"])
+    _, waiting = in_flight.claim(["a", "b"])
+    in_flight.release({"a": owned["a"]}, {"a": "value-a"})
+
+    # Calls that don't finish in time are left to the waiter.
+    assert in_flight.wait(waiting) == ({"a": "value-a"}, ["b"])
+    in_flight.release({"b": owned["b"]}, {"b": "value-b"})
+
+
+@override_options({"hybridcloud.caching.coalesce-timeout": 0.0})
+def test_in_flight_calls_disabled() -> None:
+    in_flight = _InFlightCalls()
+
+    owned, waiting = in_flight.claim(["a"])
+    owned2, waiting2 = in_flight.claim(["a"])
+    assert set(owned) == set(owned2) == {"a"}
+    assert waiting == waiting2 == {}
+
+
+@django_db_all(transaction=True)
+@override_options({"hybridcloud.caching.coalesce-timeout": 0.01})
+def test_caching_coalesce_timeout() -> None:
+    cache.clear()
+
+    @back_with_silo_cache_many(base_key="get_users", silo_mode=SiloMode.REGION, t=RpcUser)
+    def get_users(user_ids: list[int]) -> list[RpcUser]:
+        return user_service.get_many(filter=dict(user_ids=user_ids))
+
+    users = [Factories.create_user() for _ in range(2)]
+    user_ids = [u.id for u in users]
+
+    # Another caller claimed the first user, but never finishes fetching it.
+    version = _consume_generator(_delete_cache(get_users.key_from(user_ids[0]), SiloMode.REGION))
+    owned, _ = _in_flight.claim([_versioned_key(get_users.key_from(user_ids[0]), version)])
+    try:
+        with mock.patch.object(get_users, "cb", wraps=get_users.cb) as cb:
+            assert [u.id for u in get_users(user_ids)] == user_ids
+        assert cb.call_args_list == [mock.call([user_ids[1]]), mock.call([user_ids[0]])]
+    finally:
+        _in_flight.release(owned)
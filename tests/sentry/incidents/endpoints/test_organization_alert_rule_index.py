@@ -48,6 +48,8 @@ from sentry.testutils.cases import APITestCase, SnubaTestCase
 from sentry.testutils.factories import EventType
 from sentry.testutils.helpers.datetime import before_now, freeze_time, iso_format
 from sentry.testutils.helpers.features import with_feature
+from sentry.testutils.helpers.link_header import parse_link_header
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.outbox import outbox_runner
 from sentry.testutils.silo import assume_test_silo_mode
 from sentry.testutils.skips import requires_snuba
@@ -215,6 +217,37 @@ class AlertRuleListEndpointTest(AlertRuleIndexBase):
 
         assert resp.data == serialize([alert_rule])
 
+    def test_keyset_pagination(self):
+        self.create_team(organization=self.organization, members=[self.user])
+        alert_rules = [
+            self.create_alert_rule(date_added=before_now(minutes=minutes)) for minutes in (3, 2, 1)
+        ]
+        self.login_as(self.user)
+
+        cursor = None
+        pages = []
+        with (
+            self.feature("organizations:incidents"),
+            override_options(
+                {"api.paginator.keyset-endpoints": ["OrganizationAlertRuleIndexEndpoint"]}
+            ),
+        ):
+            while True:
+                params = {"per_page": 2}
+                if cursor is not None:
+                    params["cursor"] = cursor
+                resp = self.get_success_response(self.organization.slug, **params)
+                pages.append([rule["id"] for rule in resp.data])
+                links = {attrs["rel"]: attrs for attrs in parse_link_header(resp["Link"]).values()}
+                if links["next"]["results"] != "true":
+                    break
+                cursor = links["next"]["cursor"]
+
+        assert pages == [
+            [str(alert_rules[2].id), str(alert_rules[1].id)],
+            [str(alert_rules[0].id)],
+        ]
+
 
 @freeze_time()
 class AlertRuleCreateEndpointTest(AlertRuleIndexBase, SnubaTestCase):
@@ -1,5 +1,6 @@
 from sentry.models.options.project_option import ProjectOption
 from sentry.testutils.cases import TestCase
+from sentry.utils.cache import cache
 
 
 class ProjectOptionManagerTest(TestCase):
@@ -28,3 +29,22 @@ class ProjectOptionManagerTest(TestCase):
         ProjectOption.objects.create(project=self.project, key="foo", value="bar")
         result = ProjectOption.objects.get_value_bulk([self.project], "foo")
         assert result == {self.project: "bar"}
+
+    def test_prefetch_all_values(self):
+        other = self.create_project()
+        ProjectOption.objects.create(project=self.project, key="foo", value="bar")
+        ProjectOption.objects.create(project=other, key="foo", value="baz")
+        ProjectOption.objects.clear_local_cache()
+        cache.delete_many([ProjectOption.objects._make_key(p.id) for p in (self.project, other)])
+
+        with self.assertNumQueries(1):
+            ProjectOption.objects.prefetch_all_values([self.project.id, other.id])
+        with self.assertNumQueries(0):
+            assert ProjectOption.objects.get_value(self.project, "foo") == "bar"
+            assert ProjectOption.objects.get_value(other, "foo") == "baz"
+
+        # Another worker finds the options in the cache.
+        ProjectOption.objects.clear_local_cache()
+        with self.assertNumQueries(0):
+            ProjectOption.objects.prefetch_all_values([self.project.id, other.id])
+            assert ProjectOption.objects.get_all_values(other) == {"foo": "baz"}
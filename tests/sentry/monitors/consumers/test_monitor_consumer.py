@@ -19,7 +19,10 @@ from sentry.constants import ObjectStatus
 from sentry.db.models import BoundedPositiveIntegerField
 from sentry.models.environment import Environment
 from sentry.monitors.constants import TIMEOUT, PermitCheckInStatus
-from sentry.monitors.consumers.monitor_consumer import StoreMonitorCheckInStrategyFactory
+from sentry.monitors.consumers.monitor_consumer import (
+    CheckinBatchPrefetch,
+    StoreMonitorCheckInStrategyFactory,
+)
 from sentry.monitors.models import (
     CheckInStatus,
     Monitor,
@@ -32,6 +35,7 @@ from sentry.monitors.models import (
 from sentry.monitors.processing_errors.errors import ProcessingErrorsException, ProcessingErrorType
 from sentry.monitors.types import CheckinItem
 from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
 from sentry.utils import json
 from sentry.utils.outcomes import Outcome
 
@@ -1060,6 +1064,94 @@ class MonitorConsumerTest(TestCase):
 
         assert try_monitor_clock_tick.call_count == 1
 
+    @override_options({"crons.consumer.batch-prefetch": True})
+    def test_parallel_batch_prefetch(self):
+        factory = StoreMonitorCheckInStrategyFactory(mode="parallel", max_batch_size=4)
+        commit = mock.Mock()
+        consumer = factory.create_with_partitions(commit, {self.partition: 0})
+
+        monitor = self._create_monitor(slug="my-monitor")
+        monitor_environment = MonitorEnvironment.objects.ensure_environment(
+            self.project, monitor, "production"
+        )
+
+        # An in-progress check-in and its completion within the same batch
+        self.send_checkin(monitor.slug, status="in_progress", consumer=consumer)
+        guid = self.guid
+        self.send_checkin(monitor.slug, guid=guid, consumer=consumer)
+
+        # An upserted monitor, and a check-in of it without a config
+        self.send_checkin(
+            "new-monitor",
+            monitor_config={"schedule": {"type": "crontab", "value": "13 * * * *"}},
+            consumer=consumer,
+        )
+        upsert_guid = self.guid
+        self.send_checkin("new-monitor", consumer=consumer)
+        new_monitor_guid = self.guid
+
+        # One more check-in to process the batch
+        self.send_checkin(monitor.slug, consumer=consumer)
+
+        checkin = MonitorCheckIn.objects.get(guid=guid)
+        assert checkin.status == CheckInStatus.OK
+        assert checkin.monitor_environment_id == monitor_environment.id
+
+        new_monitor = Monitor.objects.get(slug="new-monitor")
+        assert MonitorCheckIn.objects.get(guid=upsert_guid).monitor_id == new_monitor.id
+        assert MonitorCheckIn.objects.get(guid=new_monitor_guid).monitor_id == new_monitor.id
+
+    @override_options({"crons.consumer.batch-prefetch": True})
+    def test_parallel_batch_prefetch_environments(self):
+        factory = StoreMonitorCheckInStrategyFactory(mode="parallel", max_batch_size=4)
+        commit = mock.Mock()
+        consumer = factory.create_with_partitions(commit, {self.partition: 0})
+
+        monitor = self._create_monitor(slug="my-monitor")
+
+        # Check-ins of the same monitor in two environments are processed in
+        # different groups
+        self.send_checkin(monitor.slug, environment="production", consumer=consumer)
+        production_guid = self.guid
+        self.send_checkin(monitor.slug, environment="staging", consumer=consumer)
+        staging_guid = self.guid
+        self.send_checkin(monitor.slug, environment="production", consumer=consumer)
+        self.send_checkin(monitor.slug, environment="staging", consumer=consumer)
+
+        # One more check-in to process the batch
+        self.send_checkin(monitor.slug, consumer=consumer)
+
+        production_checkin = MonitorCheckIn.objects.get(guid=production_guid)
+        staging_checkin = MonitorCheckIn.objects.get(guid=staging_guid)
+        assert production_checkin.monitor_id == monitor.id
+        assert staging_checkin.monitor_id == monitor.id
+        assert production_checkin.monitor_environment.get_environment().name == "production"
+        assert staging_checkin.monitor_environment.get_environment().name == "staging"
+        assert MonitorCheckIn.objects.filter(monitor_id=monitor.id).count() == 4
+
+    def test_batch_prefetch_deleted_project(self):
+        monitor = self._create_monitor(slug="my-monitor")
+
+        def make_item(project_id: int) -> CheckinItem:
+            wrapper: CheckIn = {
+                "message_type": "check_in",
+                "start_time": datetime.now().timestamp(),
+                "project_id": project_id,
+                "payload": "",
+                "sdk": "test/1.0",
+                "retention_days": 90,
+            }
+            payload = {"monitor_slug": monitor.slug, "check_in_id": uuid.uuid4().hex}
+            return CheckinItem(datetime.now(), self.partition.index, wrapper, payload)  # type: ignore[arg-type]
+
+        deleted_project_id = self.project.id + 1000
+        prefetch = CheckinBatchPrefetch([make_item(self.project.id), make_item(deleted_project_id)])
+
+        # The check-in of the deleted project isn't prefetched, and doesn't
+        # keep the others from being prefetched.
+        assert prefetch.pop_monitor(self.project.id, monitor.slug) == (True, monitor)
+        assert prefetch.pop_monitor(deleted_project_id, monitor.slug) == (False, None)
+
     @mock.patch("sentry.quotas.backend.check_accept_monitor_checkin")
     def test_monitor_quotas_accept(self, check_accept_monitor_checkin):
         check_accept_monitor_checkin.return_value = PermitCheckInStatus.ACCEPT
@@ -2,7 +2,9 @@
 Testsuite of backend-independent nodestore tests. Add your backend to the
 `ns` fixture to have it tested.
 """
+
 from contextlib import nullcontext
+from unittest import mock
 
 import pytest
 
@@ -97,3 +99,35 @@ def test_set_subkeys(ns):
     ns.delete("node_1")
     assert ns.get("node_1") is None
     assert ns.get("node_1", subkey="other") is None
+
+
+@override_options(
+    {
+        "nodestore.set-subkeys.enable-set-cache-item": False,
+        "nodestore.local-cache.max-bytes": 1_000_000,
+    }
+)
+def test_local_cache(ns):
+    ns.local_cache.clear()
+    ns.set_subkeys("node_1", {None: {"foo": "a"}, "other": {"foo": "b"}})
+
+    with mock.patch.object(ns, "_get_bytes", wraps=ns._get_bytes) as mock_get_bytes:
+        assert ns.get("node_1") == {"foo": "a"}
+        # Subkeys are served from the same cached payload
+        assert ns.get("node_1", subkey="other") == {"foo": "b"}
+        assert ns.get_multi(["node_1"]) == {"node_1": {"foo": "a"}}
+        assert mock_get_bytes.call_count == 1
+
+        # Callers get their own copy of the payload
+        ns.get("node_1")["foo"] = "mutated"
+        assert ns.get("node_1") == {"foo": "a"}
+
+    # Writes invalidate the cached payload
+    ns.set("node_1", {"foo": "c"})
+    assert ns.get("node_1") == {"foo": "c"}
+
+    # Deletes are remembered as misses
+    ns.delete("node_1")
+    with mock.patch.object(ns, "_get_bytes") as mock_get_bytes:
+        assert ns.get("node_1") is None
+        assert mock_get_bytes.call_count == 0
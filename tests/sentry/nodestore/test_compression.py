@@ -0,0 +1,156 @@
+import time
+from unittest import mock
+
+import pytest
+import zstandard
+
+from sentry.nodestore import compression
+from sentry.nodestore.base import json_dumps
+from sentry.nodestore.django.backend import DjangoNodeStorage
+from sentry.testutils.helpers import override_options
+from sentry.testutils.pytest.fixtures import django_db_all
+from sentry.testutils.skips import requires_pytest_benchmark
+
+
+def make_payload(i: int) -> dict:
+    return {
+        "event_id": f"{i:032x}",
+        "platform": "python",
+        "message": f"Something went wrong in request {i}",
+        "sdk": {"name": "sentry.python.django", "version": "2.13.0"},
+        "contexts": {
+            "runtime": {"name": "CPython", "version": "3.12.4", "build": "main"},
+            "os": {"name": "Linux", "kernel_version": "6.1.0"},
+        },
+        "exception": {
+            "values": [
+                {
+                    "type": "ValueError",
+                    "value": f"invalid literal for int() with base 10: '{i}'",
+                    "stacktrace": {
+                        "frames": [
+                            {
+                                "filename": f"django/core/handlers/{name}.py",
+                                "abs_path": f"/usr/local/lib/python3.12/site-packages/django/core/handlers/{name}.py",
+                                "function": f"_get_{name}",
+                                "module": f"django.core.handlers.{name}",
+                                "lineno": 42 + j,
+                                "in_app": False,
+                            }
+                            for j, name in enumerate(["base", "exception", "wsgi", "asgi"])
+                        ]
+                    },
+                }
+            ]
+        },
+    }
+
+
+SAMPLES = [json_dumps(make_payload(i)).encode("utf8") for i in range(500)]
+
+
+@pytest.fixture
+def dict_id():
+    dictionary = zstandard.train_dictionary(16 * 1024, SAMPLES)
+    with mock.patch("sentry.models.files.utils.get_storage") as mock_get_storage:
+        dict_id = compression.store_dictionary(dictionary.as_bytes())
+        mock_get_storage.return_value.open.return_value.__enter__.return_value.read.return_value = (
+            dictionary.as_bytes()
+        )
+        compression._dictionaries.clear()
+        compression.get_dictionary(dict_id)
+    yield dict_id
+    compression._dictionaries.clear()
+
+
+def test_roundtrip(dict_id):
+    payload = SAMPLES[0]
+
+    with override_options({"nodestore.zstd-dictionaries": {"python": dict_id}}):
+        compressed = compression.compress_with_dictionary(payload, "python")
+
+    assert compression.is_dictionary_compressed(compressed)
+    assert compressed[3] == compression.DICTIONARY_FORMAT_VERSION
+    assert len(compressed) < len(zstandard.compress(payload))
+    assert compression.decompress(compressed) == payload
+
+
+def test_inactive_platform_is_not_compressed(dict_id):
+    payload = SAMPLES[0]
+
+    with override_options({"nodestore.zstd-dictionaries": {"python": dict_id}}):
+        assert compression.compress_with_dictionary(payload, "javascript") == payload
+        assert compression.compress_with_dictionary(payload, None) == payload
+
+
+def test_legacy_payloads_are_passed_through():
+    assert compression.decompress(None) is None
+    assert compression.decompress(SAMPLES[0]) == SAMPLES[0]
+
+
+def test_unknown_dictionary_falls_back_to_plain_payload():
+    compression._dictionaries.clear()
+    with (
+        mock.patch("sentry.models.files.utils.get_storage") as mock_get_storage,
+        override_options({"nodestore.zstd-dictionaries": {"python": 1234}}),
+    ):
+        mock_get_storage.return_value.open.side_effect = FileNotFoundError
+        assert compression.compress_with_dictionary(SAMPLES[0], "python") == SAMPLES[0]
+
+
+@django_db_all
+def test_nodestore_reads_old_and_new_formats(dict_id):
+    ns = DjangoNodeStorage()
+    old_payload = make_payload(1)
+    new_payload = make_payload(2)
+
+    ns.set("a" * 32, old_payload)
+    with override_options({"nodestore.zstd-dictionaries": {"python": dict_id}}):
+        ns.set_subkeys("b" * 32, {None: new_payload, "unprocessed": {"foo": "bar"}})
+
+    assert not compression.is_dictionary_compressed(ns._get_bytes("a" * 32))
+    assert compression.is_dictionary_compressed(ns._get_bytes("b" * 32))
+
+    assert ns.get("a" * 32) == old_payload
+    assert ns.get("b" * 32) == new_payload
+    assert ns.get("b" * 32, subkey="unprocessed") == {"foo": "bar"}
+    assert ns.get_multi(["a" * 32, "b" * 32]) == {"a" * 32: old_payload, "b" * 32: new_payload}
+
+
+@requires_pytest_benchmark
+@pytest.mark.parametrize("mode", ["dictionary", "zstd"])
+def test_benchmark_compression(mode, dict_id, benchmark):
+    """
+    Reports compression ratio and encode/decode microseconds per event, compared against the
+    standalone zstd compression the bigtable backend does today.
+    """
+    if mode == "dictionary":
+        with override_options({"nodestore.zstd-dictionaries": {"python": dict_id}}):
+            encode = lambda value: compression.compress_with_dictionary(value, "python")  # noqa
+            decode = compression.decompress
+            encoded = [encode(value) for value in SAMPLES]
+    else:
+        encode = zstandard.compress
+        decode = zstandard.decompress
+        encoded = [encode(value) for value in SAMPLES]
+
+    def roundtrip():
+        for value in SAMPLES:
+            decode(encode(value))
+
+    with override_options({"nodestore.zstd-dictionaries": {"python": dict_id}}):
+        benchmark(roundtrip)
+
+        start = time.perf_counter()
+        for value in SAMPLES:
+            encode(value)
+        encode_us = (time.perf_counter() - start) * 1e6 / len(SAMPLES)
+
+    start = time.perf_counter()
+    for value in encoded:
+        decode(value)
+    decode_us = (time.perf_counter() - start) * 1e6 / len(SAMPLES)
+
+    benchmark.extra_info["compression_ratio"] = sum(map(len, SAMPLES)) / sum(map(len, encoded))
+    benchmark.extra_info["encode_us_per_event"] = encode_us
+    benchmark.extra_info["decode_us_per_event"] = decode_us
@@ -0,0 +1,105 @@
+import threading
+from unittest import mock
+
+import pytest
+
+from sentry.nodestore.localcache import ENTRY_OVERHEAD_BYTES, MISSING, LocalNodeCache
+
+
+@pytest.fixture
+def cache():
+    return LocalNodeCache(max_bytes=10_000, ttl=60, miss_ttl=10)
+
+
+def test_get_set(cache):
+    assert cache.get("a") is None
+
+    cache.set("a", b'{"foo":"bar"}')
+    cache.set("b", None)
+
+    assert cache.get("a") == b'{"foo":"bar"}'
+    assert cache.get("b") is MISSING
+    assert cache.get_many(["a", "b", "c"]) == {"a": b'{"foo":"bar"}', "b": MISSING}
+
+
+def test_evicts_by_size(cache):
+    payload = b"x" * (1000 - ENTRY_OVERHEAD_BYTES)
+    for i in range(10):
+        cache.set(str(i), payload)
+    assert cache.current_bytes == 10_000
+
+    # Touch the oldest entry so the second-oldest one is evicted instead
+    assert cache.get("0")
+    cache.set("10", payload)
+
+    assert cache.current_bytes == 10_000
+    assert cache.get("0") == payload
+    assert cache.get("1") is None
+
+
+def test_skips_huge_payloads(cache):
+    cache.set("a", b"x" * 5000)
+    assert cache.get("a") is None
+    assert cache.current_bytes == 0
+
+
+def test_expiry(cache):
+    with mock.patch("sentry.nodestore.localcache.time.monotonic", return_value=100.0):
+        cache.set("a", b"{}")
+        cache.set("b", None)
+
+    with mock.patch("sentry.nodestore.localcache.time.monotonic", return_value=115.0):
+        assert cache.get("a") == b"{}"
+        assert cache.get("b") is None
+
+    with mock.patch("sentry.nodestore.localcache.time.monotonic", return_value=160.0):
+        assert cache.get("a") is None
+
+    assert cache.current_bytes == 0
+
+
+def test_fetch_populates_cache(cache):
+    fetch = mock.Mock(side_effect=[b"{}", None])
+
+    assert cache.fetch("a", fetch) == b"{}"
+    assert cache.fetch("a", fetch) == b"{}"
+    assert cache.fetch("b", fetch) is None
+    assert cache.fetch("b", fetch) is None
+    assert fetch.call_count == 2
+
+
+def test_fetch_coalesces_concurrent_requests(cache):
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch(id):
+        calls.append(id)
+        started.set()
+        release.wait()
+        return b'{"foo":"bar"}'
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.fetch("a", slow_fetch)))
+        for _ in range(5)
+    ]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["a"]
+    assert results == [b'{"foo":"bar"}'] * 5
+
+
+def test_fetch_propagates_errors(cache):
+    with pytest.raises(ValueError):
+        cache.fetch("a", mock.Mock(side_effect=ValueError))
+
+    assert cache.get("a") is None
+    assert cache.fetch("a", mock.Mock(return_value=b"{}")) == b"{}"
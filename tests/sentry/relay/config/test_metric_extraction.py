@@ -31,6 +31,7 @@ from sentry.snuba.metrics.extraction import (
 )
 from sentry.snuba.models import QuerySubscription, SnubaQuery
 from sentry.tasks.on_demand_metrics import process_widget_specs
+from sentry.testutils.factories import Factories
 from sentry.testutils.helpers import Feature
 from sentry.testutils.helpers.on_demand import create_widget
 from sentry.testutils.helpers.options import override_options
@@ -2105,3 +2106,75 @@ def test_get_current_widget_specs(
     ):
         specs = get_current_widget_specs(default_project.organization)
     assert specs == expected
+
+
+@django_db_all
+@override_options({"on_demand_metrics.cache_metric_specs": 1.0})
+def test_get_metric_extraction_config_cached_specs(default_project: Project, django_cache) -> None:
+    other_project = Factories.create_project(organization=default_project.organization)
+    with Feature({ON_DEMAND_METRICS_WIDGETS: True}):
+        create_widget(["count()"], "transaction.duration:>=1000", default_project)
+
+        with mock.patch.object(
+            OnDemandMetricSpec,
+            "to_metric_spec",
+            autospec=True,
+            side_effect=OnDemandMetricSpec.to_metric_spec,
+        ) as to_metric_spec:
+            config = get_metric_extraction_config(default_project)
+            assert config
+            assert to_metric_spec.call_count == 2  # 2 spec versions
+
+            # The specs of the widget are generated once for all projects of the organization.
+            assert get_metric_extraction_config(other_project) == config
+            assert to_metric_spec.call_count == 2
+
+            # A changed query generates new specs.
+            DashboardWidgetQuery.objects.update(conditions="transaction.duration:>=2000")
+            config = get_metric_extraction_config(default_project)
+            assert config
+            assert config["metrics"][0]["condition"]["value"] == 2000.0  # type: ignore[typeddict-item]
+            assert to_metric_spec.call_count == 4
+
+
+@django_db_all
+@override_options({"on_demand_metrics.cache_metric_specs": 1.0})
+def test_get_metric_extraction_config_cached_specs_project_dependent(
+    default_project: Project, django_cache
+) -> None:
+    with Feature({ON_DEMAND_METRICS: True}):
+        create_alert("apdex(10)", "transaction.duration:>=1000", default_project)
+
+        with mock.patch.object(
+            OnDemandMetricSpec,
+            "to_metric_spec",
+            autospec=True,
+            side_effect=OnDemandMetricSpec.to_metric_spec,
+        ) as to_metric_spec:
+            config = get_metric_extraction_config(default_project)
+            assert config
+            calls = to_metric_spec.call_count
+
+            # Specs which depend on the project are generated every time.
+            assert get_metric_extraction_config(default_project) == config
+            assert to_metric_spec.call_count == 2 * calls
+
+
+@django_db_all
+@override_options({"on_demand_metrics.cache_metric_specs": 1.0})
+def test_get_metric_extraction_config_cached_specs_failed(
+    default_project: Project, django_cache
+) -> None:
+    other_project = Factories.create_project(organization=default_project.organization)
+    with Feature({ON_DEMAND_METRICS_WIDGETS: True}):
+        create_widget(["count()"], "transaction.duration:>=1000", default_project)
+
+        with mock.patch.object(
+            OnDemandMetricSpec, "to_metric_spec", side_effect=Exception("misconfigured")
+        ):
+            assert not get_metric_extraction_config(default_project)
+
+        # Specs which failed for one project are not cached for the others.
+        config = get_metric_extraction_config(other_project)
+        assert config
+        assert config["metrics"]
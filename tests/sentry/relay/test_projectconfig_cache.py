@@ -1,6 +1,8 @@
 from unittest import mock
 
+from sentry.relay.config import ProjectConfigPatch
 from sentry.relay.projectconfig_cache import redis
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.pytest.fixtures import django_db_all
 from sentry.utils import metrics
 
@@ -34,3 +36,59 @@ def test_read_write():
 
     assert cache.get_rev(dsn1) == "my_rev_123"
     assert cache.get_rev(dsn2) is None
+
+
+@django_db_all
+def test_exists_many():
+    cache = redis.RedisProjectConfigCache()
+    cache.set_many({"fake-dsn-1": {"my-value": "foo"}, "fake-dsn-3": {"my-value": "bar"}})
+
+    assert cache.exists_many(["fake-dsn-1", "fake-dsn-2", "fake-dsn-3"]) == {
+        "fake-dsn-1",
+        "fake-dsn-3",
+    }
+    assert cache.exists_many([]) == set()
+
+
+@django_db_all
+def test_patch_many():
+    cache = redis.RedisProjectConfigCache()
+    config = {"rev": "rev-1", "config": {"quotas": ["a"], "sampling": {"rules": []}}}
+    cache.set_many({"fake-dsn": config})
+
+    cache.patch_many(
+        {"fake-dsn": ProjectConfigPatch({"sampling": {"rules": [1]}, "metricExtraction": None})}
+    )
+    patched = cache.get("fake-dsn")
+    assert patched["config"] == {"quotas": ["a"], "sampling": {"rules": [1]}}
+    assert patched["rev"] != "rev-1"
+    assert cache.get_rev("fake-dsn") == patched["rev"]
+
+    cache.patch_many({"fake-dsn": ProjectConfigPatch({"sampling": None})})
+    repatched = cache.get("fake-dsn")
+    assert repatched["config"] == {"quotas": ["a"]}
+    assert repatched["rev"] not in ("rev-1", patched["rev"])
+
+    # A full config replaces all patched sections.
+    cache.set_many({"fake-dsn": config})
+    assert cache.get("fake-dsn") == config
+
+    # Sections aren't returned without a full config.
+    cache.patch_many({"fake-dsn": ProjectConfigPatch({"sampling": None})})
+    cache.delete_many(["fake-dsn"])
+    assert cache.get("fake-dsn") is None
+    cache.patch_many({"fake-dsn": ProjectConfigPatch({"sampling": None})})
+    assert cache.get("fake-dsn") is None
+
+
+@django_db_all
+def test_get_patched_with_patching_disabled():
+    cache = redis.RedisProjectConfigCache()
+    config = {"rev": "rev-1", "config": {"sampling": {"rules": []}}}
+    cache.set_many({"fake-dsn": config})
+    with override_options({"relay.project-config-patching.enable": True}):
+        cache.patch_many({"fake-dsn": ProjectConfigPatch({"sampling": {"rules": [1]}})})
+
+    patched = cache.get("fake-dsn")
+    assert patched["config"] == {"sampling": {"rules": [1]}}
+    assert patched["rev"] == cache.get_rev("fake-dsn")
@@ -76,3 +76,25 @@ def test_custom_prefix():
     redis = cache._get_redis_client(expected_key)
 
     assert redis.get(expected_key) == b"1"
+
+
+def test_sections_lifecycle():
+    cache = RedisProjectConfigDebounceCache()
+    kwargs = {
+        "public_key": None,
+        "project_id": 42,
+        "organization_id": None,
+    }
+
+    cache.debounce(**kwargs, sections=["sampling"])
+    assert cache.is_debounced(**kwargs, sections=("sampling",))
+    assert not cache.is_debounced(**kwargs, sections=("quotas",))
+    assert not cache.is_debounced(**kwargs)
+
+    # A task for the whole scope covers all sections.
+    cache.debounce(**kwargs)
+    assert cache.is_debounced(**kwargs, sections=("quotas",))
+
+    cache.mark_task_done(**kwargs)
+    cache.mark_task_done(**kwargs, sections=("sampling",))
+    assert not cache.is_debounced(**kwargs, sections=("sampling",))
@@ -527,3 +527,18 @@ class RecordingBufferedTestCase(RecordingTestCase):
             max_buffer_size_in_bytes=1000,
             max_buffer_time_in_seconds=1000,
         )
+
+
+class PipelinedRecordingBufferedTestCase(RecordingTestCase):
+    def processing_factory(self):
+        return RecordingBufferedStrategyFactory(
+            max_buffer_message_count=1000,
+            max_buffer_size_in_bytes=1000,
+            max_buffer_time_in_seconds=1000,
+            num_processes=2,
+            input_block_size=1,
+            output_block_size=1,
+            max_batch_size=1,
+            max_batch_time=1,
+            upload_threads=2,
+        )
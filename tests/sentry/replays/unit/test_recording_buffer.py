@@ -1,4 +1,5 @@
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 import pytest
@@ -145,3 +146,15 @@ def test_commit_uploads_failure(_do_upload):
 
     with pytest.raises(BufferCommitFailed):
         commit_uploads([{}])  # type: ignore[typeddict-item]
+
+
+@patch("sentry.replays.consumers.recording_buffered._do_upload")
+def test_commit_uploads_with_executor(_do_upload):
+    """Assert uploads run on the given executor and failures still fail the batch."""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        commit_uploads([{}, {}, {}], executor)  # type: ignore[list-item]
+        assert _do_upload.call_count == 3
+
+        _do_upload.side_effect = ValueError("")
+        with pytest.raises(BufferCommitFailed):
+            commit_uploads([{}], executor)  # type: ignore[list-item]
@@ -381,6 +381,37 @@ class GetConditionGroupResultsTest(CreateEventTestCase):
         }
 
 
+    @override_options({"delayed_processing.query_cache.bucket_seconds": 60})
+    def test_query_cache(self):
+        condition_data = self.create_event_frequency_condition(
+            interval=self.interval,
+            comparison_type=ComparisonType.PERCENT,
+            comparison_interval=self.comparison_interval,
+        )
+        condition_groups, group_id, unique_queries = self.create_condition_groups([condition_data])
+        present_percent_query, offset_percent_query = unique_queries
+
+        with patch(
+            "sentry.rules.processing.delayed_processing.safe_execute", wraps=safe_execute
+        ) as mock_safe_execute:
+            results = get_condition_group_results(condition_groups, self.project)
+            assert results == {
+                present_percent_query: {group_id: 2},
+                offset_percent_query: {group_id: 1},
+            }
+            assert mock_safe_execute.call_count == 2
+
+            # A later task counts new events, and reuses the results of the comparison window
+            self.create_event(self.project.id, FROZEN_TIME, "group-1", self.environment.name)
+            results = get_condition_group_results(condition_groups, self.project)
+            assert results == {
+                present_percent_query: {group_id: 3},
+                offset_percent_query: {group_id: 1},
+            }
+            assert mock_safe_execute.call_count == 3
+            assert mock_safe_execute.call_args.kwargs["comparison_interval"] is None
+
+
 class GetGroupToGroupEventTest(CreateEventTestCase):
     def setUp(self):
         super().setUp()
@@ -1049,6 +1080,33 @@ class ProcessDelayedAlertConditionsTest(CreateEventTestCase, PerformanceIssueTes
         assert (self.rule1.id, self.group1.id) in rule_fire_histories
         self.assert_buffer_cleared(project_id=self.project.id)
 
+    def test_apply_delayed_fires_after_new_event(self):
+        """
+        Test that a rule which didn't meet its threshold fires once a later
+        event pushes the group over it
+        """
+        rule = self.create_project_rule(
+            project=self.project,
+            condition_match=[self.event_frequency_condition2],
+            environment_id=self.environment.id,
+        )
+        event5 = self.create_event(self.project.id, FROZEN_TIME, "group-5", self.environment.name)
+        self.create_event(self.project.id, FROZEN_TIME, "group-5", self.environment.name)
+        group5 = event5.group
+        self.push_to_hash(self.project.id, rule.id, group5.id, event5.event_id)
+
+        apply_delayed(self.project.id)
+        assert not RuleFireHistory.objects.filter(rule=rule, group=group5).exists()
+
+        event6 = self.create_event(self.project.id, FROZEN_TIME, "group-5", self.environment.name)
+        self.push_to_hash(self.project.id, rule.id, group5.id, event6.event_id)
+
+        apply_delayed(self.project.id)
+        assert RuleFireHistory.objects.filter(
+            rule=rule, group=group5, event_id=event6.event_id
+        ).exists()
+        self.assert_buffer_cleared(project_id=self.project.id)
+
     def test_apply_delayed_action_match_all(self):
         """
         Test that a rule with multiple conditions and an action match of
@@ -30,6 +30,7 @@ from sentry.sentry_metrics.indexer.base import FetchType, FetchTypeExt, Metadata
 from sentry.sentry_metrics.use_case_id_registry import UseCaseID
 from sentry.snuba.metrics.naming_layer.mri import SessionMRI, TransactionMRI
 from sentry.testutils.helpers.options import override_options
+from sentry.testutils.skips import requires_pytest_benchmark
 from sentry.utils import json
 
 MOCK_METRIC_ID_AGG_OPTION = {
@@ -1983,9 +1984,9 @@ def test_cardinality_limiter(caplog, settings):
             INGEST_CODEC, RELEASE_HEALTH_SCHEMA_VALIDATION_RULES_OPTION_NAME
         ).validate,
     )
-    keys_to_remove = list(batch.parsed_payloads_by_meta)[:2]
-    # the messages come in a certain order, and Python dictionaries preserve
-    # their insertion order. So we can hardcode offsets here.
+    keys_to_remove = batch.columns.broker_metas[:2]
+    # the messages are decoded in the order they come in, so we can hardcode
+    # offsets here.
     assert keys_to_remove == [
         BrokerMeta(partition=Partition(Topic("topic"), 0), offset=0),
         BrokerMeta(partition=Partition(Topic("topic"), 0), offset=1),
@@ -2170,3 +2171,135 @@ def test_aggregation_options():
         assert get_aggregation_options("c:spans/count@none") == {
             AggregationOption.DISABLE_PERCENTILES: TimeWindow.NINETY_DAYS
         }
+
+
+def test_columns():
+    outer_message = _construct_outer_message(
+        [
+            (counter_payload, counter_headers),
+            ({**distribution_payload, "tags": {}}, distribution_headers),
+            ({**set_payload, "name": "invalid"}, set_headers),
+            ({**set_payload, "org_id": 2}, set_headers),
+        ]
+    )
+    batch = IndexerBatch(
+        outer_message,
+        True,
+        False,
+        tags_validator=ReleaseHealthTagsValidator().is_allowed,
+        schema_validator=MetricsSchemaValidator(
+            INGEST_CODEC, RELEASE_HEALTH_SCHEMA_VALIDATION_RULES_OPTION_NAME
+        ).validate,
+    )
+
+    columns = batch.columns
+    assert len(columns) == 3
+    assert columns.broker_metas == [BrokerMeta(0, 0), BrokerMeta(0, 1), BrokerMeta(0, 3)]
+    assert columns.org_ids == [1, 1, 2]
+    assert columns.use_case_ids == [UseCaseID.SESSIONS] * 3
+    assert columns.names == [
+        SessionMRI.RAW_SESSION.value,
+        SessionMRI.RAW_DURATION.value,
+        SessionMRI.RAW_ERROR.value,
+    ]
+    assert columns.types == ["c", "d", "s"]
+    assert columns.values == [
+        counter_payload["value"],
+        distribution_payload["value"],
+        set_payload["value"],
+    ]
+    assert columns.tag_offsets == [0, 2, 2, 4]
+    assert columns.get_tags(0) == (["environment", "session.status"], ["production", "init"])
+    assert columns.get_tags(1) == ([], [])
+    assert columns.get_tags(2) == (["environment", "session.status"], ["production", "errored"])
+
+    batch.filter_messages([BrokerMeta(0, 0)])
+    assert batch.extract_strings() == {
+        UseCaseID.SESSIONS: {
+            1: {"d:sessions/duration@second"},
+            2: {
+                "s:sessions/error@none",
+                "environment",
+                "session.status",
+                "production",
+                "errored",
+            },
+        }
+    }
+
+
+def test_throughput_metrics():
+    outer_message = _construct_outer_message([(counter_payload, counter_headers)])
+    batch = IndexerBatch(
+        outer_message,
+        True,
+        False,
+        tags_validator=ReleaseHealthTagsValidator().is_allowed,
+        schema_validator=MetricsSchemaValidator(
+            INGEST_CODEC, RELEASE_HEALTH_SCHEMA_VALIDATION_RULES_OPTION_NAME
+        ).validate,
+    )
+    batch.filter_messages([BrokerMeta(0, 0)])
+    with patch("sentry.sentry_metrics.consumers.indexer.batch.metrics") as metrics:
+        batch.reconstruct_messages({}, {})
+
+    reported = {call.args[0] for call in metrics.distribution.call_args_list}
+    assert "metrics_consumer.process_message.batch.messages_per_second" in reported
+    assert "metrics_consumer.process_message.batch.bytes_per_second" in reported
+
+
+@requires_pytest_benchmark
+@pytest.mark.django_db
+def test_benchmark_batch(benchmark):
+    """
+    Decode, extract the strings of and re-encode a batch of 1000 messages, to report
+    messages/sec and bytes/sec through the batch.
+    """
+    payloads = [
+        (
+            {
+                **counter_payload,
+                "org_id": i % 10 + 1,
+                "tags": {**counter_payload["tags"], "release": f"release-{i % 50}"},
+            },
+            counter_headers,
+        )
+        for i in range(1000)
+    ]
+    outer_message = _construct_outer_message(payloads)
+    num_bytes = sum(len(msg.payload.value) for msg in outer_message.payload)
+
+    def run():
+        batch = IndexerBatch(
+            outer_message,
+            True,
+            False,
+            tags_validator=ReleaseHealthTagsValidator().is_allowed,
+            schema_validator=MetricsSchemaValidator(
+                INGEST_CODEC, RELEASE_HEALTH_SCHEMA_VALIDATION_RULES_OPTION_NAME
+            ).validate,
+        )
+        strings = batch.extract_strings()
+        mapping = {
+            use_case_id: {
+                org_id: {string: i for i, string in enumerate(org_strings, start=1)}
+                for org_id, org_strings in org_mapping.items()
+            }
+            for use_case_id, org_mapping in strings.items()
+        }
+        meta = {
+            use_case_id: {
+                org_id: {
+                    string: Metadata(id=id, fetch_type=FetchType.CACHE_HIT)
+                    for string, id in org_strings.items()
+                }
+                for org_id, org_strings in org_mapping.items()
+            }
+            for use_case_id, org_mapping in mapping.items()
+        }
+        return batch.reconstruct_messages(mapping, meta)
+
+    result = benchmark(run)
+    assert len(result.data) == len(payloads)
+    benchmark.extra_info["messages_per_second"] = len(payloads) / benchmark.stats.stats.mean
+    benchmark.extra_info["bytes_per_second"] = num_bytes / benchmark.stats.stats.mean
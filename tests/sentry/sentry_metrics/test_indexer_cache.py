@@ -1,12 +1,21 @@
 from datetime import timedelta
+from unittest import mock
 
 import pytest
 from django.conf import settings
 from django.utils import timezone
 
-from sentry.sentry_metrics.indexer.cache import StringIndexerCache
+from sentry.sentry_metrics.indexer.base import (
+    FetchType,
+    StringIndexer,
+    UseCaseKeyResult,
+    UseCaseKeyResults,
+)
+from sentry.sentry_metrics.indexer.cache import CachingIndexer, StringIndexerCache
+from sentry.sentry_metrics.indexer.mock import RawSimpleIndexer
 from sentry.sentry_metrics.use_case_id_registry import UseCaseID
 from sentry.testutils.helpers.options import override_options
+from sentry.testutils.skips import requires_pytest_benchmark
 from sentry.utils.cache import cache
 from sentry.utils.hashlib import md5_text
 
@@ -240,3 +249,92 @@ def test_is_valid_timestamp() -> None:
 
     assert not indexer_cache._is_valid_timestamp(str(stale_ts))
     assert indexer_cache._is_valid_timestamp(str(new_ts))
+
+
+@pytest.fixture
+def local_indexer_cache():
+    cache.clear()
+    return StringIndexerCache(
+        **settings.SENTRY_STRING_INDEXER_CACHE_OPTIONS, partition_key=_PARTITION_KEY
+    )
+
+
+@override_options({"sentry-metrics.indexer.cache-l1.max-size": 2})
+def test_local_cache(local_indexer_cache: StringIndexerCache, use_case_id: str) -> None:
+    keys = [f"{use_case_id}:1:{string}" for string in ("a", "b", "c")]
+    local_indexer_cache.set_many("br", {keys[0]: 1, keys[1]: 2})
+    assert len(local_indexer_cache.local) == 2
+
+    # Served from process memory, even once the shared cache lost the keys
+    cache.clear()
+    assert local_indexer_cache.get_many("br", keys) == {keys[0]: 1, keys[1]: 2, keys[2]: None}
+    assert local_indexer_cache.get("res", keys[0]) is None
+    # Keys can be any iterable
+    assert local_indexer_cache.get_many("br", (key for key in keys[:2])) == {
+        keys[0]: 1,
+        keys[1]: 2,
+    }
+
+    # Least recently used keys are evicted
+    local_indexer_cache.set("br", keys[2], 3)
+    assert local_indexer_cache.get_many("br", keys) == {keys[0]: None, keys[1]: 2, keys[2]: 3}
+
+    local_indexer_cache.delete("br", keys[1])
+    assert local_indexer_cache.get("br", keys[1]) is None
+
+
+@override_options({"sentry-metrics.indexer.cache-l1.max-size": 10})
+def test_local_cache_filled_from_shared_cache(
+    local_indexer_cache: StringIndexerCache, use_case_id: str
+) -> None:
+    key = f"{use_case_id}:1:a"
+    local_indexer_cache.set_many("br", {key: 1})
+    local_indexer_cache.local.clear()
+
+    assert local_indexer_cache.get_many("br", [key]) == {key: 1}
+    with mock.patch.object(local_indexer_cache.cache, "get_many") as get_many:
+        assert local_indexer_cache.get_many("br", [key]) == {key: 1}
+    assert get_many.call_count == 0
+
+
+@override_options({"sentry-metrics.indexer.cache-bloom.capacity": 100})
+def test_bloom_filter_skips_unindexed_strings(local_indexer_cache: StringIndexerCache) -> None:
+    rate_limited = UseCaseKeyResults()
+    rate_limited.add_use_case_key_result(
+        UseCaseKeyResult(UseCaseID.SESSIONS, 1, "rate-limited", None), FetchType.RATE_LIMITED
+    )
+    backend = mock.Mock(spec=StringIndexer)
+    backend.bulk_record.return_value = rate_limited
+    indexer = CachingIndexer(local_indexer_cache, backend)
+    strings = {UseCaseID.SESSIONS: {1: {"rate-limited"}}}
+
+    with mock.patch.object(
+        local_indexer_cache.cache, "get_many", wraps=local_indexer_cache.cache.get_many
+    ) as get_many:
+        assert indexer.bulk_record(strings)[UseCaseID.SESSIONS][1] == {"rate-limited": None}
+        assert indexer.bulk_record(strings)[UseCaseID.SESSIONS][1] == {"rate-limited": None}
+
+    assert get_many.call_count == 1
+    assert backend.bulk_record.call_count == 2
+
+
+@requires_pytest_benchmark
+@pytest.mark.parametrize("l1_size", [0, 100_000], ids=["shared", "local"])
+def test_benchmark_bulk_record(local_indexer_cache: StringIndexerCache, l1_size, benchmark):
+    """
+    Push batches of a stable working set of strings through `bulk_record`, backed by the
+    in-memory indexer, to compare strings/sec with and without the process-local cache.
+    """
+    batch = {
+        UseCaseID.TRANSACTIONS: {
+            org_id: {f"tag-{i}" for i in range(100)} for org_id in range(1, 11)
+        }
+    }
+    indexer = CachingIndexer(local_indexer_cache, RawSimpleIndexer())
+
+    with override_options({"sentry-metrics.indexer.cache-l1.max-size": l1_size}):
+        indexer.bulk_record(batch)
+        benchmark(indexer.bulk_record, batch)
+
+    benchmark.extra_info["strings"] = 1000
+    benchmark.extra_info["strings_per_second"] = 1000 / benchmark.stats.stats.mean
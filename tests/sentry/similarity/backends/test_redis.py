@@ -113,6 +113,28 @@ class RedisScriptMinHashIndexBackendTestCase(TestCase):
             "5",
         ]
 
+    def test_record_many(self):
+        timestamp = int(time.time())
+        self.index.record_many(
+            "example",
+            [
+                ("1", [("index:a", "hello world"), ("index:b", "hello world")], None),
+                ("2", [("index:a", "hello world"), ("index:b", "pizza world")], timestamp - 60),
+                ("3", [], None),
+            ],
+            timestamp=timestamp,
+        )
+        self.index.record("other", "1", [("index:a", "hello world"), ("index:b", "hello world")])
+        self.index.record("other", "2", [("index:a", "hello world"), ("index:b", "pizza world")])
+
+        assert self.index.compare(
+            "example", "1", [("index:a", 0), ("index:b", 0)]
+        ) == self.index.compare("other", "1", [("index:a", 0), ("index:b", 0)])
+        assert [key for key, _ in self.index.compare("example", "1", [("index:a", 0)])] == [
+            "1",
+            "2",
+        ]
+
     def test_multiple_index(self):
         self.index.record("example", "1", [("index:a", "hello world"), ("index:b", "hello world")])
         self.index.record("example", "2", [("index:a", "hello world"), ("index:b", "hello world")])
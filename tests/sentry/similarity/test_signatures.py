@@ -24,3 +24,15 @@ def test_signatures() -> None:
     estimation = results[True] / float(sum(results.values()))
 
     assert similarity == pytest.approx(estimation, 0.1)
+
+
+def test_build_many() -> None:
+    get_signature = MinHashSignatureBuilder(16, 0xFFFF)
+    feature_sets = [{"foo", "bar"}, "hello world", ["bar", "baz", "foo"]]
+
+    assert get_signature.build_many(feature_sets) == [
+        get_signature(features) for features in feature_sets
+    ]
+
+    with pytest.raises(ValueError):
+        get_signature.build_many([[]])
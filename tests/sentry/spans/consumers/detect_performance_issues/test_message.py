@@ -3,7 +3,7 @@ from hashlib import md5
 from unittest import mock
 
 from sentry.issues.grouptype import PerformanceStreamedSpansGroupTypeExperimental
-from sentry.spans.consumers.detect_performance_issues.message import process_segment
+from sentry.spans.consumers.detect_performance_issues.message import SpanTree, process_segment
 from sentry.testutils.cases import TestCase
 from sentry.testutils.helpers.options import override_options
 from tests.sentry.spans.consumers.process.test_factory import build_mock_span
@@ -125,3 +125,44 @@ class TestSpansTask(TestCase):
         )
 
         assert job["performance_problems"][0].type == PerformanceStreamedSpansGroupTypeExperimental
+
+
+def _span(span_id, parent_span_id=None, start_timestamp=0.0, is_segment=False):
+    return {
+        "span_id": span_id,
+        "parent_span_id": parent_span_id,
+        "start_timestamp": start_timestamp,
+        "is_segment": is_segment,
+    }
+
+
+def test_span_tree_preorder():
+    spans = [
+        _span("c", parent_span_id="a", start_timestamp=2.0),
+        _span("orphan", parent_span_id="missing", start_timestamp=0.5),
+        _span("a", is_segment=True, start_timestamp=0.0),
+        _span("b", parent_span_id="a", start_timestamp=1.0),
+        _span("d", parent_span_id="b", start_timestamp=3.0),
+        _span("b", parent_span_id="c", start_timestamp=9.0),
+    ]
+    tree = SpanTree(spans)
+
+    assert len(tree.spans) == 5
+    assert tree.spans[tree.root]["span_id"] == "a"
+    assert [tree.spans[i]["span_id"] if i != -1 else None for i in tree.parents] == [
+        "a",
+        None,
+        None,
+        "a",
+        "b",
+    ]
+    assert [span["span_id"] for span in tree.flatten()] == ["a", "b", "d", "c", "orphan"]
+
+
+def test_span_tree_deep():
+    depth = 10000
+    spans = [_span("0", is_segment=True)] + [
+        _span(str(i), parent_span_id=str(i - 1), start_timestamp=float(i)) for i in range(1, depth)
+    ]
+
+    assert [span["span_id"] for span in SpanTree(spans).flatten()] == [str(i) for i in range(depth)]
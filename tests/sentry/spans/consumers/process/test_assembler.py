@@ -0,0 +1,88 @@
+from unittest import mock
+
+from sentry.spans.buffer.redis import SegmentKey
+from sentry.spans.consumers.process.assembler import SegmentAssembler
+from sentry.testutils.helpers.options import override_options
+
+KEY_1 = SegmentKey("a49b42af9fb69da0", 1, 0)
+KEY_2 = SegmentKey("89225fa064375ee5", 1, 0)
+KEY_3 = SegmentKey("a96c2bcd49de0c43", 1, 1)
+
+
+def test_pop_complete():
+    assembler = SegmentAssembler()
+    assembler.add({KEY_1: [b"a"], KEY_3: [b"c"]}, {KEY_1: 100, KEY_3: 100}, {KEY_1: 1, KEY_3: 1})
+    assembler.add({KEY_1: [b"b"], KEY_2: [b"d"]}, {KEY_1: 90, KEY_2: 200}, {KEY_1: 2, KEY_2: 2})
+    assert len(assembler) == 3
+    assert assembler.size == 4
+
+    # Partition 1 didn't advance, so its segment stays open.
+    assert assembler.pop_complete({0: 210}) == [(KEY_1, [b"a", b"b"])]
+    assert len(assembler) == 2
+    assert assembler.size == 2
+
+    assert assembler.pop_complete({0: 320, 1: 220}) == [(KEY_3, [b"c"]), (KEY_2, [b"d"])]
+    assert len(assembler) == 0
+    assert assembler.size == 0
+
+
+@override_options({"standalone-spans.segment-assembler.max-bytes": 4})
+def test_spill_oldest_over_max_bytes():
+    assembler = SegmentAssembler()
+    assembler.add({KEY_1: [b"aaa"]}, {KEY_1: 100}, {KEY_1: 1})
+    assembler.add({KEY_2: [b"bb"], KEY_3: [b"c"]}, {KEY_2: 110, KEY_3: 110}, {KEY_2: 2, KEY_3: 1})
+
+    spilled = assembler.pop_spilled()
+    assert spilled.spans_map == {KEY_1: [b"aaa"]}
+    assert spilled.segment_first_seen_ts == {KEY_1: 100}
+    assert assembler.size == 3
+
+    # Later spans of a spilled segment go to redis as well.
+    to_redis = assembler.add(
+        {KEY_1: [b"d"], KEY_2: [b"e"]}, {KEY_1: 120, KEY_2: 120}, {KEY_1: 3, KEY_2: 3}
+    )
+    assert to_redis.spans_map == {KEY_1: [b"d"]}
+    assert to_redis.segment_first_seen_ts == {KEY_1: 120}
+    assert KEY_1 not in assembler.segments
+    assert assembler.segments[KEY_2].spans == [b"bb", b"e"]
+
+
+@override_options({"standalone-spans.segment-assembler.max-hold-seconds": 60})
+def test_spill_after_max_hold():
+    assembler = SegmentAssembler()
+    with mock.patch("time.monotonic", return_value=1000.0):
+        assembler.add({KEY_1: [b"a"]}, {KEY_1: 100}, {KEY_1: 1})
+    with mock.patch("time.monotonic", return_value=1030.0):
+        assembler.add({KEY_2: [b"b"]}, {KEY_2: 100}, {KEY_2: 2})
+
+    with mock.patch("time.monotonic", return_value=1070.0):
+        spilled = assembler.pop_spilled()
+    assert spilled.spans_map == {KEY_1: [b"a"]}
+    assert list(assembler.segments) == [KEY_2]
+
+
+def test_pop_all():
+    assembler = SegmentAssembler()
+    assembler.add(
+        {KEY_1: [b"a"], KEY_2: [b"b"], KEY_3: [b"c"]},
+        {KEY_1: 1, KEY_2: 2, KEY_3: 3},
+        {KEY_1: 1, KEY_2: 2, KEY_3: 3},
+    )
+
+    assert assembler.pop_all(partitions=[1]).spans_map == {KEY_3: [b"c"]}
+    assert assembler.pop_all().spans_map == {KEY_1: [b"a"], KEY_2: [b"b"]}
+    assert len(assembler) == 0
+    assert assembler.size == 0
+
+
+def test_held_offsets():
+    assembler = SegmentAssembler()
+    assert assembler.held_offsets() == {}
+
+    assembler.add({KEY_1: [b"a"], KEY_3: [b"c"]}, {KEY_1: 100, KEY_3: 100}, {KEY_1: 5, KEY_3: 7})
+    assembler.add({KEY_1: [b"b"], KEY_2: [b"d"]}, {KEY_1: 100, KEY_2: 200}, {KEY_1: 8, KEY_2: 9})
+    assert assembler.held_offsets() == {0: 5, 1: 7}
+
+    # Offsets move on once the oldest segment of a partition is emitted.
+    assembler.pop_complete({0: 210})
+    assert assembler.held_offsets() == {0: 9, 1: 7}
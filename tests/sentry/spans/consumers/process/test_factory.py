@@ -504,3 +504,89 @@ def test_with_expand_segment():
         ]
 
         assert redis_client.ttl("segment:a96c2bcd49de0c43:1:process-segment") == -2
+
+
+@django_db_all
+@override_options(
+    {
+        "standalone-spans.process-spans-consumer.enable": True,
+        "standalone-spans.process-spans-consumer.project-allowlist": [1],
+        "standalone-spans.segment-assembler.enable": True,
+    }
+)
+def test_assembles_segments_in_memory():
+    redis_client = get_redis_client()
+    topic = ArroyoTopic(get_topic_definition(Topic.SNUBA_SPANS)["real_topic_name"])
+    partition = Partition(topic, 0)
+    factory = process_spans_strategy()
+    with mock.patch.object(
+        factory,
+        "producer",
+        new=mock.Mock(),
+    ) as mock_producer:
+        strategy = factory.create_with_partitions(
+            commit=mock.Mock(),
+            partitions={},
+        )
+
+        span_data = build_mock_span(project_id=1, is_segment=True)
+        message1 = build_mock_message(span_data, topic)
+        strategy.submit(make_payload(message1, partition, 1, datetime.now() - timedelta(minutes=3)))
+
+        span_data = build_mock_span(project_id=1)
+        message2 = build_mock_message(span_data, topic)
+        strategy.submit(make_payload(message2, partition))
+
+        strategy.poll()
+        strategy.join(1)
+        strategy.terminate()
+
+        mock_producer.produce.assert_called_once()
+        decoded_segment = BUFFERED_SEGMENT_SCHEMA.decode(
+            mock_producer.produce.call_args.args[1].value
+        )
+        assert len(decoded_segment["spans"]) == 2
+        assert not redis_client.exists("segment:a49b42af9fb69da0:1:process-segment")
+
+
+@django_db_all
+@override_options(
+    {
+        "standalone-spans.process-spans-consumer.enable": True,
+        "standalone-spans.process-spans-consumer.project-allowlist": [1],
+        "standalone-spans.segment-assembler.enable": True,
+    }
+)
+def test_spills_open_segments_on_join():
+    redis_client = get_redis_client()
+    topic = ArroyoTopic(get_topic_definition(Topic.SNUBA_SPANS)["real_topic_name"])
+    partition = Partition(topic, 0)
+    factory = process_spans_strategy()
+    commit = mock.Mock()
+    with mock.patch.object(factory, "producer", new=mock.Mock()) as mock_producer:
+        strategy = factory.create_with_partitions(
+            commit=commit,
+            partitions={},
+        )
+
+        span_data = build_mock_span(project_id=1, is_segment=True)
+        message1 = build_mock_message(span_data, topic)
+        strategy.submit(make_payload(message1, partition, 5))
+
+        span_data = build_mock_span(project_id=1)
+        message2 = build_mock_message(span_data, topic)
+        strategy.submit(make_payload(message2, partition, 6))
+
+        strategy.poll()
+        strategy.join(1)
+        strategy.terminate()
+
+        mock_producer.produce.assert_not_called()
+
+    # Offsets are held back at the segment's first span until it is spilled.
+    commit.assert_any_call({partition: 5})
+    commit.assert_any_call({partition: 7})
+    assert redis_client.lrange("segment:a49b42af9fb69da0:1:process-segment", 0, -1) == [
+        message1.value().encode("utf-8"),
+        message2.value().encode("utf-8"),
+    ]
@@ -11,6 +11,7 @@ from sentry.tasks.process_buffer import (
     process_pending_batch,
 )
 from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
 
 
 class ProcessIncrTest(TestCase):
@@ -31,6 +32,17 @@ class ProcessPendingTest(TestCase):
         assert len(mock_process_pending.mock_calls) == 1
         mock_process_pending.assert_any_call()
 
+    @override_options({"buffer.pending-partitions": 3})
+    @mock.patch("sentry.buffer.backend.process_pending")
+    def test_partitions(self, mock_process_pending):
+        with self.tasks():
+            process_pending()
+        assert mock_process_pending.mock_calls == [
+            mock.call(partition=0),
+            mock.call(partition=1),
+            mock.call(partition=2),
+        ]
+
 
 class ProcessPendingBatchTest(TestCase):
     @mock.patch("sentry.buffer.backend.process_batch")
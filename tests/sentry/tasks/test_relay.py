@@ -5,6 +5,7 @@ from unittest.mock import call, patch
 import pytest
 from django.db import router, transaction
 
+from sentry import features
 from sentry.db.postgres.transactions import in_test_hide_transaction_boundary
 from sentry.models.options.project_option import ProjectOption
 from sentry.models.project import Project
@@ -14,13 +15,17 @@ from sentry.relay.projectconfig_debounce_cache.redis import RedisProjectConfigDe
 from sentry.tasks.relay import (
     _schedule_invalidate_project_config,
     build_project_config,
+    compute_configs,
     invalidate_project_config,
     schedule_build_project_config,
     schedule_invalidate_project_config,
 )
+from sentry.testutils.factories import Factories
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.helpers.task_runner import BurstTaskRunner
 from sentry.testutils.hybrid_cloud import simulated_transaction_watermarks
 from sentry.testutils.pytest.fixtures import django_db_all
+from sentry.testutils.skips import requires_pytest_benchmark
 
 
 def _cache_keys_for_project(project):
@@ -92,8 +97,10 @@ def redis_cache(monkeypatch):
 
     cache = RedisProjectConfigCache()
     monkeypatch.setattr("sentry.relay.projectconfig_cache.set_many", cache.set_many)
+    monkeypatch.setattr("sentry.relay.projectconfig_cache.patch_many", cache.patch_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.delete_many", cache.delete_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.get", cache.get)
+    monkeypatch.setattr("sentry.relay.projectconfig_cache.exists_many", cache.exists_many)
 
     return cache
 
@@ -416,6 +423,43 @@ class TestInvalidationTask:
             },
         ]
 
+    @override_options({"relay.project-config-patching.enable": True})
+    def test_debounce_sections(
+        self,
+        monkeypatch,
+        default_project,
+        invalidation_debounce_cache,
+        django_cache,
+    ):
+        tasks = []
+
+        def apply_async(args=None, kwargs=None, countdown=None):
+            assert not args
+            tasks.append(kwargs)
+
+        monkeypatch.setattr("sentry.tasks.relay.invalidate_project_config.apply_async", apply_async)
+
+        invalidation_debounce_cache.mark_task_done(
+            public_key=None, project_id=default_project.id, organization_id=None
+        )
+        for trigger in ("dynamic_sampling:boost_release", "releaseproject.post_save"):
+            schedule_invalidate_project_config(project_id=default_project.id, trigger=trigger)
+        # Other sections are not held back by a task for the sampling section
+        schedule_invalidate_project_config(
+            project_id=default_project.id, trigger="monitors:monitor_created"
+        )
+        schedule_invalidate_project_config(project_id=default_project.id, trigger="test")
+        # A task for the whole config covers all sections
+        schedule_invalidate_project_config(
+            project_id=default_project.id, trigger="alerts:create-on-demand-metric"
+        )
+
+        assert [(task["trigger"], task.get("sections")) for task in tasks] == [
+            ("dynamic_sampling:boost_release", ("sampling",)),
+            ("monitors:monitor_created", ("quotas",)),
+            ("test", None),
+        ]
+
     def test_invalidate(
         self,
         monkeypatch,
@@ -464,6 +508,42 @@ class TestInvalidationTask:
             assert new_cfg is not None
             assert new_cfg != cfg
 
+    @override_options({"relay.project-config-patching.enable": True})
+    def test_invalidate_sections(
+        self,
+        monkeypatch,
+        default_project,
+        default_projectkey,
+        redis_cache,
+        invalidation_debounce_cache,
+        task_runner,
+        django_cache,
+    ):
+        cfg = {"rev": "dummy", "config": {"dummy-key": "val", "sampling": "dummy"}}
+        redis_cache.set_many({default_projectkey.public_key: cfg})
+
+        with mock.patch(
+            "sentry.relay.config.get_dynamic_sampling_config", return_value={"rules": []}
+        ), task_runner():
+            schedule_invalidate_project_config(
+                project_id=default_project.id, trigger="dynamic_sampling:custom_rule_upsert"
+            )
+
+        new_cfg = redis_cache.get(default_projectkey.public_key)
+        assert new_cfg["config"] == {"dummy-key": "val", "sampling": {"rules": []}}
+        assert new_cfg["rev"] != "dummy"
+        # Patching some sections doesn't hold back invalidations of the whole config.
+        assert not invalidation_debounce_cache.is_debounced(
+            public_key=None, project_id=default_project.id, organization_id=None
+        )
+
+        with task_runner():
+            schedule_invalidate_project_config(project_id=default_project.id, trigger="test")
+
+        new_cfg = redis_cache.get(default_projectkey.public_key)
+        assert "dummy-key" not in new_cfg["config"]
+        assert new_cfg["projectId"] == default_project.id
+
     @mock.patch(
         "sentry.tasks.relay._schedule_invalidate_project_config",
         wraps=_schedule_invalidate_project_config,
@@ -540,3 +620,72 @@ def test_invalidate_hierarchy(
     assert len(calls) == 1
     cache = redis_cache.get(default_projectkey)
     assert cache["disabled"] is False
+
+
+@django_db_all
+def test_compute_configs_organization(default_organization, redis_cache, django_cache):
+    projects = [Factories.create_project(organization=default_organization) for _ in range(3)]
+    cached_keys = [Factories.create_project_key(project) for project in projects[:2]]
+    redis_cache.set_many({key.public_key: {"dummy": "dummy"} for key in cached_keys})
+
+    configs = compute_configs(organization_id=default_organization.id)
+
+    assert set(configs) == {key.public_key for key in cached_keys}
+    for key in cached_keys:
+        assert configs[key.public_key]["projectId"] == key.project_id
+        assert configs[key.public_key]["publicKeys"][0]["publicKey"] == key.public_key
+
+
+@django_db_all
+def test_compute_configs_organization_batches_features(
+    default_organization, redis_cache, django_cache
+):
+    projects = [Factories.create_project(organization=default_organization) for _ in range(3)]
+    keys = [Factories.create_project_key(project) for project in projects]
+    redis_cache.set_many({key.public_key: {"dummy": "dummy"} for key in keys})
+
+    manager = features.default_manager
+    with (
+        patch.object(manager, "_has", wraps=manager._has) as has,
+        patch.object(manager, "_has_for_projects", wraps=manager._has_for_projects) as batch,
+    ):
+        compute_configs(organization_id=default_organization.id)
+
+    # Every feature is evaluated once for the organization, not once per project
+    org_checks = [c.args[0] for c in has.call_args_list if c.args[0].startswith("organizations:")]
+    assert org_checks
+    assert len(org_checks) == len(set(org_checks))
+    assert not [c for c in has.call_args_list if c.args[0].startswith("projects:")]
+    for c in batch.call_args_list:
+        assert set(c.args[2]) == set(projects)
+
+
+@requires_pytest_benchmark
+@django_db_all
+@pytest.mark.parametrize("num_projects", [10, 100])
+@pytest.mark.parametrize("bulk", [False, True], ids=["per-project", "bulk"])
+def test_benchmark_compute_configs_organization(
+    default_organization, redis_cache, django_cache, num_projects, bulk, benchmark
+):
+    """
+    Recompute the configs of every project of an organization, one project at a time and
+    with the organization-wide bulk path, to compare the time per invalidation.
+    """
+    projects = [
+        Factories.create_project(organization=default_organization) for _ in range(num_projects)
+    ]
+    public_keys = [key for project in projects for key in _cache_keys_for_project(project)]
+    redis_cache.set_many({public_key: {"dummy": "dummy"} for public_key in public_keys})
+
+    def compute():
+        ProjectOption.objects.clear_local_cache()
+        if bulk:
+            return compute_configs(organization_id=default_organization.id)
+        configs = {}
+        for project in projects:
+            configs.update(compute_configs(project_id=project.id))
+        return configs
+
+    configs = benchmark.pedantic(compute, rounds=5)
+    benchmark.extra_info["projects"] = num_projects
+    assert set(public_keys) <= set(configs)
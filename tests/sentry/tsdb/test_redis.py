@@ -28,11 +28,13 @@ def test_suppression_wrapper():
 
 
 class RedisTSDBTest(TestCase):
+    backend_cls: type[RedisTSDB] = RedisTSDB
+
     @override_options(
         {"redis.clusters": {"tsdb": {"hosts": {i - 6: {"db": i} for i in range(6, 9)}}}}
     )
     def setUp(self):
-        self.db = RedisTSDB(
+        self.db = self.backend_cls(
             rollups=(
                 # time in seconds, samples to keep
                 (10, 30),  # 5 minutes at 10 seconds
@@ -1,3 +1,4 @@
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
 from hashlib import md5
@@ -7,6 +8,7 @@ from unittest.mock import call
 import pytest
 from arroyo import Message
 from arroyo.backends.kafka import KafkaPayload
+from arroyo.processing.strategies import ProcessingStrategy
 from arroyo.types import BrokerValue, Partition, Topic
 from sentry_kafka_schemas.schema_types.uptime_results_v1 import (
     CHECKSTATUS_FAILURE,
@@ -24,6 +26,7 @@ from sentry.uptime.consumers.results_consumer import (
     AUTO_DETECTED_ACTIVE_SUBSCRIPTION_INTERVAL,
     ONBOARDING_MONITOR_PERIOD,
     UptimeResultsStrategyFactory,
+    build_active_consecutive_status_key,
     build_last_update_key,
     build_onboarding_failure_key,
 )
@@ -49,7 +52,7 @@ class ProcessResultTest(ProducerTestMixin):
             uptime_subscription=self.subscription
         )
 
-    def send_result(self, result: CheckResult):
+    def send_result(self, result: CheckResult, consumer: ProcessingStrategy | None = None):
         codec = kafka_definition.get_topic_codec(kafka_definition.Topic.UPTIME_RESULTS)
         message = Message(
             BrokerValue(
@@ -60,10 +63,10 @@ class ProcessResultTest(ProducerTestMixin):
             )
         )
         with self.feature(UptimeDomainCheckFailure.build_ingest_feature_name()):
-            factory = UptimeResultsStrategyFactory()
-            commit = mock.Mock()
-
-            consumer = factory.create_with_partitions(commit, {self.partition: 0})
+            if consumer is None:
+                factory = UptimeResultsStrategyFactory()
+                commit = mock.Mock()
+                consumer = factory.create_with_partitions(commit, {self.partition: 0})
             consumer.submit(message)
 
     def test(self):
@@ -407,6 +410,74 @@ class ProcessResultTest(ProducerTestMixin):
         with pytest.raises(Group.DoesNotExist):
             Group.objects.get(grouphash__hash=hashed_fingerprint)
 
+    @override_options(
+        {
+            "uptime.result-consumer.in-memory-state": True,
+            "uptime.result-consumer.state-checkpoint-seconds": 600,
+        }
+    )
+    def test_in_memory_state(self):
+        factory = UptimeResultsStrategyFactory()
+        consumer = factory.create_with_partitions(mock.Mock(), {self.partition: 0})
+        redis = _get_cluster()
+        failure_key = build_active_consecutive_status_key(
+            self.project_subscription, CHECKSTATUS_FAILURE
+        )
+        last_update_key = build_last_update_key(self.project_subscription)
+
+        with self.feature("organizations:uptime-create-issues"):
+            for minutes in (5, 4, 3):
+                result = self.create_uptime_result(
+                    self.subscription.subscription_id,
+                    scheduled_check_time=datetime.now() - timedelta(minutes=minutes),
+                )
+                self.send_result(result, consumer=consumer)
+
+                # Nothing is written to redis until the state is checkpointed
+                assert not redis.exists(failure_key)
+                assert not redis.exists(last_update_key)
+
+            # The last update is kept in memory as well, so duplicates are skipped
+            with mock.patch("sentry.uptime.consumers.results_consumer.metrics") as metrics:
+                self.send_result(result, consumer=consumer)
+                metrics.incr.assert_has_calls(
+                    [
+                        call(
+                            "uptime.result_processor.skipping_already_processed_update",
+                            tags={"status": CHECKSTATUS_FAILURE, "mode": "auto_detected_active"},
+                            sample_rate=1.0,
+                        ),
+                    ]
+                )
+
+        hashed_fingerprint = md5(str(self.project_subscription.id).encode("utf-8")).hexdigest()
+        assert Group.objects.filter(grouphash__hash=hashed_fingerprint).exists()
+        self.project_subscription.refresh_from_db()
+        assert self.project_subscription.uptime_status == UptimeStatus.FAILED
+
+        # The state is checkpointed when polling once the interval passed, also without results
+        with mock.patch(
+            "sentry.uptime.consumers.state_store.time.time", return_value=time.time() + 601
+        ):
+            consumer.poll()
+        assert redis.get(failure_key) == "3"
+        assert redis.get(last_update_key) == str(result["scheduled_check_time_ms"])
+        assert redis.ttl(failure_key) > 0
+
+        result = self.create_uptime_result(
+            self.subscription.subscription_id,
+            scheduled_check_time=datetime.now() - timedelta(minutes=2),
+        )
+        with self.feature("organizations:uptime-create-issues"):
+            self.send_result(result, consumer=consumer)
+        assert redis.get(last_update_key) != str(result["scheduled_check_time_ms"])
+
+        # Joining the strategy, e.g. before partitions are revoked, flushes the state for the
+        # next owner
+        consumer.close()
+        consumer.join()
+        assert redis.get(last_update_key) == str(result["scheduled_check_time_ms"])
+
     def test_missed(self):
         result = self.create_uptime_result(
             self.subscription.subscription_id, status=CHECKSTATUS_MISSED_WINDOW
@@ -0,0 +1,60 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from sentry.testutils.cases import TestCase
+from sentry.uptime.consumers.state_store import InMemoryStateStore
+from sentry.uptime.detectors.ranking import _get_cluster
+
+
+class InMemoryStateStoreTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.redis = _get_cluster()
+        self.store = InMemoryStateStore(timedelta(seconds=10))
+
+    def test_loads_from_redis(self):
+        self.redis.set("uptime-state:a", 5, ex=60)
+
+        assert self.store.get_many(["uptime-state:a", "uptime-state:b"]) == [5, None]
+        assert self.store.incr("uptime-state:a", timedelta(minutes=1)) == 6
+        assert self.store.incr("uptime-state:b", timedelta(minutes=1)) == 1
+
+        # Loaded keys aren't read again
+        self.redis.set("uptime-state:a", 10, ex=60)
+        assert self.store.get_many(["uptime-state:a"]) == [6]
+
+    def test_checkpoint(self):
+        self.redis.set("uptime-state:deleted", 1, ex=60)
+        self.store.set("uptime-state:a", 1, timedelta(minutes=1))
+        self.store.incr("uptime-state:b", timedelta(minutes=1))
+        self.store.delete("uptime-state:deleted")
+
+        # Too early
+        self.store.checkpoint()
+        assert not self.redis.exists("uptime-state:a")
+
+        with mock.patch("time.time", return_value=time.time() + 11):
+            self.store.checkpoint()
+        assert self.redis.get("uptime-state:a") == "1"
+        assert self.redis.get("uptime-state:b") == "1"
+        assert 0 < self.redis.ttl("uptime-state:b") <= 60
+        assert not self.redis.exists("uptime-state:deleted")
+        assert not self.store.dirty
+
+    def test_expiry(self):
+        self.store.set("uptime-state:a", 1, timedelta(seconds=5))
+
+        with mock.patch("time.time", return_value=time.time() + 6):
+            assert self.store.get_many(["uptime-state:a"]) == [None]
+            assert self.store.incr("uptime-state:a", timedelta(seconds=5)) == 1
+
+    def test_clear(self):
+        self.store.set("uptime-state:a", 1, timedelta(minutes=1))
+        self.store.clear()
+
+        assert self.redis.get("uptime-state:a") == "1"
+        assert self.store.values == {}
+
+        self.redis.set("uptime-state:a", 2, ex=60)
+        assert self.store.get_many(["uptime-state:a"]) == [2]
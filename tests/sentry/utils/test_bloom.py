@@ -0,0 +1,15 @@
+from sentry.utils.bloom import BloomFilter
+
+
+def test_bloom_filter() -> None:
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    assert "a" not in bloom
+
+    for i in range(1000):
+        bloom.add(f"known:{i}")
+    assert len(bloom) == 1000
+    assert bloom.full
+
+    assert all(f"known:{i}" in bloom for i in range(1000))
+    false_positives = sum(f"unknown:{i}" in bloom for i in range(10000))
+    assert false_positives < 300
@@ -3,6 +3,7 @@ import uuid
 from enum import Enum
 from unittest import TestCase
 
+import pytest
 from django.utils.translation import gettext_lazy as _
 
 from sentry.utils import json
@@ -128,3 +129,18 @@ class JSONHelpersTest(TestCase):
             "good_dogs": "all",
             "bad_dogs": None,
         }
+
+    def test_loads_array_items(self):
+        assert list(json.loads_array_items(b' [ {"a": 1}, 2,"x" ]\n')) == [{"a": 1}, 2, "x"]
+        assert list(json.loads_array_items("[]")) == []
+
+    def test_loads_array_items_invalid(self):
+        items = json.loads_array_items('[{"a": 1}, 2 3]')
+        assert next(items) == {"a": 1}
+        assert next(items) == 2
+        with pytest.raises(json.JSONDecodeError):
+            next(items)
+
+        for value in ('{"a": 1}', "[1,]", "[1", "[1] 2", ""):
+            with pytest.raises(json.JSONDecodeError):
+                list(json.loads_array_items(value))